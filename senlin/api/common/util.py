@@ -69,16 +69,16 @@ def parse_request(name, req, body, key=None):
     try:
         obj = req_cls.obj_from_primitive(primitive)
         jsonschema.validate(primitive, obj.to_json_schema())
+
+        # Do version coversion if necessary
+        if version != req_cls.VERSION:
+            obj.obj_make_compatible(primitive, version)
+            obj = req_cls.obj_from_primitive(primitive)
     except ValueError as ex:
         raise exc.HTTPBadRequest(six.text_type(ex))
     except jsonschema.exceptions.ValidationError as ex:
         raise exc.HTTPBadRequest(six.text_type(ex.message))
 
-    # Do version coversion if necessary
-    if obj is not None and version != req_cls.VERSION:
-        obj.obj_make_compatible(primitive, version)
-        return req_cls.obj_from_primitive(primitive)
-
     return obj
 
 
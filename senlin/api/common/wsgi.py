@@ -49,6 +49,7 @@ LOG = logging.getLogger(__name__)
 URL_LENGTH_LIMIT = 50000
 DEFAULT_API_VERSION = '1.0'
 API_VERSION_KEY = 'OpenStack-API-Version'
+TOTAL_COUNT_KEY = 'OpenStack-Clustering-Total-Count'
 VER_METHOD_ATTR = 'versioned_methods'
 
 # senlin_api, api opts
@@ -665,6 +666,9 @@ class Resource(object):
                 location = action_result.pop('location', None)
                 if location:
                     response.location = '/v1%s' % location
+                total_count = action_result.pop('total_count', None)
+                if total_count is not None:
+                    response.headers[TOTAL_COUNT_KEY] = str(total_count)
                 if not action_result:
                     action_result = None
 
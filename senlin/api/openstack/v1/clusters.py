@@ -18,6 +18,7 @@ Cluster endpoint for Senlin v1 REST API.
 from webob import exc
 
 from senlin.api.common import util
+from senlin.api.common import version_request as vr
 from senlin.api.common import wsgi
 from senlin.common import consts
 from senlin.common.i18n import _
@@ -50,6 +51,8 @@ class ClusterController(wsgi.Controller):
             consts.PARAM_SORT: 'single',
             consts.PARAM_GLOBAL_PROJECT: 'single',
         }
+        if req.version_request >= vr.APIVersionRequest('1.13'):
+            whitelist[consts.PARAM_WITH_COUNT] = 'single'
         for key in req.params.keys():
             if key not in whitelist:
                 raise exc.HTTPBadRequest(_("Invalid parameter '%s'") % key)
@@ -60,9 +63,17 @@ class ClusterController(wsgi.Controller):
         is_global = params.pop(consts.PARAM_GLOBAL_PROJECT, False)
         unsafe = util.parse_bool_param(consts.PARAM_GLOBAL_PROJECT, is_global)
         params['project_safe'] = not unsafe
+        if consts.PARAM_WITH_COUNT in whitelist:
+            params[consts.PARAM_WITH_COUNT] = util.parse_bool_param(
+                consts.PARAM_WITH_COUNT,
+                params.get(consts.PARAM_WITH_COUNT, False))
         req_obj = util.parse_request('ClusterListRequest', req, params)
         clusters = self.rpc_client.call(req.context, 'cluster_list', req_obj)
-        return {'clusters': clusters}
+        if req.version_request < vr.APIVersionRequest('1.13'):
+            return {'clusters': clusters}
+
+        # The engine returns the list with the paging details
+        return clusters
 
     @util.policy_enforce
     def create(self, req, body):
@@ -17,6 +17,7 @@ Event endpoint for Senlin v1 REST API.
 from webob import exc
 
 from senlin.api.common import util
+from senlin.api.common import version_request as vr
 from senlin.api.common import wsgi
 from senlin.common import consts
 from senlin.common.i18n import _
@@ -43,6 +44,8 @@ class EventController(wsgi.Controller):
             consts.PARAM_SORT: 'single',
             consts.PARAM_GLOBAL_PROJECT: 'single',
         }
+        if req.version_request >= vr.APIVersionRequest('1.13'):
+            whitelist[consts.PARAM_WITH_COUNT] = 'single'
 
         for key in req.params.keys():
             if key not in whitelist.keys():
@@ -53,11 +56,19 @@ class EventController(wsgi.Controller):
             consts.PARAM_GLOBAL_PROJECT,
             params.pop(consts.PARAM_GLOBAL_PROJECT, False))
         params['project_safe'] = project_safe
+        if consts.PARAM_WITH_COUNT in whitelist:
+            params[consts.PARAM_WITH_COUNT] = util.parse_bool_param(
+                consts.PARAM_WITH_COUNT,
+                params.get(consts.PARAM_WITH_COUNT, False))
 
         obj = util.parse_request('EventListRequest', req, params)
         events = self.rpc_client.call(req.context, "event_list", obj)
 
-        return {'events': events}
+        if req.version_request < vr.APIVersionRequest('1.13'):
+            return {'events': events}
+
+        # The engine returns the list with the paging details
+        return events
 
     @util.policy_enforce
     def get(self, req, event_id):
@@ -16,6 +16,7 @@ Node endpoint for Senlin v1 REST API.
 from webob import exc
 
 from senlin.api.common import util
+from senlin.api.common import version_request as vr
 from senlin.api.common import wsgi
 from senlin.common import consts
 from senlin.common.i18n import _
@@ -43,6 +44,8 @@ class NodeController(wsgi.Controller):
             consts.PARAM_SORT: 'single',
             consts.PARAM_GLOBAL_PROJECT: 'single'
         }
+        if req.version_request >= vr.APIVersionRequest('1.13'):
+            whitelist[consts.PARAM_WITH_COUNT] = 'single'
         for key in req.params.keys():
             if key not in whitelist.keys():
                 raise exc.HTTPBadRequest(_('Invalid parameter %s') % key)
@@ -52,10 +55,18 @@ class NodeController(wsgi.Controller):
             consts.PARAM_GLOBAL_PROJECT,
             params.pop(consts.PARAM_GLOBAL_PROJECT, False))
         params['project_safe'] = project_safe
+        if consts.PARAM_WITH_COUNT in whitelist:
+            params[consts.PARAM_WITH_COUNT] = util.parse_bool_param(
+                consts.PARAM_WITH_COUNT,
+                params.get(consts.PARAM_WITH_COUNT, False))
 
         obj = util.parse_request('NodeListRequest', req, params)
         nodes = self.rpc_client.call(req.context, 'node_list', obj)
-        return {'nodes': nodes}
+        if req.version_request < vr.APIVersionRequest('1.13'):
+            return {'nodes': nodes}
+
+        # The engine returns the list with the paging details
+        return nodes
 
     @util.policy_enforce
     def create(self, req, body):
@@ -24,7 +24,7 @@ class VersionController(object):
     # This includes any semantic changes which may not affect the input or
     # output formats or even originate in the API code layer.
     _MIN_API_VERSION = "1.0"
-    _MAX_API_VERSION = "1.12"
+    _MAX_API_VERSION = "1.13"
 
     DEFAULT_API_VERSION = _MIN_API_VERSION
 
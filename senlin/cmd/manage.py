@@ -22,6 +22,7 @@ from oslo_utils import timeutils
 
 from senlin.common import context
 from senlin.common.i18n import _
+from senlin.common import scheduleutils
 from senlin.db import api
 from senlin.objects import service as service_obj
 from senlin import version
@@ -42,15 +43,23 @@ def do_db_sync():
     api.db_sync(api.get_engine(), CONF.command.version)
 
 
+def _report_progress(count):
+    """Report the number of records purged so far."""
+    print(_("%s records purged so far...") % count)
+
+
 def do_event_purge():
     """Purge the specified event records in senlin's database."""
     if CONF.command.age < 0:
         print(_("Age must be a positive integer."))
         return
-    api.event_purge(api.get_engine(),
-                    CONF.command.project_id,
-                    CONF.command.granularity,
-                    CONF.command.age)
+    count = api.event_purge(api.get_engine(),
+                            CONF.command.project_id,
+                            CONF.command.granularity,
+                            CONF.command.age,
+                            chunk_size=CONF.command.chunk_size,
+                            progress=_report_progress)
+    print(_("%s event records purged.") % count)
 
 
 def do_action_purge():
@@ -71,10 +80,23 @@ def do_action_purge():
     if age < CONF.default_action_timeout:
         print(_("Age must be greater than the default action timeout."))
         return
-    api.action_purge(api.get_engine(),
-                     CONF.command.project_id,
-                     CONF.command.granularity,
-                     CONF.command.age)
+    count = api.action_purge(api.get_engine(),
+                             CONF.command.project_id,
+                             CONF.command.granularity,
+                             CONF.command.age,
+                             chunk_size=CONF.command.chunk_size,
+                             progress=_report_progress)
+    print(_("%s action records purged.") % count)
+
+
+def do_action_queue():
+    """Show the number of ready actions in each scheduling class."""
+    depth = api.action_count_ready_by_class(context.get_admin_context())
+
+    print_format = "%-16s %-10s"
+    print(print_format % (_('Class'), _('Ready')))
+    for cls in scheduleutils.ACTION_CLASSES:
+        print(print_format % (cls, depth[cls]))
 
 
 class ServiceManageCommand(object):
@@ -154,6 +176,12 @@ def add_command_parsers(subparsers):
 
     parser = subparsers.add_parser('event_purge')
     parser.set_defaults(func=do_event_purge)
+    parser.add_argument('-c',
+                        '--chunk-size',
+                        type=int,
+                        help=_("Maximum number of event records deleted in "
+                               "one transaction. Defaults to the "
+                               "purge_chunk_size option."))
     parser.add_argument('-p',
                         '--project-id',
                         nargs='?',
@@ -183,6 +211,12 @@ def add_command_parsers(subparsers):
 
     parser = subparsers.add_parser('action_purge')
     parser.set_defaults(func=do_action_purge)
+    parser.add_argument('-c',
+                        '--chunk-size',
+                        type=int,
+                        help=_("Maximum number of action records deleted in "
+                               "one transaction. Defaults to the "
+                               "purge_chunk_size option."))
     parser.add_argument('-p',
                         '--project-id',
                         nargs='?',
@@ -210,6 +244,9 @@ def add_command_parsers(subparsers):
                                "purging actions created two hours ago. "
                                "Defaults to 30."))
 
+    parser = subparsers.add_parser('action_queue')
+    parser.set_defaults(func=do_action_queue)
+
 
 command_opt = cfg.SubCommandOpt('command',
                                 title='Commands',
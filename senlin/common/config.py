@@ -72,19 +72,88 @@ engine_opts = [
                help=_('Timeout in seconds for actions.')),
     cfg.IntOpt('max_actions_per_batch',
                default=0,
-               help=_('Maximum number of node actions that each engine worker '
-                      'can schedule consecutively per batch. 0 means no '
-                      'limit.')),
+               help=_('Maximum number of node actions of the same type that '
+                      'can start at once on the same backend and region, '
+                      'across all engines. 0 means no limit.')),
     cfg.IntOpt('batch_interval',
                default=3,
-               help=_('Seconds to pause between scheduling two consecutive '
-                      'batches of node actions.')),
+               help=_('Seconds for the node actions of the same type on the '
+                      'same backend and region to be allowed another batch '
+                      'of max_actions_per_batch starts.')),
+    cfg.IntOpt('max_actions_per_claim',
+               default=1, min=1,
+               help=_('Maximum number of ready actions that each engine '
+                      'worker claims from the database in one transaction. '
+                      '1 means actions are claimed one at a time.')),
+    cfg.IntOpt('scheduling_window',
+               default=0, min=0,
+               help=_('Number of ready actions each engine worker examines '
+                      'when claiming actions, so that recovery actions go '
+                      'first, then user requests, then derived actions, '
+                      'with projects sharing each class in turns. 0 means '
+                      'actions are claimed in creation order.')),
+    cfg.IntOpt('dependency_check_interval',
+               default=10,
+               help=_('Seconds between two consecutive status checks of an '
+                      'action waiting for its depended actions, if it is not '
+                      'woken up by their completion earlier.')),
+    cfg.FloatOpt('notification_coalesce_interval',
+                 default=0.2, min=0,
+                 help=_('Seconds during which requests for scheduling ready '
+                        'actions are coalesced into one notification to the '
+                        'engines. 0 means every request is sent at once.')),
+    cfg.IntOpt('signal_refresh_interval',
+               default=30,
+               help=_('Seconds after which a running action re-reads its '
+                      'control signal from the database, in case the signal '
+                      'was not delivered to its engine.')),
     cfg.IntOpt('lock_retry_times',
                default=3,
                help=_('Number of times trying to grab a lock.')),
     cfg.IntOpt('lock_retry_interval',
                default=10,
-               help=_('Number of seconds between lock retries.')),
+               help=_('Initial number of seconds before retrying an action '
+                      'which failed to grab a lock. The interval doubles '
+                      'with each retry.')),
+    cfg.IntOpt('lock_retry_max_interval',
+               default=120,
+               help=_('Maximum number of seconds before retrying an action '
+                      'which failed to grab a lock.')),
+    cfg.IntOpt('lock_wait_timeout',
+               default=60,
+               help=_('Maximum number of seconds an action waits in line for '
+                      'a lock held by another action before giving up and '
+                      'being retried later. 0 means not waiting.')),
+    cfg.IntOpt('lock_wait_check_interval',
+               default=10,
+               help=_('Seconds between two consecutive attempts of an action '
+                      'waiting in line for a lock, if it is not woken up by '
+                      'the release of the lock earlier.')),
+    cfg.IntOpt('purge_chunk_size',
+               default=1000, min=1,
+               help=_('Maximum number of records deleted in one transaction '
+                      'when purging events or actions.')),
+    cfg.IntOpt('event_retention_interval',
+               default=0, min=0,
+               help=_('Seconds between two consecutive runs of the event '
+                      'retention task of each engine, which purges the '
+                      'events beyond event_retention_age and '
+                      'max_events_per_cluster. 0 disables the task.')),
+    cfg.IntOpt('node_count_reconcile_interval',
+               default=3600, min=0,
+               help=_('Seconds between two consecutive runs of the task of '
+                      'each engine repairing the per-cluster node status '
+                      'counters from the node records. 0 disables the '
+                      'task.')),
+    cfg.IntOpt('event_retention_age',
+               default=30, min=0,
+               help=_('Number of days events are kept by the event '
+                      'retention task. 0 means no age limit.')),
+    cfg.IntOpt('max_events_per_cluster',
+               default=0, min=0,
+               help=_('Maximum number of events kept for each cluster by '
+                      'the event retention task, the oldest ones being '
+                      'purged first. 0 means no limit.')),
     cfg.IntOpt('database_retry_limit',
                default=10,
                help=_('Number of times retrying a failed operation on the '
@@ -95,6 +164,25 @@ engine_opts = [
     cfg.IntOpt('database_max_retry_interval',
                default=2,
                help=_('Maximum number of seconds between database retries.')),
+    cfg.ListOpt('database_replica_reads',
+                default=[],
+                help=_('Families of read-only API queries served by the '
+                       'replica database set by the slave_connection '
+                       'option of the [database] section, among cluster, '
+                       'node, profile, policy, action, receiver and event. '
+                       'These queries are served by the main database when '
+                       'no replica is configured.')),
+    cfg.IntOpt('list_count_cache_ttl',
+               default=30, min=0,
+               help=_('Number of seconds the approximate total counts of '
+                      'the listed clusters, nodes, actions and events are '
+                      'cached for. 0 disables the cache.')),
+    cfg.IntOpt('object_cache_size',
+               default=1000, min=0,
+               help=_('Maximum number of profiles, of policies, and of '
+                      'node and policy lists of clusters an engine keeps '
+                      'in memory after loading them from the database. 0 '
+                      'disables the caches.')),
     cfg.IntOpt('engine_life_check_timeout',
                default=2,
                help=_('RPC timeout for the engine liveness check that is used'
@@ -150,7 +238,23 @@ dispatcher_opts = [
                choices=("critical", "error", "warning", "info", "debug"),
                help=_("Lowest event priorities to be dispatched.")),
     cfg.BoolOpt("exclude_derived_actions", default=True,
-                help=_("Exclude derived actions from events dumping."))]
+                help=_("Exclude derived actions from events dumping.")),
+    cfg.FloatOpt('flush_interval', default=1.0, min=0,
+                 help=_("Maximum number of seconds events are buffered by "
+                        "the database dispatcher before being written. 0 "
+                        "means every event is written or sent at once by "
+                        "all dispatchers.")),
+    cfg.IntOpt('batch_size', default=100, min=1,
+               help=_("Maximum number of buffered events written in one "
+                      "batch. A batch is written as soon as it is full.")),
+    cfg.IntOpt('max_queue_size', default=10000, min=1,
+               help=_("Maximum number of events buffered. Further events "
+                      "are dropped until buffered events are written.")),
+    cfg.DictOpt('sample_rates', default={},
+                help=_("Fractions of the events of derived node actions "
+                       "sent by the message dispatcher, keyed by priority, "
+                       "e.g. 'info:0.1,debug:0.01'. All the events of the "
+                       "priorities not listed are sent."))]
 
 cfg.CONF.register_group(dispatcher_group)
 cfg.CONF.register_opts(dispatcher_opts, group=dispatcher_group)
@@ -28,10 +28,10 @@ RPC_ATTRS = (
 
 RPC_PARAMS = (
     PARAM_LIMIT, PARAM_MARKER, PARAM_GLOBAL_PROJECT,
-    PARAM_SHOW_DETAILS, PARAM_SORT,
+    PARAM_SHOW_DETAILS, PARAM_SORT, PARAM_WITH_COUNT,
 ) = (
     'limit', 'marker', 'global_project',
-    'show_details', 'sort',
+    'show_details', 'sort', 'with_count',
 )
 
 SUPPORT_STATUSES = (
@@ -268,6 +268,14 @@ ACTION_STATUSES = (
     'SUSPENDED',
 )
 
+# Note: This is a copy of action signal definition defined in
+# senlin.engine.actions.base module.
+ACTION_SIGNALS = (
+    ACTION_SIG_CANCEL, ACTION_SIG_SUSPEND, ACTION_SIG_RESUME,
+) = (
+    'CANCEL', 'SUSPEND', 'RESUME',
+)
+
 ACTION_PARAMS = (
     ACTION_UPDATE_FORCE,
 ) = (
@@ -24,6 +24,8 @@ JsonPayloadSerializer = messaging.JsonPayloadSerializer
 TRANSPORT = None
 NOTIFICATION_TRANSPORT = None
 NOTIFIER = None
+# Notifiers prepared for each publisher, and the notifier they come from
+PREPARED_NOTIFIERS = {}
 
 
 class RequestContextSerializer(messaging.Serializer):
@@ -104,6 +106,7 @@ def cleanup():
         TRANSPORT.cleanup()
         TRANSPORT = None
     NOTIFIER = None
+    PREPARED_NOTIFIERS.clear()
     if NOTIFICATION_TRANSPORT:
         NOTIFICATION_TRANSPORT.cleanup()
         NOTIFICATION_TRANSPORT = None
@@ -130,6 +133,12 @@ def get_rpc_client(topic, server, serializer=None):
 
 
 def get_notifier(publisher_id):
-    """Return a configured oslo_messaging notifier."""
-    global NOTIFIER
-    return NOTIFIER.prepare(publisher_id=publisher_id)
+    """Return a configured oslo_messaging notifier.
+
+    The notifier is prepared once for each publisher and then reused.
+    """
+    base, notifier = PREPARED_NOTIFIERS.get(publisher_id, (None, None))
+    if notifier is None or base is not NOTIFIER:
+        notifier = NOTIFIER.prepare(publisher_id=publisher_id)
+        PREPARED_NOTIFIERS[publisher_id] = (NOTIFIER, notifier)
+    return notifier
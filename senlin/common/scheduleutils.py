@@ -0,0 +1,82 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Utilities for ordering ready actions by priority class and project.
+"""
+
+import collections
+
+from six.moves import zip_longest
+
+from senlin.common import consts
+
+# Scheduling classes of actions, from the highest priority to the lowest.
+ACTION_CLASSES = (
+    CLASS_RECOVERY, CLASS_RPC, CLASS_DERIVED,
+) = (
+    'recovery', 'rpc', 'derived',
+)
+
+RECOVERY_ACTIONS = (
+    consts.CLUSTER_RECOVER, consts.NODE_RECOVER,
+)
+
+
+def action_class(action):
+    """Get the scheduling class of an action.
+
+    Recovery actions, whether requested by users, the health manager or
+    derived from a cluster recovery, come first so that they are not stuck
+    behind large deployments.
+
+    :param action: An action object or DB record.
+    :returns: One of the classes defined in ACTION_CLASSES.
+    """
+    if action.action in RECOVERY_ACTIONS:
+        return CLASS_RECOVERY
+    if action.cause == consts.CAUSE_RPC:
+        return CLASS_RPC
+    return CLASS_DERIVED
+
+
+def fair_order(actions):
+    """Order actions by class, sharing each class fairly among projects.
+
+    Within a class, projects take turns in a round robin, and the actions of
+    a project keep their original order.
+
+    :param actions: A list of actions, sorted by creation time.
+    :returns: A list of the same actions in the order to be scheduled.
+    """
+    queues = dict((c, collections.OrderedDict()) for c in ACTION_CLASSES)
+    for action in actions:
+        projects = queues[action_class(action)]
+        projects.setdefault(action.project, []).append(action)
+
+    result = []
+    for cls in ACTION_CLASSES:
+        for turn in zip_longest(*queues[cls].values()):
+            result.extend(a for a in turn if a is not None)
+    return result
+
+
+def queue_depth(actions):
+    """Count the actions in each scheduling class.
+
+    :param actions: A list of actions.
+    :returns: A dict mapping each class in ACTION_CLASSES to a count.
+    """
+    depth = dict((c, 0) for c in ACTION_CLASSES)
+    for action in actions:
+        depth[action_class(action)] += 1
+    return depth
@@ -14,6 +14,7 @@
 Common utilities module.
 """
 
+import collections
 import random
 import re
 import string
@@ -33,6 +34,7 @@ from senlin.common.i18n import _
 from senlin.objects import service as service_obj
 
 cfg.CONF.import_opt('max_response_size', 'senlin.common.config')
+cfg.CONF.import_opt('object_cache_size', 'senlin.common.config')
 cfg.CONF.import_opt('periodic_interval', 'senlin.common.config')
 
 LOG = logging.getLogger(__name__)
@@ -242,3 +244,99 @@ def is_engine_dead(ctx, engine_id, duration=None):
     if timeutils.is_older_than(eng.updated_at, duration):
         return True
     return False
+
+
+# The object caches of this process, keyed by their names.
+_OBJECT_CACHES = {}
+
+
+class ObjectCache(object):
+    """A bounded LRU cache of objects built from database records.
+
+    Each entry remembers the version of the record its object was built
+    from, i.e. the 'updated_at' timestamp of the record. Looking up an entry
+    with another version is a miss, so a changed record is never served from
+    the cache even if the change has not been broadcast to this process.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        _OBJECT_CACHES[name] = self
+
+    def get(self, obj_id, version):
+        """Get a cached object.
+
+        :param obj_id: The ID of the object.
+        :param version: The version of the object record.
+        :returns: The cached object, or None if there is no object of that
+                  version in the cache.
+        """
+        entry = self._entries.pop(obj_id, None)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+
+        # Add the entry back as the most recently used one
+        self._entries[obj_id] = entry
+        self.hits += 1
+        return entry[1]
+
+    def peek(self, obj_id):
+        """Get a cached object of any version.
+
+        The object may be outdated. It is meant to be refreshed from the
+        database partially rather than be used as it is.
+
+        :param obj_id: The ID of the object.
+        :returns: The cached object, or None if the object is not cached.
+        """
+        entry = self._entries.get(obj_id)
+        return None if entry is None else entry[1]
+
+    def put(self, obj_id, version, obj):
+        """Cache an object, evicting the least recently used ones."""
+        size = cfg.CONF.object_cache_size
+        if size <= 0:
+            return
+
+        self._entries.pop(obj_id, None)
+        self._entries[obj_id] = (version, obj)
+        while len(self._entries) > size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, obj_id):
+        self._entries.pop(obj_id, None)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Get the hit and miss counters and the size of the cache."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+        }
+
+
+def invalidate_cached_object(name, obj_id):
+    """Remove an object from the named cache of this process, if any."""
+    cache = _OBJECT_CACHES.get(name)
+    if cache is not None:
+        cache.invalidate(obj_id)
+
+
+def object_cache_stats():
+    """Get the statistics of the object caches of this process."""
+    return dict((name, cache.stats())
+                for name, cache in _OBJECT_CACHES.items())
+
+
+def clear_object_caches():
+    for cache in _OBJECT_CACHES.values():
+        cache.clear()
@@ -31,38 +31,62 @@ def get_engine():
     return IMPL.get_engine()
 
 
+def next_marker(rows, limit=None, sort=None, default_key=None):
+    return IMPL.next_marker(rows, limit=limit, sort=sort,
+                            default_key=default_key)
+
+
 # Clusters
 def cluster_create(context, values):
     return IMPL.cluster_create(context, values)
 
 
-def cluster_get(context, cluster_id, project_safe=True):
-    return IMPL.cluster_get(context, cluster_id, project_safe=project_safe)
+def cluster_get(context, cluster_id, project_safe=True, load_nodes=True):
+    return IMPL.cluster_get(context, cluster_id, project_safe=project_safe,
+                            load_nodes=load_nodes)
 
 
-def cluster_get_by_name(context, cluster_name, project_safe=True):
+def cluster_get_by_name(context, cluster_name, project_safe=True,
+                        load_nodes=True):
     return IMPL.cluster_get_by_name(context, cluster_name,
-                                    project_safe=project_safe)
+                                    project_safe=project_safe,
+                                    load_nodes=load_nodes)
 
 
-def cluster_get_by_short_id(context, short_id, project_safe=True):
+def cluster_get_by_short_id(context, short_id, project_safe=True,
+                            load_nodes=True):
     return IMPL.cluster_get_by_short_id(context, short_id,
-                                        project_safe=project_safe)
+                                        project_safe=project_safe,
+                                        load_nodes=load_nodes)
+
+
+def cluster_get_by_identity(context, identity, project_safe=True,
+                            load_nodes=True):
+    return IMPL.cluster_get_by_identity(context, identity,
+                                        project_safe=project_safe,
+                                        load_nodes=load_nodes)
 
 
 def cluster_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                    project_safe=True):
+                    project_safe=True, load_nodes=True, replica=False):
     return IMPL.cluster_get_all(context, limit=limit, marker=marker, sort=sort,
-                                filters=filters, project_safe=project_safe)
+                                filters=filters, project_safe=project_safe,
+                                load_nodes=load_nodes, replica=replica)
 
 
 def cluster_next_index(context, cluster_id):
     return IMPL.cluster_next_index(context, cluster_id)
 
 
-def cluster_count_all(context, filters=None, project_safe=True):
+def cluster_reserve_indexes(context, cluster_id, count):
+    return IMPL.cluster_reserve_indexes(context, cluster_id, count)
+
+
+def cluster_count_all(context, filters=None, project_safe=True,
+                      replica=False):
     return IMPL.cluster_count_all(context, filters=filters,
-                                  project_safe=project_safe)
+                                  project_safe=project_safe,
+                                  replica=replica)
 
 
 def cluster_update(context, cluster_id, values):
@@ -91,11 +115,23 @@ def node_get_by_short_id(context, short_id, project_safe=True):
                                      project_safe=project_safe)
 
 
+def node_get_by_identity(context, identity, project_safe=True):
+    return IMPL.node_get_by_identity(context, identity,
+                                     project_safe=project_safe)
+
+
 def node_get_all(context, cluster_id=None, limit=None, marker=None, sort=None,
-                 filters=None, project_safe=True):
+                 filters=None, project_safe=True, replica=False):
     return IMPL.node_get_all(context, cluster_id=cluster_id, filters=filters,
                              limit=limit, marker=marker, sort=sort,
-                             project_safe=project_safe)
+                             project_safe=project_safe, replica=replica)
+
+
+def node_count_all(context, cluster_id=None, filters=None, project_safe=True,
+                   replica=False):
+    return IMPL.node_count_all(context, cluster_id=cluster_id,
+                               filters=filters, project_safe=project_safe,
+                               replica=replica)
 
 
 def node_get_all_by_cluster(context, cluster_id, filters=None,
@@ -104,6 +140,13 @@ def node_get_all_by_cluster(context, cluster_id, filters=None,
                                         project_safe=project_safe)
 
 
+def node_columns_by_cluster(context, cluster_id, columns, filters=None,
+                            project_safe=True):
+    return IMPL.node_columns_by_cluster(context, cluster_id, columns,
+                                        filters=filters,
+                                        project_safe=project_safe)
+
+
 def node_ids_by_cluster(context, cluster_id, filters=None):
     return IMPL.node_ids_by_cluster(context, cluster_id, filters=None)
 
@@ -112,12 +155,22 @@ def node_count_by_cluster(context, cluster_id, **kwargs):
     return IMPL.node_count_by_cluster(context, cluster_id, **kwargs)
 
 
+def node_count_by_status(context, cluster_id):
+    return IMPL.node_count_by_status(context, cluster_id)
+
+
+def node_count_reconcile(context):
+    return IMPL.node_count_reconcile(context)
+
+
 def node_update(context, node_id, values):
     return IMPL.node_update(context, node_id, values)
 
 
-def node_migrate(context, node_id, to_cluster, timestamp, role=None):
-    return IMPL.node_migrate(context, node_id, to_cluster, timestamp, role)
+def node_migrate(context, node_id, to_cluster, timestamp, role=None,
+                 index=None):
+    return IMPL.node_migrate(context, node_id, to_cluster, timestamp, role,
+                             index)
 
 
 def node_delete(context, node_id):
@@ -157,6 +210,18 @@ def node_lock_steal(node_id, action_id):
     return IMPL.node_lock_steal(node_id, action_id)
 
 
+def lock_waiter_add(resource_id, action_id, engine_id, timestamp):
+    return IMPL.lock_waiter_add(resource_id, action_id, engine_id, timestamp)
+
+
+def lock_waiter_remove(resource_id, action_id):
+    return IMPL.lock_waiter_remove(resource_id, action_id)
+
+
+def lock_waiter_get_first(resource_id):
+    return IMPL.lock_waiter_get_first(resource_id)
+
+
 # Policies
 def policy_create(context, values):
     return IMPL.policy_create(context, values)
@@ -166,6 +231,11 @@ def policy_get(context, policy_id, project_safe=True):
     return IMPL.policy_get(context, policy_id, project_safe=project_safe)
 
 
+def policy_get_version(context, policy_id, project_safe=True):
+    return IMPL.policy_get_version(context, policy_id,
+                                   project_safe=project_safe)
+
+
 def policy_get_by_name(context, name, project_safe=True):
     return IMPL.policy_get_by_name(context, name, project_safe=project_safe)
 
@@ -175,10 +245,16 @@ def policy_get_by_short_id(context, short_id, project_safe=True):
                                        project_safe=project_safe)
 
 
+def policy_get_by_identity(context, identity, project_safe=True):
+    return IMPL.policy_get_by_identity(context, identity,
+                                       project_safe=project_safe)
+
+
 def policy_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                   project_safe=True):
+                   project_safe=True, replica=False):
     return IMPL.policy_get_all(context, limit=limit, marker=marker, sort=sort,
-                               filters=filters, project_safe=project_safe)
+                               filters=filters, project_safe=project_safe,
+                               replica=replica)
 
 
 def policy_update(context, policy_id, values):
@@ -234,6 +310,11 @@ def profile_get(context, profile_id, project_safe=True):
     return IMPL.profile_get(context, profile_id, project_safe=project_safe)
 
 
+def profile_get_version(context, profile_id, project_safe=True):
+    return IMPL.profile_get_version(context, profile_id,
+                                    project_safe=project_safe)
+
+
 def profile_get_by_name(context, name, project_safe=True):
     return IMPL.profile_get_by_name(context, name, project_safe=project_safe)
 
@@ -243,11 +324,16 @@ def profile_get_by_short_id(context, short_id, project_safe=True):
                                         project_safe=project_safe)
 
 
+def profile_get_by_identity(context, identity, project_safe=True):
+    return IMPL.profile_get_by_identity(context, identity,
+                                        project_safe=project_safe)
+
+
 def profile_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                    project_safe=True):
+                    project_safe=True, replica=False):
     return IMPL.profile_get_all(context, limit=limit, marker=marker,
                                 sort=sort, filters=filters,
-                                project_safe=project_safe)
+                                project_safe=project_safe, replica=replica)
 
 
 def profile_update(context, profile_id, values):
@@ -284,19 +370,39 @@ def event_create(context, values):
     return IMPL.event_create(context, values)
 
 
-def event_get(context, event_id, project_safe=True):
-    return IMPL.event_get(context, event_id, project_safe=project_safe)
+def event_create_bulk(context, values):
+    return IMPL.event_create_bulk(context, values)
+
+
+def event_get(context, event_id, project_safe=True, replica=False):
+    return IMPL.event_get(context, event_id, project_safe=project_safe,
+                          replica=replica)
 
 
-def event_get_by_short_id(context, short_id, project_safe=True):
+def event_get_by_short_id(context, short_id, project_safe=True,
+                          replica=False):
     return IMPL.event_get_by_short_id(context, short_id,
-                                      project_safe=project_safe)
+                                      project_safe=project_safe,
+                                      replica=replica)
+
+
+def event_get_by_identity(context, identity, project_safe=True,
+                          replica=False):
+    return IMPL.event_get_by_identity(context, identity,
+                                      project_safe=project_safe,
+                                      replica=replica)
 
 
 def event_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                  project_safe=True):
+                  project_safe=True, replica=False):
     return IMPL.event_get_all(context, limit=limit, marker=marker, sort=sort,
-                              filters=filters, project_safe=project_safe)
+                              filters=filters, project_safe=project_safe,
+                              replica=replica)
+
+
+def event_count_all(context, filters=None, project_safe=True, replica=False):
+    return IMPL.event_count_all(context, filters=filters,
+                                project_safe=project_safe, replica=replica)
 
 
 def event_count_by_cluster(context, cluster_id, project_safe=True):
@@ -320,6 +426,10 @@ def action_create(context, values):
     return IMPL.action_create(context, values)
 
 
+def action_create_bulk(context, values, dependencies, nodes=None):
+    return IMPL.action_create_bulk(context, values, dependencies, nodes=nodes)
+
+
 def action_update(context, action_id, values):
     return IMPL.action_update(context, action_id, values)
 
@@ -343,6 +453,11 @@ def action_get_by_short_id(context, short_id, project_safe=True):
                                        project_safe=project_safe)
 
 
+def action_get_by_identity(context, identity, project_safe=True):
+    return IMPL.action_get_by_identity(context, identity,
+                                       project_safe=project_safe)
+
+
 def action_get_all_by_owner(context, owner):
     return IMPL.action_get_all_by_owner(context, owner)
 
@@ -352,11 +467,22 @@ def action_get_all_active_by_target(context, target_id, project_safe=True):
                                                 project_safe=project_safe)
 
 
+def action_columns_active_by_target(context, target_id, columns,
+                                    project_safe=True):
+    return IMPL.action_columns_active_by_target(context, target_id, columns,
+                                                project_safe=project_safe)
+
+
 def action_get_all(context, filters=None, limit=None, marker=None, sort=None,
-                   project_safe=True):
+                   project_safe=True, replica=False):
     return IMPL.action_get_all(context, filters=filters, sort=sort,
                                limit=limit, marker=marker,
-                               project_safe=project_safe)
+                               project_safe=project_safe, replica=replica)
+
+
+def action_count_all(context, filters=None, project_safe=True, replica=False):
+    return IMPL.action_count_all(context, filters=filters,
+                                 project_safe=project_safe, replica=replica)
 
 
 def action_check_status(context, action_id, timestamp):
@@ -410,6 +536,24 @@ def action_acquire_first_ready(context, owner, timestamp):
     return IMPL.action_acquire_first_ready(context, owner, timestamp)
 
 
+def action_acquire_ready_batch(context, owner, timestamp, limit):
+    return IMPL.action_acquire_ready_batch(context, owner, timestamp, limit)
+
+
+def action_acquire_batch(context, action_ids, owner, timestamp):
+    return IMPL.action_acquire_batch(context, action_ids, owner, timestamp)
+
+
+def action_get_all_ready(context, timestamp=None, limit=None,
+                         action_class=None):
+    return IMPL.action_get_all_ready(context, timestamp=timestamp,
+                                     limit=limit, action_class=action_class)
+
+
+def action_count_ready_by_class(context, timestamp=None):
+    return IMPL.action_count_ready_by_class(context, timestamp=timestamp)
+
+
 def action_abandon(context, action_id, values=None):
     return IMPL.action_abandon(context, action_id, values)
 
@@ -450,11 +594,16 @@ def receiver_get_by_short_id(context, short_id, project_safe=True):
                                          project_safe=project_safe)
 
 
+def receiver_get_by_identity(context, identity, project_safe=True):
+    return IMPL.receiver_get_by_identity(context, identity,
+                                         project_safe=project_safe)
+
+
 def receiver_get_all(context, limit=None, marker=None, filters=None, sort=None,
-                     project_safe=True):
+                     project_safe=True, replica=False):
     return IMPL.receiver_get_all(context, limit=limit, marker=marker,
                                  sort=sort, filters=filters,
-                                 project_safe=project_safe)
+                                 project_safe=project_safe, replica=replica)
 
 
 def receiver_delete(context, receiver_id):
@@ -516,6 +665,11 @@ def registry_get_by_param(context, params):
     return IMPL.registry_get_by_param(context, params)
 
 
+def token_bucket_consume(context, bucket_id, rate, capacity, timestamp):
+    return IMPL.token_bucket_consume(context, bucket_id, rate, capacity,
+                                     timestamp)
+
+
 def db_sync(engine, version=None):
     """Migrate the database to `version` or the most recent version."""
     return IMPL.db_sync(engine, version=version)
@@ -526,11 +680,21 @@ def db_version(engine):
     return IMPL.db_version(engine)
 
 
-def event_purge(engine, project, granularity, age):
+def event_purge(engine, project, granularity, age, chunk_size=None,
+                progress=None):
     """Purge the event records in database."""
-    return IMPL.event_purge(project, granularity, age)
+    return IMPL.event_purge(project, granularity, age, chunk_size=chunk_size,
+                            progress=progress)
+
+
+def event_purge_excess(max_events, chunk_size=None, progress=None):
+    """Purge the oldest events of clusters having more than max_events."""
+    return IMPL.event_purge_excess(max_events, chunk_size=chunk_size,
+                                   progress=progress)
 
 
-def action_purge(engine, project, granularity, age):
+def action_purge(engine, project, granularity, age, chunk_size=None,
+                 progress=None):
     """Purge the action records in database."""
-    return IMPL.action_purge(project, granularity, age)
+    return IMPL.action_purge(project, granularity, age, chunk_size=chunk_size,
+                             progress=progress)
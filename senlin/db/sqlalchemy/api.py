@@ -14,6 +14,7 @@
 Implementation of SQLAlchemy backend.
 """
 
+import collections
 import datetime
 import six
 import sys
@@ -30,10 +31,14 @@ from oslo_utils import timeutils
 import osprofiler.sqlalchemy
 import sqlalchemy
 from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm import noload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.sql.expression import func
 
 from senlin.common import consts
 from senlin.common import exception
+from senlin.common import scheduleutils
 from senlin.db.sqlalchemy import migration
 from senlin.db.sqlalchemy import models
 from senlin.db.sqlalchemy import utils
@@ -47,6 +52,7 @@ _CONTEXT = threading.local()
 cfg.CONF.import_opt('database_retry_limit', 'senlin.common.config')
 cfg.CONF.import_opt('database_retry_interval', 'senlin.common.config')
 cfg.CONF.import_opt('database_max_retry_interval', 'senlin.common.config')
+cfg.CONF.import_opt('database_replica_reads', 'senlin.common.config')
 
 
 def _get_main_context_manager():
@@ -65,8 +71,22 @@ def get_engine():
     return _get_main_context_manager().writer.get_engine()
 
 
-def session_for_read():
-    return _get_main_context_manager().reader.using(_CONTEXT)
+def session_for_read(family=None):
+    """Get a session for reading.
+
+    :param family: The family of a read-only API query, such as 'node'. The
+                   query is served by the replica database if the family is
+                   enabled by the `database_replica_reads` option and a
+                   replica is configured. Engine paths, e.g. scheduling,
+                   locking and status updates, never pass a family so that
+                   they always read from the main database.
+    """
+    reader = _get_main_context_manager().reader
+    if family is not None and family in CONF.database_replica_reads:
+        # The asynchronous reader uses [database]slave_connection when
+        # it is set, and the main database otherwise
+        reader = reader.async_
+    return reader.using(_CONTEXT)
 
 
 def session_for_write():
@@ -87,20 +107,34 @@ def retry_on_deadlock(f):
         max_retry_interval=CONF.database_max_retry_interval)(f)
 
 
+def _short_id_filter(model, short_id):
+    """Filter the objects whose ID starts with the given short ID.
+
+    The range on the ID lets the primary key index serve the search on any
+    database, the LIKE keeps the match exact.
+    """
+    return sqlalchemy.and_(model.id >= short_id,
+                           model.id < short_id + '~',
+                           model.id.like('%s%%' % short_id))
+
+
+def _first_unique(query, arg):
+    """Get the only object of a query, probing two objects at most."""
+    objs = query.limit(2).all()
+    if len(objs) > 1:
+        raise exception.MultipleChoices(arg=arg)
+    return objs[0] if objs else None
+
+
 def query_by_short_id(context, model_query, model, short_id,
                       project_safe=True):
     q = model_query()
-    q = q.filter(model.id.like('%s%%' % short_id))
+    q = q.filter(_short_id_filter(model, short_id))
 
     if project_safe:
         q = q.filter_by(project=context.project_id)
 
-    if q.count() == 1:
-        return q.first()
-    elif q.count() == 0:
-        return None
-    else:
-        raise exception.MultipleChoices(arg=short_id)
+    return _first_unique(q, short_id)
 
 
 def query_by_name(context, model_query, name, project_safe=True):
@@ -110,35 +144,148 @@ def query_by_name(context, model_query, name, project_safe=True):
     if project_safe:
         q = q.filter_by(project=context.project_id)
 
-    if q.count() == 1:
-        return q.first()
-    elif q.count() == 0:
+    return _first_unique(q, name)
+
+
+def query_by_identity(context, model_query, model, identity,
+                      project_safe=True, by_name=True):
+    """Find an object by its ID, name or short ID in one query.
+
+    An object having the identity as its ID is preferred, then the objects
+    having it as their name, then the objects whose ID starts with it.
+
+    :param by_name: Whether the objects can be found by their names.
+    :returns: The object found, or None if no object is found.
+    :raises MultipleChoices: If the identity matches the names or the short
+                             IDs of more than one object.
+    """
+    conditions = [(model.id == identity, 0)]
+    if by_name:
+        conditions.append((model.name == identity, 1))
+    rank = sqlalchemy.case(conditions, else_=2).label('rank')
+
+    q = model_query()
+    q = q.filter(sqlalchemy.or_(_short_id_filter(model, identity),
+                                *[c for c, _ in conditions]))
+    if project_safe:
+        q = q.filter_by(project=context.project_id)
+
+    rows = q.add_columns(rank).order_by(rank).limit(2).all()
+    if not rows:
         return None
-    else:
-        raise exception.MultipleChoices(arg=name)
+    if len(rows) > 1 and rows[0].rank == rows[1].rank:
+        raise exception.MultipleChoices(arg=identity)
+    return rows[0][0]
+
+
+def paginate_query(query, model, model_query, limit, sort_keys, sort_dirs,
+                   marker=None):
+    """Sort a query and get a page of it using keyset pagination.
+
+    :param model_query: A function returning a query of the model, used to
+                        load the marker row when the marker is an ID.
+    :param marker: A cursor returned by `next_marker` for the previous
+                   page, or the ID of the last row of that page.
+    :returns: A query of the rows on the page.
+    """
+    if marker:
+        values = utils.decode_cursor(marker, sort_keys)
+        if values is None:
+            row = model_query().get(marker)
+            if row is not None:
+                values = [getattr(row, k) for k in sort_keys]
+        if values is not None:
+            query = utils.keyset_filter(query, model, sort_keys, sort_dirs,
+                                        values)
+
+    # MySQL and SQLite sort NULL values first in ascending order and last in
+    # descending order anyway. Ordering by the plain columns lets the order
+    # be served by an index on the sort keys.
+    if query.session.get_bind().dialect.name in ('mysql', 'sqlite'):
+        native = {'asc-nullsfirst': 'asc', 'desc-nullslast': 'desc'}
+        sort_dirs = [native.get(d, d) for d in sort_dirs]
+
+    return sa_utils.paginate_query(query, model, limit, sort_keys,
+                                   sort_dirs=sort_dirs)
+
+
+def next_marker(rows, limit=None, sort=None, default_key=None):
+    """Get the cursor for the page following a page of rows.
+
+    :param rows: The rows of a page.
+    :param limit: The maximum number of rows of the page.
+    :param sort: The sorting parameters of the query of the page.
+    :param default_key: The default sorting key of the query.
+    :returns: An opaque string to be used as the marker of the next page,
+              or None if the page is the last one.
+    """
+    if not limit or len(rows) < limit:
+        return None
+
+    keys, _dirs = utils.get_sort_params(sort, default_key)
+    return utils.encode_cursor(keys, [getattr(rows[-1], k) for k in keys])
 
 
 # Clusters
-def cluster_model_query():
-    with session_for_read() as session:
+def cluster_model_query(replica=False):
+    """Query clusters with their profile and policy bindings.
+
+    The nodes of the clusters are not loaded. Use _load_cluster_node_ids to
+    get their IDs.
+
+    :param replica: True if the query may be served by the replica database.
+    """
+    with session_for_read('cluster' if replica else None) as session:
         query = session.query(models.Cluster).options(
-            joinedload(models.Cluster.nodes),
+            noload(models.Cluster.nodes),
             joinedload(models.Cluster.profile),
             joinedload(models.Cluster.policies)
         )
         return query
 
 
+def _load_cluster_node_ids(clusters, replica=False):
+    """Load the IDs of the nodes of clusters.
+
+    The IDs of the nodes of all the clusters are read with one query, without
+    building node rows. The `nodes` of each cluster is set to a list of
+    tuples having an `id` attribute.
+
+    :param clusters: A list of cluster rows, possibly containing None.
+    :param replica: True if the query may be served by the replica database.
+    """
+    clusters = [c for c in clusters if c is not None]
+    if not clusters:
+        return
+
+    node_ids = collections.defaultdict(list)
+    with session_for_read('cluster' if replica else None) as session:
+        query = session.query(models.Node.cluster_id, models.Node.id).filter(
+            models.Node.cluster_id.in_([c.id for c in clusters]))
+        for row in query.all():
+            node_ids[row.cluster_id].append(row)
+
+    for cluster in clusters:
+        set_committed_value(cluster, 'nodes', node_ids[cluster.id])
+
+
 @retry_on_deadlock
 def cluster_create(context, values):
     with session_for_write() as session:
         cluster_ref = models.Cluster()
         cluster_ref.update(values)
         session.add(cluster_ref)
+        session.flush()
+        # The counters of the usual statuses exist from the start, so that
+        # they are only ever updated in place
+        session.bulk_insert_mappings(
+            models.ClusterNodeCount,
+            [{'cluster_id': cluster_ref.id, 'status': status, 'node_count': 0}
+             for status in consts.NODE_STATUSES])
     return cluster_get(context, cluster_ref.id)
 
 
-def cluster_get(context, cluster_id, project_safe=True):
+def cluster_get(context, cluster_id, project_safe=True, load_nodes=True):
     cluster = cluster_model_query().get(cluster_id)
 
     if cluster is None:
@@ -147,21 +294,40 @@ def cluster_get(context, cluster_id, project_safe=True):
     if project_safe:
         if context.project_id != cluster.project:
             return None
+
+    if load_nodes:
+        _load_cluster_node_ids([cluster])
     return cluster
 
 
-def cluster_get_by_name(context, name, project_safe=True):
-    return query_by_name(context, cluster_model_query, name,
-                         project_safe=project_safe)
+def cluster_get_by_name(context, name, project_safe=True, load_nodes=True):
+    cluster = query_by_name(context, cluster_model_query, name,
+                            project_safe=project_safe)
+    if load_nodes:
+        _load_cluster_node_ids([cluster])
+    return cluster
 
 
-def cluster_get_by_short_id(context, short_id, project_safe=True):
-    return query_by_short_id(context, cluster_model_query, models.Cluster,
-                             short_id, project_safe=project_safe)
+def cluster_get_by_short_id(context, short_id, project_safe=True,
+                            load_nodes=True):
+    cluster = query_by_short_id(context, cluster_model_query, models.Cluster,
+                                short_id, project_safe=project_safe)
+    if load_nodes:
+        _load_cluster_node_ids([cluster])
+    return cluster
+
+
+def cluster_get_by_identity(context, identity, project_safe=True,
+                            load_nodes=True):
+    cluster = query_by_identity(context, cluster_model_query, models.Cluster,
+                                identity, project_safe=project_safe)
+    if load_nodes:
+        _load_cluster_node_ids([cluster])
+    return cluster
 
 
-def _query_cluster_get_all(context, project_safe=True):
-    query = cluster_model_query()
+def _query_cluster_get_all(context, project_safe=True, replica=False):
+    query = cluster_model_query(replica)
 
     if project_safe:
         query = query.filter_by(project=context.project_id)
@@ -169,35 +335,53 @@ def _query_cluster_get_all(context, project_safe=True):
 
 
 def cluster_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                    project_safe=True):
-    query = _query_cluster_get_all(context, project_safe=project_safe)
+                    project_safe=True, load_nodes=True, replica=False):
+    query = _query_cluster_get_all(context, project_safe=project_safe,
+                                   replica=replica)
     if filters:
         query = utils.exact_filter(query, models.Cluster, filters)
 
     keys, dirs = utils.get_sort_params(sort, consts.CLUSTER_INIT_AT)
-    if marker:
-        marker = cluster_model_query().get(marker)
+    clusters = paginate_query(query, models.Cluster,
+                              lambda: cluster_model_query(replica), limit,
+                              keys, dirs, marker=marker).all()
+    if load_nodes:
+        _load_cluster_node_ids(clusters, replica=replica)
+    return clusters
 
-    return sa_utils.paginate_query(query, models.Cluster, limit, keys,
-                                   marker=marker, sort_dirs=dirs).all()
+
+def cluster_next_index(context, cluster_id):
+    return cluster_reserve_indexes(context, cluster_id, 1)
 
 
 @retry_on_deadlock
-def cluster_next_index(context, cluster_id):
+def cluster_reserve_indexes(context, cluster_id, count):
+    """Reserve a contiguous block of node indexes in a cluster.
+
+    The block is reserved with an atomic increment of the next index of the
+    cluster, so concurrent reservations never overlap and the cluster row is
+    only locked until the end of this short transaction.
+
+    :returns: The first index of the block reserved, or 0 if the cluster is
+              not found.
+    """
     with session_for_write() as session:
-        cluster = session.query(models.Cluster).with_for_update().get(
-            cluster_id)
-        if cluster is None:
+        query = session.query(models.Cluster).filter_by(id=cluster_id)
+        updated = query.update(
+            {'next_index': models.Cluster.next_index + count},
+            synchronize_session=False)
+        if not updated:
             return 0
 
-        next_index = cluster.next_index
-        cluster.next_index = cluster.next_index + 1
-        cluster.save(session)
-        return next_index
+        next_index = session.query(models.Cluster.next_index).filter_by(
+            id=cluster_id).scalar()
+        return next_index - count
 
 
-def cluster_count_all(context, filters=None, project_safe=True):
-    query = _query_cluster_get_all(context, project_safe=project_safe)
+def cluster_count_all(context, filters=None, project_safe=True,
+                      replica=False):
+    query = _query_cluster_get_all(context, project_safe=project_safe,
+                                   replica=replica)
     query = utils.exact_filter(query, models.Cluster, filters)
     return query.count()
 
@@ -233,13 +417,67 @@ def cluster_delete(context, cluster_id):
         for cp in cluster.policies:
             session.delete(cp)
 
+        session.query(models.ClusterNodeCount).filter_by(
+            cluster_id=cluster_id).delete(synchronize_session=False)
+
         # Delete cluster
         session.delete(cluster)
 
 
+def _bump_generation(session, cluster_ids, key):
+    """Increment a generation counter of some clusters.
+
+    Engines cache the nodes and the policies of a cluster along with the
+    generation counters they were loaded at. The counters are incremented
+    atomically in the transactions changing the nodes or the policy bindings
+    of the clusters, so that the cached data is not used any more.
+
+    :param cluster_ids: A list of cluster IDs, which may contain empty ones.
+    :param key: Either 'node_generation' or 'policy_generation'.
+    """
+    cluster_ids = set(c for c in cluster_ids if c)
+    if not cluster_ids:
+        return
+
+    column = getattr(models.Cluster, key)
+    query = session.query(models.Cluster).filter(
+        models.Cluster.id.in_(cluster_ids))
+    query.update({key: column + 1}, synchronize_session=False)
+
+
 # Nodes
-def node_model_query():
-    with session_for_read() as session:
+def _bump_node_generation(node):
+    """Increment the generation counter of a node about to be saved.
+
+    The counter is incremented atomically along with the other changes of
+    the node, so that engines can reload only the changed nodes of a cluster
+    when the node generation of the cluster changes.
+    """
+    node.generation = models.Node.generation + 1
+
+
+def _add_node_count(session, cluster_id, status, delta):
+    """Add a number to the counter of the nodes of a cluster in a status.
+
+    The counter is updated with an atomic increment in the transaction
+    changing the nodes, so that concurrent node updates are not lost.
+    """
+    if not cluster_id or status is None or not delta:
+        return
+
+    query = session.query(models.ClusterNodeCount).filter_by(
+        cluster_id=cluster_id, status=status)
+    updated = query.update(
+        {'node_count': models.ClusterNodeCount.node_count + delta},
+        synchronize_session=False)
+    if not updated and delta > 0:
+        session.add(models.ClusterNodeCount(
+            cluster_id=cluster_id, status=status, node_count=delta))
+        session.flush()
+
+
+def node_model_query(replica=False):
+    with session_for_read('node' if replica else None) as session:
         query = session.query(models.Node).options(
             joinedload(models.Node.profile)
         )
@@ -253,6 +491,8 @@ def node_create(context, values):
         node = models.Node()
         node.update(values)
         session.add(node)
+        _add_node_count(session, node.cluster_id, node.status, 1)
+        _bump_generation(session, [node.cluster_id], 'node_generation')
         return node
 
 
@@ -278,8 +518,14 @@ def node_get_by_short_id(context, short_id, project_safe=True):
                              project_safe=project_safe)
 
 
-def _query_node_get_all(context, project_safe=True, cluster_id=None):
-    query = node_model_query()
+def node_get_by_identity(context, identity, project_safe=True):
+    return query_by_identity(context, node_model_query, models.Node,
+                             identity, project_safe=project_safe)
+
+
+def _query_node_get_all(context, project_safe=True, cluster_id=None,
+                        replica=False):
+    query = node_model_query(replica)
 
     if cluster_id is not None:
         query = query.filter_by(cluster_id=cluster_id)
@@ -291,18 +537,25 @@ def _query_node_get_all(context, project_safe=True, cluster_id=None):
 
 
 def node_get_all(context, cluster_id=None, limit=None, marker=None, sort=None,
-                 filters=None, project_safe=True):
+                 filters=None, project_safe=True, replica=False):
     query = _query_node_get_all(context, project_safe=project_safe,
-                                cluster_id=cluster_id)
+                                cluster_id=cluster_id, replica=replica)
 
     if filters:
         query = utils.exact_filter(query, models.Node, filters)
 
     keys, dirs = utils.get_sort_params(sort, consts.NODE_INIT_AT)
-    if marker:
-        marker = node_model_query().get(marker)
-    return sa_utils.paginate_query(query, models.Node, limit, keys,
-                                   marker=marker, sort_dirs=dirs).all()
+    return paginate_query(query, models.Node,
+                          lambda: node_model_query(replica), limit,
+                          keys, dirs, marker=marker).all()
+
+
+def node_count_all(context, cluster_id=None, filters=None, project_safe=True,
+                   replica=False):
+    query = _query_node_get_all(context, project_safe=project_safe,
+                                cluster_id=cluster_id, replica=replica)
+    query = utils.exact_filter(query, models.Node, filters)
+    return query.count()
 
 
 def node_get_all_by_cluster(context, cluster_id, filters=None,
@@ -316,6 +569,35 @@ def node_get_all_by_cluster(context, cluster_id, filters=None,
     return query.all()
 
 
+def _query_columns(session, model, columns):
+    """Query some columns of a model.
+
+    The JSON columns not asked for are neither fetched nor decoded.
+
+    :param columns: A list of the names of the columns.
+    :returns: A query of rows having the columns as their attributes.
+    """
+    return session.query(*[getattr(model, c) for c in columns])
+
+
+def node_columns_by_cluster(context, cluster_id, columns, filters=None,
+                            project_safe=True):
+    """An internal API for getting some columns of the nodes of a cluster.
+
+    :param columns: A list of the names of the node columns to get.
+    :returns: A list of rows having the columns as their attributes.
+    """
+    with session_for_read() as session:
+        query = _query_columns(session, models.Node, columns)
+        query = query.filter_by(cluster_id=cluster_id)
+        if project_safe:
+            query = query.filter_by(project=context.project_id)
+        if filters:
+            query = utils.exact_filter(query, models.Node, filters)
+
+        return query.all()
+
+
 def node_ids_by_cluster(context, cluster_id, filters=None):
     """an internal API for getting node IDs."""
     with session_for_read() as session:
@@ -328,6 +610,20 @@ def node_ids_by_cluster(context, cluster_id, filters=None):
 
 def node_count_by_cluster(context, cluster_id, **kwargs):
     project_safe = kwargs.pop('project_safe', True)
+    if set(kwargs) <= set(['status']):
+        # Served by the node counters of the cluster
+        with session_for_read() as session:
+            if project_safe:
+                project = session.query(models.Cluster.project).filter_by(
+                    id=cluster_id).scalar()
+                if project != context.project_id:
+                    return 0
+
+            query = session.query(
+                func.sum(models.ClusterNodeCount.node_count)).filter_by(
+                cluster_id=cluster_id, **kwargs)
+            return query.scalar() or 0
+
     query = node_model_query()
     query = query.filter_by(cluster_id=cluster_id)
     query = query.filter_by(**kwargs)
@@ -350,8 +646,15 @@ def node_update(context, node_id, values):
         if not node:
             raise exception.ResourceNotFound(type='node', id=node_id)
 
+        old = (node.cluster_id, node.status)
         node.update(values)
+        _bump_node_generation(node)
         node.save(session)
+        if (node.cluster_id, node.status) != old:
+            _add_node_count(session, old[0], old[1], -1)
+            _add_node_count(session, node.cluster_id, node.status, 1)
+        _bump_generation(session, [old[0], node.cluster_id],
+                         'node_generation')
         if 'status' in values and node.cluster_id is not None:
             cluster = session.query(models.Cluster).get(node.cluster_id)
             if cluster is not None:
@@ -387,7 +690,9 @@ def node_add_dependents(context, depended, dependent, dep_type=None):
         dependents = dep_node.dependents.get(key, [])
         dependents.append(dependent)
         dep_node.dependents.update({key: dependents})
+        _bump_node_generation(dep_node)
         dep_node.save(session)
+        _bump_generation(session, [dep_node.cluster_id], 'node_generation')
 
 
 @retry_on_deadlock
@@ -420,22 +725,33 @@ def node_remove_dependents(context, depended, dependent, dep_type=None):
                 dep_node.dependents.update({key: dependents})
             else:
                 dep_node.dependents.pop(key)
+            _bump_node_generation(dep_node)
             dep_node.save(session)
+            _bump_generation(session, [dep_node.cluster_id],
+                             'node_generation')
 
 
 @retry_on_deadlock
-def node_migrate(context, node_id, to_cluster, timestamp, role=None):
+def node_migrate(context, node_id, to_cluster, timestamp, role=None,
+                 index=None):
     with session_for_write() as session:
         node = session.query(models.Node).get(node_id)
         from_cluster = node.cluster_id
         if from_cluster:
             node.index = -1
         if to_cluster:
-            node.index = cluster_next_index(context, to_cluster)
+            if index is None:
+                index = cluster_next_index(context, to_cluster)
+            node.index = index
         node.cluster_id = to_cluster if to_cluster else ''
         node.updated_at = timestamp
         node.role = role
+        _bump_node_generation(node)
         node.save(session)
+        _add_node_count(session, from_cluster, node.status, -1)
+        _add_node_count(session, node.cluster_id, node.status, 1)
+        _bump_generation(session, [from_cluster, node.cluster_id],
+                         'node_generation')
         return node
 
 
@@ -446,14 +762,89 @@ def node_delete(context, node_id):
         if not node:
             # Note: this is okay, because the node may have already gone
             return
+        _add_node_count(session, node.cluster_id, node.status, -1)
+        _bump_generation(session, [node.cluster_id], 'node_generation')
         session.delete(node)
 
 
+def node_count_by_status(context, cluster_id):
+    """An internal API for getting the node counters of a cluster.
+
+    :param cluster_id: ID of the cluster.
+    :returns: A dict mapping node statuses to the number of nodes of the
+              cluster in each status, only containing non-zero numbers.
+    """
+    with session_for_read() as session:
+        query = session.query(models.ClusterNodeCount.status,
+                              models.ClusterNodeCount.node_count).filter_by(
+            cluster_id=cluster_id).filter(
+            models.ClusterNodeCount.node_count != 0)
+        return dict(query.all())
+
+
+@retry_on_deadlock
+def _reconcile_node_counts(cluster_id):
+    with session_for_write() as session:
+        # Lock the counters first so that nodes changed meanwhile update
+        # them after the counting
+        counters = session.query(models.ClusterNodeCount).filter_by(
+            cluster_id=cluster_id).with_for_update().all()
+        query = session.query(models.Node.status, func.count()).filter_by(
+            cluster_id=cluster_id).filter(
+            models.Node.status.isnot(None)).group_by(models.Node.status)
+        actual = dict(query.all())
+
+        repaired = False
+        for counter in counters:
+            count = actual.pop(counter.status, 0)
+            if counter.node_count != count:
+                counter.node_count = count
+                repaired = True
+        for status, count in actual.items():
+            session.add(models.ClusterNodeCount(
+                cluster_id=cluster_id, status=status, node_count=count))
+            repaired = True
+        return repaired
+
+
+def node_count_reconcile(context):
+    """Repair the node counters of clusters from their nodes.
+
+    Each cluster is checked in its own short transaction.
+
+    :returns: A list of the IDs of the clusters whose counters were wrong.
+    """
+    with session_for_read() as session:
+        cluster_ids = [c.id for c in session.query(models.Cluster.id)]
+        # Counters of nodes referring to missing clusters, if any
+        cluster_ids += [c.cluster_id for c in session.query(
+            models.ClusterNodeCount.cluster_id).filter(
+            ~models.ClusterNodeCount.cluster_id.in_(
+                session.query(models.Cluster.id))).distinct()]
+
+    return [c for c in cluster_ids if _reconcile_node_counts(c)]
+
+
 # Locks
+def _lock_waiter_ahead(session, resource_id, action_id):
+    """Check whether another action is first in line for a lock.
+
+    :param session: The session of the lock transaction.
+    :param resource_id: ID of the cluster or node to be locked.
+    :param action_id: ID of the action that attempts to lock the resource.
+    :return: True if the first waiter of the resource is another action.
+    """
+    first = session.query(models.LockWaiter.action_id).filter_by(
+        resource_id=resource_id).order_by(models.LockWaiter.id).first()
+    return first is not None and first.action_id != action_id
+
+
 @retry_on_deadlock
 def cluster_lock_acquire(cluster_id, action_id, scope):
     """Acquire lock on a cluster.
 
+    The lock is not granted if another action is first in line for it.
+
     :param cluster_id: ID of the cluster.
     :param action_id: ID of the action that attempts to lock the cluster.
     :param scope: +1 means a node-level operation lock; -1 indicates
@@ -463,6 +854,9 @@ def cluster_lock_acquire(cluster_id, action_id, scope):
     with session_for_write() as session:
         query = session.query(models.ClusterLock).with_for_update()
         lock = query.get(cluster_id)
+        if _lock_waiter_ahead(session, cluster_id, action_id):
+            return lock.action_ids if lock is not None else []
+
         if lock is not None:
             if scope == 1 and lock.semaphore > 0:
                 if action_id not in lock.action_ids:
@@ -545,6 +939,9 @@ def node_lock_acquire(node_id, action_id):
     with session_for_write() as session:
         lock = session.query(
             models.NodeLock).with_for_update().get(node_id)
+        if _lock_waiter_ahead(session, node_id, action_id):
+            return lock.action_id if lock is not None else None
+
         if lock is None:
             lock = models.NodeLock(node_id=node_id, action_id=action_id)
             session.add(lock)
@@ -588,9 +985,52 @@ def node_lock_steal(node_id, action_id):
         return lock.action_id
 
 
-# Policies
-def policy_model_query():
+@retry_on_deadlock
+def lock_waiter_add(resource_id, action_id, engine_id, timestamp):
+    """Put an action in line for the lock on a cluster or node.
+
+    :param resource_id: ID of the cluster or node to be locked.
+    :param action_id: ID of the waiting action.
+    :param engine_id: ID of the engine running the waiting action.
+    :param timestamp: Time the action started waiting.
+    """
+    with session_for_write() as session:
+        query = session.query(models.LockWaiter).filter_by(
+            resource_id=resource_id, action_id=action_id)
+        if query.first() is None:
+            session.add(models.LockWaiter(resource_id=resource_id,
+                                          action_id=action_id,
+                                          engine_id=engine_id,
+                                          created_at=timestamp))
+
+
+@retry_on_deadlock
+def lock_waiter_remove(resource_id, action_id):
+    """Take an action out of line for the lock on a cluster or node.
+
+    :param resource_id: ID of the cluster or node.
+    :param action_id: ID of the waiting action.
+    """
+    with session_for_write() as session:
+        session.query(models.LockWaiter).filter_by(
+            resource_id=resource_id, action_id=action_id).delete(
+            synchronize_session=False)
+
+
+def lock_waiter_get_first(resource_id):
+    """Get the first action in line for the lock on a cluster or node.
+
+    :param resource_id: ID of the cluster or node.
+    :return: The waiter record, or None if no action is waiting.
+    """
     with session_for_read() as session:
+        return session.query(models.LockWaiter).filter_by(
+            resource_id=resource_id).order_by(models.LockWaiter.id).first()
+
+
+# Policies
+def policy_model_query(replica=False):
+    with session_for_read('policy' if replica else None) as session:
         query = session.query(models.Policy).options(
             joinedload(models.Policy.bindings)
         )
@@ -620,6 +1060,21 @@ def policy_get(context, policy_id, project_safe=True):
     return policy
 
 
+def policy_get_version(context, policy_id, project_safe=True):
+    """Get the version of a policy, i.e. the time it was last updated.
+
+    :returns: A row with the 'updated_at' attribute, or None if the policy
+              is not found.
+    """
+    with session_for_read() as session:
+        query = _query_columns(session, models.Policy, ['updated_at'])
+        query = query.filter_by(id=policy_id)
+        if project_safe:
+            query = query.filter_by(project=context.project_id)
+
+        return query.first()
+
+
 def policy_get_by_name(context, name, project_safe=True):
     return query_by_name(context, policy_model_query, name,
                          project_safe=project_safe)
@@ -630,9 +1085,14 @@ def policy_get_by_short_id(context, short_id, project_safe=True):
                              short_id, project_safe=project_safe)
 
 
+def policy_get_by_identity(context, identity, project_safe=True):
+    return query_by_identity(context, policy_model_query, models.Policy,
+                             identity, project_safe=project_safe)
+
+
 def policy_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                   project_safe=True):
-    query = policy_model_query()
+                   project_safe=True, replica=False):
+    query = policy_model_query(replica)
 
     if project_safe:
         query = query.filter_by(project=context.project_id)
@@ -641,10 +1101,9 @@ def policy_get_all(context, limit=None, marker=None, sort=None, filters=None,
         query = utils.exact_filter(query, models.Policy, filters)
 
     keys, dirs = utils.get_sort_params(sort, consts.POLICY_CREATED_AT)
-    if marker:
-        marker = policy_model_query().get(marker)
-    return sa_utils.paginate_query(query, models.Policy, limit, keys,
-                                   marker=marker, sort_dirs=dirs).all()
+    return paginate_query(query, models.Policy,
+                          lambda: policy_model_query(replica), limit,
+                          keys, dirs, marker=marker).all()
 
 
 @retry_on_deadlock
@@ -656,6 +1115,10 @@ def policy_update(context, policy_id, values):
 
         policy.update(values)
         policy.save(session)
+        bindings = session.query(models.ClusterPolicies.cluster_id).filter_by(
+            policy_id=policy_id)
+        _bump_generation(session, [b.cluster_id for b in bindings],
+                         'policy_generation')
         return policy
 
 
@@ -765,6 +1228,7 @@ def cluster_policy_attach(context, cluster_id, policy_id, values):
         binding.policy_id = policy_id
         binding.update(values)
         session.add(binding)
+        _bump_generation(session, [cluster_id], 'policy_generation')
     # Load foreignkey cluster and policy
     return cluster_policy_get(context, cluster_id, policy_id)
 
@@ -778,6 +1242,7 @@ def cluster_policy_detach(context, cluster_id, policy_id):
         if bindings is None:
             return
         session.delete(bindings)
+        _bump_generation(session, [cluster_id], 'policy_generation')
 
 
 @retry_on_deadlock
@@ -792,6 +1257,7 @@ def cluster_policy_update(context, cluster_id, policy_id, values):
 
         binding.update(values)
         binding.save(session)
+        _bump_generation(session, [cluster_id], 'policy_generation')
         return binding
 
 
@@ -840,8 +1306,8 @@ def cluster_remove_dependents(context, cluster_id, profile_id):
 
 
 # Profiles
-def profile_model_query():
-    with session_for_read() as session:
+def profile_model_query(replica=False):
+    with session_for_read('profile' if replica else None) as session:
         query = session.query(models.Profile)
         return query
 
@@ -869,6 +1335,21 @@ def profile_get(context, profile_id, project_safe=True):
     return profile
 
 
+def profile_get_version(context, profile_id, project_safe=True):
+    """Get the version of a profile, i.e. the time it was last updated.
+
+    :returns: A row with the 'updated_at' attribute, or None if the profile
+              is not found.
+    """
+    with session_for_read() as session:
+        query = _query_columns(session, models.Profile, ['updated_at'])
+        query = query.filter_by(id=profile_id)
+        if project_safe:
+            query = query.filter_by(project=context.project_id)
+
+        return query.first()
+
+
 def profile_get_by_name(context, name, project_safe=True):
     return query_by_name(context, profile_model_query, name,
                          project_safe=project_safe)
@@ -879,9 +1360,14 @@ def profile_get_by_short_id(context, short_id, project_safe=True):
                              short_id, project_safe=project_safe)
 
 
+def profile_get_by_identity(context, identity, project_safe=True):
+    return query_by_identity(context, profile_model_query, models.Profile,
+                             identity, project_safe=project_safe)
+
+
 def profile_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                    project_safe=True):
-    query = profile_model_query()
+                    project_safe=True, replica=False):
+    query = profile_model_query(replica)
 
     if project_safe:
         query = query.filter_by(project=context.project_id)
@@ -890,10 +1376,9 @@ def profile_get_all(context, limit=None, marker=None, sort=None, filters=None,
         query = utils.exact_filter(query, models.Profile, filters)
 
     keys, dirs = utils.get_sort_params(sort, consts.PROFILE_CREATED_AT)
-    if marker:
-        marker = profile_model_query().get(marker)
-    return sa_utils.paginate_query(query, models.Profile, limit, keys,
-                                   marker=marker, sort_dirs=dirs).all()
+    return paginate_query(query, models.Profile,
+                          lambda: profile_model_query(replica), limit,
+                          keys, dirs, marker=marker).all()
 
 
 @retry_on_deadlock
@@ -977,8 +1462,8 @@ def cred_create_update(context, values):
 
 
 # Events
-def event_model_query():
-    with session_for_read() as session:
+def event_model_query(replica=False):
+    with session_for_read('event' if replica else None) as session:
         query = session.query(models.Event).options(
             joinedload(models.Event.cluster)
         )
@@ -995,8 +1480,18 @@ def event_create(context, values):
 
 
 @retry_on_deadlock
-def event_get(context, event_id, project_safe=True):
-    event = event_model_query().get(event_id)
+def event_create_bulk(context, values):
+    """Create event records with one multi-row insert.
+
+    :param values: A list of dicts, one for each event record.
+    """
+    with session_for_write() as session:
+        session.bulk_insert_mappings(models.Event, values)
+
+
+@retry_on_deadlock
+def event_get(context, event_id, project_safe=True, replica=False):
+    event = event_model_query(replica).get(event_id)
     if project_safe and event is not None:
         if event.project != context.project_id:
             return None
@@ -1004,31 +1499,49 @@ def event_get(context, event_id, project_safe=True):
     return event
 
 
-def event_get_by_short_id(context, short_id, project_safe=True):
-    return query_by_short_id(context, event_model_query, models.Event,
-                             short_id, project_safe=project_safe)
+def event_get_by_short_id(context, short_id, project_safe=True,
+                          replica=False):
+    return query_by_short_id(context, lambda: event_model_query(replica),
+                             models.Event, short_id,
+                             project_safe=project_safe)
+
+
+def event_get_by_identity(context, identity, project_safe=True,
+                          replica=False):
+    return query_by_identity(context, lambda: event_model_query(replica),
+                             models.Event, identity,
+                             project_safe=project_safe, by_name=False)
 
 
 def _event_filter_paginate_query(context, query, filters=None,
-                                 limit=None, marker=None, sort=None):
+                                 limit=None, marker=None, sort=None,
+                                 replica=False):
     if filters:
         query = utils.exact_filter(query, models.Event, filters)
 
     keys, dirs = utils.get_sort_params(sort, consts.EVENT_TIMESTAMP)
-    if marker:
-        marker = event_model_query().get(marker)
-    return sa_utils.paginate_query(query, models.Event, limit, keys,
-                                   marker=marker, sort_dirs=dirs).all()
+    return paginate_query(query, models.Event,
+                          lambda: event_model_query(replica), limit,
+                          keys, dirs, marker=marker).all()
 
 
 def event_get_all(context, limit=None, marker=None, sort=None, filters=None,
-                  project_safe=True):
-    query = event_model_query()
+                  project_safe=True, replica=False):
+    query = event_model_query(replica)
     if project_safe:
         query = query.filter_by(project=context.project_id)
 
     return _event_filter_paginate_query(context, query, filters=filters,
-                                        limit=limit, marker=marker, sort=sort)
+                                        limit=limit, marker=marker, sort=sort,
+                                        replica=replica)
+
+
+def event_count_all(context, filters=None, project_safe=True, replica=False):
+    query = event_model_query(replica)
+    if project_safe:
+        query = query.filter_by(project=context.project_id)
+    query = utils.exact_filter(query, models.Event, filters)
+    return query.count()
 
 
 def event_count_by_cluster(context, cluster_id, project_safe=True):
@@ -1053,39 +1566,144 @@ def event_get_all_by_cluster(context, cluster_id, limit=None, marker=None,
                                         limit=limit, marker=marker, sort=sort)
 
 
+def _age_to_seconds(granularity, age):
+    """Convert an age in the given granularity to seconds."""
+    if granularity == 'days':
+        return age * 86400
+    elif granularity == 'hours':
+        return age * 3600
+    elif granularity == 'minutes':
+        return age * 60
+    return age
+
+
 @retry_on_deadlock
-def event_prune(context, cluster_id, project_safe=True):
+def _delete_chunk(model, ids, before_delete=None):
     with session_for_write() as session:
-        query = session.query(models.Event).with_for_update()
-        query = query.filter_by(cluster_id=cluster_id)
+        if before_delete is not None:
+            before_delete(session, ids)
+        return session.query(model).filter(model.id.in_(ids)).delete(
+            synchronize_session=False)
+
+
+def _delete_in_chunks(model, select_ids, chunk_size=None, progress=None,
+                      before_delete=None):
+    """Delete rows in chunks, each in its own short transaction.
+
+    The IDs of each chunk are selected without locking the rows, so that
+    other writers are only blocked by the deletion of a chunk.
+
+    :param model: Model of the rows to delete.
+    :param select_ids: A function taking a session and returning a query of
+                       the IDs of the rows to delete.
+    :param chunk_size: Maximum number of rows deleted in one transaction.
+                       Defaults to the `purge_chunk_size` option.
+    :param progress: Optional function called with the number of rows
+                     deleted so far after each chunk.
+    :param before_delete: Optional function called with the session and the
+                          IDs of a chunk before deleting the chunk.
+    :returns: The number of rows deleted.
+    """
+    chunk_size = chunk_size or cfg.CONF.purge_chunk_size
+    total = 0
+    while True:
+        with session_for_read() as session:
+            ids = [r[0] for r in select_ids(session).limit(chunk_size)]
+        if not ids:
+            break
+
+        total += _delete_chunk(model, ids, before_delete=before_delete)
+        if progress is not None:
+            progress(total)
+        if len(ids) < chunk_size:
+            break
+
+    return total
+
+
+def event_prune(context, cluster_id, project_safe=True):
+    def select_ids(session):
+        query = session.query(models.Event.id).filter_by(
+            cluster_id=cluster_id)
         if project_safe:
             query = query.filter_by(project=context.project_id)
+        return query
 
-        return query.delete(synchronize_session='fetch')
+    return _delete_in_chunks(models.Event, select_ids)
 
 
-@retry_on_deadlock
-def event_purge(project, granularity='days', age=30):
-    with session_for_write() as session:
-        query = session.query(models.Event).with_for_update()
+def event_purge(project, granularity='days', age=30, chunk_size=None,
+                progress=None):
+    def select_ids(session):
+        query = session.query(models.Event.id)
         if project is not None:
             query = query.filter(models.Event.project.in_(project))
-        if granularity is not None and age is not None:
-            if granularity == 'days':
-                age = age * 86400
-            elif granularity == 'hours':
-                age = age * 3600
-            elif granularity == 'minutes':
-                age = age * 60
-            time_line = timeutils.utcnow() - datetime.timedelta(seconds=age)
+        if time_line is not None:
             query = query.filter(models.Event.timestamp < time_line)
+        return query
 
-        return query.delete(synchronize_session='fetch')
+    time_line = None
+    if granularity is not None and age is not None:
+        age = _age_to_seconds(granularity, age)
+        time_line = timeutils.utcnow() - datetime.timedelta(seconds=age)
 
+    return _delete_in_chunks(models.Event, select_ids, chunk_size=chunk_size,
+                             progress=progress)
 
-# Actions
-def action_model_query():
+
+def event_purge_excess(max_events, chunk_size=None, progress=None):
+    """Purge the oldest events of the clusters having too many events.
+
+    :param max_events: Maximum number of events to keep for each cluster.
+    :param chunk_size: Maximum number of events deleted in one transaction.
+    :param progress: Optional function called with the number of events
+                     deleted so far after each chunk.
+    :returns: The number of events deleted.
+    """
     with session_for_read() as session:
+        # Events of orphan nodes have an empty cluster ID
+        clusters = session.query(models.Event.cluster_id).filter(
+            models.Event.cluster_id.isnot(None),
+            models.Event.cluster_id != '').group_by(
+            models.Event.cluster_id).having(
+            func.count(models.Event.id) > max_events).all()
+
+    # Events sharing a timestamp are ordered by their IDs, so that exactly
+    # max_events events are kept
+    sort_keys = ['timestamp', 'id']
+    sort_dirs = ['desc', 'desc']
+
+    total = 0
+    for (cluster_id,) in clusters:
+        # Sort key of the oldest event to keep
+        with session_for_read() as session:
+            cutoff = session.query(
+                models.Event.timestamp, models.Event.id).filter_by(
+                cluster_id=cluster_id).order_by(
+                models.Event.timestamp.desc(), models.Event.id.desc()).offset(
+                max_events - 1).first()
+        if cutoff is None:
+            continue
+
+        def select_ids(session, cluster_id=cluster_id, cutoff=list(cutoff)):
+            query = session.query(models.Event.id).filter_by(
+                cluster_id=cluster_id)
+            return utils.keyset_filter(query, models.Event, sort_keys,
+                                       sort_dirs, cutoff)
+
+        def report(count, done=total):
+            progress(done + count)
+
+        total += _delete_in_chunks(
+            models.Event, select_ids, chunk_size=chunk_size,
+            progress=report if progress is not None else None)
+
+    return total
+
+
+# Actions
+def action_model_query(replica=False):
+    with session_for_read('action' if replica else None) as session:
         query = session.query(models.Action).options(
             joinedload(models.Action.dep_on),
             joinedload(models.Action.dep_by)
@@ -1102,6 +1720,41 @@ def action_create(context, values):
     return action_get(context, action.id)
 
 
+@retry_on_deadlock
+def action_create_bulk(context, values, dependencies, nodes=None):
+    """Create actions, their dependencies and nodes in one transaction.
+
+    :param values: A list of dicts of the actions to create.
+    :param dependencies: A list of (depended, dependent) tuples of action IDs.
+    :param nodes: An optional list of dicts of the nodes to create.
+    """
+    pending = collections.Counter(t for d, t in dependencies)
+    created = set(v['id'] for v in values)
+    values = [dict(v, pending_dependencies=pending[v['id']]) for v in values]
+
+    with session_for_write() as session:
+        if nodes:
+            session.bulk_insert_mappings(models.Node, nodes)
+            counts = collections.Counter(
+                (n.get('cluster_id'), n.get('status')) for n in nodes)
+            for (cluster_id, status), count in counts.items():
+                _add_node_count(session, cluster_id, status, count)
+            _bump_generation(session, [c for c, s in counts],
+                             'node_generation')
+        session.bulk_insert_mappings(models.Action, values)
+        session.bulk_insert_mappings(
+            models.ActionDependency,
+            [{'depended': d, 'dependent': t} for d, t in dependencies])
+
+        # Existing dependents are now waiting for the created actions
+        waiting = collections.defaultdict(list)
+        for action_id, count in pending.items():
+            if action_id not in created:
+                waiting[count].append(action_id)
+        for count, action_ids in waiting.items():
+            _add_pending_dependencies(session, action_ids, count)
+
+
 @retry_on_deadlock
 def action_update(context, action_id, values):
     with session_for_write() as session:
@@ -1153,29 +1806,52 @@ def action_get_by_short_id(context, short_id, project_safe=True):
                              short_id, project_safe=project_safe)
 
 
+def action_get_by_identity(context, identity, project_safe=True):
+    return query_by_identity(context, action_model_query, models.Action,
+                             identity, project_safe=project_safe)
+
+
 def action_get_all_by_owner(context, owner_id):
     query = action_model_query().filter_by(owner=owner_id)
     return query.all()
 
 
-def action_get_all_active_by_target(context, target_id, project_safe=True):
-    query = action_model_query()
+def _filter_active_by_target(query, context, target_id, project_safe):
     if project_safe:
         query = query.filter_by(project=context.project_id)
     query = query.filter_by(target=target_id)
-    query = query.filter(
+    return query.filter(
         models.Action.status.in_(
             [consts.ACTION_READY,
              consts.ACTION_WAITING,
              consts.ACTION_RUNNING,
              consts.ACTION_WAITING_LIFECYCLE_COMPLETION]))
+
+
+def action_get_all_active_by_target(context, target_id, project_safe=True):
+    query = _filter_active_by_target(action_model_query(), context,
+                                     target_id, project_safe)
     actions = query.all()
     return actions
 
 
+def action_columns_active_by_target(context, target_id, columns,
+                                    project_safe=True):
+    """An internal API for getting some columns of the active actions.
+
+    :param columns: A list of the names of the action columns to get.
+    :returns: A list of rows having the columns as their attributes.
+    """
+    with session_for_read() as session:
+        query = _query_columns(session, models.Action, columns)
+        query = _filter_active_by_target(query, context, target_id,
+                                         project_safe)
+        return query.all()
+
+
 def action_get_all(context, filters=None, limit=None, marker=None, sort=None,
-                   project_safe=True):
-    query = action_model_query()
+                   project_safe=True, replica=False):
+    query = action_model_query(replica)
     if project_safe:
         query = query.filter_by(project=context.project_id)
 
@@ -1183,28 +1859,94 @@ def action_get_all(context, filters=None, limit=None, marker=None, sort=None,
         query = utils.exact_filter(query, models.Action, filters)
 
     keys, dirs = utils.get_sort_params(sort, consts.ACTION_CREATED_AT)
-    if marker:
-        marker = action_model_query().get(marker)
-    return sa_utils.paginate_query(query, models.Action, limit, keys,
-                                   marker=marker, sort_dirs=dirs).all()
+    return paginate_query(query, models.Action,
+                          lambda: action_model_query(replica), limit,
+                          keys, dirs, marker=marker).all()
+
+
+def action_count_all(context, filters=None, project_safe=True, replica=False):
+    query = action_model_query(replica)
+    if project_safe:
+        query = query.filter_by(project=context.project_id)
+    query = utils.exact_filter(query, models.Action, filters)
+    return query.count()
 
 
 @retry_on_deadlock
 def action_check_status(context, action_id, timestamp):
+    with session_for_read() as session:
+        action = session.query(models.Action.status,
+                               models.Action.pending_dependencies).filter_by(
+            id=action_id).first()
+
+    if action.pending_dependencies:
+        return consts.ACTION_WAITING
+    if action.status != consts.ACTION_WAITING:
+        return action.status
+
+    # Depended actions are normally released with the action flipped to
+    # READY at once, this only catches actions left WAITING without any.
     with session_for_write() as session:
-        q = session.query(models.ActionDependency)
-        count = q.filter_by(dependent=action_id).count()
-        if count > 0:
-            return consts.ACTION_WAITING
+        query = session.query(models.Action).filter_by(
+            id=action_id, status=consts.ACTION_WAITING,
+            pending_dependencies=0)
+        query.update({'status': consts.ACTION_READY,
+                      'status_reason': 'All depended actions completed.',
+                      'end_time': timestamp},
+                     synchronize_session=False)
+        return session.query(models.Action.status).filter_by(
+            id=action_id).scalar()
+
+
+def _add_pending_dependencies(session, action_ids, count):
+    """Make actions wait for more depended actions.
+
+    :param session: The session of the transaction.
+    :param action_ids: A list of IDs of the dependent actions.
+    :param count: Number of depended actions added to each of them.
+    """
+    query = session.query(models.Action).filter(
+        models.Action.id.in_(action_ids))
+    query.update({'status': consts.ACTION_WAITING,
+                  'status_reason': 'Waiting for depended actions.',
+                  'pending_dependencies': (
+                      models.Action.pending_dependencies + count)},
+                 synchronize_session=False)
 
-        action = session.query(models.Action).get(action_id)
-        if action.status == consts.ACTION_WAITING:
-            action.status = consts.ACTION_READY
-            action.status_reason = 'All depended actions completed.'
-            action.end_time = timestamp
-            action.save(session)
 
-        return action.status
+def _release_dependents(session, action_ids, timestamp, count=1):
+    """Count down the pending dependencies of actions.
+
+    A waiting action with no more pending dependency is made READY by the
+    same statement.
+
+    :param session: The session of the transaction.
+    :param action_ids: A list of IDs of the dependent actions.
+    :param timestamp: Time the depended action completed.
+    :param count: Number of depended actions completed for each of them.
+    """
+    if not action_ids:
+        return
+
+    table = models.Action.__table__
+    ready = sqlalchemy.and_(table.c.pending_dependencies <= count,
+                            table.c.status == consts.ACTION_WAITING)
+    # MySQL evaluates assignments from left to right, so the columns tested
+    # by the conditions are assigned last
+    values = [
+        (table.c.status_reason,
+         sqlalchemy.case([(ready, 'All depended actions completed.')],
+                         else_=table.c.status_reason)),
+        (table.c.end_time,
+         sqlalchemy.case([(ready, timestamp)], else_=table.c.end_time)),
+        (table.c.status,
+         sqlalchemy.case([(ready, consts.ACTION_READY)],
+                         else_=table.c.status)),
+        (table.c.pending_dependencies, table.c.pending_dependencies - count),
+    ]
+    stmt = table.update(preserve_parameter_order=True).where(
+        table.c.id.in_(action_ids)).values(values)
+    session.execute(stmt)
 
 
 def action_dependency_model_query():
@@ -1239,11 +1981,7 @@ def dependency_add(context, depended, dependent):
                 r = models.ActionDependency(depended=d, dependent=dependent)
                 session.add(r)
 
-            query = session.query(models.Action).with_for_update()
-            query = query.filter_by(id=dependent)
-            query.update({'status': consts.ACTION_WAITING,
-                          'status_reason': 'Waiting for depended actions.'},
-                         synchronize_session='fetch')
+            _add_pending_dependencies(session, [dependent], len(depended))
             return
 
         # Only dependent can be a list now, convert it to a list if it
@@ -1257,11 +1995,7 @@ def dependency_add(context, depended, dependent):
             r = models.ActionDependency(depended=depended, dependent=d)
             session.add(r)
 
-        q = session.query(models.Action).with_for_update()
-        q = q.filter(models.Action.id.in_(dependents))
-        q.update({'status': consts.ACTION_WAITING,
-                  'status_reason': 'Waiting for depended actions.'},
-                 synchronize_session='fetch')
+        _add_pending_dependencies(session, dependents, 1)
 
 
 @retry_on_deadlock
@@ -1279,7 +2013,11 @@ def action_mark_succeeded(context, action_id, timestamp):
 
         subquery = session.query(models.ActionDependency).filter_by(
             depended=action_id)
-        subquery.delete(synchronize_session='fetch')
+        dependents = [d.dependent for d in subquery.all()]
+        subquery.delete(synchronize_session=False)
+        _release_dependents(session, dependents, timestamp)
+
+    return dependents
 
 
 @retry_on_deadlock
@@ -1296,63 +2034,103 @@ def action_mark_ready(context, action_id, timestamp):
         query.update(values, synchronize_session=False)
 
 
+def _mark_cascade(session, action_ids, timestamp, status, reason,
+                  default_reason):
+    """Mark actions and, in cascade, their dependents as completed.
+
+    The dependents of a marked action are marked in turn, unless the
+    'update_parent_status' input of the action is False. The affected
+    actions are found with one query per level of dependency and updated
+    with bulk statements.
+
+    :param session: The session of the transaction.
+    :param action_ids: A list of IDs of the actions completed.
+    :param timestamp: Time the actions completed.
+    :param status: Status of the marked actions.
+    :param reason: Status reason of the actions completed.
+    :param default_reason: Status reason of the dependents marked.
+    :return: A list of IDs of the dependents of the actions completed.
+    """
+    dep = models.ActionDependency
+    roots = set(action_ids)
+    marked = list(action_ids)
+    seen = set(marked)
+    released = collections.Counter()
+    dependents = []
+    frontier = marked
+    while frontier:
+        rows = session.query(
+            dep.depended, dep.dependent, models.Action.id,
+            models.Action.inputs).outerjoin(
+            models.Action, models.Action.id == dep.depended).filter(
+            dep.depended.in_(frontier)).all()
+
+        frontier = []
+        for row in rows:
+            released[row.dependent] += 1
+            if row.depended in roots:
+                dependents.append(row.dependent)
+            if row.id is None or row.dependent in seen:
+                continue
+            if (row.inputs or {}).get('update_parent_status', True):
+                seen.add(row.dependent)
+                frontier.append(row.dependent)
+        marked.extend(frontier)
+
+    if released:
+        query = session.query(dep).filter(dep.depended.in_(marked))
+        query.delete(synchronize_session=False)
+        by_count = collections.defaultdict(list)
+        for dependent, count in released.items():
+            by_count[count].append(dependent)
+        for count, ids in by_count.items():
+            _release_dependents(session, ids, timestamp, count)
+
+    values = {
+        'owner': None,
+        'status': status,
+        'status_reason': reason,
+        'end_time': timestamp,
+    }
+    query = session.query(models.Action).filter(
+        models.Action.id.in_(action_ids))
+    query.update(values, synchronize_session=False)
+    if len(marked) > len(roots):
+        values['status_reason'] = default_reason
+        query = session.query(models.Action).filter(
+            models.Action.id.in_(marked[len(roots):]))
+        query.update(values, synchronize_session=False)
+
+    return dependents
+
+
 @retry_on_deadlock
 def _mark_failed(action_id, timestamp, reason=None):
-    # mark myself as failed
     with session_for_write() as session:
-        query = session.query(models.Action).filter_by(id=action_id)
-        values = {
-            'owner': None,
-            'status': consts.ACTION_FAILED,
-            'status_reason': (six.text_type(reason) if reason else
+        return _mark_cascade(session, [action_id], timestamp,
+                             consts.ACTION_FAILED,
+                             (six.text_type(reason) if reason else
                               'Action execution failed'),
-            'end_time': timestamp,
-        }
-        query.update(values, synchronize_session=False)
-        action = query.all()
-
-        query = session.query(models.ActionDependency)
-        query = query.filter_by(depended=action_id)
-        dependents = [d.dependent for d in query.all()]
-        query.delete(synchronize_session=False)
-
-    if parent_status_update_needed(action):
-        for d in dependents:
-            _mark_failed(d, timestamp)
+                             'Action execution failed')
 
 
 @retry_on_deadlock
 def action_mark_failed(context, action_id, timestamp, reason=None):
-    _mark_failed(action_id, timestamp, reason)
+    return _mark_failed(action_id, timestamp, reason)
 
 
-@retry_on_deadlock
 def _mark_cancelled(session, action_id, timestamp, reason=None):
-    query = session.query(models.Action).filter_by(id=action_id)
-    values = {
-        'owner': None,
-        'status': consts.ACTION_CANCELLED,
-        'status_reason': (six.text_type(reason) if reason else
+    return _mark_cascade(session, [action_id], timestamp,
+                         consts.ACTION_CANCELLED,
+                         (six.text_type(reason) if reason else
                           'Action execution cancelled'),
-        'end_time': timestamp,
-    }
-    query.update(values, synchronize_session=False)
-    action = query.all()
-
-    query = session.query(models.ActionDependency)
-    query = query.filter_by(depended=action_id)
-    dependents = [d.dependent for d in query.all()]
-    query.delete(synchronize_session=False)
-
-    if parent_status_update_needed(action):
-        for d in dependents:
-            _mark_cancelled(session, d, timestamp)
+                         'Action execution cancelled')
 
 
 @retry_on_deadlock
 def action_mark_cancelled(context, action_id, timestamp, reason=None):
     with session_for_write() as session:
-        _mark_cancelled(session, action_id, timestamp, reason)
+        return _mark_cancelled(session, action_id, timestamp, reason)
 
 
 @retry_on_deadlock
@@ -1367,6 +2145,10 @@ def action_acquire(context, action_id, owner, timestamp):
 
         if action.status != consts.ACTION_READY:
             return None
+
+        if action.not_before and float(action.not_before) > timestamp:
+            return None
+
         action.owner = owner
         action.start_time = timestamp
         action.status = consts.ACTION_RUNNING
@@ -1379,9 +2161,10 @@ def action_acquire(context, action_id, owner, timestamp):
 @retry_on_deadlock
 def action_acquire_random_ready(context, owner, timestamp):
     with session_for_write() as session:
-        action = (session.query(models.Action).
-                  filter_by(status=consts.ACTION_READY).
-                  filter_by(owner=None).
+        query = (session.query(models.Action).
+                 filter_by(status=consts.ACTION_READY).
+                 filter_by(owner=None))
+        action = (_filter_eligible(query, timestamp).
                   order_by(func.random()).
                   with_for_update().first())
 
@@ -1398,14 +2181,155 @@ def action_acquire_random_ready(context, owner, timestamp):
 @retry_on_deadlock
 def action_acquire_first_ready(context, owner, timestamp):
     with session_for_write() as session:
-        action = session.query(models.Action).filter_by(
-            status=consts.ACTION_READY).filter_by(
-            owner=None).order_by(
+        query = session.query(models.Action).filter_by(
+            status=consts.ACTION_READY).filter_by(owner=None)
+        action = _filter_eligible(query, timestamp).order_by(
             consts.ACTION_CREATED_AT or func.random()).first()
     if action:
         return action_acquire(context, action.id, owner, timestamp)
 
 
+def _skip_locked_supported(session):
+    """Check whether the backend supports 'FOR UPDATE ... SKIP LOCKED'."""
+    dialect = session.get_bind().dialect
+    version = dialect.server_version_info or ()
+    if dialect.name == 'postgresql':
+        return version >= (9, 5)
+    if dialect.name == 'mysql' and not getattr(dialect, '_is_mariadb', False):
+        return version >= (8, 0, 1)
+    return False
+
+
+@retry_on_deadlock
+def action_acquire_ready_batch(context, owner, timestamp, limit):
+    """Acquire up to `limit` ready actions in one transaction.
+
+    Rows locked by other engines are skipped when the backend supports
+    'SKIP LOCKED', otherwise they are waited for and re-checked.
+    """
+    with session_for_write() as session:
+        query = session.query(models.Action).filter_by(
+            status=consts.ACTION_READY).filter_by(owner=None)
+        query = _filter_eligible(query, timestamp).order_by(
+            consts.ACTION_CREATED_AT).limit(limit)
+        return _acquire_locked_ready(session, query, owner, timestamp)
+
+
+@retry_on_deadlock
+def action_acquire_batch(context, action_ids, owner, timestamp):
+    """Acquire the given actions if they are still ready.
+
+    :returns: A list of the actions acquired, in the order of `action_ids`.
+    """
+    with session_for_write() as session:
+        query = session.query(models.Action).filter(
+            models.Action.id.in_(action_ids)).filter_by(
+            status=consts.ACTION_READY).filter_by(owner=None)
+        query = _filter_eligible(query, timestamp)
+        actions = _acquire_locked_ready(session, query, owner, timestamp)
+
+    order = dict((action_id, i) for i, action_id in enumerate(action_ids))
+    return sorted(actions, key=lambda a: order[a.id])
+
+
+def _filter_eligible(query, timestamp):
+    """Filter out the actions whose retry is deferred beyond `timestamp`."""
+    return query.filter(sqlalchemy.or_(
+        models.Action.not_before.is_(None),
+        models.Action.not_before <= timestamp))
+
+
+def _acquire_locked_ready(session, query, owner, timestamp):
+    """Lock the ready actions of a query and acquire them.
+
+    Rows locked by other engines are skipped when the backend supports
+    'SKIP LOCKED', otherwise they are waited for and re-checked.
+    """
+    if _skip_locked_supported(session):
+        query = query.with_for_update(skip_locked=True)
+    else:
+        query = query.with_for_update()
+
+    actions = []
+    for action in query.all():
+        # The action may have been acquired while we were waiting for
+        # the row lock
+        if action.owner or action.status != consts.ACTION_READY:
+            continue
+
+        action.owner = owner
+        action.start_time = timestamp
+        action.status = consts.ACTION_RUNNING
+        action.status_reason = 'The action is being processed.'
+        action.save(session)
+        actions.append(action)
+
+    return actions
+
+
+def _action_class_rank():
+    """Get a SQL expression of the scheduling class of actions.
+
+    The value is the index of the class in scheduleutils.ACTION_CLASSES, as
+    determined by scheduleutils.action_class.
+    """
+    return sqlalchemy.case([
+        (models.Action.action.in_(scheduleutils.RECOVERY_ACTIONS), 0),
+        (models.Action.cause == consts.CAUSE_RPC, 1),
+    ], else_=2)
+
+
+def _filter_ready(query, timestamp):
+    """Filter the ready actions not yet acquired by any engine."""
+    query = query.filter(models.Action.status == consts.ACTION_READY,
+                         models.Action.owner.is_(None))
+    if timestamp is not None:
+        query = _filter_eligible(query, timestamp)
+    return query
+
+
+def action_get_all_ready(context, timestamp=None, limit=None,
+                         action_class=None):
+    """Get the ready actions not yet acquired, in creation order.
+
+    Only the columns needed for scheduling are loaded.
+
+    :param timestamp: If specified, only the actions eligible to run at this
+                      time are returned.
+    :param action_class: If specified, only the actions of this scheduling
+                         class are returned.
+    """
+    with session_for_read() as session:
+        query = session.query(models.Action).options(
+            load_only('id', 'action', 'cause', 'project', 'created_at'))
+        query = _filter_ready(query, timestamp)
+        if action_class is not None:
+            rank = scheduleutils.ACTION_CLASSES.index(action_class)
+            query = query.filter(_action_class_rank() == rank)
+        query = query.order_by(consts.ACTION_CREATED_AT)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+
+def action_count_ready_by_class(context, timestamp=None):
+    """Count the ready actions not yet acquired in each scheduling class.
+
+    :param timestamp: If specified, only the actions eligible to run at this
+                      time are counted.
+    :returns: A dict mapping each class in scheduleutils.ACTION_CLASSES to
+              a count.
+    """
+    with session_for_read() as session:
+        rank = _action_class_rank()
+        query = session.query(rank, func.count())
+        query = _filter_ready(query, timestamp)
+        counts = dict(query.group_by(rank).all())
+
+    return dict((c, counts.get(i, 0))
+                for i, c in enumerate(scheduleutils.ACTION_CLASSES))
+
+
 @retry_on_deadlock
 def action_abandon(context, action_id, values=None):
     """Abandon an action for other workers to execute again.
@@ -1494,32 +2418,36 @@ def action_delete_by_target(context, target, action=None,
         return q.delete(synchronize_session='fetch')
 
 
-@retry_on_deadlock
-def action_purge(project, granularity='days', age=30):
-    with session_for_write() as session:
-        query = session.query(models.Action).with_for_update()
+def action_purge(project, granularity='days', age=30, chunk_size=None,
+                 progress=None):
+    def select_ids(session):
+        query = session.query(models.Action.id)
         if project is not None:
             query = query.filter(models.Action.project.in_(project))
-        if granularity is not None and age is not None:
-            if granularity == 'days':
-                age = age * 86400
-            elif granularity == 'hours':
-                age = age * 3600
-            elif granularity == 'minutes':
-                age = age * 60
-            time_line = timeutils.utcnow() - datetime.timedelta(seconds=age)
+        if time_line is not None:
             query = query.filter(models.Action.created_at < time_line)
+        return query
+
+    def delete_dependencies(session, action_ids):
+        session.query(models.ActionDependency).filter(
+            sqlalchemy.or_(
+                models.ActionDependency.depended.in_(action_ids),
+                models.ActionDependency.dependent.in_(action_ids))).delete(
+            synchronize_session=False)
+
+    time_line = None
+    if granularity is not None and age is not None:
+        age = _age_to_seconds(granularity, age)
+        time_line = timeutils.utcnow() - datetime.timedelta(seconds=age)
 
-        # Get dependants to delete
-        for d in query.all():
-            q = session.query(models.ActionDependency).filter_by(depended=d.id)
-            q.delete(synchronize_session='fetch')
-        return query.delete(synchronize_session='fetch')
+    return _delete_in_chunks(models.Action, select_ids, chunk_size=chunk_size,
+                             progress=progress,
+                             before_delete=delete_dependencies)
 
 
 # Receivers
-def receiver_model_query():
-    with session_for_read() as session:
+def receiver_model_query(replica=False):
+    with session_for_read('receiver' if replica else None) as session:
         query = session.query(models.Receiver)
         return query
 
@@ -1546,8 +2474,8 @@ def receiver_get(context, receiver_id, project_safe=True):
 
 
 def receiver_get_all(context, limit=None, marker=None, filters=None, sort=None,
-                     project_safe=True):
-    query = receiver_model_query()
+                     project_safe=True, replica=False):
+    query = receiver_model_query(replica)
     if project_safe:
         query = query.filter_by(project=context.project_id)
 
@@ -1555,10 +2483,9 @@ def receiver_get_all(context, limit=None, marker=None, filters=None, sort=None,
         query = utils.exact_filter(query, models.Receiver, filters)
 
     keys, dirs = utils.get_sort_params(sort, consts.RECEIVER_NAME)
-    if marker:
-        marker = receiver_model_query().get(marker)
-    return sa_utils.paginate_query(query, models.Receiver, limit, keys,
-                                   marker=marker, sort_dirs=dirs).all()
+    return paginate_query(query, models.Receiver,
+                          lambda: receiver_model_query(replica), limit,
+                          keys, dirs, marker=marker).all()
 
 
 def receiver_get_by_name(context, name, project_safe=True):
@@ -1571,6 +2498,11 @@ def receiver_get_by_short_id(context, short_id, project_safe=True):
                              short_id, project_safe=project_safe)
 
 
+def receiver_get_by_identity(context, identity, project_safe=True):
+    return query_by_identity(context, receiver_model_query, models.Receiver,
+                             identity, project_safe=project_safe)
+
+
 @retry_on_deadlock
 def receiver_delete(context, receiver_id):
     with session_for_write() as session:
@@ -1636,23 +2568,44 @@ def service_get_all():
         return session.query(models.Service).all()
 
 
-@retry_on_deadlock
-def _mark_engine_failed(session, action_id, timestamp, reason=None):
-    query = session.query(models.ActionDependency)
-    # process cluster actions
-    d_query = query.filter_by(dependent=action_id)
-    dependents = [d.depended for d in d_query.all()]
-    if dependents:
-        for d in dependents:
-            _mark_engine_failed(session, d, timestamp, reason)
-    else:
-        depended = query.filter_by(depended=action_id)
-        depended.delete(synchronize_session=False)
+def _mark_engine_failed(session, action_ids, timestamp, reason=None):
+    """Mark actions and the actions they depend on as failed.
+
+    :param session: The session of the transaction.
+    :param action_ids: A list of IDs of the actions of a dead engine.
+    :param timestamp: Time the actions failed.
+    :param reason: Status reason of the failed actions.
+    """
+    dep = models.ActionDependency
+    marked = list(action_ids)
+    seen = set(marked)
+    leaves = []
+    frontier = marked
+    while frontier:
+        rows = session.query(dep.depended, dep.dependent).filter(
+            dep.dependent.in_(frontier)).all()
+        parents = set(row.dependent for row in rows)
+        leaves.extend(a for a in frontier if a not in parents)
+        frontier = []
+        for row in rows:
+            if row.depended not in seen:
+                seen.add(row.depended)
+                frontier.append(row.depended)
+        marked.extend(frontier)
+
+    # Release the dependents of the actions not waiting for others
+    if leaves:
+        query = session.query(dep).filter(dep.depended.in_(leaves))
+        released = collections.Counter(row.dependent for row in query.all())
+        query.delete(synchronize_session=False)
+        by_count = collections.defaultdict(list)
+        for dependent, count in released.items():
+            by_count[count].append(dependent)
+        for count, ids in by_count.items():
+            _release_dependents(session, ids, timestamp, count)
 
     # TODO(anyone): this will mark all depended actions' status to 'FAILED'
     # even the action belong to other engines and the action is running
-    # mark myself as failed
-    action = session.query(models.Action).filter_by(id=action_id).first()
     values = {
         'owner': None,
         'status': consts.ACTION_FAILED,
@@ -1660,49 +2613,107 @@ def _mark_engine_failed(session, action_id, timestamp, reason=None):
                           'Action execution failed'),
         'end_time': timestamp,
     }
-    action.update(values)
-    action.save(session)
+    query = session.query(models.Action).filter(models.Action.id.in_(marked))
+    query.update(values, synchronize_session=False)
+
+
+# Maximum number of action IDs matched against the cluster locks in a query
+LOCK_MATCH_CHUNK_SIZE = 100
+
+
+def _cluster_locks_by_actions(session, action_ids):
+    """Find the clusters whose locks are held by any of some actions.
+
+    The lists of action IDs are stored as JSON texts, which are matched
+    against chunks of the action IDs in SQL, so that only the candidate
+    locks are loaded. The candidates are then checked for exact matches.
+
+    :param session: The session of the transaction.
+    :param action_ids: A set of IDs of the actions.
+    :returns: A list of IDs of the clusters.
+    """
+    encoded = sqlalchemy.type_coerce(models.ClusterLock.action_ids,
+                                     sqlalchemy.Text)
+    ids = sorted(action_ids)
+    affected = []
+    for start in range(0, len(ids), LOCK_MATCH_CHUNK_SIZE):
+        chunk = ids[start:start + LOCK_MATCH_CHUNK_SIZE]
+        query = session.query(models.ClusterLock.cluster_id,
+                              models.ClusterLock.action_ids).filter(
+            sqlalchemy.or_(*[encoded.like('%%"%s"%%' % a) for a in chunk]))
+        affected.extend(r.cluster_id for r in query.all()
+                        if action_ids.intersection(r.action_ids or []))
+    return sorted(set(affected))
+
+
+def _release_locks_by_actions(session, action_ids):
+    """Release the cluster and node locks held by actions.
+
+    Only the cluster locks listing any of the actions are locked and
+    changed.
+
+    :param session: The session of the transaction.
+    :param action_ids: A set of IDs of the actions.
+    """
+    query = session.query(models.NodeLock).filter(
+        models.NodeLock.action_id.in_(action_ids))
+    query.delete(synchronize_session=False)
+
+    affected = _cluster_locks_by_actions(session, action_ids)
+    if not affected:
+        return
+
+    emptied = []
+    query = session.query(models.ClusterLock).filter(
+        models.ClusterLock.cluster_id.in_(affected)).with_for_update()
+    for lock in query.all():
+        owners = [a for a in lock.action_ids if a not in action_ids]
+        if not owners:
+            emptied.append(lock.cluster_id)
+        elif len(owners) < len(lock.action_ids):
+            # Only node scope locks are shared by several actions
+            lock.action_ids = owners
+            lock.semaphore = len(owners)
+            lock.save(session)
+
+    if emptied:
+        query = session.query(models.ClusterLock).filter(
+            models.ClusterLock.cluster_id.in_(emptied))
+        query.delete(synchronize_session=False)
 
 
 @retry_on_deadlock
 def dummy_gc(engine_id):
     with session_for_write() as session:
-        q_actions = session.query(models.Action).filter_by(owner=engine_id)
-        timestamp = time.time()
-        for action in q_actions.all():
-            _mark_engine_failed(session, action.id, timestamp,
-                                reason='Engine failure')
-            # Release all node locks
-            query = (session.query(models.NodeLock).
-                     filter_by(action_id=action.id))
-            query.delete(synchronize_session=False)
+        q_actions = session.query(models.Action.id).filter_by(
+            owner=engine_id)
+        action_ids = set(a.id for a in q_actions.all())
+        if not action_ids:
+            return
 
-            # Release all cluster locks
-            for clock in session.query(models.ClusterLock).all():
-                res = _release_cluster_lock(session, clock, action.id, -1)
-                if not res:
-                    _release_cluster_lock(session, clock, action.id, 1)
+        timestamp = time.time()
+        _mark_engine_failed(session, list(action_ids), timestamp,
+                            reason='Engine failure')
+        _release_locks_by_actions(session, action_ids)
 
 
 @retry_on_deadlock
 def gc_by_engine(engine_id):
     # Get all actions locked by an engine
     with session_for_write() as session:
-        q_actions = session.query(models.Action).filter_by(owner=engine_id)
-        timestamp = time.time()
-        for a in q_actions.all():
-            # Release all node locks
-            query = session.query(models.NodeLock).filter_by(action_id=a.id)
-            query.delete(synchronize_session=False)
-
-            # Release all cluster locks
-            for cl in session.query(models.ClusterLock).all():
-                res = _release_cluster_lock(session, cl, a.id, -1)
-                if not res:
-                    _release_cluster_lock(session, cl, a.id, 1)
+        q_actions = session.query(models.Action.id).filter_by(
+            owner=engine_id)
+        action_ids = set(a.id for a in q_actions.all())
+        if action_ids:
+            timestamp = time.time()
+            _release_locks_by_actions(session, action_ids)
+            _mark_cascade(session, list(action_ids), timestamp,
+                          consts.ACTION_FAILED, 'Engine failure',
+                          'Action execution failed')
 
-            # mark action failed and release lock
-            _mark_failed(a.id, timestamp, reason="Engine failure")
+        # Remove the lock waiters left by the engine
+        session.query(models.LockWaiter).filter_by(
+            engine_id=engine_id).delete(synchronize_session=False)
 
 
 # HealthRegistry
@@ -1777,6 +2788,42 @@ def registry_get_by_param(context, params):
     return obj
 
 
+# TokenBuckets
+def token_bucket_consume(context, bucket_id, rate, capacity, timestamp):
+    """Take a token from a token bucket, creating the bucket if needed.
+
+    Tokens are refilled at `rate` per second up to `capacity`. A token can
+    be taken from an empty bucket, in which case it is reserved and the
+    caller has to wait until it is refilled.
+
+    :returns: Seconds to wait before the token taken can be used.
+    """
+    try:
+        return _token_bucket_consume(bucket_id, rate, capacity, timestamp)
+    except db_exc.DBDuplicateEntry:
+        # The bucket was created by another engine meanwhile
+        return _token_bucket_consume(bucket_id, rate, capacity, timestamp)
+
+
+@retry_on_deadlock
+def _token_bucket_consume(bucket_id, rate, capacity, timestamp):
+    with session_for_write() as session:
+        bucket = session.query(models.TokenBucket).with_for_update().get(
+            bucket_id)
+        if bucket is None:
+            bucket = models.TokenBucket(id=bucket_id, tokens=capacity)
+            session.add(bucket)
+        else:
+            elapsed = max(0, timestamp - float(bucket.refilled_at))
+            bucket.tokens = min(capacity, bucket.tokens + elapsed * rate)
+
+        bucket.tokens -= 1
+        bucket.refilled_at = timestamp
+        if bucket.tokens >= 0:
+            return 0
+        return -bucket.tokens / rate
+
+
 # Utils
 def db_sync(engine, version=None):
     """Migrate the database to `version` or the most recent version."""
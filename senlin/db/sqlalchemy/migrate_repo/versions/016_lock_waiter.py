@@ -0,0 +1,35 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from sqlalchemy import Column, Integer, MetaData, Numeric, String, Table
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    lock_waiter = Table(
+        'lock_waiter', meta,
+        Column('id', Integer, primary_key=True, autoincrement=True),
+        Column('resource_id', String(36), nullable=False, index=True),
+        Column('action_id', String(36), nullable=False),
+        Column('engine_id', String(36)),
+        Column('created_at', Numeric(18, 6)),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    lock_waiter.create()
+
+
+def downgrade(migrate_engine):
+    raise NotImplementedError('Database downgrade not supported - '
+                              'would drop all tables')
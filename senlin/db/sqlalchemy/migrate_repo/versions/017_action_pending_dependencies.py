@@ -0,0 +1,34 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from sqlalchemy import Column, func, Integer, MetaData, select, Table
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    action = Table('action', meta, autoload=True)
+    pending = Column('pending_dependencies', Integer, default=0)
+    pending.create(action)
+
+    # Count the dependencies of the existing actions
+    dependency = Table('dependency', meta, autoload=True)
+    count = select([func.count()]).where(
+        dependency.c.dependent == action.c.id).as_scalar()
+    migrate_engine.execute(
+        action.update().values(pending_dependencies=count))
+
+
+def downgrade(migrate_engine):
+    raise NotImplementedError('Database downgrade not supported - '
+                              'would drop all tables')
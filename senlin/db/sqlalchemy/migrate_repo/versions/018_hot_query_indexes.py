@@ -0,0 +1,60 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from sqlalchemy import Index, MetaData, Table
+
+# Indexes to create, keyed by table name. The column order follows the
+# filters and sort keys of the queries using them.
+INDEXES = {
+    'action': [
+        ('ix_action_status_owner_created_at',
+         ['status', 'owner', 'created_at']),
+        ('ix_action_owner', ['owner']),
+        ('ix_action_target_status', ['target', 'status']),
+    ],
+    'node': [
+        ('ix_node_cluster_id_status', ['cluster_id', 'status']),
+    ],
+    'dependency': [
+        ('ix_dependency_depended_dependent', ['depended', 'dependent']),
+        ('ix_dependency_dependent_depended', ['dependent', 'depended']),
+    ],
+    'event': [
+        ('ix_event_cluster_id_project_timestamp',
+         ['cluster_id', 'project', 'timestamp']),
+        ('ix_event_project_timestamp', ['project', 'timestamp']),
+        ('ix_event_timestamp', ['timestamp']),
+    ],
+    'health_registry': [
+        ('ix_health_registry_engine_id', ['engine_id']),
+    ],
+    'cluster_policy': [
+        ('ix_cluster_policy_cluster_id_policy_id',
+         ['cluster_id', 'policy_id']),
+    ],
+}
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    for table_name, indexes in INDEXES.items():
+        table = Table(table_name, meta, autoload=True)
+        for name, columns in indexes:
+            index = Index(name, *[table.c[c] for c in columns])
+            index.create(migrate_engine)
+
+
+def downgrade(migrate_engine):
+    raise NotImplementedError('Database downgrade not supported - '
+                              'would drop all tables')
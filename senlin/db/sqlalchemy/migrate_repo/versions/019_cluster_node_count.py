@@ -0,0 +1,57 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from sqlalchemy import Column, func, Integer, MetaData, select, String, Table
+
+# Node statuses having a counter for each cluster
+NODE_STATUSES = (
+    'INIT', 'ACTIVE', 'ERROR', 'WARNING', 'CREATING', 'UPDATING',
+    'DELETING', 'RECOVERING', 'OPERATING',
+)
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    cluster_node_count = Table(
+        'cluster_node_count', meta,
+        Column('cluster_id', String(36), primary_key=True, nullable=False),
+        Column('status', String(64), primary_key=True, nullable=False),
+        Column('node_count', Integer, nullable=False, default=0),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    cluster_node_count.create()
+
+    # Count the nodes of the existing clusters
+    cluster = Table('cluster', meta, autoload=True)
+    node = Table('node', meta, autoload=True)
+    counts = dict(((c, s), n) for c, s, n in migrate_engine.execute(
+        select([node.c.cluster_id, node.c.status, func.count()]).where(
+            node.c.cluster_id != '').where(
+            node.c.status.isnot(None)).group_by(
+            node.c.cluster_id, node.c.status)))
+
+    for row in migrate_engine.execute(select([cluster.c.id])):
+        for status in NODE_STATUSES:
+            counts.setdefault((row.id, status), 0)
+
+    rows = [{'cluster_id': c, 'status': s, 'node_count': n}
+            for (c, s), n in counts.items()]
+    if rows:
+        migrate_engine.execute(cluster_node_count.insert(), rows)
+
+
+def downgrade(migrate_engine):
+    raise NotImplementedError('Database downgrade not supported - '
+                              'would drop all tables')
@@ -0,0 +1,38 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from sqlalchemy import Column, Integer, MetaData, Table
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    cluster = Table('cluster', meta, autoload=True)
+    node_generation = Column('node_generation', Integer, default=0)
+    node_generation.create(cluster)
+    policy_generation = Column('policy_generation', Integer, default=0)
+    policy_generation.create(cluster)
+
+    node = Table('node', meta, autoload=True)
+    generation = Column('generation', Integer, default=0)
+    generation.create(node)
+
+    # Counters are incremented in place, so they must not be NULL
+    migrate_engine.execute(
+        cluster.update().values(node_generation=0, policy_generation=0))
+    migrate_engine.execute(node.update().values(generation=0))
+
+
+def downgrade(migrate_engine):
+    raise NotImplementedError('Database downgrade not supported - '
+                              'would drop all tables')
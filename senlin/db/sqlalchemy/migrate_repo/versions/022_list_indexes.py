@@ -0,0 +1,42 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from sqlalchemy import Index, MetaData, Table
+
+# Indexes serving the pages of the list APIs in their default sort orders
+INDEXES = {
+    'cluster': [
+        ('ix_cluster_project_init_at_id', ['project', 'init_at', 'id']),
+    ],
+    'node': [
+        ('ix_node_project_init_at_id', ['project', 'init_at', 'id']),
+    ],
+    'action': [
+        ('ix_action_project_created_at_id', ['project', 'created_at', 'id']),
+    ],
+}
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    for table_name, indexes in INDEXES.items():
+        table = Table(table_name, meta, autoload=True)
+        for name, columns in indexes:
+            index = Index(name, *[table.c[c] for c in columns])
+            index.create(migrate_engine)
+
+
+def downgrade(migrate_engine):
+    raise NotImplementedError('Database downgrade not supported - '
+                              'would drop all tables')
@@ -16,7 +16,8 @@ SQLAlchemy models for Senlin data.
 
 from oslo_db.sqlalchemy import models
 from oslo_utils import uuidutils
-from sqlalchemy import Boolean, Column, Numeric, ForeignKey, Integer
+from sqlalchemy import Boolean, Column, Float, Numeric, ForeignKey
+from sqlalchemy import Index, Integer
 from sqlalchemy import String, Text
 from sqlalchemy.ext import declarative
 from sqlalchemy.orm import backref
@@ -35,7 +36,10 @@ class TimestampMixin(object):
 
 class Profile(BASE, TimestampMixin, models.ModelBase):
     """Profile objects."""
-    __table_args__ = {'mysql_engine': 'InnoDB'}
+    __table_args__ = (
+        Index('ix_profile_name', 'name'),
+        {'mysql_engine': 'InnoDB'}
+    )
     __tablename__ = 'profile'
 
     id = Column('id', String(36), primary_key=True, default=lambda: UUID4())
@@ -52,7 +56,10 @@ class Profile(BASE, TimestampMixin, models.ModelBase):
 
 class Policy(BASE, TimestampMixin, models.ModelBase):
     """Policy objects."""
-    __table_args__ = {'mysql_engine': 'InnoDB'}
+    __table_args__ = (
+        Index('ix_policy_name', 'name'),
+        {'mysql_engine': 'InnoDB'}
+    )
     __tablename__ = 'policy'
 
     id = Column('id', String(36), primary_key=True, default=lambda: UUID4())
@@ -69,7 +76,11 @@ class Policy(BASE, TimestampMixin, models.ModelBase):
 
 class Cluster(BASE, TimestampMixin, models.ModelBase):
     """Cluster objects."""
-    __table_args__ = {'mysql_engine': 'InnoDB'}
+    __table_args__ = (
+        Index('ix_cluster_name', 'name'),
+        Index('ix_cluster_project_init_at_id', 'project', 'init_at', 'id'),
+        {'mysql_engine': 'InnoDB'}
+    )
     __tablename__ = 'cluster'
 
     id = Column('id', String(36), primary_key=True, default=lambda: UUID4())
@@ -94,6 +105,8 @@ class Cluster(BASE, TimestampMixin, models.ModelBase):
     data = Column(types.Dict)
     dependents = Column(types.Dict)
     config = Column(types.Dict)
+    node_generation = Column(Integer, default=0)
+    policy_generation = Column(Integer, default=0)
 
     profile = relationship(Profile)
 
@@ -101,7 +114,12 @@ class Cluster(BASE, TimestampMixin, models.ModelBase):
 class Node(BASE, TimestampMixin, models.ModelBase):
     """Node objects."""
 
-    __table_args__ = {'mysql_engine': 'InnoDB'}
+    __table_args__ = (
+        Index('ix_node_cluster_id_status', 'cluster_id', 'status'),
+        Index('ix_node_name', 'name'),
+        Index('ix_node_project_init_at_id', 'project', 'init_at', 'id'),
+        {'mysql_engine': 'InnoDB'}
+    )
     __tablename__ = 'node'
 
     id = Column('id', String(36), primary_key=True, default=lambda: UUID4())
@@ -122,12 +140,23 @@ class Node(BASE, TimestampMixin, models.ModelBase):
     meta_data = Column(types.Dict)
     data = Column(types.Dict)
     dependents = Column(types.Dict)
+    generation = Column(Integer, default=0)
     profile = relationship(Profile, backref=backref('nodes'))
     cluster = relationship(Cluster, backref=backref('nodes'),
                            foreign_keys=[cluster_id],
                            primaryjoin='Cluster.id == Node.cluster_id')
 
 
+class ClusterNodeCount(BASE, models.ModelBase):
+    """Number of nodes of a cluster in a status."""
+    __table_args__ = {'mysql_engine': 'InnoDB'}
+    __tablename__ = 'cluster_node_count'
+
+    cluster_id = Column(String(36), primary_key=True, nullable=False)
+    status = Column(String(64), primary_key=True, nullable=False)
+    node_count = Column(Integer, nullable=False, default=0)
+
+
 class ClusterLock(BASE, models.ModelBase):
     """Cluster locks for actions."""
     __table_args__ = {'mysql_engine': 'InnoDB'}
@@ -147,9 +176,25 @@ class NodeLock(BASE, models.ModelBase):
     action_id = Column(String(36))
 
 
+class LockWaiter(BASE, models.ModelBase):
+    """Actions waiting in line for cluster or node locks."""
+    __table_args__ = {'mysql_engine': 'InnoDB'}
+    __tablename__ = 'lock_waiter'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    resource_id = Column(String(36), nullable=False, index=True)
+    action_id = Column(String(36), nullable=False)
+    engine_id = Column(String(36))
+    created_at = Column(Numeric(18, 6))
+
+
 class ClusterPolicies(BASE, models.ModelBase):
     """Association between clusters and policies."""
-    __table_args__ = {'mysql_engine': 'InnoDB'}
+    __table_args__ = (
+        Index('ix_cluster_policy_cluster_id_policy_id',
+              'cluster_id', 'policy_id'),
+        {'mysql_engine': 'InnoDB'}
+    )
     __tablename__ = 'cluster_policy'
 
     id = Column('id', String(36), primary_key=True, default=lambda: UUID4())
@@ -166,7 +211,10 @@ class ClusterPolicies(BASE, models.ModelBase):
 class HealthRegistry(BASE, models.ModelBase):
     """Clusters registered for health management."""
 
-    __table_args__ = {'mysql_engine': 'InnoDB'}
+    __table_args__ = (
+        Index('ix_health_registry_engine_id', 'engine_id'),
+        {'mysql_engine': 'InnoDB'}
+    )
     __tablename__ = 'health_registry'
 
     id = Column('id', String(36), primary_key=True, default=lambda: UUID4())
@@ -180,7 +228,10 @@ class HealthRegistry(BASE, models.ModelBase):
 
 class Receiver(BASE, TimestampMixin, models.ModelBase):
     """Receiver objects associated with clusters."""
-    __table_args__ = {'mysql_engine': 'InnoDB'}
+    __table_args__ = (
+        Index('ix_receiver_name', 'name'),
+        {'mysql_engine': 'InnoDB'}
+    )
     __tablename__ = 'receiver'
 
     id = Column('id', String(36), primary_key=True, default=lambda: UUID4())
@@ -210,7 +261,11 @@ class Credential(BASE, models.ModelBase):
 
 class ActionDependency(BASE, models.ModelBase):
     """Action dependencies."""
-    __table_args__ = {'mysql_engine': 'InnoDB'}
+    __table_args__ = (
+        Index('ix_dependency_depended_dependent', 'depended', 'dependent'),
+        Index('ix_dependency_dependent_depended', 'dependent', 'depended'),
+        {'mysql_engine': 'InnoDB'}
+    )
     __tablename__ = 'dependency'
 
     id = Column('id', String(36), primary_key=True, default=lambda: UUID4())
@@ -222,7 +277,16 @@ class ActionDependency(BASE, models.ModelBase):
 
 class Action(BASE, TimestampMixin, models.ModelBase):
     """Action objects."""
-    __table_args__ = {'mysql_engine': 'InnoDB'}
+    __table_args__ = (
+        Index('ix_action_status_owner_created_at',
+              'status', 'owner', 'created_at'),
+        Index('ix_action_owner', 'owner'),
+        Index('ix_action_target_status', 'target', 'status'),
+        Index('ix_action_name', 'name'),
+        Index('ix_action_project_created_at_id',
+              'project', 'created_at', 'id'),
+        {'mysql_engine': 'InnoDB'}
+    )
     __tablename__ = 'action'
 
     id = Column('id', String(36), primary_key=True, default=lambda: UUID4())
@@ -235,6 +299,8 @@ class Action(BASE, TimestampMixin, models.ModelBase):
     interval = Column(Integer)
     start_time = Column(Numeric(18, 6))
     end_time = Column(Numeric(18, 6))
+    not_before = Column(Numeric(18, 6))
+    pending_dependencies = Column(Integer, default=0)
     timeout = Column(Integer)
     status = Column(String(255))
     status_reason = Column(Text)
@@ -256,7 +322,13 @@ class Action(BASE, TimestampMixin, models.ModelBase):
 
 class Event(BASE, models.ModelBase):
     """Events generated by the Senin engine."""
-    __table_args__ = {'mysql_engine': 'InnoDB'}
+    __table_args__ = (
+        Index('ix_event_cluster_id_project_timestamp',
+              'cluster_id', 'project', 'timestamp'),
+        Index('ix_event_project_timestamp', 'project', 'timestamp'),
+        Index('ix_event_timestamp', 'timestamp'),
+        {'mysql_engine': 'InnoDB'}
+    )
     __tablename__ = 'event'
 
     id = Column('id', String(36), primary_key=True, default=lambda: UUID4())
@@ -292,3 +364,13 @@ class Service(BASE, TimestampMixin, models.ModelBase):
     topic = Column(String(255))
     disabled = Column(Boolean, default=False)
     disabled_reason = Column(String(255))
+
+
+class TokenBucket(BASE, models.ModelBase):
+    """Token buckets rate limiting actions across engines."""
+    __table_args__ = {'mysql_engine': 'InnoDB'}
+    __tablename__ = 'token_bucket'
+
+    id = Column('id', String(255), primary_key=True, nullable=False)
+    tokens = Column(Float)
+    refilled_at = Column(Numeric(18, 6))
@@ -10,8 +10,15 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import base64
+import datetime
+import decimal
+
 from oslo_config import cfg
+from oslo_serialization import jsonutils
 from oslo_utils import timeutils
+import six
+import sqlalchemy
 
 
 def exact_filter(query, model, filters):
@@ -76,6 +83,132 @@ def get_sort_params(value, default_key=None):
     return keys, dirs
 
 
+def encode_cursor(sort_keys, values):
+    """Encode the sort key values of a row into an opaque page cursor.
+
+    :param sort_keys: A list of sorting keys.
+    :param values: A list of the values of the sorting keys of the last row
+                   of a page.
+    :return: A URL safe string to be used as the marker of the next page.
+    """
+    encoded = []
+    for value in values:
+        if isinstance(value, datetime.datetime):
+            value = {'datetime': value.isoformat()}
+        elif isinstance(value, decimal.Decimal):
+            value = {'decimal': six.text_type(value)}
+        encoded.append(value)
+
+    data = jsonutils.dump_as_bytes([sort_keys, encoded])
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort_keys):
+    """Decode a page cursor into the values of the sorting keys.
+
+    :param cursor: A string returned by `encode_cursor`.
+    :param sort_keys: A list of sorting keys of the current query.
+    :return: A list of the values of the sorting keys, or None if the cursor
+             is not valid for the sorting keys.
+    """
+    try:
+        data = base64.urlsafe_b64decode(
+            str(cursor) + '=' * (-len(cursor) % 4))
+        keys, encoded = jsonutils.loads(data)
+    except (TypeError, ValueError):
+        return None
+
+    if (keys != sort_keys or not isinstance(encoded, list) or
+            len(encoded) != len(sort_keys)):
+        return None
+
+    values = []
+    for value in encoded:
+        try:
+            if isinstance(value, dict) and 'datetime' in value:
+                value = timeutils.parse_isotime(value['datetime'])
+            elif isinstance(value, dict) and 'decimal' in value:
+                value = decimal.Decimal(value['decimal'])
+        except (TypeError, ValueError, decimal.InvalidOperation):
+            return None
+
+        # Only scalar values can be compared with the columns
+        if not (value is None or
+                isinstance(value, (datetime.datetime, decimal.Decimal,
+                                   bool, float) + six.integer_types +
+                           six.string_types)):
+            return None
+        values.append(value)
+    return values
+
+
+def _column_after(column, nullable, sort_dir, value):
+    """A criterion for the column values after a value in a sort order."""
+    if sort_dir.startswith('desc'):
+        # NULL values come last in descending order
+        if value is None:
+            return None
+        if nullable:
+            return sqlalchemy.or_(column < value, column.is_(None))
+        return column < value
+
+    # NULL values come first in ascending order
+    if value is None:
+        return column.isnot(None)
+    return column > value
+
+
+def _column_not_before(column, nullable, sort_dir, value):
+    """A criterion for the column values not before a value."""
+    if sort_dir.startswith('desc'):
+        if value is None:
+            return column.is_(None)
+        if nullable:
+            return sqlalchemy.or_(column <= value, column.is_(None))
+        return column <= value
+
+    if value is None:
+        return None
+    return column >= value
+
+
+def keyset_filter(query, model, sort_keys, sort_dirs, values):
+    """Filter a query to the rows following the given sort key values.
+
+    Besides the usual expansion of the compound sort keys, the query is
+    constrained by a range on the first sort key, which can be served by
+    an index on that key instead of scanning from the start of the order.
+
+    :param query: The query to filter.
+    :param model: The model the query applies to.
+    :param sort_keys: A list of sorting keys, the last of which is unique.
+    :param sort_dirs: A list of sorting directions.
+    :param values: A list of the values of the sorting keys of the last row
+                   of the previous page.
+    :return: The filtered query.
+    """
+    columns = [getattr(model, key) for key in sort_keys]
+    nullables = [c.property.columns[0].nullable for c in columns]
+
+    criteria = []
+    for i, column in enumerate(columns):
+        after = _column_after(column, nullables[i], sort_dirs[i], values[i])
+        if after is None:
+            continue
+        equals = [columns[j].is_(None) if values[j] is None
+                  else columns[j] == values[j] for j in range(i)]
+        criteria.append(sqlalchemy.and_(*(equals + [after])))
+
+    if not criteria:
+        return query.filter(sqlalchemy.false())
+
+    lead = _column_not_before(columns[0], nullables[0], sort_dirs[0],
+                              values[0])
+    if lead is not None:
+        query = query.filter(lead)
+    return query.filter(sqlalchemy.or_(*criteria))
+
+
 def is_service_dead(service):
     """Check if a given service is dead."""
     cfg.CONF.import_opt("periodic_interval", "senlin.common.config")
@@ -11,12 +11,14 @@
 # under the License.
 
 import eventlet
+import random
 import six
 import time
 
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import timeutils
+from oslo_utils import uuidutils
 
 from senlin.common import consts
 from senlin.common import context as req_context
@@ -39,11 +41,11 @@ class Action(object):
     """An action can be performed on a cluster or a node of a cluster."""
 
     RETURNS = (
-        RES_OK, RES_ERROR, RES_RETRY, RES_CANCEL, RES_TIMEOUT,
+        RES_OK, RES_ERROR, RES_RETRY, RES_DEFER, RES_CANCEL, RES_TIMEOUT,
         RES_LIFECYCLE_COMPLETE, RES_LIFECYCLE_HOOK_TIMEOUT,
     ) = (
-        'OK', 'ERROR', 'RETRY', 'CANCEL', 'TIMEOUT', 'LIFECYCLE_COMPLETE',
-        'LIFECYCLE_HOOK_TIMEOUT'
+        'OK', 'ERROR', 'RETRY', 'DEFER', 'CANCEL', 'TIMEOUT',
+        'LIFECYCLE_COMPLETE', 'LIFECYCLE_HOOK_TIMEOUT'
     )
 
     # Action status definitions:
@@ -139,6 +141,10 @@ class Action(object):
 
         self.data = kwargs.get('data', {})
 
+        # Seconds to wait before executing the action again when its
+        # execution returns RES_DEFER
+        self.defer_delay = 0
+
     def store(self, ctx):
         """Store the action record into database table.
 
@@ -148,7 +154,23 @@ class Action(object):
 
         timestamp = timeutils.utcnow(True)
 
-        values = {
+        values = self._to_values()
+
+        if self.id:
+            self.updated_at = timestamp
+            values['updated_at'] = timestamp
+            ao.Action.update(ctx, self.id, values)
+        else:
+            self.created_at = timestamp
+            values['created_at'] = timestamp
+            action = ao.Action.create(ctx, values)
+            self.id = action.id
+
+        return self.id
+
+    def _to_values(self):
+        """Get the values of the action record in database table."""
+        return {
             'name': self.name,
             'context': self.context.to_dict(),
             'target': self.target,
@@ -171,18 +193,6 @@ class Action(object):
             'domain': self.domain,
         }
 
-        if self.id:
-            self.updated_at = timestamp
-            values['updated_at'] = timestamp
-            ao.Action.update(ctx, self.id, values)
-        else:
-            self.created_at = timestamp
-            values['created_at'] = timestamp
-            action = ao.Action.create(ctx, values)
-            self.id = action.id
-
-        return self.id
-
     @classmethod
     def _from_object(cls, obj):
         """Construct an action from database object.
@@ -269,6 +279,61 @@ class Action(object):
         obj = cls(target, action, c, **kwargs)
         return obj.store(ctx)
 
+    @classmethod
+    def create_bulk(cls, ctx, specs, dependencies, nodes=None):
+        """Create ready actions along with their dependencies in bulk.
+
+        All records are stored in a single transaction.
+
+        :param ctx: The requesting context.
+        :param specs: A list of (target, action, kwargs) tuples, each of
+                      which specifies an action to create. The ID of the
+                      action can be provided in kwargs so that it can be
+                      referenced in dependencies.
+        :param dependencies: A list of (depended, dependent) tuples of action
+                             IDs.
+        :param nodes: An optional list of new `Node` objects to be stored
+                      along with the actions.
+        :return: A list of the IDs of the actions created.
+        """
+        new_nodes = set(node.id for node in nodes or [])
+        params = {
+            'user_id': ctx.user_id,
+            'project_id': ctx.project_id,
+            'domain_id': ctx.domain_id,
+            'is_admin': ctx.is_admin,
+            'request_id': ctx.request_id,
+            'trusts': ctx.trusts,
+        }
+        c = req_context.RequestContext.from_dict(params)
+        timestamp = timeutils.utcnow(True)
+
+        action_values = []
+        for target, action, kwargs in specs:
+            # Nothing can lock or conflict with nodes not yet created
+            if target not in new_nodes:
+                cls._check_action_lock(target, action)
+                cls._check_conflicting_actions(ctx, target, action)
+
+            obj = cls(target, action, c, **kwargs)
+            if not obj.id:
+                obj.id = uuidutils.generate_uuid()
+            obj.status = cls.READY
+            obj.created_at = timestamp
+            values = obj._to_values()
+            values['id'] = obj.id
+            action_values.append(values)
+
+        node_values = []
+        for node in nodes or []:
+            node.init_at = timestamp
+            values = node._to_values()
+            values['id'] = node.id
+            node_values.append(values)
+        ao.Action.create_bulk(ctx, action_values, dependencies,
+                              nodes=node_values)
+        return [v['id'] for v in action_values]
+
     @staticmethod
     def _check_action_lock(target, action):
         if action in consts.LOCK_BYPASS_ACTIONS:
@@ -284,12 +349,13 @@ class Action(object):
 
     @staticmethod
     def _check_conflicting_actions(ctx, target, action):
-        conflict_actions = ao.Action.get_all_active_by_target(ctx, target)
+        conflict_actions = ao.Action.columns_active_by_target(ctx, target,
+                                                              ['id'])
         # Ignore conflicting actions on deletes.
         if not conflict_actions or action in consts.CONFLICT_BYPASS_ACTIONS:
             return
         else:
-            action_ids = [a['id'] for a in conflict_actions]
+            action_ids = [a.id for a in conflict_actions]
             raise exception.ActionConflict(
                 type=action, target=target, actions=",".join(action_ids))
 
@@ -328,6 +394,21 @@ class Action(object):
             return
 
         ao.Action.signal(self.context, self.id, cmd)
+        self._deliver_signal(self.id, self.owner, cmd)
+
+    @staticmethod
+    def _deliver_signal(action_id, owner, cmd):
+        """Deliver a signal to the engine running the action, if any.
+
+        :param action_id: ID of the action signaled.
+        :param owner: ID of the engine owning the action, or None.
+        :param cmd: One of the command word defined in self.COMMANDS.
+        """
+        if dispatcher.deliver_signal(action_id, cmd):
+            return
+
+        if owner:
+            dispatcher.signal_action(owner, cmd, action_id=action_id)
 
     def signal_cancel(self):
         """Signal the action and any depended actions to cancel.
@@ -346,6 +427,7 @@ class Action(object):
                                             actual=self.status)
 
         ao.Action.signal(self.context, self.id, self.SIG_CANCEL)
+        self._deliver_signal(self.id, self.owner, self.SIG_CANCEL)
 
         if self.status in (self.WAITING_LIFECYCLE_COMPLETION, self.INIT):
             self.set_status(self.RES_CANCEL, 'Action execution cancelled')
@@ -359,6 +441,7 @@ class Action(object):
             action = self.load(self.context, action_id=child)
             if not action.is_cancelled():
                 ao.Action.signal(self.context, child, self.SIG_CANCEL)
+                self._deliver_signal(child, action.owner, self.SIG_CANCEL)
             # If the action is in WAITING_LIFECYCLE_COMPLETION or INIT update
             # the status to CANCELLED immediately.
             if action.status in (action.WAITING_LIFECYCLE_COMPLETION,
@@ -408,28 +491,50 @@ class Action(object):
         """
         raise NotImplementedError
 
+    @staticmethod
+    def _retry_delay(retries):
+        """Get the number of seconds to wait before retrying an action.
+
+        The delay doubles with each retry up to a maximum, and half of it is
+        randomized so that actions failed together do not retry together.
+
+        :param retries: Number of retries of the action so far.
+        :returns: A float number of seconds.
+        """
+        delay = min(cfg.CONF.lock_retry_interval * (2 ** (retries - 1)),
+                    cfg.CONF.lock_retry_max_interval)
+        return delay / 2.0 + random.uniform(0, delay / 2.0)
+
     def set_status(self, result, reason=None):
         """Set action status based on return value from execute."""
 
         timestamp = wallclock()
+        dependents = None
 
         if result == self.RES_OK:
             status = self.SUCCEEDED
-            ao.Action.mark_succeeded(self.context, self.id, timestamp)
+            dependents = ao.Action.mark_succeeded(self.context, self.id,
+                                                  timestamp)
 
         elif result == self.RES_ERROR:
             status = self.FAILED
-            ao.Action.mark_failed(self.context, self.id, timestamp,
-                                  reason or 'ERROR')
+            dependents = ao.Action.mark_failed(self.context, self.id,
+                                               timestamp, reason or 'ERROR')
 
         elif result == self.RES_TIMEOUT:
             status = self.FAILED
-            ao.Action.mark_failed(self.context, self.id, timestamp,
-                                  reason or 'TIMEOUT')
+            dependents = ao.Action.mark_failed(self.context, self.id,
+                                               timestamp, reason or 'TIMEOUT')
 
         elif result == self.RES_CANCEL:
             status = self.CANCELLED
-            ao.Action.mark_cancelled(self.context, self.id, timestamp)
+            dependents = ao.Action.mark_cancelled(self.context, self.id,
+                                                  timestamp)
+
+        elif result == self.RES_DEFER:
+            # Action cannot start yet, which does not count as a retry
+            status = self.READY
+            self._defer(timestamp, self.defer_delay)
 
         else:  # result == self.RES_RETRY:
             retries = self.data.get('retries', 0)
@@ -440,27 +545,63 @@ class Action(object):
                 retries += 1
 
                 self.data.update({'retries': retries})
-                ao.Action.abandon(self.context, self.id, {'data': self.data})
-                # sleep for a while
-                eventlet.sleep(cfg.CONF.lock_retry_interval)
-                dispatcher.start_action(self.id)
+                self._defer(timestamp, self._retry_delay(retries))
             else:
                 status = self.RES_ERROR
                 if not reason:
                     reason = ('Exceeded maximum number of retries (%d)'
                               '') % cfg.CONF.lock_retry_times
-                ao.Action.mark_failed(self.context, self.id, timestamp, reason)
+                dependents = ao.Action.mark_failed(self.context, self.id,
+                                                   timestamp, reason)
 
         if status == self.SUCCEEDED:
             EVENT.info(self, consts.PHASE_END, reason or 'SUCCEEDED')
         elif status == self.READY:
-            EVENT.warning(self, consts.PHASE_ERROR, reason or 'RETRY')
+            if result == self.RES_RETRY:
+                EVENT.warning(self, consts.PHASE_ERROR, reason or 'RETRY')
         else:
             EVENT.error(self, consts.PHASE_ERROR, reason or 'ERROR')
 
         self.status = status
         self.status_reason = reason
 
+        if dependents:
+            self._wake_dependents(dependents)
+
+    def _defer(self, timestamp, delay):
+        """Put the action back to READY to be executed again after a delay.
+
+        Instead of holding this thread, the action is claimed again by the
+        scheduler once it is eligible.
+
+        :param timestamp: The current time.
+        :param delay: Seconds to wait before executing the action again.
+        """
+        ao.Action.abandon(self.context, self.id,
+                          {'data': self.data,
+                           'not_before': timestamp + delay})
+        eventlet.spawn_after(delay, dispatcher.start_action)
+
+    def _wake_dependents(self, dependents):
+        """Wake up the dependent actions waiting for this action.
+
+        A dependent action running on this engine is woken up directly,
+        otherwise the engine owning it is notified.
+
+        :param dependents: A list of IDs of the dependent actions.
+        """
+        for action_id in dependents:
+            if dispatcher.wake_waiter(action_id):
+                continue
+
+            try:
+                owner = ao.Action.lock_check(self.context, action_id)
+            except exception.ResourceNotFound:
+                continue
+
+            if owner:
+                dispatcher.wake_action(owner, action_id=action_id)
+
     def get_status(self):
         timestamp = wallclock()
         status = ao.Action.check_status(self.context, self.id, timestamp)
@@ -481,7 +622,15 @@ class Action(object):
             EVENT.debug(self, consts.PHASE_ERROR, 'TIMEOUT')
             return self.RES_TIMEOUT
 
+        # Signals of actions running on this engine are delivered in memory,
+        # the database is only consulted when the local copy gets stale.
+        found, result = dispatcher.get_signal(
+            self.id, cfg.CONF.signal_refresh_interval)
+        if found:
+            return result
+
         result = ao.Action.signal_query(self.context, self.id)
+        dispatcher.deliver_signal(self.id, result)
         return result
 
     def is_cancelled(self):
@@ -656,10 +805,14 @@ def ActionProc(ctx, action_id):
         LOG.error('Action "%s" could not be found.', action_id)
         return False
 
+    # Signals sent to the action from now on are delivered in memory
+    dispatcher.register_signal(action.id)
+
     if action.is_cancelled():
         reason = '%(action)s [%(id)s] cancelled' % {
             'action': action.action, 'id': action.id[:8]}
         action.set_status(action.RES_CANCEL, reason)
+        dispatcher.unregister_signal(action.id)
         LOG.info(reason)
         return True
 
@@ -685,5 +838,6 @@ def ActionProc(ctx, action_id):
     finally:
         # NOTE: locks on action is eventually released here by status update
         action.set_status(result, reason)
+        dispatcher.unregister_signal(action.id)
 
     return success
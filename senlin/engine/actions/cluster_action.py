@@ -13,8 +13,10 @@
 import copy
 import eventlet
 
+from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import timeutils
+from oslo_utils import uuidutils
 from osprofiler import profiler
 
 from senlin.common import consts
@@ -26,7 +28,6 @@ from senlin.engine import cluster as cluster_mod
 from senlin.engine import dispatcher
 from senlin.engine import node as node_mod
 from senlin.engine.notifications import message as msg
-from senlin.engine import scheduler
 from senlin.engine import senlin_lock
 from senlin.objects import action as ao
 from senlin.objects import cluster as co
@@ -63,54 +64,64 @@ class ClusterAction(base.Action):
     def _wait_for_dependents(self, lifecycle_hook_timeout=None):
         """Wait for dependent actions to complete.
 
+        The action is woken up as soon as any of its depended actions is
+        completed, the periodic status check is only a safety net.
+
         :returns: A tuple containing the result and the corresponding reason.
         """
-        status = self.get_status()
-        while status != self.READY:
-            if status == self.FAILED:
-                reason = ('%(action)s [%(id)s] failed' % {
-                    'action': self.action, 'id': self.id[:8]})
-                LOG.debug(reason)
-                return self.RES_ERROR, reason
+        dispatcher.register_waiter(self.id)
+        try:
+            status = self.get_status()
+            while status != self.READY:
+                if status == self.FAILED:
+                    reason = ('%(action)s [%(id)s] failed' % {
+                        'action': self.action, 'id': self.id[:8]})
+                    LOG.debug(reason)
+                    return self.RES_ERROR, reason
 
-            if self.is_cancelled():
-                # During this period, if cancel request comes, cancel this
-                # operation immediately after signaling children to cancel,
-                # then release the cluster lock
-                reason = ('%(action)s [%(id)s] cancelled' % {
-                    'action': self.action, 'id': self.id[:8]})
-                LOG.debug(reason)
-                return self.RES_CANCEL, reason
-
-            # When a child action is cancelled the parent action will update
-            # its status to cancelled as well this allows it to exit.
-            if status == self.CANCELLED:
-                if self.check_children_complete():
+                if self.is_cancelled():
+                    # During this period, if cancel request comes, cancel
+                    # this operation immediately after signaling children to
+                    # cancel, then release the cluster lock
                     reason = ('%(action)s [%(id)s] cancelled' % {
                         'action': self.action, 'id': self.id[:8]})
                     LOG.debug(reason)
                     return self.RES_CANCEL, reason
 
-            if self.is_timeout():
-                # Action timeout, return
-                reason = ('%(action)s [%(id)s] timeout' % {
-                    'action': self.action, 'id': self.id[:8]})
-                LOG.debug(reason)
-                return self.RES_TIMEOUT, reason
-
-            if (lifecycle_hook_timeout is not None and
-                    self.is_timeout(lifecycle_hook_timeout)):
-                # if lifecycle hook timeout is specified and Lifecycle hook
-                # timeout is reached, return
-                reason = ('%(action)s [%(id)s] lifecycle hook timeout'
-                          '') % {'action': self.action, 'id': self.id[:8]}
-                LOG.debug(reason)
-                return self.RES_LIFECYCLE_HOOK_TIMEOUT, reason
-
-            # Continue waiting (with reschedule)
-            scheduler.reschedule(self.id, 3)
-            status = self.get_status()
-            dispatcher.start_action()
+                # When a child action is cancelled the parent action will
+                # update its status to cancelled as well this allows it to
+                # exit.
+                if status == self.CANCELLED:
+                    if self.check_children_complete():
+                        reason = ('%(action)s [%(id)s] cancelled' % {
+                            'action': self.action, 'id': self.id[:8]})
+                        LOG.debug(reason)
+                        return self.RES_CANCEL, reason
+
+                if self.is_timeout():
+                    # Action timeout, return
+                    reason = ('%(action)s [%(id)s] timeout' % {
+                        'action': self.action, 'id': self.id[:8]})
+                    LOG.debug(reason)
+                    return self.RES_TIMEOUT, reason
+
+                if (lifecycle_hook_timeout is not None and
+                        self.is_timeout(lifecycle_hook_timeout)):
+                    # if lifecycle hook timeout is specified and Lifecycle
+                    # hook timeout is reached, return
+                    reason = ('%(action)s [%(id)s] lifecycle hook timeout'
+                              '') % {'action': self.action, 'id': self.id[:8]}
+                    LOG.debug(reason)
+                    return self.RES_LIFECYCLE_HOOK_TIMEOUT, reason
+
+                # Continue waiting until woken up by a depended action
+                woken = dispatcher.wait_for_wakeup(
+                    self.id, cfg.CONF.dependency_check_interval)
+                status = self.get_status()
+                if not woken:
+                    dispatcher.start_action()
+        finally:
+            dispatcher.unregister_waiter(self.id)
 
         return self.RES_OK, 'All dependents ended with success'
 
@@ -127,6 +138,31 @@ class ClusterAction(base.Action):
                 return False
         return True
 
+    def _create_children(self, specs, nodes=None, dependencies=None):
+        """Create the derived actions the current action depends on.
+
+        The actions, their dependencies and the new nodes, if any, are all
+        stored in one transaction before the actions are dispatched.
+
+        :param specs: A list of (target, action, kwargs) tuples specifying
+                      the actions to create.
+        :param nodes: An optional list of new `Node` objects to store.
+        :param dependencies: An optional list of (depended, dependent)
+                             tuples of action IDs. By default, the current
+                             action depends on all the actions created.
+        :returns: A list of the IDs of the actions created.
+        """
+        for target, action, kwargs in specs:
+            kwargs.setdefault('id', uuidutils.generate_uuid())
+        if dependencies is None:
+            dependencies = [(kwargs['id'], self.id)
+                            for target, action, kwargs in specs]
+
+        child = base.Action.create_bulk(self.context, specs, dependencies,
+                                        nodes=nodes)
+        dispatcher.start_action()
+        return child
+
     def _create_nodes(self, count):
         """Utility method for node creation.
 
@@ -138,13 +174,17 @@ class ClusterAction(base.Action):
             return self.RES_OK, ''
 
         placement = self.data.get('placement', None)
+        name_format = self.entity.config.get("node.name.format", "")
+        profile = self.entity.rt.get('profile')
+        first = co.Cluster.reserve_indexes(self.context, self.entity.id, count)
 
         nodes = []
-        child = []
+        specs = []
         # conunt >= 1
         for m in range(count):
-            index = co.Cluster.get_next_index(self.context, self.entity.id)
+            index = first + m
             kwargs = {
+                'id': uuidutils.generate_uuid(),
                 'index': index,
                 'metadata': {},
                 'user': self.entity.user,
@@ -155,29 +195,20 @@ class ClusterAction(base.Action):
                 # We assume placement is a list
                 kwargs['data'] = {'placement': placement['placements'][m]}
 
-            name_format = self.entity.config.get("node.name.format", "")
             name = utils.format_node_name(name_format, self.entity, index)
             node = node_mod.Node(name, self.entity.profile_id,
-                                 self.entity.id, context=self.context,
-                                 **kwargs)
-
-            node.store(self.context)
+                                 self.entity.id, **kwargs)
+            # All nodes share the profile already loaded by the cluster
+            node.rt = {'profile': profile}
             nodes.append(node)
 
             kwargs = {
                 'name': 'node_create_%s' % node.id[:8],
                 'cause': consts.CAUSE_DERIVED,
             }
-            action_id = base.Action.create(self.context, node.id,
-                                           consts.NODE_CREATE, **kwargs)
-            child.append(action_id)
-
-        # Build dependency and make the new action ready
-        dobj.Dependency.create(self.context, [a for a in child], self.id)
-        for cid in child:
-            ao.Action.update(self.context, cid,
-                             {'status': base.Action.READY})
-        dispatcher.start_action()
+            specs.append((node.id, consts.NODE_CREATE, kwargs))
+
+        self._create_children(specs, nodes=nodes)
 
         # Wait for cluster creation to complete
         res, reason = self._wait_for_dependents()
@@ -235,7 +266,7 @@ class ClusterAction(base.Action):
             plan.append(set(nodes_list))
 
         for node_set in plan:
-            child = []
+            specs = []
             nodes = list(node_set)
 
             for node in nodes:
@@ -246,20 +277,10 @@ class ClusterAction(base.Action):
                         'new_profile_id': profile_id,
                     },
                 }
-                action_id = base.Action.create(self.context, node,
-                                               consts.NODE_UPDATE, **kwargs)
-                child.append(action_id)
-
-            if child:
-                dobj.Dependency.create(self.context, [c for c in child],
-                                       self.id)
-                for cid in child:
-                    ao.Action.update(self.context, cid,
-                                     {'status': base.Action.READY})
+                specs.append((node, consts.NODE_UPDATE, kwargs))
 
-                dispatcher.start_action()
-                # clear the action list
-                child = []
+            if specs:
+                self._create_children(specs)
                 result, new_reason = self._wait_for_dependents()
                 if result != self.RES_OK:
                     self.entity.eval_status(self.context,
@@ -415,26 +436,17 @@ class ClusterAction(base.Action):
         return self.RES_OK, ''
 
     def _remove_nodes_normally(self, action_name, node_ids, inputs=None):
-        child = []
+        specs = []
         for node_id in node_ids:
             kwargs = {
                 'name': 'node_delete_%s' % node_id[:8],
                 'cause': consts.CAUSE_DERIVED,
                 'inputs': inputs or {},
             }
+            specs.append((node_id, action_name, kwargs))
 
-            action_id = base.Action.create(self.context, node_id, action_name,
-                                           **kwargs)
-            child.append((action_id, node_id))
-
-        if child:
-            dobj.Dependency.create(self.context, [aid for aid, nid in child],
-                                   self.id)
-            for action_id, node_id in child:
-                ao.Action.update(self.context, action_id,
-                                 {'status': base.Action.READY})
-
-            dispatcher.start_action()
+        if specs:
+            self._create_children(specs)
             res, reason = self._wait_for_dependents()
             return res, reason
 
@@ -571,24 +583,20 @@ class ClusterAction(base.Action):
         if res:
             return self.RES_ERROR, res
 
-        child = []
-        for node in nodes:
+        first = co.Cluster.reserve_indexes(self.context, self.target,
+                                           len(nodes))
+        specs = []
+        for m, node in enumerate(nodes):
             nid = node.id
             kwargs = {
                 'name': 'node_join_%s' % nid[:8],
                 'cause': consts.CAUSE_DERIVED,
-                'inputs': {'cluster_id': self.target},
+                'inputs': {'cluster_id': self.target, 'index': first + m},
             }
-            action_id = base.Action.create(self.context, nid, consts.NODE_JOIN,
-                                           **kwargs)
-            child.append(action_id)
+            specs.append((nid, consts.NODE_JOIN, kwargs))
 
-        if child:
-            dobj.Dependency.create(self.context, [c for c in child], self.id)
-            for cid in child:
-                ao.Action.update(self.context, cid,
-                                 {'status': base.Action.READY})
-            dispatcher.start_action()
+        if specs:
+            self._create_children(specs)
 
         # Wait for dependent action if any
         result, new_reason = self._wait_for_dependents()
@@ -727,38 +735,31 @@ class ClusterAction(base.Action):
         result = self.RES_OK
         reason = 'Completed replacing nodes.'
 
-        children = []
-        for (original, replacement) in node_dict.items():
-            kwargs = {
+        first = co.Cluster.reserve_indexes(self.context, self.target,
+                                           len(node_dict))
+        specs = []
+        dependencies = []
+        for m, (original, replacement) in enumerate(node_dict.items()):
+            # node_leave action
+            leave_kwargs = {
+                'id': uuidutils.generate_uuid(),
+                'name': 'node_leave_%s' % original[:8],
                 'cause': consts.CAUSE_DERIVED,
             }
-
-            # node_leave action
-            kwargs['name'] = 'node_leave_%s' % original[:8]
-            leave_action_id = base.Action.create(self.context, original,
-                                                 consts.NODE_LEAVE, **kwargs)
             # node_join action
-            kwargs['name'] = 'node_join_%s' % replacement[:8]
-            kwargs['inputs'] = {'cluster_id': self.target}
-            join_action_id = base.Action.create(self.context, replacement,
-                                                consts.NODE_JOIN, **kwargs)
-
-            children.append((join_action_id, leave_action_id))
-
-        if children:
-            dobj.Dependency.create(self.context, [c[0] for c in children],
-                                   self.id)
-            for child in children:
-                join_id = child[0]
-                leave_id = child[1]
-                ao.Action.update(self.context, join_id,
-                                 {'status': base.Action.READY})
-
-                dobj.Dependency.create(self.context, [join_id], leave_id)
-                ao.Action.update(self.context, leave_id,
-                                 {'status': base.Action.READY})
+            join_kwargs = {
+                'id': uuidutils.generate_uuid(),
+                'name': 'node_join_%s' % replacement[:8],
+                'cause': consts.CAUSE_DERIVED,
+                'inputs': {'cluster_id': self.target, 'index': first + m},
+            }
+            specs.append((original, consts.NODE_LEAVE, leave_kwargs))
+            specs.append((replacement, consts.NODE_JOIN, join_kwargs))
+            dependencies.append((join_kwargs['id'], self.id))
+            dependencies.append((join_kwargs['id'], leave_kwargs['id']))
 
-                dispatcher.start_action()
+        if specs:
+            self._create_children(specs, dependencies=dependencies)
 
             result, new_reason = self._wait_for_dependents()
             if result != self.RES_OK:
@@ -779,7 +780,7 @@ class ClusterAction(base.Action):
         """
         self.entity.do_check(self.context)
 
-        child = []
+        specs = []
         res = self.RES_OK
         reason = 'Cluster checking completed.'
         for node in self.entity.nodes:
@@ -791,21 +792,15 @@ class ClusterAction(base.Action):
                     self.context, node_id, action=[consts.NODE_CHECK],
                     status=[consts.ACTION_SUCCEEDED, consts.ACTION_FAILED])
 
-            name = 'node_check_%s' % node_id[:8]
-            action_id = base.Action.create(
-                self.context, node_id, consts.NODE_CHECK, name=name,
-                cause=consts.CAUSE_DERIVED,
-                inputs=self.inputs
-            )
+            kwargs = {
+                'name': 'node_check_%s' % node_id[:8],
+                'cause': consts.CAUSE_DERIVED,
+                'inputs': self.inputs,
+            }
+            specs.append((node_id, consts.NODE_CHECK, kwargs))
 
-            child.append(action_id)
-
-        if child:
-            dobj.Dependency.create(self.context, [c for c in child], self.id)
-            for cid in child:
-                ao.Action.update(self.context, cid,
-                                 {'status': base.Action.READY})
-            dispatcher.start_action()
+        if specs:
+            self._create_children(specs)
 
             # Wait for dependent action if any
             res, new_reason = self._wait_for_dependents()
@@ -827,7 +822,9 @@ class ClusterAction(base.Action):
 
         if current > desired:
             count = current - desired
-            nodes = no.Node.get_all_by_cluster(self.context, cluster.id)
+            # Only the columns used for choosing the nodes are loaded
+            nodes = no.Node.columns_by_cluster(
+                self.context, cluster.id, ['id', 'status', 'created_at'])
             candidates = scaleutils.nodes_by_random(nodes, count)
             self._delete_nodes(candidates)
 
@@ -845,7 +842,7 @@ class ClusterAction(base.Action):
         inputs['operation'] = self.inputs.get('operation', None)
         inputs['operation_params'] = self.inputs.get('operation_params', None)
 
-        children = []
+        specs = []
         for node in self.entity.nodes:
             node_id = node.id
             if check:
@@ -854,22 +851,17 @@ class ClusterAction(base.Action):
 
             if node.status == consts.NS_ACTIVE:
                 continue
-            action_id = base.Action.create(
-                self.context, node_id, consts.NODE_RECOVER,
-                name='node_recover_%s' % node_id[:8],
-                cause=consts.CAUSE_DERIVED, inputs=inputs,
-            )
-            children.append(action_id)
+            kwargs = {
+                'name': 'node_recover_%s' % node_id[:8],
+                'cause': consts.CAUSE_DERIVED,
+                'inputs': inputs,
+            }
+            specs.append((node_id, consts.NODE_RECOVER, kwargs))
 
         res = self.RES_OK
         reason = 'Cluster recovery succeeded.'
-        if children:
-            dobj.Dependency.create(self.context, [c for c in children],
-                                   self.id)
-            for cid in children:
-                ao.Action.update(self.context, cid,
-                                 {'status': consts.ACTION_READY})
-            dispatcher.start_action()
+        if specs:
+            self._create_children(specs)
 
             # Wait for dependent action if any
             res, new_reason = self._wait_for_dependents()
@@ -1108,25 +1100,20 @@ class ClusterAction(base.Action):
         operation = inputs['operation']
         self.entity.do_operation(self.context, operation=operation)
 
-        child = []
+        specs = []
         res = self.RES_OK
         reason = "Cluster operation '%s' completed." % operation
         nodes = inputs.pop('nodes')
         for node_id in nodes:
-            action_id = base.Action.create(
-                self.context, node_id, consts.NODE_OPERATION,
-                name='node_%s_%s' % (operation, node_id[:8]),
-                cause=consts.CAUSE_DERIVED,
-                inputs=inputs,
-            )
-            child.append(action_id)
+            kwargs = {
+                'name': 'node_%s_%s' % (operation, node_id[:8]),
+                'cause': consts.CAUSE_DERIVED,
+                'inputs': inputs,
+            }
+            specs.append((node_id, consts.NODE_OPERATION, kwargs))
 
-        if child:
-            dobj.Dependency.create(self.context, [c for c in child], self.id)
-            for cid in child:
-                ao.Action.update(self.context, cid,
-                                 {'status': base.Action.READY})
-            dispatcher.start_action()
+        if specs:
+            self._create_children(specs)
 
             # Wait for dependent action if any
             res, new_reason = self._wait_for_dependents()
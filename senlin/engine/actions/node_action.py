@@ -12,6 +12,7 @@
 
 import eventlet
 
+from oslo_config import cfg
 from oslo_log import log as logging
 from osprofiler import profiler
 
@@ -24,6 +25,7 @@ from senlin.engine import node as node_mod
 from senlin.engine import senlin_lock
 from senlin.objects import action as ao
 from senlin.objects import node as no
+from senlin.objects import token_bucket as tbo
 from senlin.policies import base as pb
 
 LOG = logging.getLogger(__name__)
@@ -165,7 +167,9 @@ class NodeAction(base.Action):
         :returns: A tuple containing the result and the corresponding reason.
         """
         cluster_id = self.inputs.get('cluster_id')
-        result = self.entity.do_join(self.context, cluster_id)
+        # The index may have been reserved by the cluster action
+        index = self.inputs.get('index')
+        result = self.entity.do_join(self.context, cluster_id, index=index)
         if result:
             return self.RES_OK, 'Node successfully joined cluster.'
         else:
@@ -239,12 +243,62 @@ class NodeAction(base.Action):
 
         return method()
 
+    def _rate_limit_key(self):
+        """Get the key of the token bucket limiting this action.
+
+        Actions of the same type on nodes of the same profile type in the
+        same region share a bucket.
+        """
+        profile = self.entity.rt.get('profile')
+        placement = self.entity.data.get('placement') or {}
+        region = placement.get('region_name')
+        profile_type = ''
+        if profile is not None:
+            profile_type = profile.type
+            if region is None:
+                ctx = profile.properties.get(profile.CONTEXT) or {}
+                region = ctx.get('region_name')
+
+        return '%s:%s:%s' % (self.action, profile_type, region or '')
+
+    def _take_rate_limit_token(self):
+        """Take a token for the action from its token bucket.
+
+        Up to `max_actions_per_batch` actions sharing a token bucket can
+        start at once, after which they are started at a rate of that many
+        per `batch_interval` seconds, across all engines. The token is taken
+        once, a deferred or retried action does not take another one.
+
+        :returns: Seconds to wait before the action can start.
+        """
+        capacity = cfg.CONF.max_actions_per_batch
+        interval = cfg.CONF.batch_interval
+        if capacity == 0 or interval == 0 or self.data.get('rate_limited'):
+            return 0
+
+        key = self._rate_limit_key()
+        wait = tbo.TokenBucket.consume(self.context, key,
+                                       float(capacity) / interval, capacity,
+                                       base.wallclock())
+        self.data['rate_limited'] = True
+        if wait > 0:
+            LOG.debug('Action %(id)s is rate limited by %(key)s, deferred for '
+                      '%(wait).2f seconds.',
+                      {'id': self.id[:8], 'key': key, 'wait': wait})
+        return wait
+
     def execute(self, **kwargs):
         """Interface function for action execution.
 
         :param dict kwargs: Parameters provided to the action, if any.
         :returns: A tuple containing the result and the related reason.
         """
+        wait = self._take_rate_limit_token()
+        if wait > 0:
+            # Give the worker thread back instead of waiting in it
+            self.defer_delay = wait
+            return self.RES_DEFER, 'Rate limited'
+
         # Since node.cluster_id could be reset to '' during action execution,
         # we record it here for policy check and cluster lock release.
         forced = (self.action in [consts.NODE_DELETE, consts.NODE_OPERATION])
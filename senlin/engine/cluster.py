@@ -10,6 +10,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import copy
+
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import timeutils
@@ -17,6 +19,7 @@ import six
 
 from senlin.common import consts
 from senlin.common import exception
+from senlin.common import utils
 from senlin.engine import cluster_policy as cpm
 from senlin.engine import health_manager
 from senlin.engine import node as node_mod
@@ -30,6 +33,12 @@ LOG = logging.getLogger(__name__)
 
 CONF = cfg.CONF
 
+# Nodes and policies of the clusters loaded by this engine, keyed by cluster
+# IDs and versioned by the generation counters of the clusters. Each cluster
+# gets its own copies of the cached objects.
+_NODES = utils.ObjectCache('cluster_nodes')
+_POLICIES = utils.ObjectCache('cluster_policies')
+
 
 class Cluster(object):
     """A cluster is a collection of objects of the same profile type.
@@ -74,6 +83,8 @@ class Cluster(object):
         self.metadata = kwargs.get('metadata') or {}
         self.dependents = kwargs.get('dependents') or {}
         self.config = kwargs.get('config') or {}
+        self.node_generation = kwargs.get('node_generation')
+        self.policy_generation = kwargs.get('policy_generation')
 
         # rt is a dict for runtime data
         self.rt = {
@@ -86,24 +97,91 @@ class Cluster(object):
             self._load_runtime_data(context)
 
     def _load_runtime_data(self, context):
+        """Load the profile, the nodes and the policies of the cluster.
+
+        The nodes and the policies are cached by the engine and only loaded
+        again when the matching generation counter of the cluster changes.
+        When the node generation changes, only the changed nodes are loaded
+        again.
+        """
         if self.id is None:
             return
 
-        policies = []
-        bindings = cpo.ClusterPolicy.get_all(context, self.id)
-        for b in bindings:
-            # Detect policy type conflicts
-            policy = pcb.Policy.load(context, b.policy_id, project_safe=False)
-            policies.append(policy)
+        nodes = self._load_cached(context, _NODES, self.node_generation,
+                                  self._load_nodes,
+                                  lambda node: node.obj_clone())
+        policies = self._load_cached(context, _POLICIES,
+                                     self.policy_generation,
+                                     self._load_policies, copy.copy)
 
         self.rt = {
             'profile': pfb.Profile.load(context,
                                         profile_id=self.profile_id,
                                         project_safe=False),
-            'nodes': no.Node.get_all_by_cluster(context, self.id),
+            'nodes': nodes,
             'policies': policies
         }
 
+    def _load_cached(self, context, cache, generation, load_func,
+                     copy_func):
+        """Get some runtime data from a cache, or load and cache them.
+
+        :param cache: The cache of the runtime data.
+        :param generation: The generation of the data read with the cluster,
+                           or None if it is unknown.
+        :param load_func: A function loading a list of objects from database,
+                          given the outdated cached list, if any.
+        :param copy_func: A function copying a cached object, so that the
+                          copy can be changed by an action.
+        :returns: A new list of objects not shared with other clusters.
+        """
+        if generation is None:
+            return load_func(context, None)
+
+        outdated = cache.peek(self.id)
+        value = cache.get(self.id, generation)
+        if value is None:
+            value = load_func(context, outdated)
+            cache.put(self.id, generation, value)
+        return [copy_func(obj) for obj in value]
+
+    def _load_nodes(self, context, outdated):
+        """Load the nodes of the cluster.
+
+        :param outdated: An outdated list of the nodes. The nodes whose
+                         generations are not changed since are reused.
+        """
+        if not outdated:
+            return no.Node.get_all_by_cluster(context, self.id)
+
+        cached = dict((node.id, node) for node in outdated)
+        rows = no.Node.columns_by_cluster(context, self.id,
+                                          ['id', 'generation'])
+        changed = set(r.id for r in rows if r.id not in cached or
+                      cached[r.id].generation != r.generation)
+        loaded = {}
+        if changed:
+            nodes = no.Node.get_all_by_cluster(
+                context, self.id, filters={'id': list(changed)})
+            loaded = dict((node.id, node) for node in nodes)
+
+        nodes = []
+        for r in rows:
+            # A changed node may have been removed from the cluster since
+            node = loaded.get(r.id) if r.id in changed else cached[r.id]
+            if node is not None:
+                nodes.append(node)
+        return nodes
+
+    def _load_policies(self, context, outdated):
+        policies = []
+        bindings = cpo.ClusterPolicy.get_all(context, self.id)
+        for b in bindings:
+            # Detect policy type conflicts
+            policy = pcb.Policy.load(context, b.policy_id, project_safe=False)
+            policies.append(policy)
+        return policies
+
     def store(self, context):
         """Store the cluster in database and return its ID.
 
@@ -142,6 +220,9 @@ class Cluster(object):
             cluster = co.Cluster.create(context, values)
             self.id = cluster.id
 
+        # The generations read with the cluster may be outdated by now
+        self.node_generation = None
+        self.policy_generation = None
         self._load_runtime_data(context)
         return self.id
 
@@ -170,6 +251,8 @@ class Cluster(object):
             'metadata': obj.metadata,
             'dependents': obj.dependents,
             'config': obj.config,
+            'node_generation': obj.node_generation,
+            'policy_generation': obj.policy_generation,
         }
 
         return cls(obj.name, obj.desired_capacity, obj.profile_id,
@@ -179,8 +262,10 @@ class Cluster(object):
     def load(cls, context, cluster_id=None, dbcluster=None, project_safe=True):
         """Retrieve a cluster from database."""
         if dbcluster is None:
+            # Nodes are loaded along with other runtime data
             dbcluster = co.Cluster.get(context, cluster_id,
-                                       project_safe=project_safe)
+                                       project_safe=project_safe,
+                                       load_nodes=False)
             if dbcluster is None:
                 raise exception.ResourceNotFound(type='cluster', id=cluster_id)
 
@@ -539,13 +624,8 @@ class Cluster(object):
         :param operation: The operation that triggers this status evaluation.
         :returns: ``None``.
         """
-        nodes = node_mod.Node.load_all(ctx, cluster_id=self.id)
-        self.rt['nodes'] = [n for n in nodes]
-
-        active_count = 0
-        for node in self.nodes:
-            if node.status == consts.NS_ACTIVE:
-                active_count += 1
+        counts = no.Node.count_by_status(ctx, self.id)
+        active_count = counts.get(consts.NS_ACTIVE, 0)
 
         # get provided desired_capacity/min_size/max_size
         desired = params.get('desired_capacity', self.desired_capacity)
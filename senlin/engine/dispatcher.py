@@ -10,6 +10,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import time
+
+import eventlet
+from eventlet import event
 from oslo_config import cfg
 from oslo_context import context as oslo_context
 from oslo_log import log as logging
@@ -18,15 +22,27 @@ from oslo_service import service
 
 from senlin.common import consts
 from senlin.common import messaging
+from senlin.common import utils
 
 LOG = logging.getLogger(__name__)
 
 OPERATIONS = (
-    START_ACTION, CANCEL_ACTION, STOP
+    START_ACTION, CANCEL_ACTION, SUSPEND_ACTION, RESUME_ACTION, WAKE_ACTION,
+    INVALIDATE_CACHE, STOP
 ) = (
-    'start_action', 'cancel_action', 'stop'
+    'start_action', 'cancel_action', 'suspend_action', 'resume_action',
+    'wake_action', 'invalidate_cache', 'stop'
 )
 
+# Events of the actions on this engine that are waiting for their depended
+# actions to complete, keyed by action ID.
+_WAITERS = {}
+
+# Control signals of the actions running on this engine, keyed by action ID.
+# Each value is a tuple of the signal and the time it was last known to be
+# in sync with the database.
+_SIGNALS = {}
+
 
 class Dispatcher(service.Service):
     """RPC server for dispatching actions.
@@ -39,6 +55,10 @@ class Dispatcher(service.Service):
         self.engine_id = engine_service.engine_id
         self.topic = topic
         self.version = version
+        # Whether a pass scheduling ready actions is running, and whether
+        # another one was requested meanwhile.
+        self._scheduling = False
+        self._rescan = False
 
     def start(self):
         """Start the dispatcher.
@@ -53,25 +73,50 @@ class Dispatcher(service.Service):
 
         server = messaging.get_rpc_server(self.target, self)
         server.start()
+        _COALESCER.register_engine(self.engine_id, self.TG)
 
     def listening(self, ctxt):
         """Respond affirmatively to confirm that engine is still alive."""
         return True
 
     def start_action(self, ctxt, action_id=None):
-        self.TG.start_action(self.engine_id, action_id)
+        if action_id is not None:
+            self.TG.start_action(self.engine_id, action_id)
+            return
+
+        if self._scheduling:
+            # The running pass scans once more instead
+            self._rescan = True
+            return
+
+        self._scheduling = True
+        try:
+            self.TG.start_action(self.engine_id)
+            while self._rescan:
+                self._rescan = False
+                self.TG.start_action(self.engine_id)
+        finally:
+            self._scheduling = False
 
     def cancel_action(self, ctxt, action_id):
-        """Cancel an action."""
-        self.TG.cancel_action(action_id)
+        """Deliver a cancel signal to an action running on this engine."""
+        deliver_signal(action_id, consts.ACTION_SIG_CANCEL)
 
     def suspend_action(self, ctxt, action_id):
-        """Suspend an action."""
-        self.TG.suspend_action(action_id)
+        """Deliver a suspend signal to an action running on this engine."""
+        deliver_signal(action_id, consts.ACTION_SIG_SUSPEND)
 
     def resume_action(self, ctxt, action_id):
-        """Resume an action."""
-        self.TG.resume_action(action_id)
+        """Deliver a resume signal to an action running on this engine."""
+        deliver_signal(action_id, consts.ACTION_SIG_RESUME)
+
+    def wake_action(self, ctxt, action_id):
+        """Wake up an action waiting for its depended actions."""
+        wake_waiter(action_id)
+
+    def invalidate_cache(self, ctxt, name, obj_id):
+        """Drop an object changed by another engine from a local cache."""
+        utils.invalidate_cached_object(name, obj_id)
 
     def stop(self):
         super(Dispatcher, self).stop()
@@ -112,4 +157,214 @@ def notify(method, engine_id=None, **kwargs):
 
 
 def start_action(engine_id=None, **kwargs):
+    """Notify engines to schedule ready actions.
+
+    Requests not targeting a specific engine or action are coalesced.
+
+    :param engine_id: dispatcher to notify; None implies any of them
+    """
+    if engine_id is None and not kwargs:
+        return _COALESCER.start_action()
+
     return notify(START_ACTION, engine_id, **kwargs)
+
+
+def wake_action(engine_id, **kwargs):
+    return notify(WAKE_ACTION, engine_id, **kwargs)
+
+
+def invalidate_cache(name, obj_id):
+    """Notify all engines that a cached object has changed.
+
+    :param name: The name of the object cache, e.g. 'profile'.
+    :param obj_id: The ID of the object updated or deleted.
+    """
+    utils.invalidate_cached_object(name, obj_id)
+    return notify(INVALIDATE_CACHE, None, name=name, obj_id=obj_id)
+
+
+def signal_action(engine_id, signal, **kwargs):
+    """Notify the engine running an action of a signal sent to it.
+
+    :param engine_id: ID of the engine running the action.
+    :param signal: One of the signals defined in consts.ACTION_SIGNALS.
+    """
+    methods = {
+        consts.ACTION_SIG_CANCEL: CANCEL_ACTION,
+        consts.ACTION_SIG_SUSPEND: SUSPEND_ACTION,
+        consts.ACTION_SIG_RESUME: RESUME_ACTION,
+    }
+    return notify(methods[signal], engine_id, **kwargs)
+
+
+class NotificationCoalescer(object):
+    """Coalescer of the start_action notifications sent by this process.
+
+    Bursts of requests are debounced into a single notification per
+    coalesce interval. The notification is cast to the local engine if it
+    is lightly loaded, otherwise it is broadcast to all engines.
+    """
+
+    def __init__(self):
+        self.engine_id = None
+        self.TG = None
+        self.pending = False
+
+    def register_engine(self, engine_id, thread_group_mgr):
+        """Register the engine running in this process.
+
+        :param engine_id: ID of the local engine.
+        :param thread_group_mgr: Thread group manager of the local engine.
+        """
+        self.engine_id = engine_id
+        self.TG = thread_group_mgr
+
+    def start_action(self):
+        """Request engines to schedule ready actions.
+
+        :returns: True if the request is sent or coalesced, or False if
+                  sending it timed out.
+        """
+        interval = cfg.CONF.notification_coalesce_interval
+        if not interval:
+            return notify(START_ACTION, self._select_engine())
+
+        if not self.pending:
+            self.pending = True
+            eventlet.spawn_after(interval, self._flush,
+                                 oslo_context.get_current())
+        return True
+
+    def _flush(self, ctxt):
+        """Send the notification coalesced.
+
+        :param ctxt: Request context of the first request coalesced.
+        """
+        self.pending = False
+        if ctxt is not None:
+            ctxt.update_store()
+        try:
+            notify(START_ACTION, self._select_engine())
+        except Exception as ex:
+            LOG.error('Failed in notifying engines to start actions: %s', ex)
+
+    def _select_engine(self):
+        """Select the engine to notify.
+
+        :returns: ID of the local engine if it uses less than half of its
+                  thread pool, or None to broadcast.
+        """
+        if self.engine_id is None:
+            return None
+
+        busy = len(self.TG.group.threads)
+        if busy * 2 < cfg.CONF.scheduler_thread_pool_size:
+            return self.engine_id
+
+        return None
+
+
+_COALESCER = NotificationCoalescer()
+
+
+def register_waiter(action_id):
+    """Register an action as waiting for its depended actions.
+
+    :param action_id: ID of the waiting action.
+    """
+    _WAITERS[action_id] = event.Event()
+
+
+def unregister_waiter(action_id):
+    """Unregister an action waiting for its depended actions.
+
+    :param action_id: ID of the waiting action.
+    """
+    _WAITERS.pop(action_id, None)
+
+
+def wait_for_wakeup(action_id, timeout):
+    """Wait until the action is woken up or the timeout expires.
+
+    :param action_id: ID of the waiting action.
+    :param timeout: Maximum number of seconds to wait.
+    :returns: True if the action was woken up, or False if it timed out.
+    """
+    waiter = _WAITERS.get(action_id)
+    if waiter is None:
+        eventlet.sleep(timeout)
+        return False
+
+    with eventlet.Timeout(timeout, False):
+        waiter.wait()
+
+    woken = waiter.ready()
+    # Re-arm so that wake-ups arriving before next wait are not lost
+    _WAITERS[action_id] = event.Event()
+    return woken
+
+
+def wake_waiter(action_id):
+    """Wake up an action waiting on this engine.
+
+    :param action_id: ID of the waiting action.
+    :returns: True if the action is waiting on this engine, or False
+              otherwise.
+    """
+    waiter = _WAITERS.get(action_id)
+    if waiter is None:
+        return False
+
+    if not waiter.ready():
+        waiter.send(True)
+    return True
+
+
+def register_signal(action_id):
+    """Register an action as running on this engine.
+
+    The signal of the action is unknown until it is read from the database
+    or delivered to this engine.
+
+    :param action_id: ID of the running action.
+    """
+    _SIGNALS[action_id] = (None, 0)
+
+
+def unregister_signal(action_id):
+    """Unregister the control signal of an action running on this engine.
+
+    :param action_id: ID of the running action.
+    """
+    _SIGNALS.pop(action_id, None)
+
+
+def get_signal(action_id, max_age):
+    """Get the control signal of an action running on this engine.
+
+    :param action_id: ID of the running action.
+    :param max_age: Maximum number of seconds since the signal was last
+                    known to be in sync with the database.
+    :returns: A tuple of a boolean telling whether a usable signal is found
+              and the signal itself.
+    """
+    entry = _SIGNALS.get(action_id)
+    if entry is None or time.time() - entry[1] > max_age:
+        return False, None
+
+    return True, entry[0]
+
+
+def deliver_signal(action_id, signal):
+    """Deliver a control signal to an action running on this engine.
+
+    :param action_id: ID of the running action.
+    :param signal: One of the signals defined in consts.ACTION_SIGNALS.
+    :returns: True if the action is running on this engine, or False
+              otherwise.
+    """
+    if action_id not in _SIGNALS:
+        return False
+
+    _SIGNALS[action_id] = (signal, time.time())
+    return True
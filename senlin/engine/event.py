@@ -39,6 +39,18 @@ def load_dispatcher():
         LOG.info("Loaded dispatchers: %s", dispatchers.names())
 
 
+def flush():
+    """Make dispatchers send the events they buffered."""
+    if dispatchers is None:
+        return
+
+    try:
+        dispatchers.map_method("flush")
+    except Exception as ex:
+        LOG.exception("Dispatcher failed to flush events: %s",
+                      six.text_type(ex))
+
+
 def _event_data(action, phase=None, reason=None):
     action_name = action.action
     if action_name in [consts.NODE_OPERATION, consts.CLUSTER_OPERATION]:
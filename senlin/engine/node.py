@@ -93,7 +93,23 @@ class Node(object):
         @param context: Request context for node creation.
         @return: UUID of node created.
         """
-        values = {
+        values = self._to_values()
+
+        if self.id:
+            no.Node.update(context, self.id, values)
+        else:
+            init_at = timeutils.utcnow(True)
+            self.init_at = init_at
+            values['init_at'] = init_at
+            node = no.Node.create(context, values)
+            self.id = node.id
+
+        self._load_runtime_data(context)
+        return self.id
+
+    def _to_values(self):
+        """Get the values of the node record in database table."""
+        return {
             'name': self.name,
             'physical_id': self.physical_id,
             'cluster_id': self.cluster_id,
@@ -113,18 +129,6 @@ class Node(object):
             'dependents': self.dependents,
         }
 
-        if self.id:
-            no.Node.update(context, self.id, values)
-        else:
-            init_at = timeutils.utcnow(True)
-            self.init_at = init_at
-            values['init_at'] = init_at
-            node = no.Node.create(context, values)
-            self.id = node.id
-
-        self._load_runtime_data(context)
-        return self.id
-
     @classmethod
     def _from_object(cls, context, obj):
         """Construct a node from node object.
@@ -278,7 +282,7 @@ class Node(object):
 
         return True
 
-    def do_join(self, context, cluster_id):
+    def do_join(self, context, cluster_id, index=None):
         if self.cluster_id == cluster_id:
             return True
 
@@ -291,7 +295,8 @@ class Node(object):
         if not res:
             return False
         timestamp = timeutils.utcnow(True)
-        db_node = no.Node.migrate(context, self.id, cluster_id, timestamp)
+        db_node = no.Node.migrate(context, self.id, cluster_id, timestamp,
+                                  index=index)
         self.cluster_id = cluster_id
         self.updated_at = timestamp
         self.index = db_node.index
@@ -20,6 +20,7 @@ from oslo_service import threadgroup
 from osprofiler import profiler
 
 from senlin.common import context
+from senlin.common import scheduleutils
 from senlin.engine.actions import base as action_mod
 from senlin.objects import action as ao
 
@@ -44,6 +45,10 @@ class ThreadGroupManager(object):
         # for DB accessing in scheduler module
         self.db_session = context.RequestContext(is_admin=True)
 
+        # Number of ready actions in each scheduling class, as of the last
+        # scheduling round.
+        self.queue_depth = scheduleutils.queue_depth([])
+
     def _service_task(self):
         """Dummy task which gets queued on the service.Service threadgroup.
 
@@ -91,48 +96,86 @@ class ThreadGroupManager(object):
         :param action_id: ID of the action to be executed. None means all
                           ready actions will be acquired and scheduled to run.
         """
-        actions_launched = 0
-        max_batch_size = cfg.CONF.max_actions_per_batch
-        batch_interval = cfg.CONF.batch_interval
-
         if action_id is not None:
             timestamp = wallclock()
             action = ao.Action.acquire(self.db_session, action_id, worker_id,
                                        timestamp)
             if action:
                 self.start(action_mod.ActionProc, self.db_session, action.id)
-                actions_launched += 1
 
+        # NOTE: node actions are rate limited per backend when they are
+        # executed, so claiming never pauses here.
         while True:
-            timestamp = wallclock()
-            action = ao.Action.acquire_first_ready(self.db_session, worker_id,
-                                                   timestamp)
-            if not action:
+            actions = self._acquire_ready_actions(worker_id)
+            if not actions:
                 break
 
-            if max_batch_size == 0 or 'NODE' not in action.action:
-                self.start(action_mod.ActionProc, self.db_session, action.id)
-                continue
-
-            if max_batch_size > actions_launched:
+            for action in actions:
                 self.start(action_mod.ActionProc, self.db_session, action.id)
-                actions_launched += 1
-                continue
 
-            self.start(action_mod.ActionProc, self.db_session, action.id)
+    def _acquire_ready_actions(self, worker_id):
+        """Acquire ready actions for the worker.
 
-            LOG.debug(
-                'Engine %(id)s has launched %(num)s node actions '
-                'consecutively, stop scheduling node action for '
-                '%(interval)s second...',
-                {
-                    'id': worker_id,
-                    'num': max_batch_size,
-                    'interval': batch_interval
-                })
-
-            sleep(batch_interval)
-            actions_launched = 1
+        :param worker_id: ID of the worker thread.
+        :returns: A list of acquired actions, empty if none is ready.
+        """
+        timestamp = wallclock()
+        claim_size = cfg.CONF.max_actions_per_claim
+        if cfg.CONF.scheduling_window:
+            return self._acquire_by_priority(worker_id, timestamp,
+                                             claim_size)
+
+        if claim_size > 1:
+            return ao.Action.acquire_ready_batch(self.db_session, worker_id,
+                                                 timestamp, claim_size)
+
+        action = ao.Action.acquire_first_ready(self.db_session, worker_id,
+                                               timestamp)
+        return [action] if action else []
+
+    def _acquire_by_priority(self, worker_id, timestamp, claim_size):
+        """Acquire ready actions by priority class and project fair share.
+
+        :param worker_id: ID of the worker thread.
+        :param timestamp: Time the actions are acquired.
+        :param claim_size: Maximum number of actions to acquire.
+        :returns: A list of acquired actions, empty if none is ready.
+        """
+        self.queue_depth = ao.Action.count_ready_by_class(
+            self.db_session, timestamp=timestamp)
+        if not any(self.queue_depth.values()):
+            return []
+
+        LOG.debug('Engine %(id)s found ready actions %(depth)s',
+                  {'id': worker_id, 'depth': self.queue_depth})
+
+        # The window is filled class by class, so that the older actions of
+        # a lower class never keep the actions of a higher class out of it
+        window = cfg.CONF.scheduling_window
+        ready = []
+        for cls in scheduleutils.ACTION_CLASSES:
+            if len(ready) >= window:
+                break
+            if self.queue_depth[cls]:
+                ready.extend(ao.Action.get_all_ready(
+                    self.db_session, timestamp=timestamp,
+                    limit=window - len(ready), action_class=cls))
+
+        # Try the next candidates if others claimed the first ones
+        candidates = [a.id for a in scheduleutils.fair_order(ready)]
+        for start in range(0, len(candidates), claim_size):
+            action_ids = candidates[start:start + claim_size]
+            if claim_size > 1:
+                actions = ao.Action.acquire_batch(self.db_session, action_ids,
+                                                  worker_id, timestamp)
+            else:
+                action = ao.Action.acquire(self.db_session, action_ids[0],
+                                           worker_id, timestamp)
+                actions = [action] if action else []
+            if actions:
+                return actions
+
+        return []
 
     def cancel_action(self, action_id):
         """Cancel an action execution progress."""
@@ -156,9 +199,12 @@ class ThreadGroupManager(object):
         """Define a periodic task to be run in the thread group.
 
         The task will be executed in a separate green thread.
-        Interval is from cfg.CONF.periodic_interval
+        Interval is from cfg.CONF.periodic_interval. The first run of the task
+        can be delayed by an `initial_delay` keyword argument in seconds.
         """
-        timer = self.group.add_timer(interval, func, None, *args, **kwargs)
+        initial_delay = kwargs.pop('initial_delay', None)
+        timer = self.group.add_timer(interval, func, initial_delay, *args,
+                                     **kwargs)
         return timer
 
     def stop_timers(self):
@@ -10,8 +10,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import eventlet
-import random
+import collections
 import time
 
 from oslo_config import cfg
@@ -20,15 +19,17 @@ from oslo_log import log as logging
 
 from senlin.common.i18n import _
 from senlin.common import utils
+from senlin.engine import dispatcher
 from senlin import objects
 from senlin.objects import action as ao
 from senlin.objects import cluster_lock as cl_obj
+from senlin.objects import lock_waiter as lw_obj
 from senlin.objects import node_lock as nl_obj
 
 CONF = cfg.CONF
 
-CONF.import_opt('lock_retry_times', 'senlin.common.config')
-CONF.import_opt('lock_retry_interval', 'senlin.common.config')
+CONF.import_opt('lock_wait_timeout', 'senlin.common.config')
+CONF.import_opt('lock_wait_check_interval', 'senlin.common.config')
 
 LOG = logging.getLogger(__name__)
 
@@ -38,11 +39,104 @@ LOCK_SCOPES = (
     -1, 1,
 )
 
+# Counters of the lock waits and steals on this engine.
+_STATS = collections.Counter()
+
+
+def get_stats():
+    """Get the counters of the lock waits and steals on this engine.
+
+    :returns: A dict with the number of waits, the number of waits timed out,
+              the total number of seconds waited and the number of locks
+              stolen.
+    """
+    return {
+        'waits': _STATS['waits'],
+        'timeouts': _STATS['timeouts'],
+        'wait_time': _STATS['wait_time'],
+        'steals': _STATS['steals'],
+    }
+
+
+def _wake_next(resource_id):
+    """Wake up the first action in line for the lock on a resource.
+
+    :param resource_id: ID of the cluster or node.
+    """
+    waiter = lw_obj.LockWaiter.get_first(resource_id)
+    if waiter is None or dispatcher.wake_waiter(waiter.action_id):
+        return
+
+    if waiter.engine_id:
+        dispatcher.wake_action(waiter.engine_id, action_id=waiter.action_id)
+
+
+def _wait_in_line(resource_id, action_id, engine, acquire):
+    """Wait in line for the lock on a resource.
+
+    The action is woken up as soon as the lock is released and it is first
+    in line, the periodic attempt is only a safety net.
+
+    :param resource_id: ID of the cluster or node to be locked.
+    :param action_id: ID of the waiting action.
+    :param engine: ID of the engine running the waiting action.
+    :param acquire: A function trying to acquire the lock, which returns
+                    True on success.
+    :returns: True if the lock is acquired, or False if the wait timed out.
+    """
+    timeout = CONF.lock_wait_timeout
+    if not engine or not timeout:
+        return False
+
+    start = time.time()
+    deadline = start + timeout
+    dispatcher.register_waiter(action_id)
+    lw_obj.LockWaiter.add(resource_id, action_id, engine, start)
+    acquired = False
+    try:
+        acquired = acquire()
+        while not acquired:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            dispatcher.wait_for_wakeup(
+                action_id, min(remaining, CONF.lock_wait_check_interval))
+            acquired = acquire()
+    finally:
+        dispatcher.unregister_waiter(action_id)
+        lw_obj.LockWaiter.remove(resource_id, action_id)
+        # The next waiter may share the lock or have become first in line
+        _wake_next(resource_id)
+
+    _STATS['waits'] += 1
+    _STATS['wait_time'] += time.time() - start
+    if not acquired:
+        _STATS['timeouts'] += 1
+    return acquired
+
+
+def _try_cluster_lock(cluster_id, action_id, scope):
+    """Try to lock a cluster.
+
+    :returns: A list of IDs of the actions owning the lock.
+    """
+    for retries in range(2):
+        try:
+            return cl_obj.ClusterLock.acquire(cluster_id, action_id, scope)
+        except exception.DBDuplicateEntry:
+            LOG.info('Duplicate entry in cluster_lock table for %(c)s.  '
+                     'Retrying cluster lock.',
+                     {'c': cluster_id})
+    return []
+
 
 def cluster_lock_acquire(context, cluster_id, action_id, engine=None,
                          scope=CLUSTER_SCOPE, forced=False):
     """Try to lock the specified cluster.
 
+    An action failing to grab the lock waits in line for it, and is granted
+    the lock in turn when it is released.
+
     :param context: the context used for DB operations.
     :param cluster_id: ID of the cluster to be locked.
     :param action_id: ID of the action which wants to lock the cluster.
@@ -56,35 +150,37 @@ def cluster_lock_acquire(context, cluster_id, action_id, engine=None,
 
     # Step 1: try lock the cluster - if the returned owner_id is the
     #         action id, it was a success
-    for retries in range(3):
-        try:
-            owners = cl_obj.ClusterLock.acquire(cluster_id, action_id, scope)
-            if action_id in owners:
-                return True
-        except exception.DBDuplicateEntry:
-            LOG.info('Duplicate entry in cluster_lock table for %(c)s.  '
-                     'Retrying cluster lock.',
-                     {'c': cluster_id})
-        eventlet.sleep(random.randrange(1, 3))
+    owners = _try_cluster_lock(cluster_id, action_id, scope)
+    if action_id in owners:
+        return True
 
     # Step 2: Last resort is 'forced locking', only needed when retry failed
     if forced:
+        _STATS['steals'] += 1
         owners = cl_obj.ClusterLock.steal(cluster_id, action_id)
         return action_id in owners
 
     # Step 3: check if the owner is a dead engine, if so, steal the lock.
-    # Will reach here only because scope == CLUSTER_SCOPE
-    action = ao.Action.get(context, owners[0])
-    if (action and action.owner and action.owner != engine and
-            utils.is_engine_dead(context, action.owner)):
-        LOG.info('The cluster %(c)s is locked by dead action %(a)s, '
-                 'try to steal the lock.',
-                 {'c': cluster_id, 'a': owners[0]})
-        dead_engine = action.owner
-        owners = cl_obj.ClusterLock.steal(cluster_id, action_id)
-        # Cleanse locks affected by the dead engine
-        objects.Service.gc_by_engine(dead_engine)
-        return action_id in owners
+    if owners:
+        action = ao.Action.get(context, owners[0])
+        if (action and action.owner and action.owner != engine and
+                utils.is_engine_dead(context, action.owner)):
+            LOG.info('The cluster %(c)s is locked by dead action %(a)s, '
+                     'try to steal the lock.',
+                     {'c': cluster_id, 'a': owners[0]})
+            _STATS['steals'] += 1
+            dead_engine = action.owner
+            owners = cl_obj.ClusterLock.steal(cluster_id, action_id)
+            # Cleanse locks affected by the dead engine
+            objects.Service.gc_by_engine(dead_engine)
+            return action_id in owners
+
+    # Step 4: wait in line until the lock is released
+    def _acquire():
+        return action_id in _try_cluster_lock(cluster_id, action_id, scope)
+
+    if _wait_in_line(cluster_id, action_id, engine, _acquire):
+        return True
 
     lock_owners = []
     for o in owners:
@@ -99,17 +195,25 @@ def cluster_lock_acquire(context, cluster_id, action_id, engine=None,
 def cluster_lock_release(cluster_id, action_id, scope):
     """Release the lock on the specified cluster.
 
+    The first action in line for the lock, if any, is woken up.
+
     :param cluster_id: ID of the cluster to be released.
     :param action_id: ID of the action that attempts to release the cluster.
     :param scope: The scope of the lock to be released.
     """
-    return cl_obj.ClusterLock.release(cluster_id, action_id, scope)
+    res = cl_obj.ClusterLock.release(cluster_id, action_id, scope)
+    if res:
+        _wake_next(cluster_id)
+    return res
 
 
 def node_lock_acquire(context, node_id, action_id, engine=None,
                       forced=False):
     """Try to lock the specified node.
 
+    An action failing to grab the lock waits in line for it, and is granted
+    the lock in turn when it is released.
+
     :param context: the context used for DB operations.
     :param node_id: ID of the node to be locked.
     :param action_id: ID of the action that attempts to lock the node.
@@ -126,20 +230,30 @@ def node_lock_acquire(context, node_id, action_id, engine=None,
 
     # Step 2: Last resort is 'forced locking', only needed when retry failed
     if forced:
+        _STATS['steals'] += 1
         owner = nl_obj.NodeLock.steal(node_id, action_id)
         return action_id == owner
 
     # Step 3: Try to steal a lock if it's owner is a dead engine.
     # if this node lock by dead engine
-    action = ao.Action.get(context, owner)
-    if (action and action.owner and action.owner != engine and
-            utils.is_engine_dead(context, action.owner)):
-        LOG.info('The node %(n)s is locked by dead action %(a)s, '
-                 'try to steal the lock.',
-                 {'n': node_id, 'a': owner})
-        reason = _('Engine died when executing this action.')
-        nl_obj.NodeLock.steal(node_id, action_id)
-        ao.Action.mark_failed(context, action.id, time.time(), reason)
+    if owner:
+        action = ao.Action.get(context, owner)
+        if (action and action.owner and action.owner != engine and
+                utils.is_engine_dead(context, action.owner)):
+            LOG.info('The node %(n)s is locked by dead action %(a)s, '
+                     'try to steal the lock.',
+                     {'n': node_id, 'a': owner})
+            _STATS['steals'] += 1
+            reason = _('Engine died when executing this action.')
+            nl_obj.NodeLock.steal(node_id, action_id)
+            ao.Action.mark_failed(context, action.id, time.time(), reason)
+            return True
+
+    # Step 4: wait in line until the lock is released
+    def _acquire():
+        return action_id == nl_obj.NodeLock.acquire(node_id, action_id)
+
+    if _wait_in_line(node_id, action_id, engine, _acquire):
         return True
 
     LOG.warning('Node is already locked by action %(old)s, '
@@ -152,7 +266,12 @@ def node_lock_acquire(context, node_id, action_id, engine=None,
 def node_lock_release(node_id, action_id):
     """Release the lock on the specified node.
 
+    The first action in line for the lock, if any, is woken up.
+
     :param node_id: ID of the node to be released.
     :param action_id: ID of the action that attempts to release the node.
     """
-    return nl_obj.NodeLock.release(node_id, action_id)
+    res = nl_obj.NodeLock.release(node_id, action_id)
+    if res:
+        _wake_next(node_id)
+    return res
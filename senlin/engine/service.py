@@ -12,10 +12,12 @@
 
 import copy
 import functools
+import random
 
 from oslo_config import cfg
 from oslo_log import log as logging
 import oslo_messaging
+from oslo_serialization import jsonutils
 from oslo_service import service
 from oslo_utils import timeutils
 from oslo_utils import uuidutils
@@ -101,6 +103,8 @@ class EngineService(service.Service):
         self._rpc_server = None
         self.cleanup_timer = None
         self.cleanup_count = 0
+        # Approximate total counts of listed objects, keyed by the query
+        self._counts = {}
 
         # Initialize the global environment
         environment.initialize()
@@ -146,6 +150,16 @@ class EngineService(service.Service):
                                                self.service_manage_cleanup)
 
         self.TG.add_timer(CONF.periodic_interval, self.service_manage_report)
+
+        if CONF.event_retention_interval:
+            # Engines start at random offsets so that they do not purge the
+            # same events at the same time
+            interval = CONF.event_retention_interval
+            self.TG.add_timer(interval, self.event_retention,
+                              initial_delay=random.uniform(0, interval))
+        if CONF.node_count_reconcile_interval:
+            self.TG.add_timer(CONF.node_count_reconcile_interval,
+                              self.node_count_reconcile)
         super(EngineService, self).start()
 
     def _stop_rpc_server(self):
@@ -172,6 +186,9 @@ class EngineService(service.Service):
 
         self.TG.stop()
 
+        # Write the events buffered by the stopped actions
+        EVENT.flush()
+
         service_obj.Service.delete(self.engine_id)
         LOG.info('Engine %s is deleted', self.engine_id)
 
@@ -183,6 +200,7 @@ class EngineService(service.Service):
             service_obj.Service.update(ctx, self.engine_id)
         except Exception as ex:
             LOG.error('Error while updating engine service: %s', ex)
+        LOG.debug('Object cache statistics: %s', utils.object_cache_stats())
 
     def _service_manage_cleanup(self):
         try:
@@ -209,6 +227,40 @@ class EngineService(service.Service):
             self.cleanup_timer.stop()
             LOG.info("Finished cleaning up dead services.")
 
+    def event_retention(self):
+        """Purge the events beyond the retention limits.
+
+        Events are deleted in chunks of short transactions, so that the
+        events of running actions can still be recorded meanwhile.
+        """
+        try:
+            age = CONF.event_retention_age
+            if age:
+                count = event_obj.Event.purge(None, 'days', age)
+                if count:
+                    LOG.info('Purged %s events older than %s days.',
+                             count, age)
+
+            max_events = CONF.max_events_per_cluster
+            if max_events:
+                count = event_obj.Event.purge_excess(max_events)
+                if count:
+                    LOG.info('Purged %s events of clusters having more than '
+                             '%s events.', count, max_events)
+        except Exception as ex:
+            LOG.error('Error while purging events: %s', ex)
+
+    def node_count_reconcile(self):
+        """Repair the node status counters of clusters if they drifted."""
+        try:
+            ctx = senlin_context.get_admin_context()
+            repaired = node_obj.Node.count_reconcile(ctx)
+            if repaired:
+                LOG.warning('Repaired the node counters of clusters: %s',
+                            ', '.join(repaired))
+        except Exception as ex:
+            LOG.error('Error while reconciling node counters: %s', ex)
+
     @request_context
     def credential_create(self, ctx, req):
         """Create the credential based on the context.
@@ -334,7 +386,7 @@ class EngineService(service.Service):
         if filters:
             query['filters'] = filters
 
-        profiles = profile_obj.Profile.get_all(ctx, **query)
+        profiles = profile_obj.Profile.get_all(ctx, replica=True, **query)
         return [p.to_dict() for p in profiles]
 
     def _validate_profile(self, ctx, spec, name=None,
@@ -539,7 +591,8 @@ class EngineService(service.Service):
         if filters:
             query['filters'] = filters
 
-        return [p.to_dict() for p in policy_obj.Policy.get_all(ctx, **query)]
+        policies = policy_obj.Policy.get_all(ctx, replica=True, **query)
+        return [p.to_dict() for p in policies]
 
     def _validate_policy(self, ctx, spec, name=None, validate_props=False):
         """Validate a policy.
@@ -672,13 +725,78 @@ class EngineService(service.Service):
 
         return policy.to_dict()
 
+    def _cached_count(self, key, count_func):
+        """Count objects, reusing a count made recently for the same query.
+
+        :param key: A hashable key identifying the query.
+        :param count_func: A function counting the objects.
+        :return: The number of the objects, which may be up to
+                 `list_count_cache_ttl` seconds old.
+        """
+        now = timeutils.utcnow_ts(microsecond=True)
+        cached = self._counts.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        count = count_func()
+        if CONF.list_count_cache_ttl > 0:
+            # drop the expired counts so that the cache does not grow
+            self._counts = dict((k, v) for k, v in self._counts.items()
+                                if v[0] > now)
+            self._counts[key] = (now + CONF.list_count_cache_ttl, count)
+        return count
+
+    def _list_result(self, ctx, req, name, items, marker, count_func,
+                     query):
+        """Build the result of a list request.
+
+        Requests of version 1.0 get the list of object representations only.
+        Later versions get a dictionary with the list, the marker of the next
+        page and, if asked for, the approximate total count of the objects.
+
+        :param name: The key of the list in the result.
+        :param items: A list of object representations.
+        :param marker: The marker of the next page, or None.
+        :param count_func: A function counting the objects, given the query
+                           without its pagination parameters.
+        :param query: A dictionary of the parameters of the list query.
+        """
+        if not req.obj_attr_is_set(consts.PARAM_WITH_COUNT):
+            return items
+
+        result = {name: items, 'next_marker': marker}
+        if req.with_count:
+            query = dict((k, v) for k, v in query.items()
+                         if k not in ('limit', 'marker', 'sort'))
+            key = (name, ctx.project_id, jsonutils.dumps(query,
+                                                         sort_keys=True))
+            result['total_count'] = self._cached_count(
+                key, functools.partial(count_func, ctx, replica=True,
+                                       **query))
+        return result
+
+    def _empty_list_result(self, req, name):
+        """Build the result of a list request matching no objects.
+
+        :param name: The key of the list in the result.
+        """
+        if not req.obj_attr_is_set(consts.PARAM_WITH_COUNT):
+            return []
+
+        result = {name: [], 'next_marker': None}
+        if req.with_count:
+            result['total_count'] = 0
+        return result
+
     @request_context
     def cluster_list(self, ctx, req):
         """List clusters matching the specified criteria.
 
         :param ctx: An instance of request context.
         :param req: An instance of the ClusterListRequest.
-        :return: A list of `Cluster` object representations.
+        :return: A list of `Cluster` object representations, or a dictionary
+                 with the list and the paging details for version 1.1 or
+                 later of the request.
         """
         req.obj_set_defaults()
         if not req.project_safe and not ctx.is_admin:
@@ -699,7 +817,10 @@ class EngineService(service.Service):
         if filters:
             query['filters'] = filters
 
-        return [c.to_dict() for c in co.Cluster.get_all(ctx, **query)]
+        clusters, marker = co.Cluster.get_page(ctx, replica=True, **query)
+        return self._list_result(ctx, req, 'clusters',
+                                 [c.to_dict() for c in clusters], marker,
+                                 co.Cluster.count_all, query)
 
     @request_context
     def cluster_get(self, context, req):
@@ -1588,7 +1709,9 @@ class EngineService(service.Service):
 
         :param ctx: An instance of the request context.
         :param req: An instance of the NodeListRequest object.
-        :return: A list of `Node` object representations.
+        :return: A list of `Node` object representations, or a dictionary
+                 with the list and the paging details for version 1.1 or
+                 later of the request.
         """
         req.obj_set_defaults()
         if not req.project_safe and not ctx.is_admin:
@@ -1617,8 +1740,10 @@ class EngineService(service.Service):
         if filters:
             query['filters'] = filters
 
-        nodes = node_obj.Node.get_all(ctx, **query)
-        return [node.to_dict() for node in nodes]
+        nodes, marker = node_obj.Node.get_page(ctx, replica=True, **query)
+        return self._list_result(ctx, req, 'nodes',
+                                 [node.to_dict() for node in nodes], marker,
+                                 node_obj.Node.count_all, query)
 
     @request_context
     def node_create(self, ctx, req):
@@ -2236,7 +2361,9 @@ class EngineService(service.Service):
 
         :param ctx: An instance of the request context.
         :param req: An instance of the ActionListRequest object.
-        :return: A list of `Action` object representations.
+        :return: A list of `Action` object representations, or a dictionary
+                 with the list and the paging details for version 1.1 or
+                 later of the request.
         """
 
         req.obj_set_defaults()
@@ -2263,9 +2390,11 @@ class EngineService(service.Service):
         if filters:
             query['filters'] = filters
 
-        actions = action_obj.Action.get_all(ctx, **query)
-
-        return [a.to_dict() for a in actions]
+        actions, marker = action_obj.Action.get_page(ctx, replica=True,
+                                                     **query)
+        return self._list_result(ctx, req, 'actions',
+                                 [a.to_dict() for a in actions], marker,
+                                 action_obj.Action.count_all, query)
 
     @request_context
     def action_create(self, ctx, req):
@@ -2392,7 +2521,8 @@ class EngineService(service.Service):
         if filters:
             query['filters'] = filters
 
-        receivers = receiver_obj.Receiver.get_all(ctx, **query)
+        receivers = receiver_obj.Receiver.get_all(ctx, replica=True,
+                                                  **query)
         return [r.to_dict() for r in receivers]
 
     @request_context
@@ -2599,7 +2729,9 @@ class EngineService(service.Service):
 
         :param ctx: An instance of the request context.
         :param req: An instance of the EventListRequest object.
-        :return: A list of `Event` object representations.
+        :return: A list of `Event` object representations, or a dictionary
+                 with the list and the paging details for version 1.1 or
+                 later of the request.
         """
 
         req.obj_set_defaults()
@@ -2632,7 +2764,7 @@ class EngineService(service.Service):
                     cluster = co.Cluster.find(ctx, cid)
                     cluster_ids.append(cluster.id)
                 except exception.ResourceNotFound:
-                    return []
+                    return self._empty_list_result(req, 'events')
             if len(cluster_ids) > 0:
                 filters['cluster_id'] = cluster_ids
         if filters:
@@ -2644,7 +2776,8 @@ class EngineService(service.Service):
             if value is not None:
                 filters[consts.EVENT_LEVEL] = value
 
-        all_events = event_obj.Event.get_all(ctx, **query)
+        all_events, marker = event_obj.Event.get_page(ctx, replica=True,
+                                                      **query)
 
         results = []
         for event in all_events:
@@ -2653,7 +2786,8 @@ class EngineService(service.Service):
             evt['level'] = level
             results.append(evt)
 
-        return results
+        return self._list_result(ctx, req, 'events', results, marker,
+                                 event_obj.Event.count_all, query)
 
     @request_context
     def event_get(self, ctx, req):
@@ -2666,7 +2800,7 @@ class EngineService(service.Service):
                  event could be found.
         """
 
-        db_event = event_obj.Event.find(ctx, req.identity)
+        db_event = event_obj.Event.find(ctx, req.identity, replica=True)
         evt = db_event.as_dict()
         level = utils.level_from_number(evt['level'])
         evt['level'] = level
@@ -47,3 +47,11 @@ class EventBackend(object):
         :returns: None
         """
         raise NotImplementedError
+
+    @classmethod
+    def flush(cls):
+        """Send the events buffered, if any.
+
+        A method for sub-classes buffering events to override.
+        """
+        pass
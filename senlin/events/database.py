@@ -10,12 +10,109 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
+
+import eventlet
+from eventlet import semaphore
+from oslo_config import cfg
+from oslo_log import log as logging
 from oslo_utils import timeutils
 
 from senlin.common import consts
 from senlin.events import base
 from senlin.objects import event as eo
 
+LOG = logging.getLogger(__name__)
+
+
+class EventWriter(object):
+    """Buffered writer of event records.
+
+    Event records are queued by the threads dumping them and written in
+    batches, with one multi-row insert for each batch. A batch is written
+    once it is full, or when the oldest queued record has waited for the
+    flush interval. Batches are written one at a time in queue order, so the
+    records of an action keep their order. When the queue is full, new
+    records are dropped and counted.
+    """
+
+    def __init__(self):
+        self.queue = collections.deque()
+        self.written = 0
+        self.dropped = 0
+        self._timer = None
+        self._lock = semaphore.Semaphore()
+
+    def write(self, context, values):
+        """Queue an event record to be written.
+
+        :param context: The request context of the action dumping the event.
+        :param values: A dict containing the values of the event record.
+        :returns: True if the record is written or queued, or False if it is
+                  dropped.
+        """
+        conf = cfg.CONF.dispatchers
+        if not conf.flush_interval:
+            eo.Event.create(context, values)
+            self.written += 1
+            return True
+
+        if len(self.queue) >= conf.max_queue_size:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                LOG.warning('Event queue is full, %s events dropped so far.',
+                            self.dropped)
+            return False
+
+        self.queue.append((context, values))
+        if len(self.queue) >= conf.batch_size:
+            self._schedule(0)
+        else:
+            self._schedule(conf.flush_interval)
+        return True
+
+    def _schedule(self, delay):
+        """Schedule a flush, unless one is scheduled already.
+
+        :param delay: Seconds before flushing. A flush scheduled later is
+                      brought forward if `delay` is 0.
+        """
+        if self._timer is not None:
+            if delay:
+                return
+            # Only cancelled if it has not started
+            self._timer.cancel()
+        self._timer = eventlet.spawn_after(delay, self.flush)
+
+    def flush(self):
+        """Write all the queued event records."""
+        self._timer = None
+        with self._lock:
+            while self.queue:
+                count = min(len(self.queue), cfg.CONF.dispatchers.batch_size)
+                batch = [self.queue.popleft() for _ in range(count)]
+                try:
+                    eo.Event.create_bulk(batch[0][0], [v for c, v in batch])
+                    self.written += count
+                except Exception as ex:
+                    self.dropped += count
+                    LOG.error('Failed in writing %s events: %s', count, ex)
+
+    def get_stats(self):
+        """Get the statistics of the event records written.
+
+        :returns: A dict containing the numbers of records queued, written
+                  and dropped.
+        """
+        return {
+            'queued': len(self.queue),
+            'written': self.written,
+            'dropped': self.dropped,
+        }
+
+
+_WRITER = EventWriter()
+
 
 class DBEvent(base.EventBackend):
     """DB driver for event dumping"""
@@ -24,6 +121,9 @@ class DBEvent(base.EventBackend):
     def dump(cls, level, action, **kwargs):
         """Create an event record into database.
 
+        The record is queued and written in a batch with other records, see
+        EventWriter.
+
         :param level: An integer as defined by python logging module.
         :param action: The action that triggered this dump.
         :param dict kwargs: Additional parameters such as ``phase``,
@@ -60,4 +160,9 @@ class DBEvent(base.EventBackend):
             'meta_data': extra,
         }
 
-        eo.Event.create(ctx, values)
+        _WRITER.write(ctx, values)
+
+    @classmethod
+    def flush(cls):
+        """Write the event records queued."""
+        _WRITER.flush()
@@ -10,23 +10,130 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import random
+
+import eventlet
+from eventlet import queue
 from oslo_config import cfg
+from oslo_log import log as logging
 
+from senlin.common import consts
 from senlin.common import utils
 from senlin.events import base
 from senlin.objects import notification as nobj
 
+LOG = logging.getLogger(__name__)
+
+
+class EventEmitter(object):
+    """Background emitter of event notifications.
+
+    Notifications are queued by the threads dumping events and sent by a
+    worker green thread, so that actions do not wait for the message bus.
+    The worker sends at most one batch of notifications before yielding to
+    other threads, and exits when the queue is empty. When the queue is
+    full, new notifications are dropped and counted.
+    """
+
+    def __init__(self):
+        self.queue = queue.LightQueue()
+        self.emitted = 0
+        self.dropped = 0
+        self._worker = None
+
+    def emit(self, context, notification):
+        """Queue a notification to be sent.
+
+        :param context: The request context of the action dumping the event.
+        :param notification: The notification object to send.
+        :returns: True if the notification is sent or queued, or False if it
+                  is dropped.
+        """
+        conf = cfg.CONF.dispatchers
+        if not conf.flush_interval:
+            self._send([(context, notification)])
+            return True
+
+        if self.queue.qsize() >= conf.max_queue_size:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                LOG.warning('Notification queue is full, %s notifications '
+                            'dropped so far.', self.dropped)
+            return False
+
+        self.queue.put((context, notification))
+        if self._worker is None:
+            self._worker = eventlet.spawn(self._run)
+        return True
+
+    def _run(self):
+        """Send queued notifications until the queue is empty."""
+        try:
+            while self.queue.qsize():
+                self._send(self._take())
+                eventlet.sleep(0)
+        finally:
+            self._worker = None
+
+    def _take(self):
+        """Take a batch of notifications from the queue."""
+        count = min(self.queue.qsize(), cfg.CONF.dispatchers.batch_size)
+        return [self.queue.get_nowait() for _ in range(count)]
+
+    def _send(self, batch):
+        for context, notification in batch:
+            try:
+                notification.emit(context)
+                self.emitted += 1
+            except Exception as ex:
+                self.dropped += 1
+                LOG.error('Failed in sending notification: %s', ex)
+
+    def flush(self):
+        """Send all the queued notifications."""
+        while self.queue.qsize():
+            self._send(self._take())
+
+    def get_stats(self):
+        """Get the statistics of the notifications sent.
+
+        :returns: A dict containing the numbers of notifications queued,
+                  emitted and dropped.
+        """
+        return {
+            'queued': self.queue.qsize(),
+            'emitted': self.emitted,
+            'dropped': self.dropped,
+        }
+
+
+_EMITTER = EventEmitter()
+_PUBLISHER = None
+
+
+def _get_publisher():
+    """Get the publisher shared by the notifications of this engine."""
+    global _PUBLISHER
+
+    if _PUBLISHER is None or _PUBLISHER.host != cfg.CONF.host:
+        _PUBLISHER = nobj.NotificationPublisher(
+            host=cfg.CONF.host, binary='senlin-engine')
+        _PUBLISHER.obj_set_defaults()
+    return _PUBLISHER
+
 
 class MessageEvent(base.EventBackend):
     """Message driver for event dumping"""
 
+    # The sample_rates option value and the rates parsed from it
+    _sample_option = None
+    _sample_rates = {}
+
     @classmethod
     def _notify_cluster_action(cls, ctx, level, cluster, action, **kwargs):
         action_name = cls._get_action_name(action)
         priority = utils.level_from_number(level).lower()
-        publisher = nobj.NotificationPublisher(
-            host=cfg.CONF.host, binary='senlin-engine')
-        publisher.obj_set_defaults()
+        publisher = _get_publisher()
         phase = kwargs.get('phase')
         event_type = nobj.EventType(
             object='cluster', action=action_name, phase=phase)
@@ -34,15 +141,13 @@ class MessageEvent(base.EventBackend):
         notification = nobj.ClusterActionNotification(
             context=ctx, priority=priority, publisher=publisher,
             event_type=event_type, payload=payload)
-        notification.emit(ctx)
+        _EMITTER.emit(ctx, notification)
 
     @classmethod
     def _notify_node_action(cls, ctx, level, node, action, **kwargs):
         action_name = cls._get_action_name(action)
         priority = utils.level_from_number(level).lower()
-        publisher = nobj.NotificationPublisher(
-            host=cfg.CONF.host, binary='senlin-engine')
-        publisher.obj_set_defaults()
+        publisher = _get_publisher()
         phase = kwargs.get('phase')
         event_type = nobj.EventType(
             object='node', action=action_name, phase=phase)
@@ -50,7 +155,7 @@ class MessageEvent(base.EventBackend):
         notification = nobj.NodeActionNotification(
             context=ctx, priority=priority, publisher=publisher,
             event_type=event_type, payload=payload)
-        notification.emit(ctx)
+        _EMITTER.emit(ctx, notification)
 
     @classmethod
     def dump(cls, level, action, **kwargs):
@@ -65,5 +170,55 @@ class MessageEvent(base.EventBackend):
         etype = cls._check_entity(entity)
         if etype == 'CLUSTER':
             cls._notify_cluster_action(ctx, level, entity, action, **kwargs)
-        else:
+        elif cls._sampled(level, action):
             cls._notify_node_action(ctx, level, entity, action, **kwargs)
+
+    @classmethod
+    def _sampled(cls, level, action):
+        """Check if the event of a node action is to be sent.
+
+        Events of derived node actions are sampled at the rates configured
+        for their priorities. Other events are always sent.
+        """
+        if action.cause != consts.CAUSE_DERIVED:
+            return True
+
+        priority = utils.level_from_number(level).lower()
+        rate = cls._get_sample_rates().get(priority)
+        if rate is None:
+            return True
+        return random.random() < rate
+
+    @classmethod
+    def _get_sample_rates(cls):
+        """Get the sample rates by priority, parsed once from the option.
+
+        Invalid rates are logged and ignored, so that all the events of their
+        priorities are sent.
+        """
+        option = cfg.CONF.dispatchers.sample_rates
+        if option is cls._sample_option:
+            return cls._sample_rates
+
+        rates = {}
+        for priority, rate in option.items():
+            try:
+                rate = float(rate)
+            except (TypeError, ValueError):
+                rate = None
+            if rate is None or not 0 <= rate <= 1:
+                LOG.error('Invalid sample rate "%(rate)s" of %(priority)s '
+                          'events ignored, it must be a number between 0 '
+                          'and 1.', {'rate': option[priority],
+                                     'priority': priority})
+                continue
+            rates[priority.lower()] = rate
+
+        cls._sample_option = option
+        cls._sample_rates = rates
+        return rates
+
+    @classmethod
+    def flush(cls):
+        """Send the notifications queued."""
+        _EMITTER.flush()
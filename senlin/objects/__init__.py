@@ -25,6 +25,7 @@ def register_all():
     __import__('senlin.objects.dependency')
     __import__('senlin.objects.event')
     __import__('senlin.objects.health_registry')
+    __import__('senlin.objects.lock_waiter')
     __import__('senlin.objects.node')
     __import__('senlin.objects.node_lock')
     __import__('senlin.objects.notification')
@@ -45,3 +46,4 @@ def register_all():
     __import__('senlin.objects.requests.receivers')
     __import__('senlin.objects.requests.webhooks')
     __import__('senlin.objects.service')
+    __import__('senlin.objects.token_bucket')
@@ -12,8 +12,7 @@
 
 """Action object."""
 
-from oslo_utils import uuidutils
-
+from senlin.common import consts
 from senlin.common import exception
 from senlin.common import utils
 from senlin.db import api as db_api
@@ -57,6 +56,11 @@ class Action(base.SenlinObject, base.VersionedObjectDictCompat):
         obj = db_api.action_create(context, values)
         return cls._from_db_object(context, cls(context), obj)
 
+    @classmethod
+    def create_bulk(cls, context, values, dependencies, nodes=None):
+        return db_api.action_create_bulk(context, values, dependencies,
+                                         nodes=nodes)
+
     @classmethod
     def find(cls, context, identity, **kwargs):
         """Find an action with the given identity.
@@ -67,15 +71,7 @@ class Action(base.SenlinObject, base.VersionedObjectDictCompat):
         :return: A DB object of action or an exception `ResourceNotFound` if
                  no matching action is found.
         """
-        if uuidutils.is_uuid_like(identity):
-            action = cls.get(context, identity, **kwargs)
-            if not action:
-                action = cls.get_by_name(context, identity, **kwargs)
-        else:
-            action = cls.get_by_name(context, identity, **kwargs)
-            if not action:
-                action = cls.get_by_short_id(context, identity, **kwargs)
-
+        action = cls.get_by_identity(context, identity, **kwargs)
         if not action:
             raise exception.ResourceNotFound(type='action', id=identity)
 
@@ -96,6 +92,11 @@ class Action(base.SenlinObject, base.VersionedObjectDictCompat):
         obj = db_api.action_get_by_short_id(context, short_id, **kwargs)
         return cls._from_db_object(context, cls(), obj)
 
+    @classmethod
+    def get_by_identity(cls, context, identity, **kwargs):
+        obj = db_api.action_get_by_identity(context, identity, **kwargs)
+        return cls._from_db_object(context, cls(), obj)
+
     @classmethod
     def action_list_active_scaling(cls, context, cluster_id, **kwargs):
         objs = db_api.action_list_active_scaling(context, cluster_id, **kwargs)
@@ -106,6 +107,24 @@ class Action(base.SenlinObject, base.VersionedObjectDictCompat):
         objs = db_api.action_get_all(context, **kwargs)
         return [cls._from_db_object(context, cls(), obj) for obj in objs]
 
+    @classmethod
+    def get_page(cls, context, **kwargs):
+        """Get a page of actions and the marker of the next page.
+
+        :returns: A tuple of the actions and the marker, which is None if
+                  the page is the last one.
+        """
+        objs = db_api.action_get_all(context, **kwargs)
+        marker = db_api.next_marker(objs, kwargs.get('limit'),
+                                    kwargs.get('sort'),
+                                    consts.ACTION_CREATED_AT)
+        objs = [cls._from_db_object(context, cls(), obj) for obj in objs]
+        return objs, marker
+
+    @classmethod
+    def count_all(cls, context, **kwargs):
+        return db_api.action_count_all(context, **kwargs)
+
     @classmethod
     def get_all_by_owner(cls, context, owner):
         objs = db_api.action_get_all_by_owner(context, owner)
@@ -116,6 +135,12 @@ class Action(base.SenlinObject, base.VersionedObjectDictCompat):
         objs = db_api.action_get_all_active_by_target(context, target)
         return [cls._from_db_object(context, cls(), obj) for obj in objs]
 
+    @classmethod
+    def columns_active_by_target(cls, context, target, columns):
+        """An internal API for retrieving some action columns only."""
+        return db_api.action_columns_active_by_target(context, target,
+                                                      columns)
+
     @classmethod
     def check_status(cls, context, action_id, timestamp):
         return db_api.action_check_status(context, action_id, timestamp)
@@ -148,6 +173,28 @@ class Action(base.SenlinObject, base.VersionedObjectDictCompat):
     def acquire_first_ready(cls, context, owner, timestamp):
         return db_api.action_acquire_first_ready(context, owner, timestamp)
 
+    @classmethod
+    def acquire_ready_batch(cls, context, owner, timestamp, limit):
+        return db_api.action_acquire_ready_batch(context, owner, timestamp,
+                                                 limit)
+
+    @classmethod
+    def acquire_batch(cls, context, action_ids, owner, timestamp):
+        return db_api.action_acquire_batch(context, action_ids, owner,
+                                           timestamp)
+
+    @classmethod
+    def get_all_ready(cls, context, timestamp=None, limit=None,
+                      action_class=None):
+        return db_api.action_get_all_ready(context, timestamp=timestamp,
+                                           limit=limit,
+                                           action_class=action_class)
+
+    @classmethod
+    def count_ready_by_class(cls, context, timestamp=None):
+        return db_api.action_count_ready_by_class(context,
+                                                  timestamp=timestamp)
+
     @classmethod
     def abandon(cls, context, action_id, values=None):
         return db_api.action_abandon(context, action_id, values)
@@ -13,8 +13,8 @@
 """Cluster object."""
 
 from oslo_utils import timeutils
-from oslo_utils import uuidutils
 
+from senlin.common import consts
 from senlin.common import exception as exc
 from senlin.common import utils
 from senlin.db import api as db_api
@@ -48,6 +48,8 @@ class Cluster(base.SenlinObject, base.VersionedObjectDictCompat):
         'domain': fields.StringField(nullable=True),
         'dependents': fields.JsonField(nullable=True),
         'config': fields.JsonField(nullable=True),
+        'node_generation': fields.IntegerField(nullable=True),
+        'policy_generation': fields.IntegerField(nullable=True),
         'profile_name': fields.StringField(),
         'nodes': fields.CustomListField(attr_name='id', nullable=True),
         'policies': fields.CustomListField(attr_name='id', nullable=True),
@@ -79,20 +81,8 @@ class Cluster(base.SenlinObject, base.VersionedObjectDictCompat):
 
     @classmethod
     def find(cls, context, identity, project_safe=True):
-        cluster = None
-        if uuidutils.is_uuid_like(identity):
-            cluster = cls.get(context, identity, project_safe=project_safe)
-            if not cluster:
-                cluster = cls.get_by_name(context, identity,
-                                          project_safe=project_safe)
-        else:
-            cluster = cls.get_by_name(context, identity,
+        cluster = cls.get_by_identity(context, identity,
                                       project_safe=project_safe)
-            # maybe it is a short form of UUID
-            if not cluster:
-                cluster = cls.get_by_short_id(context, identity,
-                                              project_safe=project_safe)
-
         if not cluster:
             raise exc.ResourceNotFound(type='cluster', id=identity)
 
@@ -113,15 +103,38 @@ class Cluster(base.SenlinObject, base.VersionedObjectDictCompat):
         obj = db_api.cluster_get_by_short_id(context, short_id, **kwargs)
         return cls._from_db_object(context, cls(), obj)
 
+    @classmethod
+    def get_by_identity(cls, context, identity, **kwargs):
+        obj = db_api.cluster_get_by_identity(context, identity, **kwargs)
+        return cls._from_db_object(context, cls(), obj)
+
     @classmethod
     def get_all(cls, context, **kwargs):
         objs = db_api.cluster_get_all(context, **kwargs)
         return [cls._from_db_object(context, cls(), obj) for obj in objs]
 
+    @classmethod
+    def get_page(cls, context, **kwargs):
+        """Get a page of clusters and the marker of the next page.
+
+        :returns: A tuple of the clusters and the marker, which is None if
+                  the page is the last one.
+        """
+        objs = db_api.cluster_get_all(context, **kwargs)
+        marker = db_api.next_marker(objs, kwargs.get('limit'),
+                                    kwargs.get('sort'),
+                                    consts.CLUSTER_INIT_AT)
+        objs = [cls._from_db_object(context, cls(), obj) for obj in objs]
+        return objs, marker
+
     @classmethod
     def get_next_index(cls, context, cluster_id):
         return db_api.cluster_next_index(context, cluster_id)
 
+    @classmethod
+    def reserve_indexes(cls, context, cluster_id, count):
+        return db_api.cluster_reserve_indexes(context, cluster_id, count)
+
     @classmethod
     def count_all(cls, context, **kwargs):
         return db_api.cluster_count_all(context, **kwargs)
@@ -12,8 +12,7 @@
 
 """Event object."""
 
-from oslo_utils import uuidutils
-
+from senlin.common import consts
 from senlin.common import exception
 from senlin.db import api as db_api
 from senlin.objects import base
@@ -45,6 +44,10 @@ class Event(base.SenlinObject, base.VersionedObjectDictCompat):
         obj = db_api.event_create(context, values)
         return cls._from_db_object(context, cls(context), obj)
 
+    @classmethod
+    def create_bulk(cls, context, values):
+        db_api.event_create_bulk(context, values)
+
     @classmethod
     def find(cls, context, identity, **kwargs):
         """Find an event with the given identity.
@@ -55,11 +58,7 @@ class Event(base.SenlinObject, base.VersionedObjectDictCompat):
 
         :return: A dictionary containing the details of the event.
         """
-        event = None
-        if uuidutils.is_uuid_like(identity):
-            event = cls.get(context, identity, **kwargs)
-        if not event:
-            event = cls.get_by_short_id(context, identity, **kwargs)
+        event = cls.get_by_identity(context, identity, **kwargs)
         if not event:
             raise exception.ResourceNotFound(type='event', id=identity)
 
@@ -73,10 +72,31 @@ class Event(base.SenlinObject, base.VersionedObjectDictCompat):
     def get_by_short_id(cls, context, short_id, **kwargs):
         return db_api.event_get_by_short_id(context, short_id, **kwargs)
 
+    @classmethod
+    def get_by_identity(cls, context, identity, **kwargs):
+        return db_api.event_get_by_identity(context, identity, **kwargs)
+
     @classmethod
     def get_all(cls, context, **kwargs):
         return db_api.event_get_all(context, **kwargs)
 
+    @classmethod
+    def get_page(cls, context, **kwargs):
+        """Get a page of events and the marker of the next page.
+
+        :returns: A tuple of the events and the marker, which is None if
+                  the page is the last one.
+        """
+        objs = db_api.event_get_all(context, **kwargs)
+        marker = db_api.next_marker(objs, kwargs.get('limit'),
+                                    kwargs.get('sort'),
+                                    consts.EVENT_TIMESTAMP)
+        return objs, marker
+
+    @classmethod
+    def count_all(cls, context, **kwargs):
+        return db_api.event_count_all(context, **kwargs)
+
     @classmethod
     def count_by_cluster(cls, context, cluster_id, **kwargs):
         return db_api.event_count_by_cluster(context, cluster_id, **kwargs)
@@ -85,3 +105,12 @@ class Event(base.SenlinObject, base.VersionedObjectDictCompat):
     def get_all_by_cluster(cls, context, cluster_id, **kwargs):
         objs = db_api.event_get_all_by_cluster(context, cluster_id, **kwargs)
         return [cls._from_db_object(context, cls(), obj) for obj in objs]
+
+    @classmethod
+    def purge(cls, project, granularity, age, **kwargs):
+        return db_api.event_purge(db_api.get_engine(), project, granularity,
+                                  age, **kwargs)
+
+    @classmethod
+    def purge_excess(cls, max_events, **kwargs):
+        return db_api.event_purge_excess(max_events, **kwargs)
@@ -0,0 +1,43 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Lock waiter object."""
+
+from senlin.db import api as db_api
+from senlin.objects import base
+from senlin.objects import fields
+
+
+@base.SenlinObjectRegistry.register
+class LockWaiter(base.SenlinObject, base.VersionedObjectDictCompat):
+    """Senlin lock waiter object."""
+
+    fields = {
+        'id': fields.IntegerField(),
+        'resource_id': fields.UUIDField(),
+        'action_id': fields.UUIDField(),
+        'engine_id': fields.UUIDField(nullable=True),
+        'created_at': fields.FloatField(nullable=True),
+    }
+
+    @classmethod
+    def add(cls, resource_id, action_id, engine_id, timestamp):
+        return db_api.lock_waiter_add(resource_id, action_id, engine_id,
+                                      timestamp)
+
+    @classmethod
+    def remove(cls, resource_id, action_id):
+        return db_api.lock_waiter_remove(resource_id, action_id)
+
+    @classmethod
+    def get_first(cls, resource_id):
+        return db_api.lock_waiter_get_first(resource_id)
@@ -12,8 +12,7 @@
 
 """Node object."""
 
-from oslo_utils import uuidutils
-
+from senlin.common import consts
 from senlin.common import exception
 from senlin.common import utils
 from senlin.db import api as db_api
@@ -44,6 +43,7 @@ class Node(base.SenlinObject, base.VersionedObjectDictCompat):
         'project': fields.StringField(),
         'domain': fields.StringField(nullable=True),
         'dependents': fields.JsonField(nullable=True),
+        'generation': fields.IntegerField(nullable=True),
         'profile_name': fields.StringField(nullable=True),
         'profile_created_at': fields.StringField(nullable=True),
     }
@@ -92,20 +92,9 @@ class Node(base.SenlinObject, base.VersionedObjectDictCompat):
                  or an exception of ``MultipleChoices`` more than one node
                  found matching the criteria.
         """
-        node = None
-        if uuidutils.is_uuid_like(identity):
-            node = cls.get(context, identity, project_safe=project_safe)
-            if not node:
-                node = cls.get_by_name(context, identity,
-                                       project_safe=project_safe)
-        else:
-            node = cls.get_by_name(context, identity,
+        node = cls.get_by_identity(context, identity,
                                    project_safe=project_safe)
-            if not node:
-                node = cls.get_by_short_id(context, identity,
-                                           project_safe=project_safe)
-
-        if node is None:
+        if not node:
             raise exception.ResourceNotFound(type='node', id=identity)
 
         return node
@@ -125,11 +114,34 @@ class Node(base.SenlinObject, base.VersionedObjectDictCompat):
         obj = db_api.node_get_by_short_id(context, short_id, **kwargs)
         return cls._from_db_object(context, cls(), obj)
 
+    @classmethod
+    def get_by_identity(cls, context, identity, **kwargs):
+        obj = db_api.node_get_by_identity(context, identity, **kwargs)
+        return cls._from_db_object(context, cls(), obj)
+
     @classmethod
     def get_all(cls, context, **kwargs):
         objs = db_api.node_get_all(context, **kwargs)
         return [cls._from_db_object(context, cls(), obj) for obj in objs]
 
+    @classmethod
+    def get_page(cls, context, **kwargs):
+        """Get a page of nodes and the marker of the next page.
+
+        :returns: A tuple of the nodes and the marker, which is None if
+                  the page is the last one.
+        """
+        objs = db_api.node_get_all(context, **kwargs)
+        marker = db_api.next_marker(objs, kwargs.get('limit'),
+                                    kwargs.get('sort'),
+                                    consts.NODE_INIT_AT)
+        objs = [cls._from_db_object(context, cls(), obj) for obj in objs]
+        return objs, marker
+
+    @classmethod
+    def count_all(cls, context, **kwargs):
+        return db_api.node_count_all(context, **kwargs)
+
     @classmethod
     def get_all_by_cluster(cls, context, cluster_id, filters=None,
                            project_safe=True):
@@ -137,6 +149,14 @@ class Node(base.SenlinObject, base.VersionedObjectDictCompat):
             context, cluster_id, filters=filters, project_safe=project_safe)
         return [cls._from_db_object(context, cls(), obj) for obj in objs]
 
+    @classmethod
+    def columns_by_cluster(cls, context, cluster_id, columns, filters=None,
+                           project_safe=True):
+        """An internal API for retrieving some node columns only."""
+        return db_api.node_columns_by_cluster(context, cluster_id, columns,
+                                              filters=filters,
+                                              project_safe=project_safe)
+
     @classmethod
     def ids_by_cluster(cls, context, cluster_id, filters=None):
         """An internal API for retrieving node ids only."""
@@ -146,15 +166,24 @@ class Node(base.SenlinObject, base.VersionedObjectDictCompat):
     def count_by_cluster(cls, context, cluster_id, **kwargs):
         return db_api.node_count_by_cluster(context, cluster_id, **kwargs)
 
+    @classmethod
+    def count_by_status(cls, context, cluster_id):
+        return db_api.node_count_by_status(context, cluster_id)
+
+    @classmethod
+    def count_reconcile(cls, context):
+        return db_api.node_count_reconcile(context)
+
     @classmethod
     def update(cls, context, obj_id, values):
         values = cls._transpose_metadata(values)
         db_api.node_update(context, obj_id, values)
 
     @classmethod
-    def migrate(cls, context, obj_id, to_cluster, timestamp, role=None):
+    def migrate(cls, context, obj_id, to_cluster, timestamp, role=None,
+                index=None):
         return db_api.node_migrate(context, obj_id, to_cluster, timestamp,
-                                   role=role)
+                                   role=role, index=index)
 
     @classmethod
     def delete(cls, context, obj_id):
@@ -12,8 +12,6 @@
 
 """Policy object."""
 
-from oslo_utils import uuidutils
-
 from senlin.common import exception
 from senlin.db import api as db_api
 from senlin.objects import base
@@ -57,15 +55,7 @@ class Policy(base.SenlinObject, base.VersionedObjectDictCompat):
         :return: A DB object of policy or an exception of `ResourceNotFound`
                  if no matching object is found.
         """
-        if uuidutils.is_uuid_like(identity):
-            policy = cls.get(context, identity, **kwargs)
-            if not policy:
-                policy = cls.get_by_name(context, identity, **kwargs)
-        else:
-            policy = cls.get_by_name(context, identity, **kwargs)
-            if not policy:
-                policy = cls.get_by_short_id(context, identity, **kwargs)
-
+        policy = cls.get_by_identity(context, identity, **kwargs)
         if not policy:
             raise exception.ResourceNotFound(type='policy', id=identity)
 
@@ -76,6 +66,11 @@ class Policy(base.SenlinObject, base.VersionedObjectDictCompat):
         obj = db_api.policy_get(context, policy_id, **kwargs)
         return cls._from_db_object(context, cls(), obj)
 
+    @classmethod
+    def get_version(cls, context, policy_id, **kwargs):
+        """An internal API for checking the version of a policy."""
+        return db_api.policy_get_version(context, policy_id, **kwargs)
+
     @classmethod
     def get_by_name(cls, context, name, **kwargs):
         obj = db_api.policy_get_by_name(context, name, **kwargs)
@@ -86,6 +81,11 @@ class Policy(base.SenlinObject, base.VersionedObjectDictCompat):
         obj = db_api.policy_get_by_short_id(context, short_id, **kwargs)
         return cls._from_db_object(context, cls(), obj)
 
+    @classmethod
+    def get_by_identity(cls, context, identity, **kwargs):
+        obj = db_api.policy_get_by_identity(context, identity, **kwargs)
+        return cls._from_db_object(context, cls(), obj)
+
     @classmethod
     def get_all(cls, context, **kwargs):
         objs = db_api.policy_get_all(context, **kwargs)
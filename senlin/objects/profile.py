@@ -11,7 +11,6 @@
 # under the License.
 
 """Profile object."""
-from oslo_utils import uuidutils
 
 from senlin.common import exception
 from senlin.common import utils
@@ -57,15 +56,7 @@ class Profile(base.SenlinObject, base.VersionedObjectDictCompat):
         :return: A DB object of profile or an exception `ResourceNotFound`
                  if no matching object is found.
         """
-        if uuidutils.is_uuid_like(identity):
-            profile = cls.get(context, identity, **kwargs)
-            if not profile:
-                profile = cls.get_by_name(context, identity, **kwargs)
-        else:
-            profile = cls.get_by_name(context, identity, **kwargs)
-            if not profile:
-                profile = cls.get_by_short_id(context, identity, **kwargs)
-
+        profile = cls.get_by_identity(context, identity, **kwargs)
         if not profile:
             raise exception.ResourceNotFound(type='profile', id=identity)
 
@@ -76,6 +67,11 @@ class Profile(base.SenlinObject, base.VersionedObjectDictCompat):
         obj = db_api.profile_get(context, profile_id, **kwargs)
         return cls._from_db_object(context, cls(), obj)
 
+    @classmethod
+    def get_version(cls, context, profile_id, **kwargs):
+        """An internal API for checking the version of a profile."""
+        return db_api.profile_get_version(context, profile_id, **kwargs)
+
     @classmethod
     def get_by_name(cls, context, name, **kwargs):
         obj = db_api.profile_get_by_name(context, name, **kwargs)
@@ -86,6 +82,11 @@ class Profile(base.SenlinObject, base.VersionedObjectDictCompat):
         obj = db_api.profile_get_by_short_id(context, short_id, **kwargs)
         return cls._from_db_object(context, cls(), obj)
 
+    @classmethod
+    def get_by_identity(cls, context, identity, **kwargs):
+        obj = db_api.profile_get_by_identity(context, identity, **kwargs)
+        return cls._from_db_object(context, cls(), obj)
+
     @classmethod
     def get_all(cls, context, **kwargs):
         objs = db_api.profile_get_all(context, **kwargs)
@@ -12,8 +12,6 @@
 
 """Receiver object."""
 
-from oslo_utils import uuidutils
-
 from senlin.common import exception
 from senlin.common import utils
 from senlin.db import api as db_api
@@ -58,15 +56,7 @@ class Receiver(base.SenlinObject, base.VersionedObjectDictCompat):
         :return: A DB object of receiver or an exception `ResourceNotFound`
                  if no matching receiver is found.
         """
-        if uuidutils.is_uuid_like(identity):
-            receiver = cls.get(context, identity, **kwargs)
-            if not receiver:
-                receiver = cls.get_by_name(context, identity, **kwargs)
-        else:
-            receiver = cls.get_by_name(context, identity, **kwargs)
-            if not receiver:
-                receiver = cls.get_by_short_id(context, identity, **kwargs)
-
+        receiver = cls.get_by_identity(context, identity, **kwargs)
         if not receiver:
             raise exception.ResourceNotFound(type='receiver', id=identity)
 
@@ -87,6 +77,11 @@ class Receiver(base.SenlinObject, base.VersionedObjectDictCompat):
         obj = db_api.receiver_get_by_short_id(context, short_id, **kwargs)
         return cls._from_db_object(context, cls(), obj)
 
+    @classmethod
+    def get_by_identity(cls, context, identity, **kwargs):
+        obj = db_api.receiver_get_by_identity(context, identity, **kwargs)
+        return cls._from_db_object(context, cls(), obj)
+
     @classmethod
     def get_all(cls, context, **kwargs):
         objs = db_api.receiver_get_all(context, **kwargs)
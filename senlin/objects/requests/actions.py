@@ -10,6 +10,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from oslo_utils import versionutils
+
 from senlin.common import consts
 from senlin.objects import base
 from senlin.objects import fields
@@ -36,6 +38,13 @@ class ActionCreateRequest(base.SenlinObject):
 
 @base.SenlinObjectRegistry.register
 class ActionListRequest(base.SenlinObject):
+    # VERSION 1.0: Initial version
+    # VERSION 1.1: Accepted page cursors as marker and added 'with_count'
+    VERSION = '1.1'
+    VERSION_MAP = {
+        '1.13': '1.1',
+    }
+
     action_name_list = list(consts.CLUSTER_ACTION_NAMES)
     action_name_list.extend(list(consts.NODE_ACTION_NAMES))
 
@@ -47,12 +56,25 @@ class ActionListRequest(base.SenlinObject):
         'status': fields.ListOfEnumField(
             valid_values=list(consts.ACTION_STATUSES), nullable=True),
         'limit': fields.NonNegativeIntegerField(nullable=True),
-        'marker': fields.UUIDField(nullable=True),
+        'marker': fields.StringField(nullable=True),
         'sort': fields.SortField(
             valid_keys=list(consts.ACTION_SORT_KEYS), nullable=True),
-        'project_safe': fields.FlexibleBooleanField(default=True)
+        'project_safe': fields.FlexibleBooleanField(default=True),
+        'with_count': fields.FlexibleBooleanField(nullable=True),
     }
 
+    def obj_make_compatible(self, primitive, target_version):
+        super(ActionListRequest, self).obj_make_compatible(
+            primitive, target_version)
+        target_version = versionutils.convert_version_to_tuple(target_version)
+        if target_version < (1, 1):
+            if 'with_count' in primitive['senlin_object.data']:
+                del primitive['senlin_object.data']['with_count']
+            marker = primitive['senlin_object.data'].get('marker')
+            if marker is not None:
+                # Only object IDs were accepted as markers
+                fields.UUID.coerce(self, 'marker', marker)
+
 
 @base.SenlinObjectRegistry.register
 class ActionGetRequest(base.SenlinObject):
@@ -23,18 +23,37 @@ CONF.import_opt('default_action_timeout', 'senlin.common.config')
 
 @base.SenlinObjectRegistry.register
 class ClusterListRequest(base.SenlinObject):
+    # VERSION 1.0: Initial version
+    # VERSION 1.1: Accepted page cursors as marker and added 'with_count'
+    VERSION = '1.1'
+    VERSION_MAP = {
+        '1.13': '1.1',
+    }
 
     fields = {
         'name': fields.ListOfStringsField(nullable=True),
         'status': fields.ListOfEnumField(
             valid_values=list(consts.CLUSTER_STATUSES), nullable=True),
         'limit': fields.NonNegativeIntegerField(nullable=True),
-        'marker': fields.UUIDField(nullable=True),
+        'marker': fields.StringField(nullable=True),
         'sort': fields.SortField(
             valid_keys=list(consts.CLUSTER_SORT_KEYS), nullable=True),
         'project_safe': fields.FlexibleBooleanField(default=True),
+        'with_count': fields.FlexibleBooleanField(nullable=True),
     }
 
+    def obj_make_compatible(self, primitive, target_version):
+        super(ClusterListRequest, self).obj_make_compatible(
+            primitive, target_version)
+        target_version = versionutils.convert_version_to_tuple(target_version)
+        if target_version < (1, 1):
+            if 'with_count' in primitive['senlin_object.data']:
+                del primitive['senlin_object.data']['with_count']
+            marker = primitive['senlin_object.data'].get('marker')
+            if marker is not None:
+                # Only object IDs were accepted as markers
+                fields.UUID.coerce(self, 'marker', marker)
+
 
 @base.SenlinObjectRegistry.register
 class ClusterCreateRequestBody(base.SenlinObject):
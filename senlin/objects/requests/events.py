@@ -10,6 +10,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from oslo_utils import versionutils
+
 from senlin.common import consts
 from senlin.objects import base
 from senlin.objects import fields
@@ -17,6 +19,12 @@ from senlin.objects import fields
 
 @base.SenlinObjectRegistry.register
 class EventListRequest(base.SenlinObject):
+    # VERSION 1.0: Initial version
+    # VERSION 1.1: Accepted page cursors as marker and added 'with_count'
+    VERSION = '1.1'
+    VERSION_MAP = {
+        '1.13': '1.1',
+    }
 
     action_name_list = list(consts.CLUSTER_ACTION_NAMES)
     action_name_list.extend(list(consts.NODE_ACTION_NAMES))
@@ -31,12 +39,25 @@ class EventListRequest(base.SenlinObject):
         'level': fields.ListOfEnumField(
             valid_values=list(consts.EVENT_LEVELS.keys()), nullable=True),
         'limit': fields.NonNegativeIntegerField(nullable=True),
-        'marker': fields.UUIDField(nullable=True),
+        'marker': fields.StringField(nullable=True),
         'sort': fields.SortField(
             valid_keys=list(consts.EVENT_SORT_KEYS), nullable=True),
-        'project_safe': fields.FlexibleBooleanField(default=True)
+        'project_safe': fields.FlexibleBooleanField(default=True),
+        'with_count': fields.FlexibleBooleanField(nullable=True),
     }
 
+    def obj_make_compatible(self, primitive, target_version):
+        super(EventListRequest, self).obj_make_compatible(
+            primitive, target_version)
+        target_version = versionutils.convert_version_to_tuple(target_version)
+        if target_version < (1, 1):
+            if 'with_count' in primitive['senlin_object.data']:
+                del primitive['senlin_object.data']['with_count']
+            marker = primitive['senlin_object.data'].get('marker')
+            if marker is not None:
+                # Only object IDs were accepted as markers
+                fields.UUID.coerce(self, 'marker', marker)
+
 
 @base.SenlinObjectRegistry.register
 class EventGetRequest(base.SenlinObject):
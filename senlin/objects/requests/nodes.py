@@ -39,6 +39,12 @@ class NodeCreateRequest(base.SenlinObject):
 
 @base.SenlinObjectRegistry.register
 class NodeListRequest(base.SenlinObject):
+    # VERSION 1.0: Initial version
+    # VERSION 1.1: Accepted page cursors as marker and added 'with_count'
+    VERSION = '1.1'
+    VERSION_MAP = {
+        '1.13': '1.1',
+    }
 
     fields = {
         'cluster_id': fields.StringField(nullable=True),
@@ -46,12 +52,25 @@ class NodeListRequest(base.SenlinObject):
         'status': fields.ListOfEnumField(
             valid_values=list(consts.NODE_STATUSES), nullable=True),
         'limit': fields.NonNegativeIntegerField(nullable=True),
-        'marker': fields.UUIDField(nullable=True),
+        'marker': fields.StringField(nullable=True),
         'sort': fields.SortField(
             valid_keys=list(consts.NODE_SORT_KEYS), nullable=True),
-        'project_safe': fields.FlexibleBooleanField(default=True)
+        'project_safe': fields.FlexibleBooleanField(default=True),
+        'with_count': fields.FlexibleBooleanField(nullable=True),
     }
 
+    def obj_make_compatible(self, primitive, target_version):
+        super(NodeListRequest, self).obj_make_compatible(
+            primitive, target_version)
+        target_version = versionutils.convert_version_to_tuple(target_version)
+        if target_version < (1, 1):
+            if 'with_count' in primitive['senlin_object.data']:
+                del primitive['senlin_object.data']['with_count']
+            marker = primitive['senlin_object.data'].get('marker')
+            if marker is not None:
+                # Only object IDs were accepted as markers
+                fields.UUID.coerce(self, 'marker', marker)
+
 
 @base.SenlinObjectRegistry.register
 class NodeGetRequest(base.SenlinObject):
@@ -0,0 +1,33 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Token bucket object."""
+
+from senlin.db import api as db_api
+from senlin.objects import base
+from senlin.objects import fields
+
+
+@base.SenlinObjectRegistry.register
+class TokenBucket(base.SenlinObject, base.VersionedObjectDictCompat):
+    """Senlin token bucket object."""
+
+    fields = {
+        'id': fields.StringField(),
+        'tokens': fields.FloatField(),
+        'refilled_at': fields.FloatField(nullable=True),
+    }
+
+    @classmethod
+    def consume(cls, context, bucket_id, rate, capacity, timestamp):
+        return db_api.token_bucket_consume(context, bucket_id, rate,
+                                           capacity, timestamp)
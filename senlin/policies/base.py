@@ -10,6 +10,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import copy
+
 from oslo_context import context as oslo_context
 from oslo_utils import reflection
 from oslo_utils import timeutils
@@ -20,6 +22,7 @@ from senlin.common.i18n import _
 from senlin.common import schema
 from senlin.common import utils
 from senlin.drivers import base as driver
+from senlin.engine import dispatcher
 from senlin.engine import environment
 from senlin.objects import credential as co
 from senlin.objects import policy as po
@@ -30,6 +33,9 @@ CHECK_RESULTS = (
     'OK', 'ERROR',
 )
 
+# Policies loaded by this engine, keyed by their IDs.
+_CACHE = utils.ObjectCache('policy')
+
 
 class Policy(object):
     """Base class for policies."""
@@ -120,6 +126,12 @@ class Policy(object):
         self._octaviaclient = None
         self._lbaasclient = None
 
+    def __copy__(self):
+        """Copy a policy, sharing its spec but not its clients."""
+        policy = object.__new__(type(self))
+        policy.__dict__.update(self.__dict__)
+        return policy
+
     @classmethod
     def _from_object(cls, policy):
         """Construct a policy from a Policy object.
@@ -154,16 +166,32 @@ class Policy(object):
         :returns: An object of the proper policy class.
         """
         if db_policy is None:
+            version = po.Policy.get_version(context, policy_id,
+                                            project_safe=project_safe)
+            if version is None:
+                raise exception.ResourceNotFound(type='policy', id=policy_id)
+
+            cached = _CACHE.get(policy_id, version.updated_at)
+            if cached is not None:
+                return copy.copy(cached)
+
             db_policy = po.Policy.get(context, policy_id,
                                       project_safe=project_safe)
             if db_policy is None:
                 raise exception.ResourceNotFound(type='policy', id=policy_id)
+        else:
+            cached = _CACHE.get(db_policy.id, db_policy.updated_at)
+            if cached is not None:
+                return copy.copy(cached)
 
-        return cls._from_object(db_policy)
+        result = cls._from_object(db_policy)
+        _CACHE.put(db_policy.id, db_policy.updated_at, result)
+        return copy.copy(result)
 
     @classmethod
     def delete(cls, context, policy_id):
         po.Policy.delete(context, policy_id)
+        dispatcher.invalidate_cache(_CACHE.name, policy_id)
 
     def store(self, context):
         """Store the policy object into database table."""
@@ -183,6 +211,7 @@ class Policy(object):
             self.updated_at = timestamp
             values['updated_at'] = timestamp
             po.Policy.update(context, self.id, values)
+            dispatcher.invalidate_cache(_CACHE.name, self.id)
         else:
             self.created_at = timestamp
             values['created_at'] = timestamp
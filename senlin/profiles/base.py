@@ -28,12 +28,16 @@ from senlin.common.i18n import _
 from senlin.common import schema
 from senlin.common import utils
 from senlin.drivers import base as driver_base
+from senlin.engine import dispatcher
 from senlin.engine import environment
 from senlin.objects import credential as co
 from senlin.objects import profile as po
 
 LOG = logging.getLogger(__name__)
 
+# Profiles loaded by this engine, keyed by their IDs.
+_CACHE = utils.ObjectCache('profile')
+
 
 class Profile(object):
     """Base class for profiles."""
@@ -131,6 +135,12 @@ class Profile(object):
         self._block_storageclient = None
         self._glanceclient = None
 
+    def __copy__(self):
+        """Copy a profile, sharing its spec but not its clients."""
+        profile = object.__new__(type(self))
+        profile.__dict__.update(self.__dict__)
+        return profile
+
     @classmethod
     def _from_object(cls, profile):
         """Construct a profile from profile object.
@@ -153,14 +163,33 @@ class Profile(object):
 
     @classmethod
     def load(cls, ctx, profile=None, profile_id=None, project_safe=True):
-        """Retrieve a profile object from database."""
+        """Retrieve a profile object from database.
+
+        Profiles are cached by the engine, so only the version of a profile
+        is read from the database when the cached one is up to date.
+        """
         if profile is None:
+            version = po.Profile.get_version(ctx, profile_id,
+                                             project_safe=project_safe)
+            if version is None:
+                raise exc.ResourceNotFound(type='profile', id=profile_id)
+
+            cached = _CACHE.get(profile_id, version.updated_at)
+            if cached is not None:
+                return copy.copy(cached)
+
             profile = po.Profile.get(ctx, profile_id,
                                      project_safe=project_safe)
             if profile is None:
                 raise exc.ResourceNotFound(type='profile', id=profile_id)
+        else:
+            cached = _CACHE.get(profile.id, profile.updated_at)
+            if cached is not None:
+                return copy.copy(cached)
 
-        return cls._from_object(profile)
+        result = cls._from_object(profile)
+        _CACHE.put(profile.id, profile.updated_at, result)
+        return copy.copy(result)
 
     @classmethod
     def create(cls, ctx, name, spec, metadata=None):
@@ -192,6 +221,7 @@ class Profile(object):
     @classmethod
     def delete(cls, ctx, profile_id):
         po.Profile.delete(ctx, profile_id)
+        dispatcher.invalidate_cache(_CACHE.name, profile_id)
 
     def store(self, ctx):
         """Store the profile into database and return its ID."""
@@ -212,6 +242,7 @@ class Profile(object):
             self.updated_at = timestamp
             values['updated_at'] = timestamp
             po.Profile.update(ctx, self.id, values)
+            dispatcher.invalidate_cache(_CACHE.name, self.id)
         else:
             self.created_at = timestamp
             values['created_at'] = timestamp
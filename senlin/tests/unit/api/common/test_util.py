@@ -189,6 +189,23 @@ class TestParseRequest(base.SenlinTestCase):
         self.assertEqual("Additional properties are not allowed ('bogus_key' "
                          "was unexpected)", six.text_type(ex))
 
+    def test_marker_not_uuid_before_cursors(self):
+        name = 'ClusterListRequest'
+        body = {'marker': 'not-a-uuid', 'project_safe': True}
+        req = mock.Mock(context=utils.dummy_context(api_version='1.12'))
+
+        ex = self.assertRaises(exc.HTTPBadRequest,
+                               util.parse_request,
+                               name, req, body)
+
+        self.assertEqual("The value for marker is not a valid UUID: "
+                         "'not-a-uuid'.", six.text_type(ex))
+
+        # Page cursors are accepted as markers from version 1.13
+        req = mock.Mock(context=utils.dummy_context(api_version='1.13'))
+        res = util.parse_request(name, req, body)
+        self.assertEqual('not-a-uuid', res.marker)
+
     @mock.patch.object(jsonschema, 'validate')
     @mock.patch.object(FakeRequest, 'obj_from_primitive')
     @mock.patch.object(obj_base.SenlinObject, 'obj_class_from_name')
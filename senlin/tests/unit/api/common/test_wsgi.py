@@ -15,6 +15,7 @@ import socket
 import fixtures
 import mock
 from oslo_config import cfg
+from oslo_serialization import jsonutils
 from oslo_utils import encodeutils
 import six
 import webob
@@ -209,6 +210,22 @@ class ResourceTest(base.SenlinTestCase):
         self.assertEqual(expected, resp.headers['OpenStack-API-Version'])
         self.assertEqual('OpenStack-API-Version', resp.headers['Vary'])
 
+    def test_resource_call_with_total_count(self):
+        class Controller(object):
+            def index(self, req):
+                return {'foos': [], 'next_marker': None, 'total_count': 7}
+
+        actions = {'action': 'index'}
+        env = {'wsgiorg.routing_args': [None, actions]}
+        request = wsgi.Request.blank('/tests', environ=env)
+        request.version_request = vr.APIVersionRequest('1.13')
+
+        resource = wsgi.Resource(Controller())
+        resp = resource(request)
+        self.assertEqual({'foos': [], 'next_marker': None},
+                         jsonutils.loads(resp.body))
+        self.assertEqual('7', resp.headers['OpenStack-Clustering-Total-Count'])
+
 
 class ControllerTest(base.SenlinTestCase):
 
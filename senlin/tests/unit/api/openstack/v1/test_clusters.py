@@ -100,6 +100,49 @@ class ClusterControllerTest(shared.ControllerTest, base.SenlinTestCase):
 
         mock_call.assert_called_once_with(req.context, 'cluster_list', obj)
 
+    @mock.patch.object(util, 'parse_request')
+    @mock.patch.object(rpc_client.EngineClient, 'call')
+    def test_index_with_count(self, mock_call, mock_parse, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'index', True)
+        params = {'limit': '1', 'with_count': 'true'}
+        req = self._get('/clusters', params=params, version='1.13')
+        obj = vorc.ClusterListRequest()
+        mock_parse.return_value = obj
+        engine_resp = {
+            'clusters': [{'foo': 'bar'}],
+            'next_marker': 'NEXT_MARKER',
+            'total_count': 3,
+        }
+        mock_call.return_value = engine_resp
+
+        result = self.controller.index(req)
+
+        self.assertEqual(engine_resp, result)
+        mock_parse.assert_called_once_with(
+            'ClusterListRequest', req,
+            {
+                'limit': '1',
+                'project_safe': True,
+                'with_count': True,
+            })
+        mock_call.assert_called_once_with(req.context, 'cluster_list', obj)
+
+    @mock.patch.object(util, 'parse_request')
+    @mock.patch.object(rpc_client.EngineClient, 'call')
+    def test_index_with_count_version_mismatch(self, mock_call, mock_parse,
+                                               mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'index', True)
+        params = {'with_count': 'true'}
+        req = self._get('/clusters', params=params, version='1.12')
+
+        ex = self.assertRaises(exc.HTTPBadRequest,
+                               self.controller.index, req)
+
+        self.assertEqual("Invalid parameter 'with_count'",
+                         six.text_type(ex))
+        self.assertEqual(0, mock_parse.call_count)
+        self.assertEqual(0, mock_call.call_count)
+
     @mock.patch.object(util, 'parse_request')
     @mock.patch.object(rpc_client.EngineClient, 'call')
     def test_index_failed_with_exception(self, mock_call, mock_parse,
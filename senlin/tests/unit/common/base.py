@@ -23,6 +23,7 @@ import testscenarios
 import testtools
 
 from senlin.common import messaging
+from senlin.common import utils as common_utils
 from senlin.engine import scheduler
 from senlin.tests.unit.common import utils
 
@@ -79,6 +80,7 @@ class SenlinTestCase(testscenarios.WithScenarios,
 
         utils.setup_dummy_db()
         self.addCleanup(utils.reset_dummy_db)
+        self.addCleanup(common_utils.clear_object_caches)
 
     def stub_wallclock(self):
         # Overrides scheduler wallclock to speed up tests expecting timeouts.
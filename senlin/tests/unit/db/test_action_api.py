@@ -56,6 +56,50 @@ class DBAPIActionTest(base.SenlinTestCase):
         self.assertEqual(self.ctx.domain_id, action.domain)
         self.assertIsNone(action.outputs)
 
+    def test_action_create_bulk(self):
+        profile = shared.create_profile(self.ctx)
+        cluster = shared.create_cluster(self.ctx, profile)
+        parent = _create_action(self.ctx, name='PARENT', status='RUNNING')
+        nodes = [
+            {'id': 'NODE%s' % i, 'name': 'node-%s' % i, 'index': i,
+             'cluster_id': cluster.id, 'profile_id': profile.id,
+             'project': self.ctx.project_id, 'status': 'INIT'}
+            for i in range(2)
+        ]
+        values = [
+            {'id': 'ACTION%s' % i, 'name': 'A%s' % i, 'target': 'NODE%s' % i,
+             'action': consts.NODE_CREATE, 'status': consts.ACTION_READY,
+             'project': self.ctx.project_id, 'context': {}, 'inputs': {}}
+            for i in range(2)
+        ]
+        dependencies = [('ACTION0', parent.id), ('ACTION1', parent.id),
+                        ('ACTION0', 'ACTION1')]
+
+        db_api.action_create_bulk(self.ctx, values, dependencies, nodes=nodes)
+
+        for i in range(2):
+            node = db_api.node_get(self.ctx, 'NODE%s' % i)
+            self.assertEqual('node-%s' % i, node.name)
+            self.assertEqual(0, node.generation)
+            action = db_api.action_get(self.ctx, 'ACTION%s' % i)
+            self.assertEqual('A%s' % i, action.name)
+            self.assertEqual('NODE%s' % i, action.target)
+            self.assertEqual(consts.ACTION_READY, action.status)
+        self.assertEqual(0, db_api.action_get(
+            self.ctx, 'ACTION0').pending_dependencies)
+        self.assertEqual(1, db_api.action_get(
+            self.ctx, 'ACTION1').pending_dependencies)
+        parent = db_api.action_get(self.ctx, parent.id)
+        self.assertEqual(consts.ACTION_WAITING, parent.status)
+        self.assertEqual('Waiting for depended actions.',
+                         parent.status_reason)
+        self.assertEqual(2, parent.pending_dependencies)
+        self.assertEqual(['ACTION0', 'ACTION1'],
+                         sorted(db_api.dependency_get_depended(self.ctx,
+                                                               parent.id)))
+        self.assertEqual(['ACTION0'],
+                         db_api.dependency_get_depended(self.ctx, 'ACTION1'))
+
     def test_action_update(self):
         action = _create_action(self.ctx)
         values = {
@@ -209,6 +253,121 @@ class DBAPIActionTest(base.SenlinTestCase):
         self.assertEqual(consts.ACTION_RUNNING, action.status)
         self.assertEqual(timestamp, float(action.start_time))
 
+    def test_action_acquire_ready_batch(self):
+        now = tu.utcnow(True)
+        specs = [
+            {'name': 'A01', 'status': 'INIT'},
+            {'name': 'A02', 'status': 'READY', 'owner': 'worker1'},
+            {'name': 'A03', 'status': 'READY',
+             'created_at': now - datetime.timedelta(seconds=10)},
+            {'name': 'A04', 'status': 'READY',
+             'created_at': now - datetime.timedelta(seconds=20)},
+            {'name': 'A05', 'status': 'READY',
+             'created_at': now - datetime.timedelta(seconds=5)},
+        ]
+
+        for spec in specs:
+            _create_action(self.ctx, **spec)
+
+        timestamp = time.time()
+        actions = db_api.action_acquire_ready_batch(self.ctx, 'worker2',
+                                                    timestamp, 2)
+
+        self.assertEqual(['A04', 'A03'], [a.name for a in actions])
+        for action in actions:
+            self.assertEqual('worker2', action.owner)
+            self.assertEqual(consts.ACTION_RUNNING, action.status)
+            self.assertEqual(timestamp, float(action.start_time))
+
+        actions = db_api.action_acquire_ready_batch(self.ctx, 'worker3',
+                                                    timestamp, 2)
+        self.assertEqual(['A05'], [a.name for a in actions])
+
+        actions = db_api.action_acquire_ready_batch(self.ctx, 'worker3',
+                                                    timestamp, 2)
+        self.assertEqual([], actions)
+
+    def test_action_acquire_batch(self):
+        specs = [
+            {'name': 'A01', 'status': 'INIT'},
+            {'name': 'A02', 'status': 'READY', 'owner': 'worker1'},
+            {'name': 'A03', 'status': 'READY'},
+            {'name': 'A04', 'status': 'READY'},
+        ]
+        ids = [_create_action(self.ctx, **spec).id for spec in specs]
+
+        timestamp = time.time()
+        actions = db_api.action_acquire_batch(
+            self.ctx, [ids[3], ids[0], ids[1], ids[2]], 'worker2', timestamp)
+
+        # only the ready ones are acquired, in the order requested
+        self.assertEqual(['A04', 'A03'], [a.name for a in actions])
+        for action in actions:
+            self.assertEqual('worker2', action.owner)
+            self.assertEqual(consts.ACTION_RUNNING, action.status)
+            self.assertEqual(timestamp, float(action.start_time))
+
+        actions = db_api.action_acquire_batch(self.ctx, ids, 'worker3',
+                                              timestamp)
+        self.assertEqual([], actions)
+
+    def test_action_get_all_ready(self):
+        now = tu.utcnow(True)
+        specs = [
+            {'name': 'A01', 'status': 'INIT'},
+            {'name': 'A02', 'status': 'READY', 'owner': 'worker1'},
+            {'name': 'A03', 'status': 'READY',
+             'created_at': now - datetime.timedelta(seconds=10)},
+            {'name': 'A04', 'status': 'READY', 'cause': consts.CAUSE_RPC,
+             'created_at': now - datetime.timedelta(seconds=20)},
+            {'name': 'A05', 'status': 'READY',
+             'created_at': now - datetime.timedelta(seconds=5)},
+        ]
+        ids = dict((spec['name'], _create_action(self.ctx, **spec).id)
+                   for spec in specs)
+
+        actions = db_api.action_get_all_ready(self.ctx)
+        self.assertEqual([ids['A04'], ids['A03'], ids['A05']],
+                         [a.id for a in actions])
+        self.assertEqual(consts.CAUSE_RPC, actions[0].cause)
+
+        actions = db_api.action_get_all_ready(self.ctx, limit=2)
+        self.assertEqual([ids['A04'], ids['A03']], [a.id for a in actions])
+
+    def test_action_get_all_ready_by_class(self):
+        now = tu.utcnow(True)
+        specs = [
+            {'name': 'A01', 'status': 'READY', 'action': 'NODE_CREATE',
+             'created_at': now - datetime.timedelta(seconds=30)},
+            {'name': 'A02', 'status': 'READY', 'action': 'NODE_RECOVER',
+             'created_at': now - datetime.timedelta(seconds=20)},
+            {'name': 'A03', 'status': 'READY', 'action': 'CLUSTER_RESIZE',
+             'cause': consts.CAUSE_RPC,
+             'created_at': now - datetime.timedelta(seconds=10)},
+            {'name': 'A04', 'status': 'READY', 'action': 'CLUSTER_RECOVER',
+             'cause': consts.CAUSE_RPC, 'created_at': now},
+            {'name': 'A05', 'status': 'READY', 'action': 'NODE_RECOVER',
+             'owner': 'worker1'},
+        ]
+        ids = dict((_create_action(self.ctx, **spec).id, spec['name'])
+                   for spec in specs)
+
+        def names(action_class, **kwargs):
+            return [ids[a.id] for a in db_api.action_get_all_ready(
+                self.ctx, action_class=action_class, **kwargs)]
+
+        self.assertEqual(['A02', 'A04'], names('recovery'))
+        self.assertEqual(['A02'], names('recovery', limit=1))
+        self.assertEqual(['A03'], names('rpc'))
+        self.assertEqual(['A01'], names('derived'))
+
+        self.assertEqual({'recovery': 2, 'rpc': 1, 'derived': 1},
+                         db_api.action_count_ready_by_class(self.ctx))
+
+    def test_action_count_ready_by_class_empty(self):
+        self.assertEqual({'recovery': 0, 'rpc': 0, 'derived': 0},
+                         db_api.action_count_ready_by_class(self.ctx))
+
     def test_action_get_all_by_owner(self):
         specs = [
             {'name': 'A01', 'owner': 'work1'},
@@ -271,6 +430,57 @@ class DBAPIActionTest(base.SenlinTestCase):
         for name in names:
             self.assertIn(name, ['A01', 'A04', 'A05', 'A06', 'A10'])
 
+    def test_action_columns_active_by_target(self):
+        specs = [
+            {'name': 'A01', 'target': 'cluster_001', 'status': 'READY'},
+            {'name': 'A02', 'target': 'node_001', 'status': 'READY'},
+            {'name': 'A03', 'target': 'cluster_001', 'status': 'INIT'},
+            {'name': 'A04', 'target': 'cluster_001', 'status': 'RUNNING'},
+            {'name': 'A05', 'target': 'cluster_001', 'status': 'SUCCEEDED'},
+        ]
+
+        for spec in specs:
+            _create_action(self.ctx, **spec)
+
+        actions = db_api.action_columns_active_by_target(
+            self.ctx, 'cluster_001', ['id', 'name'])
+        self.assertEqual(['A01', 'A04'], sorted(a.name for a in actions))
+        # the other columns are not loaded
+        self.assertFalse(hasattr(actions[0], 'inputs'))
+
+        new_ctx = utils.dummy_context(project='another-project')
+        actions = db_api.action_columns_active_by_target(
+            new_ctx, 'cluster_001', ['id'])
+        self.assertEqual(0, len(actions))
+
+    def test_action_get_all_with_next_marker(self):
+        now = tu.utcnow(True)
+        for i in range(5):
+            _create_action(self.ctx, name='A%02d' % i,
+                           status='READY' if i % 2 else 'INIT',
+                           created_at=now - datetime.timedelta(seconds=i))
+
+        names = []
+        marker = None
+        while True:
+            actions = db_api.action_get_all(self.ctx, limit=2, marker=marker,
+                                            sort='status,created_at:desc')
+            names.extend(a.name for a in actions)
+            marker = db_api.next_marker(actions, 2,
+                                        'status,created_at:desc')
+            if marker is None:
+                break
+
+        self.assertEqual(['A00', 'A02', 'A04', 'A01', 'A03'], names)
+
+    def test_action_count_all(self):
+        _create_action(self.ctx, status='READY')
+        _create_action(self.ctx, status='INIT')
+
+        self.assertEqual(2, db_api.action_count_all(self.ctx))
+        self.assertEqual(1, db_api.action_count_all(
+            self.ctx, filters={'status': ['READY']}))
+
     def test_action_get_all_project_safe(self):
         parser.simple_parse(shared.sample_action)
         _create_action(self.ctx)
@@ -312,6 +522,49 @@ class DBAPIActionTest(base.SenlinTestCase):
                          action1.status_reason)
         self.assertEqual(round(timestamp, 6), float(action1.end_time))
 
+    def test_action_check_status_multiple_depended(self):
+        specs = [
+            {'name': 'A01', 'target': 'cluster_001', 'status': 'RUNNING'},
+            {'name': 'A02', 'target': 'node_001'},
+            {'name': 'A03', 'target': 'node_002',
+             'inputs': {'update_parent_status': False}},
+        ]
+        id_of = {}
+        for spec in specs:
+            action = _create_action(self.ctx, **spec)
+            id_of[spec['name']] = action.id
+
+        db_api.dependency_add(self.ctx, [id_of['A02'], id_of['A03']],
+                              id_of['A01'])
+        action1 = db_api.action_get(self.ctx, id_of['A01'])
+        self.assertEqual(2, action1.pending_dependencies)
+
+        timestamp = time.time()
+        db_api.action_mark_succeeded(self.ctx, id_of['A02'], timestamp)
+        action1 = db_api.action_get(self.ctx, id_of['A01'])
+        self.assertEqual(consts.ACTION_WAITING, action1.status)
+        self.assertEqual(1, action1.pending_dependencies)
+        status = db_api.action_check_status(self.ctx, id_of['A01'], timestamp)
+        self.assertEqual(consts.ACTION_WAITING, status)
+
+        db_api.action_mark_failed(self.ctx, id_of['A03'], timestamp)
+        # flipped to READY by the completion of the last depended action
+        action1 = db_api.action_get(self.ctx, id_of['A01'])
+        self.assertEqual(consts.ACTION_READY, action1.status)
+        self.assertEqual(0, action1.pending_dependencies)
+        self.assertEqual('All depended actions completed.',
+                         action1.status_reason)
+
+    def test_action_check_status_waiting_without_depended(self):
+        action = _create_action(self.ctx, status='WAITING')
+
+        timestamp = time.time()
+        status = db_api.action_check_status(self.ctx, action.id, timestamp)
+
+        self.assertEqual(consts.ACTION_READY, status)
+        action = db_api.action_get(self.ctx, action.id)
+        self.assertEqual(round(timestamp, 6), float(action.end_time))
+
     def _check_dependency_add_dependent_list(self):
         specs = [
             {'name': 'A01', 'target': 'cluster_001'},
@@ -396,7 +649,9 @@ class DBAPIActionTest(base.SenlinTestCase):
         timestamp = time.time()
         id_of = self._check_dependency_add_dependent_list()
 
-        db_api.action_mark_succeeded(self.ctx, id_of['A01'], timestamp)
+        res = db_api.action_mark_succeeded(self.ctx, id_of['A01'], timestamp)
+        self.assertEqual({id_of['A02'], id_of['A03'], id_of['A04']},
+                         set(res))
 
         res = db_api.dependency_get_depended(self.ctx, id_of['A01'])
         self.assertEqual(0, len(res))
@@ -408,6 +663,9 @@ class DBAPIActionTest(base.SenlinTestCase):
         for aid in [id_of['A02'], id_of['A03'], id_of['A04']]:
             res = db_api.dependency_get_dependents(self.ctx, aid)
             self.assertEqual(0, len(res))
+            action = db_api.action_get(self.ctx, aid)
+            self.assertEqual(consts.ACTION_READY, action.status)
+            self.assertEqual(0, action.pending_dependencies)
 
     def _prepare_action_mark_failed_cancel(self):
         specs = [
@@ -475,7 +733,7 @@ class DBAPIActionTest(base.SenlinTestCase):
         timestamp = time.time()
         id_of = self._prepare_action_mark_failed_cancel()
         with db_api.session_for_write() as session:
-            db_api._mark_engine_failed(session, id_of['A01'],
+            db_api._mark_engine_failed(session, [id_of['A01']],
                                        timestamp, 'BOOM')
         for aid in [id_of['A02'], id_of['A03'], id_of['A04']]:
             action = db_api.action_get(self.ctx, aid)
@@ -496,7 +754,7 @@ class DBAPIActionTest(base.SenlinTestCase):
         timestamp = time.time()
         id_of = self._prepare_action_mark_failed_cancel()
         with db_api.session_for_write() as session:
-            db_api._mark_engine_failed(session, id_of['A02'],
+            db_api._mark_engine_failed(session, [id_of['A02']],
                                        timestamp, 'BOOM')
 
         for aid in [id_of['A03'], id_of['A04']]:
@@ -524,7 +782,9 @@ class DBAPIActionTest(base.SenlinTestCase):
     def test_action(self):
         timestamp = time.time()
         id_of = self._prepare_action_mark_failed_cancel()
-        db_api.action_mark_failed(self.ctx, id_of['A01'], timestamp)
+        res = db_api.action_mark_failed(self.ctx, id_of['A01'], timestamp)
+        self.assertEqual({id_of['A05'], id_of['A06'], id_of['A07']},
+                         set(res))
 
         for aid in [id_of['A05'], id_of['A06'], id_of['A07']]:
             action = db_api.action_get(self.ctx, aid)
@@ -558,6 +818,54 @@ class DBAPIActionTest(base.SenlinTestCase):
         result = db_api.dependency_get_dependents(self.ctx, id_of['A01'])
         self.assertEqual(3, len(result))
 
+    def test_action_mark_failed_cascade(self):
+        timestamp = time.time()
+        id_of = self._prepare_action_mark_failed_cancel()
+        db_api.action_mark_failed(self.ctx, id_of['A02'], timestamp, 'BOOM')
+
+        action = db_api.action_get(self.ctx, id_of['A02'])
+        self.assertEqual(consts.ACTION_FAILED, action.status)
+        self.assertEqual('BOOM', action.status_reason)
+
+        # the failure cascades through A01 to its own dependents
+        for aid in [id_of['A01'], id_of['A05'], id_of['A06'], id_of['A07']]:
+            action = db_api.action_get(self.ctx, aid)
+            self.assertEqual(consts.ACTION_FAILED, action.status)
+            self.assertEqual('Action execution failed', action.status_reason)
+            self.assertEqual(round(timestamp, 6), float(action.end_time))
+            self.assertEqual(0, len(db_api.dependency_get_dependents(
+                self.ctx, aid)))
+        action = db_api.action_get(self.ctx, id_of['A01'])
+        self.assertEqual(2, action.pending_dependencies)
+
+        for aid in [id_of['A03'], id_of['A04']]:
+            action = db_api.action_get(self.ctx, aid)
+            self.assertEqual(consts.ACTION_INIT, action.status)
+
+    def test_action_mark_failed_shared_dependent(self):
+        specs = [
+            {'name': 'A01', 'status': 'WAITING', 'target': 'cluster_001'},
+            {'name': 'A02', 'status': 'WAITING', 'target': 'cluster_001'},
+            {'name': 'A03', 'status': 'INIT', 'target': 'node_001',
+             'inputs': {'update_parent_status': False}},
+        ]
+        id_of = {}
+        for spec in specs:
+            action = _create_action(self.ctx, **spec)
+            id_of[spec['name']] = action.id
+        db_api.dependency_add(self.ctx, id_of['A03'],
+                              [id_of['A01'], id_of['A02']])
+
+        timestamp = time.time()
+        res = db_api.action_mark_failed(self.ctx, id_of['A03'], timestamp)
+
+        self.assertEqual({id_of['A01'], id_of['A02']}, set(res))
+        # not failed in cascade but released
+        for aid in [id_of['A01'], id_of['A02']]:
+            action = db_api.action_get(self.ctx, aid)
+            self.assertEqual(consts.ACTION_READY, action.status)
+            self.assertEqual(0, action.pending_dependencies)
+
     def test_action_mark_cancelled(self):
         timestamp = time.time()
         id_of = self._prepare_action_mark_failed_cancel()
@@ -641,6 +949,54 @@ class DBAPIActionTest(base.SenlinTestCase):
                                        timestamp)
         self.assertIsNone(action)
 
+    def test_action_acquire_not_before(self):
+        action = _create_action(self.ctx)
+        # whole seconds are not rounded when stored
+        timestamp = float(int(time.time()))
+        db_api.action_update(self.ctx, action.id,
+                             {'status': 'READY', 'not_before': timestamp + 10})
+
+        result = db_api.action_acquire(self.ctx, action.id, 'worker1',
+                                       timestamp)
+        self.assertIsNone(result)
+
+        result = db_api.action_acquire(self.ctx, action.id, 'worker1',
+                                       timestamp + 10)
+        self.assertEqual('worker1', result.owner)
+        self.assertEqual(consts.ACTION_RUNNING, result.status)
+
+    def test_action_acquire_ready_not_before(self):
+        timestamp = float(int(time.time()))
+        specs = [
+            {'name': 'A01', 'status': 'READY', 'not_before': timestamp + 10},
+            {'name': 'A02', 'status': 'READY', 'not_before': timestamp - 10},
+        ]
+        ids = dict((spec['name'], _create_action(self.ctx, **spec).id)
+                   for spec in specs)
+
+        actions = db_api.action_get_all_ready(self.ctx, timestamp=timestamp)
+        self.assertEqual([ids['A02']], [a.id for a in actions])
+        actions = db_api.action_get_all_ready(self.ctx)
+        self.assertEqual(2, len(actions))
+
+        actions = db_api.action_acquire_batch(
+            self.ctx, [ids['A01'], ids['A02']], 'worker1', timestamp)
+        self.assertEqual(['A02'], [a.name for a in actions])
+
+        action = db_api.action_acquire_first_ready(self.ctx, 'worker1',
+                                                   timestamp)
+        self.assertIsNone(action)
+        action = db_api.action_acquire_random_ready(self.ctx, 'worker1',
+                                                    timestamp)
+        self.assertIsNone(action)
+        actions = db_api.action_acquire_ready_batch(self.ctx, 'worker1',
+                                                    timestamp, 10)
+        self.assertEqual([], actions)
+
+        actions = db_api.action_acquire_ready_batch(self.ctx, 'worker1',
+                                                    timestamp + 10, 10)
+        self.assertEqual(['A01'], [a.name for a in actions])
+
     def test_action_delete(self):
         action = _create_action(self.ctx)
         self.assertIsNotNone(action)
@@ -803,3 +1159,22 @@ class DBAPIActionTest(base.SenlinTestCase):
 
         actions = db_api.action_get_all(self.ctx)
         self.assertEqual(3, len(actions))
+
+    def test_action_purge_in_chunks(self):
+        old_timestamp = tu.utcnow(True) - datetime.timedelta(days=6)
+        old = [_create_action(self.ctx, created_at=old_timestamp)
+               for _ in range(3)]
+        new = _create_action(self.ctx, created_at=tu.utcnow(True))
+        db_api.dependency_add(self.ctx, [old[0].id], old[1].id)
+        db_api.dependency_add(self.ctx, [old[2].id], new.id)
+        progress = []
+
+        res = db_api.action_purge(project=None, granularity='days', age=5,
+                                  chunk_size=2, progress=progress.append)
+
+        self.assertEqual(3, res)
+        self.assertEqual([2, 3], progress)
+        actions = db_api.action_get_all(self.ctx)
+        self.assertEqual([new.id], [a.id for a in actions])
+        self.assertEqual([], db_api.dependency_get_depended(self.ctx,
+                                                            new.id))
@@ -167,6 +167,49 @@ class DBAPIClusterTest(base.SenlinTestCase):
         res = db_api.cluster_get_by_short_id(ctx_new, UUID1[:11])
         self.assertIsNone(res)
 
+    def test_cluster_get_by_identity(self):
+        cluster1 = shared.create_cluster(self.ctx, self.profile, id=UUID1,
+                                         name='cluster-1')
+        cluster2 = shared.create_cluster(self.ctx, self.profile, id=UUID2,
+                                         name=UUID1[:8])
+
+        res = db_api.cluster_get_by_identity(self.ctx, UUID1)
+        self.assertEqual(cluster1.id, res.id)
+        self.assertEqual([], res.nodes)
+        res = db_api.cluster_get_by_identity(self.ctx, 'cluster-1')
+        self.assertEqual(cluster1.id, res.id)
+        # A name is preferred over a short ID
+        res = db_api.cluster_get_by_identity(self.ctx, UUID1[:8])
+        self.assertEqual(cluster2.id, res.id)
+        res = db_api.cluster_get_by_identity(self.ctx, UUID2[:8])
+        self.assertEqual(cluster2.id, res.id)
+        res = db_api.cluster_get_by_identity(self.ctx, 'non-existent')
+        self.assertIsNone(res)
+
+        ctx_new = utils.dummy_context(project='different_project_id')
+        res = db_api.cluster_get_by_identity(ctx_new, UUID1)
+        self.assertIsNone(res)
+        res = db_api.cluster_get_by_identity(ctx_new, UUID1,
+                                             project_safe=False)
+        self.assertEqual(cluster1.id, res.id)
+
+    def test_cluster_get_by_identity_multiple_choices(self):
+        cluster1 = shared.create_cluster(self.ctx, self.profile,
+                                         id='same-part-unique-part',
+                                         name='cluster')
+        shared.create_cluster(self.ctx, self.profile,
+                              id='same-part-part-unique', name='cluster')
+
+        self.assertRaises(exception.MultipleChoices,
+                          db_api.cluster_get_by_identity,
+                          self.ctx, 'cluster')
+        self.assertRaises(exception.MultipleChoices,
+                          db_api.cluster_get_by_identity,
+                          self.ctx, 'same-part')
+        # An ID is preferred over names and short IDs
+        res = db_api.cluster_get_by_identity(self.ctx, cluster1.id)
+        self.assertEqual(cluster1.id, res.id)
+
     def test_cluster_get_all(self):
         values = [
             {'name': 'cluster1'},
@@ -181,6 +224,40 @@ class DBAPIClusterTest(base.SenlinTestCase):
         names = [ret_cluster.name for ret_cluster in ret_clusters]
         [self.assertIn(val['name'], names) for val in values]
 
+    def test_cluster_get_node_ids(self):
+        cluster = shared.create_cluster(self.ctx, self.profile)
+        nodes = [shared.create_node(self.ctx, cluster, self.profile)
+                 for _ in range(3)]
+
+        ret_cluster = db_api.cluster_get(self.ctx, cluster.id)
+        self.assertEqual(sorted(n.id for n in nodes),
+                         sorted(n.id for n in ret_cluster.nodes))
+
+    def test_cluster_get_without_nodes(self):
+        cluster = shared.create_cluster(self.ctx, self.profile)
+        shared.create_node(self.ctx, cluster, self.profile)
+
+        ret_cluster = db_api.cluster_get(self.ctx, cluster.id,
+                                         load_nodes=False)
+        self.assertEqual(cluster.id, ret_cluster.id)
+        self.assertEqual([], ret_cluster.nodes)
+        self.assertEqual(self.profile.name, ret_cluster.profile.name)
+
+    def test_cluster_get_all_node_ids(self):
+        cluster1 = shared.create_cluster(self.ctx, self.profile)
+        cluster2 = shared.create_cluster(self.ctx, self.profile)
+        node1 = shared.create_node(self.ctx, cluster1, self.profile)
+        node2 = shared.create_node(self.ctx, cluster1, self.profile)
+
+        ret_clusters = db_api.cluster_get_all(self.ctx)
+        nodes = dict((c.id, sorted(n.id for n in c.nodes))
+                     for c in ret_clusters)
+        self.assertEqual({cluster1.id: sorted([node1.id, node2.id]),
+                          cluster2.id: []}, nodes)
+
+        ret_clusters = db_api.cluster_get_all(self.ctx, load_nodes=False)
+        self.assertEqual([[], []], [c.nodes for c in ret_clusters])
+
     def test_cluster_get_all_with_regular_project(self):
         values = [
             {'project': UUID1},
@@ -296,6 +373,40 @@ class DBAPIClusterTest(base.SenlinTestCase):
         self.assertEqual(1, len(cl_db))
         self.assertEqual(clusters[2].id, cl_db[0].id)
 
+    def test_cluster_get_all_next_marker(self):
+        now = tu.utcnow(True)
+        clusters = [shared.create_cluster(self.ctx, self.profile,
+                                          name='cluster-%s' % (i % 2),
+                                          init_at=now)
+                    for i in range(5)]
+        # The ID is the last sorting key, in ascending order
+        expected = sorted(sorted(clusters, key=lambda c: c.id),
+                          key=lambda c: c.name, reverse=True)
+
+        results = []
+        marker = None
+        for page in range(3):
+            cl_db = db_api.cluster_get_all(self.ctx, limit=2, marker=marker,
+                                           sort='name:desc')
+            results.extend(cl_db)
+            marker = db_api.next_marker(cl_db, 2, 'name:desc')
+
+        self.assertIsNone(marker)
+        self.assertEqual([c.id for c in expected], [c.id for c in results])
+
+    def test_cluster_get_all_next_marker_default_sort(self):
+        now = tu.utcnow(True)
+        clusters = [shared.create_cluster(self.ctx, self.profile,
+                                          init_at=now)
+                    for x in range(3)]
+        expected = sorted(c.id for c in clusters)
+
+        cl_db = db_api.cluster_get_all(self.ctx, limit=2)
+        marker = db_api.next_marker(cl_db, 2, None, 'init_at')
+        cl_db.extend(db_api.cluster_get_all(self.ctx, limit=2,
+                                            marker=marker))
+        self.assertEqual(expected, [c.id for c in cl_db])
+
     def test_cluster_get_all_non_existing_marker(self):
         [shared.create_cluster(self.ctx, self.profile) for x in range(3)]
         uuid = "this cluster doesn't exist"
@@ -316,6 +427,30 @@ class DBAPIClusterTest(base.SenlinTestCase):
         res = db_api.cluster_get(self.ctx, cluster_id)
         self.assertEqual(3, res.next_index)
 
+    def test_cluster_reserve_indexes(self):
+        cluster = shared.create_cluster(self.ctx, self.profile)
+
+        res = db_api.cluster_reserve_indexes(self.ctx, cluster.id, 3)
+        self.assertEqual(1, res)
+        res = db_api.cluster_get(self.ctx, cluster.id)
+        self.assertEqual(4, res.next_index)
+        res = db_api.cluster_reserve_indexes(self.ctx, cluster.id, 2)
+        self.assertEqual(4, res)
+        res = db_api.cluster_next_index(self.ctx, cluster.id)
+        self.assertEqual(6, res)
+
+    def test_cluster_reserve_indexes_not_found(self):
+        res = db_api.cluster_reserve_indexes(self.ctx, 'BOGUS', 3)
+        self.assertEqual(0, res)
+
+    def test_cluster_count_all_replica(self):
+        shared.create_cluster(self.ctx, self.profile, name='foo')
+        shared.create_cluster(self.ctx, self.profile, name='bar')
+
+        res = db_api.cluster_count_all(self.ctx, filters={'name': 'foo'},
+                                       replica=True)
+        self.assertEqual(1, res)
+
     def test_cluster_count_all(self):
         clusters = [shared.create_cluster(self.ctx, self.profile)
                     for i in range(3)]
@@ -140,6 +140,31 @@ class DBAPIClusterPolicyTest(base.SenlinTestCase):
         self.assertEqual(1, len(bindings))
         self.assertEqual(timestamp, bindings[0].last_op)
 
+    def test_policy_generation(self):
+        def generation():
+            cluster = db_api.cluster_get(self.ctx, self.cluster.id)
+            return cluster.policy_generation
+
+        policy = self.create_policy()
+        self.assertEqual(0, generation())
+
+        db_api.cluster_policy_attach(self.ctx, self.cluster.id, policy.id, {})
+        self.assertEqual(1, generation())
+
+        db_api.cluster_policy_update(self.ctx, self.cluster.id, policy.id,
+                                     {'enabled': False})
+        self.assertEqual(2, generation())
+
+        db_api.policy_update(self.ctx, policy.id, {'name': 'new_name'})
+        self.assertEqual(3, generation())
+
+        db_api.cluster_policy_detach(self.ctx, self.cluster.id, policy.id)
+        self.assertEqual(4, generation())
+
+        # Policies not attached to the cluster do not change it
+        db_api.policy_update(self.ctx, policy.id, {'name': 'old_name'})
+        self.assertEqual(4, generation())
+
     def test_cluster_policy_get(self):
         policy = self.create_policy()
 
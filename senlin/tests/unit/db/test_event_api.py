@@ -10,6 +10,9 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
+
+from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import reflection
 from oslo_utils import timeutils as tu
@@ -88,6 +91,24 @@ class DBAPIEventTest(base.SenlinTestCase):
         self.assertEqual(self.ctx.user_id, ret_event.user)
         self.assertEqual(self.ctx.project_id, ret_event.project)
 
+    def test_event_create_bulk(self):
+        values = [{
+            'timestamp': tu.utcnow(True),
+            'level': logging.INFO,
+            'oid': 'OBJ%s' % i,
+            'user': self.ctx.user_id,
+            'project': self.ctx.project_id,
+        } for i in range(3)]
+
+        res = db_api.event_create_bulk(self.ctx, values)
+
+        self.assertIsNone(res)
+        events = db_api.event_get_all(self.ctx)
+        self.assertEqual(3, len(events))
+        self.assertEqual(['OBJ0', 'OBJ1', 'OBJ2'],
+                         sorted(e.oid for e in events))
+        self.assertEqual(3, len(set(e.id for e in events)))
+
     def test_event_get_diff_project(self):
         event = self.create_event(self.ctx)
         new_ctx = utils.dummy_context(project='a-different-project')
@@ -131,6 +152,20 @@ class DBAPIEventTest(base.SenlinTestCase):
         self.assertIsNotNone(res)
         self.assertEqual(event.id, res.id)
 
+    def test_event_get_by_identity(self):
+        event = self.create_event(self.ctx)
+
+        res = db_api.event_get_by_identity(self.ctx, event.id)
+        self.assertEqual(event.id, res.id)
+        res = db_api.event_get_by_identity(self.ctx, event.id[:8])
+        self.assertEqual(event.id, res.id)
+        res = db_api.event_get_by_identity(self.ctx, 'non-existent')
+        self.assertIsNone(res)
+
+        new_ctx = utils.dummy_context(project='a-different-project')
+        res = db_api.event_get_by_identity(new_ctx, event.id)
+        self.assertIsNone(res)
+
     def test_event_get_all(self):
         cluster1 = shared.create_cluster(self.ctx, self.profile)
         cluster2 = shared.create_cluster(self.ctx, self.profile)
@@ -194,6 +229,33 @@ class DBAPIEventTest(base.SenlinTestCase):
         self.assertEqual(1, len(events))
         self.assertEqual(event2_id, events[0].id)
 
+    def test_event_get_all_with_next_marker(self):
+        cluster1 = shared.create_cluster(self.ctx, self.profile)
+        events = [self.create_event(self.ctx, entity=cluster1,
+                                    timestamp=tu.utcnow(True))
+                  for i in range(3)]
+
+        page = db_api.event_get_all(self.ctx, limit=2)
+        marker = db_api.next_marker(page, 2, None, 'timestamp')
+        self.assertEqual([events[0].id, events[1].id], [e.id for e in page])
+
+        page = db_api.event_get_all(self.ctx, limit=2, marker=marker)
+        self.assertEqual([events[2].id], [e.id for e in page])
+        self.assertIsNone(db_api.next_marker(page, 2, None, 'timestamp'))
+
+    def test_event_count_all(self):
+        cluster1 = shared.create_cluster(self.ctx, self.profile)
+        self.create_event(self.ctx, entity=cluster1, action='action1')
+        self.create_event(self.ctx, entity=cluster1, action='action2')
+
+        self.assertEqual(2, db_api.event_count_all(self.ctx))
+        self.assertEqual(1, db_api.event_count_all(
+            self.ctx, filters={'action': 'action1'}))
+        new_ctx = utils.dummy_context(project='another-project')
+        self.assertEqual(0, db_api.event_count_all(new_ctx))
+        self.assertEqual(2, db_api.event_count_all(new_ctx,
+                                                   project_safe=False))
+
     def test_event_get_all_with_sorting(self):
         cluster1 = shared.create_cluster(self.ctx, self.profile)
 
@@ -548,3 +610,84 @@ class DBAPIEventTest(base.SenlinTestCase):
         db_api.event_purge(project=None, granularity='days', age=5)
         res = db_api.event_get_all_by_cluster(self.ctx, cluster1.id)
         self.assertEqual(1, len(res))
+
+    def test_event_purge_in_chunks(self):
+        cluster1 = shared.create_cluster(self.ctx, self.profile)
+        for i in range(5):
+            self.create_event(self.ctx, entity=cluster1)
+        self.create_event(self.ctx, timestamp=tu.utcnow(), entity=cluster1)
+        progress = []
+
+        res = db_api.event_purge(project=None, granularity='days', age=5,
+                                 chunk_size=2, progress=progress.append)
+
+        self.assertEqual(5, res)
+        self.assertEqual([2, 4, 5], progress)
+        res = db_api.event_get_all_by_cluster(self.ctx, cluster1.id)
+        self.assertEqual(1, len(res))
+
+    def test_event_purge_by_project(self):
+        cluster1 = shared.create_cluster(self.ctx, self.profile)
+        self.create_event(self.ctx, entity=cluster1)
+        ctx2 = utils.dummy_context(project='another-project')
+        self.create_event(ctx2, entity=cluster1)
+
+        res = db_api.event_purge(project=['another-project'],
+                                 granularity='days', age=5)
+
+        self.assertEqual(1, res)
+        res = db_api.event_get_all(self.ctx, project_safe=False)
+        self.assertEqual(1, len(res))
+        self.assertEqual(self.ctx.project_id, res[0].project)
+
+    def test_event_prune_in_chunks(self):
+        cluster1 = shared.create_cluster(self.ctx, self.profile)
+        for i in range(5):
+            self.create_event(self.ctx, entity=cluster1)
+        cfg.CONF.set_override('purge_chunk_size', 2)
+
+        res = db_api.event_prune(self.ctx, cluster1.id)
+
+        self.assertEqual(5, res)
+        res = db_api.event_get_all_by_cluster(self.ctx, cluster1.id)
+        self.assertEqual(0, len(res))
+
+    def test_event_purge_excess(self):
+        cluster1 = shared.create_cluster(self.ctx, self.profile)
+        cluster2 = shared.create_cluster(self.ctx, self.profile)
+        node_orphan = shared.create_node(self.ctx, None, self.profile)
+        base_time = tu.utcnow()
+        for i in range(5):
+            self.create_event(
+                self.ctx, entity=cluster1, status=str(i),
+                timestamp=base_time + datetime.timedelta(seconds=i))
+        for i in range(2):
+            self.create_event(self.ctx, entity=cluster2)
+        for i in range(4):
+            self.create_event(self.ctx, entity=node_orphan)
+        progress = []
+
+        res = db_api.event_purge_excess(2, chunk_size=2,
+                                        progress=progress.append)
+
+        self.assertEqual(3, res)
+        self.assertEqual([2, 3], progress)
+        res = db_api.event_get_all_by_cluster(self.ctx, cluster1.id)
+        self.assertEqual(['3', '4'], sorted(e.status for e in res))
+        res = db_api.event_get_all_by_cluster(self.ctx, cluster2.id)
+        self.assertEqual(2, len(res))
+        res = db_api.event_get_all(self.ctx, filters={'oid': node_orphan.id})
+        self.assertEqual(4, len(res))
+
+    def test_event_purge_excess_same_timestamp(self):
+        cluster1 = shared.create_cluster(self.ctx, self.profile)
+        timestamp = tu.utcnow()
+        events = [self.create_event(self.ctx, entity=cluster1,
+                                    timestamp=timestamp) for i in range(5)]
+
+        res = db_api.event_purge_excess(3)
+
+        self.assertEqual(2, res)
+        res = db_api.event_get_all_by_cluster(self.ctx, cluster1.id)
+        self.assertEqual(sorted(e.id for e in events)[2:],
+                         sorted(e.id for e in res))
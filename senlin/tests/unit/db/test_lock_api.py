@@ -10,8 +10,12 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import mock
 from oslo_utils import uuidutils
+import sqlalchemy
+
 from senlin.db.sqlalchemy import api as db_api
+from senlin.db.sqlalchemy import models
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
 from senlin.tests.unit.db import shared
@@ -263,6 +267,55 @@ class DBAPILockTest(base.SenlinTestCase):
         observed = db_api.node_is_locked(self.node.id)
         self.assertFalse(observed)
 
+    def test_lock_waiter_add_remove(self):
+        db_api.lock_waiter_add(self.cluster.id, UUID2, 'E1', 100.0)
+        db_api.lock_waiter_add(self.cluster.id, UUID3, 'E2', 101.0)
+        # adding an action already in line is a no-op
+        db_api.lock_waiter_add(self.cluster.id, UUID2, 'E1', 102.0)
+        self.assertIsNone(db_api.lock_waiter_get_first(self.node.id))
+
+        first = db_api.lock_waiter_get_first(self.cluster.id)
+        self.assertEqual(UUID2, first.action_id)
+        self.assertEqual('E1', first.engine_id)
+        self.assertEqual(100.0, float(first.created_at))
+
+        db_api.lock_waiter_remove(self.cluster.id, UUID2)
+        first = db_api.lock_waiter_get_first(self.cluster.id)
+        self.assertEqual(UUID3, first.action_id)
+
+        db_api.lock_waiter_remove(self.cluster.id, UUID3)
+        self.assertIsNone(db_api.lock_waiter_get_first(self.cluster.id))
+
+    def test_cluster_lock_acquire_in_turn(self):
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID1, 1)
+        self.assertEqual([UUID1], observed)
+        db_api.lock_waiter_add(self.cluster.id, UUID2, 'E1', 100.0)
+
+        # node scope lock not shared with actions behind a waiter
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID3, 1)
+        self.assertEqual([UUID1], observed)
+
+        db_api.cluster_lock_release(self.cluster.id, UUID1, 1)
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID3, -1)
+        self.assertEqual([], observed)
+
+        # the first waiter gets the lock
+        observed = db_api.cluster_lock_acquire(self.cluster.id, UUID2, -1)
+        self.assertEqual([UUID2], observed)
+
+    def test_node_lock_acquire_in_turn(self):
+        db_api.lock_waiter_add(self.node.id, UUID2, 'E1', 100.0)
+
+        observed = db_api.node_lock_acquire(self.node.id, UUID1)
+        self.assertIsNone(observed)
+
+        observed = db_api.node_lock_acquire(self.node.id, UUID2)
+        self.assertEqual(UUID2, observed)
+        db_api.lock_waiter_remove(self.node.id, UUID2)
+
+        observed = db_api.node_lock_acquire(self.node.id, UUID1)
+        self.assertEqual(UUID2, observed)
+
 
 class GCByEngineTest(base.SenlinTestCase):
 
@@ -299,6 +352,16 @@ class GCByEngineTest(base.SenlinTestCase):
         self.assertEqual('FAILED', new_action.status)
         self.assertEqual("Engine failure", new_action.status_reason)
 
+    def test_delete_lock_waiter(self):
+        db_api.lock_waiter_add(self.cluster.id, UUID2, UUID1, 100.0)
+        db_api.lock_waiter_add(self.node.id, UUID3, UUID2, 100.0)
+
+        db_api.gc_by_engine(UUID1)
+
+        self.assertIsNone(db_api.lock_waiter_get_first(self.cluster.id))
+        first = db_api.lock_waiter_get_first(self.node.id)
+        self.assertEqual(UUID3, first.action_id)
+
     def test_delete_cluster_lock_and_node_lock_1(self):
         # Test the case that an action is about node that also locked a
         # cluster and the cluster lock can be released
@@ -371,6 +434,83 @@ class GCByEngineTest(base.SenlinTestCase):
         self.assertEqual('FAILED', new_action.status)
         self.assertEqual("Engine failure", new_action.status_reason)
 
+    def test_gc_many_locks(self):
+        # Locks of many clusters and nodes, one in ten held by the dead
+        # engine, one of those shared with an action of a live engine
+        engine_id = UUID1
+        dead = ['DEAD%04d' % i for i in range(50)]
+        alive = ['LIVE%04d' % i for i in range(450)]
+        with db_api.session_for_write() as session:
+            session.bulk_insert_mappings(models.Action, [
+                {'id': a, 'owner': engine_id, 'status': 'RUNNING',
+                 'inputs': {}} for a in dead])
+            locks = [{'cluster_id': 'C%04d' % i, 'action_ids': [a],
+                      'semaphore': 1} for i, a in enumerate(dead + alive)]
+            locks[0]['action_ids'] = [dead[0], alive[0]]
+            locks[0]['semaphore'] = 2
+            session.bulk_insert_mappings(models.ClusterLock, locks)
+            session.bulk_insert_mappings(models.NodeLock, [
+                {'node_id': 'N%04d' % i, 'action_id': a}
+                for i, a in enumerate(dead + alive)])
+
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db_api.get_engine()
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', count)
+        self.addCleanup(sqlalchemy.event.remove, engine,
+                        'before_cursor_execute', count)
+
+        db_api.gc_by_engine(engine_id)
+
+        # the number of statements does not grow with the number of actions
+        self.assertLess(len(statements), 15)
+        with db_api.session_for_read() as session:
+            self.assertEqual(451, session.query(models.ClusterLock).count())
+            self.assertEqual(450, session.query(models.NodeLock).count())
+            lock = session.query(models.ClusterLock).get('C0000')
+            self.assertEqual([alive[0]], lock.action_ids)
+            self.assertEqual(1, lock.semaphore)
+            failed = session.query(models.Action).filter_by(
+                status='FAILED').count()
+            self.assertEqual(50, failed)
+
+    @mock.patch.object(db_api, 'LOCK_MATCH_CHUNK_SIZE', 2)
+    def test_cluster_locks_by_actions(self):
+        with db_api.session_for_write() as session:
+            session.bulk_insert_mappings(models.ClusterLock, [
+                {'cluster_id': 'C1', 'action_ids': ['A1'], 'semaphore': 1},
+                {'cluster_id': 'C2', 'action_ids': ['A10'], 'semaphore': 1},
+                {'cluster_id': 'C3', 'action_ids': ['A2', 'A3'],
+                 'semaphore': 2},
+                {'cluster_id': 'C4', 'action_ids': ['A4'], 'semaphore': 1},
+                {'cluster_id': 'C5', 'action_ids': ['A5'], 'semaphore': 1},
+            ])
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db_api.get_engine()
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', record)
+        self.addCleanup(sqlalchemy.event.remove, engine,
+                        'before_cursor_execute', record)
+
+        with db_api.session_for_read() as session:
+            res = db_api._cluster_locks_by_actions(
+                session, set(['A1', 'A3', 'A5']))
+
+        # IDs having others as their prefixes are not mistaken for them
+        self.assertEqual(['C1', 'C3', 'C5'], res)
+        # one query per chunk of IDs, matching the candidates in SQL
+        queries = [s for s in statements if 'cluster_lock' in s]
+        self.assertEqual(2, len(queries))
+        for query in queries:
+            self.assertIn('LIKE', query)
+
 
 class DummyGCByEngineTest(base.SenlinTestCase):
 
@@ -19,6 +19,7 @@ import six
 from senlin.common import consts
 from senlin.common import exception
 from senlin.db.sqlalchemy import api as db_api
+from senlin.db.sqlalchemy import models
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
 from senlin.tests.unit.db import shared
@@ -270,6 +271,19 @@ class DBAPINodeTest(base.SenlinTestCase):
         nodes = db_api.node_get_all(self.ctx, limit=1, marker='node1')
         self.assertEqual(1, len(nodes))
 
+    def test_node_count_all(self):
+        shared.create_node(self.ctx, None, self.profile, name='node1')
+        shared.create_node(self.ctx, self.cluster, self.profile,
+                           name='node2')
+        shared.create_node(self.ctx, self.cluster, self.profile,
+                           name='node3')
+
+        self.assertEqual(3, db_api.node_count_all(self.ctx))
+        self.assertEqual(2, db_api.node_count_all(
+            self.ctx, cluster_id=self.cluster.id))
+        self.assertEqual(1, db_api.node_count_all(
+            self.ctx, filters={'name': ['node1', 'node4']}))
+
     @mock.patch.object(sa_utils, 'paginate_query')
     def test_node_get_all_used_sort_keys(self, mock_paginate):
         node_ids = ['node1', 'node2', 'node3']
@@ -394,7 +408,8 @@ class DBAPINodeTest(base.SenlinTestCase):
         # retrieve all nodes
         nodes = db_api.node_get_all_by_cluster(self.ctx, None)
         self.assertEqual(4, len(nodes))
-        self.assertEqual(node0.id, nodes[0].id)
+        self.assertEqual(set([node0.id, node1.id, node2.id, node3.id]),
+                         set([n.id for n in nodes]))
 
         nodes = db_api.node_get_all_by_cluster(self.ctx, cluster1.id)
         self.assertEqual(1, len(nodes))
@@ -535,6 +550,38 @@ class DBAPINodeTest(base.SenlinTestCase):
         self.assertEqual(1, len(results))
         self.assertEqual(node0.id, results[0])
 
+    def test_columns_by_cluster(self):
+        shared.create_node(self.ctx, None, self.profile)
+        node1 = shared.create_node(self.ctx, self.cluster, self.profile,
+                                   role='master')
+        node2 = shared.create_node(self.ctx, self.cluster, self.profile)
+
+        results = db_api.node_columns_by_cluster(self.ctx, self.cluster.id,
+                                                 ['id', 'status'])
+        self.assertEqual(2, len(results))
+        self.assertEqual(set([node1.id, node2.id]),
+                         set(r.id for r in results))
+        self.assertEqual(set(['ACTIVE']), set(r.status for r in results))
+        # the other columns are not loaded
+        self.assertFalse(hasattr(results[0], 'metadata'))
+        self.assertFalse(hasattr(results[0], 'data'))
+
+        results = db_api.node_columns_by_cluster(self.ctx, self.cluster.id,
+                                                 ['id'],
+                                                 filters={'role': 'master'})
+        self.assertEqual([node1.id], [r.id for r in results])
+
+    def test_columns_by_cluster_project_safe(self):
+        shared.create_node(self.ctx, self.cluster, self.profile)
+        new_ctx = utils.dummy_context(project='another-project')
+
+        results = db_api.node_columns_by_cluster(new_ctx, self.cluster.id,
+                                                 ['id'])
+        self.assertEqual(0, len(results))
+        results = db_api.node_columns_by_cluster(new_ctx, self.cluster.id,
+                                                 ['id'], project_safe=False)
+        self.assertEqual(1, len(results))
+
     def test_node_update(self):
         node = shared.create_node(self.ctx, self.cluster, self.profile)
         new_attributes = {
@@ -595,6 +642,17 @@ class DBAPINodeTest(base.SenlinTestCase):
         self.assertEqual(1, len(nodes))
         self.assertEqual('NEW-ROLE', nodes[0].role)
 
+    def test_node_migrate_with_index(self):
+        node_orphan = shared.create_node(self.ctx, None, self.profile)
+        first = db_api.cluster_reserve_indexes(self.ctx, self.cluster.id, 2)
+
+        node = db_api.node_migrate(self.ctx, node_orphan.id, self.cluster.id,
+                                   tu.utcnow(True), index=first + 1)
+
+        self.assertEqual(2, node.index)
+        cluster = db_api.cluster_get(self.ctx, self.cluster.id)
+        self.assertEqual(3, cluster.next_index)
+
     def test_node_migrate_to_none(self):
         node = shared.create_node(self.ctx, self.cluster, self.profile)
         timestamp = tu.utcnow(True)
@@ -667,6 +725,50 @@ class DBAPINodeTest(base.SenlinTestCase):
         nodes = db_api.node_get_all_by_cluster(self.ctx, self.cluster.id)
         self.assertEqual(0, len(nodes))
 
+    def test_node_generation(self):
+        def generation(cluster_id):
+            return db_api.cluster_get(self.ctx, cluster_id).node_generation
+
+        cluster2 = shared.create_cluster(self.ctx, self.profile)
+        self.assertEqual(0, generation(self.cluster.id))
+
+        node = shared.create_node(self.ctx, self.cluster, self.profile)
+        self.assertEqual(1, generation(self.cluster.id))
+
+        db_api.node_update(self.ctx, node.id, {'status': 'ERROR'})
+        self.assertEqual(2, generation(self.cluster.id))
+
+        db_api.node_migrate(self.ctx, node.id, cluster2.id, tu.utcnow(True))
+        self.assertEqual(3, generation(self.cluster.id))
+        self.assertEqual(1, generation(cluster2.id))
+
+        db_api.node_delete(self.ctx, node.id)
+        self.assertEqual(3, generation(self.cluster.id))
+        self.assertEqual(2, generation(cluster2.id))
+
+    def test_node_generation_per_node(self):
+        def generation(node_id):
+            return db_api.node_get(self.ctx, node_id).generation
+
+        node1 = shared.create_node(self.ctx, self.cluster, self.profile)
+        node2 = shared.create_node(self.ctx, self.cluster, self.profile)
+        self.assertEqual(0, generation(node1.id))
+
+        db_api.node_update(self.ctx, node1.id, {'status': 'ERROR'})
+        self.assertEqual(1, generation(node1.id))
+
+        db_api.node_add_dependents(self.ctx, node1.id, 'NODE_ID')
+        self.assertEqual(2, generation(node1.id))
+
+        db_api.node_remove_dependents(self.ctx, node1.id, 'NODE_ID')
+        self.assertEqual(3, generation(node1.id))
+
+        db_api.node_migrate(self.ctx, node1.id, None, tu.utcnow(True))
+        self.assertEqual(4, generation(node1.id))
+
+        # Other nodes of the cluster are not changed
+        self.assertEqual(0, generation(node2.id))
+
     def test_node_delete_not_found(self):
         node_id = 'BogusNodeID'
         res = db_api.node_delete(self.ctx, node_id)
@@ -674,3 +776,83 @@ class DBAPINodeTest(base.SenlinTestCase):
 
         res = db_api.node_get(self.ctx, node_id)
         self.assertIsNone(res)
+
+    def test_node_count_by_status(self):
+        res = db_api.node_count_by_status(self.ctx, self.cluster.id)
+        self.assertEqual({}, res)
+
+        node1 = shared.create_node(self.ctx, self.cluster, self.profile)
+        node2 = shared.create_node(self.ctx, self.cluster, self.profile)
+        shared.create_node(self.ctx, self.cluster, self.profile,
+                           status='ERROR')
+        res = db_api.node_count_by_status(self.ctx, self.cluster.id)
+        self.assertEqual({'ACTIVE': 2, 'ERROR': 1}, res)
+
+        db_api.node_update(self.ctx, node1.id, {'status': 'WARNING'})
+        db_api.node_update(self.ctx, node1.id, {'name': 'new_name'})
+        db_api.node_delete(self.ctx, node2.id)
+        res = db_api.node_count_by_status(self.ctx, self.cluster.id)
+        self.assertEqual({'WARNING': 1, 'ERROR': 1}, res)
+
+    def test_node_count_by_status_migrate(self):
+        cluster2 = shared.create_cluster(self.ctx, self.profile)
+        node = shared.create_node(self.ctx, self.cluster, self.profile)
+
+        db_api.node_migrate(self.ctx, node.id, cluster2.id, tu.utcnow())
+
+        res = db_api.node_count_by_status(self.ctx, self.cluster.id)
+        self.assertEqual({}, res)
+        res = db_api.node_count_by_status(self.ctx, cluster2.id)
+        self.assertEqual({'ACTIVE': 1}, res)
+
+        db_api.node_migrate(self.ctx, node.id, None, tu.utcnow())
+        res = db_api.node_count_by_status(self.ctx, cluster2.id)
+        self.assertEqual({}, res)
+
+    def test_node_count_by_status_new_status(self):
+        shared.create_node(self.ctx, self.cluster, self.profile,
+                           status='UNKNOWN_STATUS')
+
+        res = db_api.node_count_by_status(self.ctx, self.cluster.id)
+        self.assertEqual({'UNKNOWN_STATUS': 1}, res)
+        res = db_api.node_count_by_cluster(self.ctx, self.cluster.id,
+                                           status='UNKNOWN_STATUS')
+        self.assertEqual(1, res)
+
+    def test_node_count_reconcile(self):
+        shared.create_node(self.ctx, self.cluster, self.profile)
+        shared.create_node(self.ctx, self.cluster, self.profile,
+                           status='ERROR')
+        cluster2 = shared.create_cluster(self.ctx, self.profile)
+        shared.create_node(self.ctx, cluster2, self.profile)
+
+        res = db_api.node_count_reconcile(self.ctx)
+        self.assertEqual([], res)
+
+        # Make the counters drift
+        with db_api.session_for_write() as session:
+            session.query(models.ClusterNodeCount).filter_by(
+                cluster_id=self.cluster.id, status='ACTIVE').update(
+                {'node_count': 5})
+            session.query(models.ClusterNodeCount).filter_by(
+                cluster_id=self.cluster.id, status='ERROR').delete()
+
+        res = db_api.node_count_reconcile(self.ctx)
+
+        self.assertEqual([self.cluster.id], res)
+        res = db_api.node_count_by_status(self.ctx, self.cluster.id)
+        self.assertEqual({'ACTIVE': 1, 'ERROR': 1}, res)
+        res = db_api.node_count_by_status(self.ctx, cluster2.id)
+        self.assertEqual({'ACTIVE': 1}, res)
+
+    def test_node_count_removed_with_cluster(self):
+        shared.create_node(self.ctx, self.cluster, self.profile)
+        db_api.node_migrate(self.ctx, db_api.node_get_all(self.ctx)[0].id,
+                            None, tu.utcnow())
+
+        db_api.cluster_delete(self.ctx, self.cluster.id)
+
+        with db_api.session_for_read() as session:
+            res = session.query(models.ClusterNodeCount).filter_by(
+                cluster_id=self.cluster.id).count()
+        self.assertEqual(0, res)
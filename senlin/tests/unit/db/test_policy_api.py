@@ -72,6 +72,20 @@ class DBAPIPolicyTest(base.SenlinTestCase):
         self.assertEqual(10, retobj.spec['max_size'])
         self.assertIsNone(retobj.data)
 
+    def test_policy_get_version(self):
+        policy = db_api.policy_create(self.ctx, self.new_policy_data())
+        res = db_api.policy_get_version(self.ctx, policy.id)
+        self.assertIsNone(res.updated_at)
+
+        timestamp = tu.utcnow(True)
+        db_api.policy_update(self.ctx, policy.id, {'updated_at': timestamp})
+        res = db_api.policy_get_version(self.ctx, policy.id)
+        self.assertEqual(timestamp, res.updated_at)
+
+        new_ctx = utils.dummy_context(project='a-different-project')
+        self.assertIsNone(db_api.policy_get_version(new_ctx, policy.id))
+        self.assertIsNone(db_api.policy_get_version(self.ctx, 'bogus'))
+
     def test_policy_get_diff_project(self):
         data = self.new_policy_data()
         policy = db_api.policy_create(self.ctx, data)
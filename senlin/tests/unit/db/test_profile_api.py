@@ -66,6 +66,31 @@ class DBAPIProfileTest(base.SenlinTestCase):
         profile = db_api.profile_get(self.ctx, 'BogusProfileID')
         self.assertIsNone(profile)
 
+    def test_profile_get_version(self):
+        profile = shared.create_profile(self.ctx)
+        res = db_api.profile_get_version(self.ctx, profile.id)
+        self.assertIsNone(res.updated_at)
+
+        timestamp = tu.utcnow(True)
+        db_api.profile_update(self.ctx, profile.id,
+                              {'updated_at': timestamp})
+        res = db_api.profile_get_version(self.ctx, profile.id)
+        self.assertEqual(timestamp, res.updated_at)
+
+    def test_profile_get_version_diff_project(self):
+        profile = shared.create_profile(self.ctx)
+        new_ctx = utils.dummy_context(project='a-different-project')
+        res = db_api.profile_get_version(new_ctx, profile.id)
+        self.assertIsNone(res)
+
+        res = db_api.profile_get_version(new_ctx, profile.id,
+                                         project_safe=False)
+        self.assertIsNotNone(res)
+
+    def test_profile_get_version_not_found(self):
+        res = db_api.profile_get_version(self.ctx, 'BogusProfileID')
+        self.assertIsNone(res)
+
     def test_profile_get_by_name(self):
         profile_name = 'my_best_profile'
 
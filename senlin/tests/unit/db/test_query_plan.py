@@ -0,0 +1,205 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import time
+
+from oslo_utils import timeutils
+import sqlalchemy
+
+from senlin.db.sqlalchemy import api as db_api
+from senlin.db.sqlalchemy import utils as db_utils
+from senlin.tests.unit.common import base
+from senlin.tests.unit.common import utils
+from senlin.tests.unit.db import shared
+
+UUID1 = shared.UUID1
+UUID2 = shared.UUID2
+
+# Statistics of the indexes on projects, for a deployment with a few projects
+# having many records each. Without statistics, SQLite rates an equality on
+# the project as selective as one on an ID, a name or a target.
+INDEX_STATS = [
+    ('cluster', 'ix_cluster_project_init_at_id', '100000 10000 1 1'),
+    ('node', 'ix_node_project_init_at_id', '1000000 100000 1 1'),
+    ('action', 'ix_action_project_created_at_id', '2000000 200000 1 1'),
+]
+
+
+class DBAPIQueryPlanTest(base.SenlinTestCase):
+    """Check that hot queries are served by indexes on SQLite."""
+
+    def setUp(self):
+        super(DBAPIQueryPlanTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self._load_stats(INDEX_STATS)
+        self.addCleanup(self._load_stats, [])
+
+    def _load_stats(self, stats):
+        conn = db_api.get_engine().raw_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('ANALYZE')
+            cursor.execute('DELETE FROM sqlite_stat1')
+            cursor.executemany('INSERT INTO sqlite_stat1 VALUES (?, ?, ?)',
+                               stats)
+            # Load the statistics for the planner
+            cursor.execute('ANALYZE sqlite_master')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _plan(self, func, *args, **kwargs):
+        """Run a DB API call and explain the statements it executed.
+
+        :returns: The details of the query plans of all the statements,
+                  joined in one string.
+        """
+        statements = []
+
+        def record(conn, cursor, statement, parameters, *args):
+            statements.append((statement, parameters))
+
+        engine = db_api.get_engine()
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', record)
+        try:
+            func(self.ctx, *args, **kwargs)
+        finally:
+            sqlalchemy.event.remove(engine, 'before_cursor_execute', record)
+
+        details = []
+        conn = engine.raw_connection()
+        try:
+            cursor = conn.cursor()
+            for statement, parameters in statements:
+                cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+                details.extend(row[-1] for row in cursor.fetchall())
+        finally:
+            conn.close()
+
+        return '\n'.join(details)
+
+    def _assert_uses(self, index, func, *args, **kwargs):
+        plan = self._plan(func, *args, **kwargs)
+        self.assertIn('INDEX %s' % index, plan)
+
+    def test_action_acquire_first_ready(self):
+        self._assert_uses('ix_action_status_owner_created_at',
+                          db_api.action_acquire_first_ready, UUID1,
+                          time.time())
+
+    def test_action_get_all_ready(self):
+        self._assert_uses('ix_action_status_owner_created_at',
+                          db_api.action_get_all_ready,
+                          timestamp=time.time(), limit=10)
+
+    def test_action_get_all_ready_by_class(self):
+        self._assert_uses('ix_action_status_owner_created_at',
+                          db_api.action_get_all_ready,
+                          timestamp=time.time(), limit=10,
+                          action_class='recovery')
+
+    def test_action_count_ready_by_class(self):
+        self._assert_uses('ix_action_status_owner_created_at',
+                          db_api.action_count_ready_by_class,
+                          timestamp=time.time())
+
+    def test_action_get_all_by_owner(self):
+        self._assert_uses('ix_action_owner',
+                          db_api.action_get_all_by_owner, UUID1)
+
+    def test_action_get_all_active_by_target(self):
+        self._assert_uses('ix_action_target_status',
+                          db_api.action_get_all_active_by_target, UUID1)
+
+    def test_node_get_all_by_cluster(self):
+        self._assert_uses('ix_node_cluster_id_status',
+                          db_api.node_get_all_by_cluster, UUID1)
+
+    def test_node_count_by_cluster(self):
+        self._assert_uses('ix_node_cluster_id_status',
+                          db_api.node_count_by_cluster, UUID1,
+                          status='ACTIVE', role='master')
+
+    def test_node_count_by_status(self):
+        self._assert_uses('sqlite_autoindex_cluster_node_count_1',
+                          db_api.node_count_by_status, UUID1)
+
+    def test_cluster_get_by_name(self):
+        self._assert_uses('ix_cluster_name',
+                          db_api.cluster_get_by_name, 'cluster')
+
+    def test_node_get_by_short_id(self):
+        self._assert_uses('sqlite_autoindex_node_1',
+                          db_api.node_get_by_short_id, 'abcd1234')
+
+    def test_node_get_by_identity(self):
+        plan = self._plan(db_api.node_get_by_identity, 'node1')
+        self.assertIn('INDEX sqlite_autoindex_node_1', plan)
+        self.assertIn('INDEX ix_node_name', plan)
+
+    def test_dependency_get_depended(self):
+        self._assert_uses('ix_dependency_dependent_depended',
+                          db_api.dependency_get_depended, UUID1)
+
+    def test_dependency_get_dependents(self):
+        self._assert_uses('ix_dependency_depended_dependent',
+                          db_api.dependency_get_dependents, UUID1)
+
+    def test_event_get_all(self):
+        self._assert_uses('ix_event_project_timestamp',
+                          db_api.event_get_all, limit=20)
+
+    def test_event_get_all_next_page(self):
+        marker = db_utils.encode_cursor(['timestamp', 'id'],
+                                        [timeutils.utcnow(True), UUID1])
+        self._assert_uses('ix_event_project_timestamp',
+                          db_api.event_get_all, limit=20, marker=marker)
+
+    def _assert_next_page_uses(self, index, func, sort_keys):
+        marker = db_utils.encode_cursor(sort_keys,
+                                        [timeutils.utcnow(True), UUID1])
+        plan = self._plan(func, limit=20, marker=marker)
+        self.assertIn('INDEX %s' % index, plan)
+        # The rows of the page may be sorted again after the related rows
+        # are joined, but the table itself is read in the index order.
+        self.assertNotIn('TEMP B-TREE', plan.split('SCAN anon_1')[0])
+
+    def test_cluster_get_all_next_page(self):
+        self._assert_next_page_uses('ix_cluster_project_init_at_id',
+                                    db_api.cluster_get_all,
+                                    ['init_at', 'id'])
+
+    def test_node_get_all_next_page(self):
+        self._assert_next_page_uses('ix_node_project_init_at_id',
+                                    db_api.node_get_all, ['init_at', 'id'])
+
+    def test_action_get_all_next_page(self):
+        self._assert_next_page_uses('ix_action_project_created_at_id',
+                                    db_api.action_get_all,
+                                    ['created_at', 'id'])
+
+    def test_event_get_all_by_cluster(self):
+        self._assert_uses('ix_event_cluster_id_project_timestamp',
+                          db_api.event_get_all_by_cluster, UUID1, limit=20)
+
+    def test_event_purge(self):
+        self._assert_uses('ix_event_timestamp',
+                          lambda ctx: db_api.event_purge(None))
+
+    def test_registry_get_by_engine(self):
+        self._assert_uses('ix_health_registry_engine_id',
+                          db_api.registry_get_by_param,
+                          {'engine_id': UUID1})
+
+    def test_cluster_policy_get(self):
+        self._assert_uses('ix_cluster_policy_cluster_id_policy_id',
+                          db_api.cluster_policy_get, UUID1, UUID2)
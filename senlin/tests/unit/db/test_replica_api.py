@@ -0,0 +1,153 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import time
+
+import fixtures
+from oslo_config import cfg
+from oslo_db.sqlalchemy import enginefacade
+
+from senlin.common import consts
+from senlin.db.sqlalchemy import api as db_api
+from senlin.tests.unit.common import base
+from senlin.tests.unit.common import utils
+from senlin.tests.unit.db import shared
+
+FAMILIES = ['cluster', 'node', 'profile', 'policy', 'action', 'receiver',
+            'event']
+
+
+class DBAPIReplicaTest(base.SenlinTestCase):
+    """Check the queries served by the replica, using two SQLite files."""
+
+    def setUp(self):
+        super(DBAPIReplicaTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        path = self.useFixture(fixtures.TempDir()).path
+        writer_url = 'sqlite:///%s' % os.path.join(path, 'writer.db')
+        replica_url = 'sqlite:///%s' % os.path.join(path, 'replica.db')
+
+        self.main = self._context_manager(connection=writer_url,
+                                          slave_connection=replica_url)
+        # Used to write records into the replica database
+        self.replica = self._context_manager(connection=replica_url)
+        self.plain = self._context_manager(connection=writer_url)
+
+        db_api.db_sync(self.main.writer.get_engine())
+        db_api.db_sync(self.replica.writer.get_engine())
+        self.useFixture(fixtures.MockPatchObject(
+            db_api, '_main_context_manager', self.main))
+        cfg.CONF.set_override('database_replica_reads', FAMILIES)
+
+    def _context_manager(self, **kwargs):
+        manager = enginefacade.transaction_context()
+        manager.configure(sqlite_synchronous=False, **kwargs)
+        self.addCleanup(manager.dispose_pool)
+        return manager
+
+    def _on_replica(self, func, *args, **kwargs):
+        """Call a DB API function with the replica as the main database."""
+        with fixtures.MockPatchObject(db_api, '_main_context_manager',
+                                      self.replica):
+            return func(self.ctx, *args, **kwargs)
+
+    def test_list_from_replica(self):
+        profile = shared.create_profile(self.ctx)
+        cluster = shared.create_cluster(self.ctx, profile)
+        shared.create_node(self.ctx, cluster, profile)
+        shared.create_policy(self.ctx)
+        shared.create_action(self.ctx, target=cluster.id, action='OPERATE',
+                             project=self.ctx.project_id)
+        shared.create_event(self.ctx)
+
+        # The replica has none of the records
+        self.assertEqual([], db_api.profile_get_all(self.ctx, replica=True))
+        self.assertEqual([], db_api.cluster_get_all(self.ctx, replica=True))
+        self.assertEqual([], db_api.node_get_all(self.ctx, replica=True))
+        self.assertEqual([], db_api.policy_get_all(self.ctx, replica=True))
+        self.assertEqual([], db_api.action_get_all(self.ctx, replica=True))
+        self.assertEqual([], db_api.event_get_all(self.ctx, replica=True))
+
+        # The main database has all of them
+        self.assertEqual(1, len(db_api.profile_get_all(self.ctx)))
+        self.assertEqual(1, len(db_api.cluster_get_all(self.ctx)))
+        self.assertEqual(1, len(db_api.node_get_all(self.ctx)))
+        self.assertEqual(1, len(db_api.policy_get_all(self.ctx)))
+        self.assertEqual(1, len(db_api.action_get_all(self.ctx)))
+        self.assertEqual(1, len(db_api.event_get_all(self.ctx)))
+
+    def test_get_from_replica(self):
+        replica_profile = self._on_replica(shared.create_profile)
+        replica_cluster = self._on_replica(shared.create_cluster,
+                                           replica_profile)
+        self._on_replica(shared.create_node, replica_cluster,
+                         replica_profile)
+        event = self._on_replica(shared.create_event)
+
+        res = db_api.cluster_get_all(self.ctx, replica=True)
+        self.assertEqual([replica_cluster.id], [c.id for c in res])
+        # Node IDs are loaded from the replica too
+        self.assertEqual(1, len(res[0].nodes))
+
+        res = db_api.event_get(self.ctx, event.id, replica=True)
+        self.assertEqual(event.id, res.id)
+        res = db_api.event_get_by_short_id(self.ctx, event.id[:8],
+                                           replica=True)
+        self.assertEqual(event.id, res.id)
+        self.assertIsNone(db_api.event_get(self.ctx, event.id))
+
+    def test_family_not_enabled(self):
+        cfg.CONF.set_override('database_replica_reads', ['event'])
+        profile = shared.create_profile(self.ctx)
+        shared.create_event(self.ctx)
+
+        res = db_api.profile_get_all(self.ctx, replica=True)
+        self.assertEqual([profile.id], [p.id for p in res])
+        self.assertEqual([], db_api.event_get_all(self.ctx, replica=True))
+
+    def test_no_replica_configured(self):
+        self.useFixture(fixtures.MockPatchObject(
+            db_api, '_main_context_manager', self.plain))
+        profile = shared.create_profile(self.ctx)
+
+        res = db_api.profile_get_all(self.ctx, replica=True)
+        self.assertEqual([profile.id], [p.id for p in res])
+
+    def test_engine_paths_on_writer(self):
+        profile = shared.create_profile(self.ctx)
+        cluster = shared.create_cluster(self.ctx, profile)
+        node = shared.create_node(self.ctx, cluster, profile)
+        action = shared.create_action(self.ctx, target=cluster.id,
+                                      action='OPERATE',
+                                      status=consts.ACTION_READY,
+                                      project=self.ctx.project_id)
+        timestamp = time.time()
+
+        self.assertIsNotNone(db_api.cluster_get(self.ctx, cluster.id))
+        self.assertIsNotNone(db_api.node_get(self.ctx, node.id))
+        self.assertEqual(
+            1, len(db_api.node_get_all_by_cluster(self.ctx, cluster.id)))
+        self.assertEqual(
+            consts.ACTION_READY,
+            db_api.action_check_status(self.ctx, action.id, timestamp))
+        self.assertEqual(
+            [action.id],
+            [a.id for a in db_api.action_get_all_ready(self.ctx)])
+
+        res = db_api.action_acquire_first_ready(self.ctx, 'ENGINE',
+                                                timestamp)
+        self.assertEqual(action.id, res.id)
+        self.assertEqual(
+            [action.id],
+            db_api.cluster_lock_acquire(cluster.id, action.id, -1))
+        self.assertTrue(db_api.cluster_is_locked(cluster.id))
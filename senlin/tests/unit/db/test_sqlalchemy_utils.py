@@ -10,8 +10,12 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import base64
+import decimal
+
 import mock
 from oslo_config import cfg
+from oslo_serialization import jsonutils
 from oslo_utils import timeutils
 
 from senlin.db.sqlalchemy import utils
@@ -99,6 +103,41 @@ class SortParamTest(base.SenlinTestCase):
                           'asc-nullsfirst'], dirs)
 
 
+class CursorTest(base.SenlinTestCase):
+
+    def test_encode_decode(self):
+        keys = ['init_at', 'name', 'start_time', 'role', 'id']
+        values = [timeutils.utcnow(True), 'foo', decimal.Decimal('1.5'),
+                  None, 'ID']
+
+        cursor = utils.encode_cursor(keys, values)
+
+        self.assertNotIn('=', cursor)
+        self.assertEqual(values, utils.decode_cursor(cursor, keys))
+
+    def test_decode_other_keys(self):
+        cursor = utils.encode_cursor(['name', 'id'], ['foo', 'ID'])
+
+        self.assertIsNone(utils.decode_cursor(cursor, ['status', 'id']))
+
+    def test_decode_not_cursor(self):
+        self.assertIsNone(utils.decode_cursor(
+            'a7e8ad19-6c5d-4e74-8a63-5a4b8aa0d2a3', ['id']))
+        self.assertIsNone(utils.decode_cursor('bogus', ['id']))
+
+    def test_decode_not_scalar(self):
+        def cursor(data):
+            return base64.urlsafe_b64encode(
+                jsonutils.dumps(data).encode('utf-8')).decode('utf-8')
+
+        keys = ['name', 'id']
+        for encoded in ([['foo'], 'ID'], [{'foo': 'bar'}, 'ID'],
+                        [{'datetime': 'bogus'}, 'ID'],
+                        [{'decimal': 'bogus'}, 'ID'], 'ID'):
+            self.assertIsNone(utils.decode_cursor(cursor([keys, encoded]),
+                                                  keys))
+
+
 class ServiceAliveTest(base.SenlinTestCase):
 
     def test_alive(self):
@@ -0,0 +1,56 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from senlin.db.sqlalchemy import api as db_api
+from senlin.tests.unit.common import base
+from senlin.tests.unit.common import utils
+
+
+class DBAPITokenBucketTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(DBAPITokenBucketTest, self).setUp()
+        self.ctx = utils.dummy_context()
+
+    def test_token_bucket_consume(self):
+        # a new bucket is full
+        for i in range(3):
+            res = db_api.token_bucket_consume(self.ctx, 'KEY', 2.0, 3, 100)
+            self.assertEqual(0, res)
+
+        # empty bucket, tokens are reserved in turn
+        res = db_api.token_bucket_consume(self.ctx, 'KEY', 2.0, 3, 100)
+        self.assertEqual(0.5, res)
+        res = db_api.token_bucket_consume(self.ctx, 'KEY', 2.0, 3, 100)
+        self.assertEqual(1.0, res)
+
+    def test_token_bucket_consume_refilled(self):
+        for i in range(3):
+            db_api.token_bucket_consume(self.ctx, 'KEY', 2.0, 3, 100)
+
+        res = db_api.token_bucket_consume(self.ctx, 'KEY', 2.0, 3, 101)
+        self.assertEqual(0, res)
+
+        # refilling stops at the capacity
+        for i in range(3):
+            res = db_api.token_bucket_consume(self.ctx, 'KEY', 2.0, 3, 200)
+            self.assertEqual(0, res)
+        res = db_api.token_bucket_consume(self.ctx, 'KEY', 2.0, 3, 200)
+        self.assertEqual(0.5, res)
+
+    def test_token_bucket_consume_separate_buckets(self):
+        db_api.token_bucket_consume(self.ctx, 'KEY1', 1.0, 1, 100)
+
+        res = db_api.token_bucket_consume(self.ctx, 'KEY2', 1.0, 1, 100)
+        self.assertEqual(0, res)
+        res = db_api.token_bucket_consume(self.ctx, 'KEY1', 1.0, 1, 100)
+        self.assertEqual(1.0, res)
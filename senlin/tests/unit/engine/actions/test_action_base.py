@@ -255,7 +255,7 @@ class ActionBaseTest(base.SenlinTestCase):
         mock_store.assert_called_once_with(self.ctx)
 
     @mock.patch.object(ab.Action, 'store')
-    @mock.patch.object(ao.Action, 'get_all_active_by_target')
+    @mock.patch.object(ao.Action, 'columns_active_by_target')
     @mock.patch.object(cl.ClusterLock, 'is_locked')
     def test_action_create_lock_cluster_false(self, mock_lock,
                                               mock_active, mock_store):
@@ -268,10 +268,10 @@ class ActionBaseTest(base.SenlinTestCase):
 
         self.assertEqual('FAKE_ID', result)
         mock_store.assert_called_once_with(self.ctx)
-        mock_active.assert_called_once_with(mock.ANY, OBJID)
+        mock_active.assert_called_once_with(mock.ANY, OBJID, ['id'])
 
     @mock.patch.object(ab.Action, 'store')
-    @mock.patch.object(ao.Action, 'get_all_active_by_target')
+    @mock.patch.object(ao.Action, 'columns_active_by_target')
     @mock.patch.object(cl.ClusterLock, 'is_locked')
     def test_action_create_lock_cluster_true(self, mock_lock,
                                              mock_active, mock_store):
@@ -290,7 +290,7 @@ class ActionBaseTest(base.SenlinTestCase):
         mock_active.assert_not_called()
 
     @mock.patch.object(ab.Action, 'store')
-    @mock.patch.object(ao.Action, 'get_all_active_by_target')
+    @mock.patch.object(ao.Action, 'columns_active_by_target')
     @mock.patch.object(nl.NodeLock, 'is_locked')
     def test_action_create_lock_node_false(self, mock_lock,
                                            mock_active, mock_store):
@@ -303,10 +303,10 @@ class ActionBaseTest(base.SenlinTestCase):
 
         self.assertEqual('FAKE_ID', result)
         mock_store.assert_called_once_with(self.ctx)
-        mock_active.assert_called_once_with(mock.ANY, OBJID)
+        mock_active.assert_called_once_with(mock.ANY, OBJID, ['id'])
 
     @mock.patch.object(ab.Action, 'store')
-    @mock.patch.object(ao.Action, 'get_all_active_by_target')
+    @mock.patch.object(ao.Action, 'columns_active_by_target')
     @mock.patch.object(cl.ClusterLock, 'is_locked')
     def test_action_create_lock_cluster_true_delete(self, mock_lock,
                                                     mock_active, mock_store):
@@ -319,10 +319,10 @@ class ActionBaseTest(base.SenlinTestCase):
 
         self.assertEqual('FAKE_ID', result)
         mock_store.assert_called_once_with(self.ctx)
-        mock_active.assert_called_once_with(mock.ANY, OBJID)
+        mock_active.assert_called_once_with(mock.ANY, OBJID, ['id'])
 
     @mock.patch.object(ab.Action, 'store')
-    @mock.patch.object(ao.Action, 'get_all_active_by_target')
+    @mock.patch.object(ao.Action, 'columns_active_by_target')
     @mock.patch.object(nl.NodeLock, 'is_locked')
     def test_action_create_lock_node_true(self, mock_lock, mock_active,
                                           mock_store):
@@ -341,7 +341,7 @@ class ActionBaseTest(base.SenlinTestCase):
         mock_active.assert_not_called()
 
     @mock.patch.object(ab.Action, 'store')
-    @mock.patch.object(ao.Action, 'get_all_active_by_target')
+    @mock.patch.object(ao.Action, 'columns_active_by_target')
     @mock.patch.object(cl.ClusterLock, 'is_locked')
     def test_action_create_conflict(self, mock_lock, mock_active, mock_store):
         mock_store.return_value = 'FAKE_ID'
@@ -358,10 +358,10 @@ class ActionBaseTest(base.SenlinTestCase):
             ab.Action.create(self.ctx, OBJID, 'NODE_CREATE', name='test')
 
         mock_store.assert_not_called()
-        mock_active.assert_called_once_with(mock.ANY, OBJID)
+        mock_active.assert_called_once_with(mock.ANY, OBJID, ['id'])
 
     @mock.patch.object(ab.Action, 'store')
-    @mock.patch.object(ao.Action, 'get_all_active_by_target')
+    @mock.patch.object(ao.Action, 'columns_active_by_target')
     @mock.patch.object(cl.ClusterLock, 'is_locked')
     def test_action_create_delete_no_conflict(self, mock_lock, mock_active,
                                               mock_store):
@@ -379,10 +379,10 @@ class ActionBaseTest(base.SenlinTestCase):
 
         self.assertEqual('FAKE_ID', result)
         mock_store.assert_called_once_with(self.ctx)
-        mock_active.assert_called_once_with(mock.ANY, OBJID)
+        mock_active.assert_called_once_with(mock.ANY, OBJID, ['id'])
 
     @mock.patch.object(ab.Action, 'store')
-    @mock.patch.object(ao.Action, 'get_all_active_by_target')
+    @mock.patch.object(ao.Action, 'columns_active_by_target')
     @mock.patch.object(cl.ClusterLock, 'is_locked')
     def test_action_create_node_operation_no_conflict(self, mock_lock,
                                                       mock_active, mock_store):
@@ -400,7 +400,7 @@ class ActionBaseTest(base.SenlinTestCase):
 
         self.assertEqual('FAKE_ID', result)
         mock_store.assert_called_once_with(self.ctx)
-        mock_active.assert_called_once_with(mock.ANY, OBJID)
+        mock_active.assert_called_once_with(mock.ANY, OBJID, ['id'])
 
     @mock.patch.object(timeutils, 'is_older_than')
     @mock.patch.object(cpo.ClusterPolicy, 'get_all')
@@ -439,6 +439,51 @@ class ActionBaseTest(base.SenlinTestCase):
                           cluster_id, 'CLUSTER_SCALE_IN')
         self.assertEqual(0, mock_store.call_count)
 
+    @mock.patch.object(ao.Action, 'create_bulk')
+    @mock.patch.object(ab.Action, '_check_conflicting_actions')
+    @mock.patch.object(ab.Action, '_check_action_lock')
+    def test_action_create_bulk(self, mock_lock, mock_conflict,
+                                mock_create):
+        node = node_mod.Node('node-1', 'PROFILE_ID', CLUSTER_ID, id='NODE_ID',
+                             index=1)
+        specs = [
+            ('NODE_ID', 'NODE_CREATE', {'id': 'ACTION_1', 'name': 'create'}),
+            (OBJID, 'NODE_DELETE', {'id': 'ACTION_2', 'name': 'delete'}),
+        ]
+        deps = [('ACTION_1', ACTION_ID), ('ACTION_2', ACTION_ID)]
+
+        res = ab.Action.create_bulk(self.ctx, specs, deps, nodes=[node])
+
+        self.assertEqual(['ACTION_1', 'ACTION_2'], res)
+        # only the existing node is checked
+        mock_lock.assert_called_once_with(OBJID, 'NODE_DELETE')
+        mock_conflict.assert_called_once_with(self.ctx, OBJID, 'NODE_DELETE')
+        mock_create.assert_called_once_with(self.ctx, mock.ANY, deps,
+                                            nodes=mock.ANY)
+        actions = mock_create.call_args[0][1]
+        self.assertEqual(['ACTION_1', 'ACTION_2'], [a['id'] for a in actions])
+        self.assertEqual(['NODE_ID', OBJID], [a['target'] for a in actions])
+        for action in actions:
+            self.assertEqual(ab.Action.READY, action['status'])
+            self.assertIsNotNone(action['created_at'])
+            self.assertEqual(self.ctx.user_id, action['context']['user_id'])
+        nodes = mock_create.call_args[1]['nodes']
+        self.assertEqual(1, len(nodes))
+        self.assertEqual('NODE_ID', nodes[0]['id'])
+        self.assertEqual('node-1', nodes[0]['name'])
+        self.assertEqual(1, nodes[0]['index'])
+        self.assertIsNotNone(nodes[0]['init_at'])
+
+    @mock.patch.object(ao.Action, 'create_bulk')
+    @mock.patch.object(cl.ClusterLock, 'is_locked')
+    def test_action_create_bulk_locked(self, mock_lock, mock_create):
+        mock_lock.return_value = True
+        specs = [(CLUSTER_ID, 'CLUSTER_CREATE', {})]
+
+        self.assertRaises(exception.ResourceIsLocked,
+                          ab.Action.create_bulk, self.ctx, specs, [])
+        self.assertEqual(0, mock_create.call_count)
+
     def test_action_delete(self):
         result = ab.Action.delete(self.ctx, 'non-existent')
         self.assertIsNone(result)
@@ -466,8 +511,9 @@ class ActionBaseTest(base.SenlinTestCase):
         self.assertIsNone(result)
         self.assertEqual(0, mock_call.call_count)
 
+    @mock.patch.object(dispatcher, 'signal_action')
     @mock.patch.object(ao.Action, 'signal')
-    def test_action_signal_cancel(self, mock_call):
+    def test_action_signal_cancel(self, mock_call, mock_notify):
         values = copy.deepcopy(self.action_values)
         action = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, **values)
         action.store(self.ctx)
@@ -478,7 +524,10 @@ class ActionBaseTest(base.SenlinTestCase):
             result = action.signal(action.SIG_CANCEL)
             self.assertIsNone(result)
             self.assertEqual(1, mock_call.call_count)
+            mock_notify.assert_called_once_with(
+                OWNER_ID, action.SIG_CANCEL, action_id=action.id)
             mock_call.reset_mock()
+            mock_notify.reset_mock()
 
         invalid = [action.SUSPENDED, action.SUCCEEDED, action.CANCELLED,
                    action.FAILED]
@@ -487,6 +536,7 @@ class ActionBaseTest(base.SenlinTestCase):
             result = action.signal(action.SIG_CANCEL)
             self.assertIsNone(result)
             self.assertEqual(0, mock_call.call_count)
+            self.assertEqual(0, mock_notify.call_count)
             mock_call.reset_mock()
 
     @mock.patch.object(ao.Action, 'signal')
@@ -531,6 +581,30 @@ class ActionBaseTest(base.SenlinTestCase):
             self.assertEqual(0, mock_call.call_count)
             mock_call.reset_mock()
 
+    @mock.patch.object(dispatcher, 'signal_action')
+    def test_deliver_signal_local(self, mock_notify):
+        self.addCleanup(dispatcher.unregister_signal, ACTION_ID)
+        dispatcher.register_signal(ACTION_ID)
+
+        ab.Action._deliver_signal(ACTION_ID, OWNER_ID, ab.Action.SIG_CANCEL)
+
+        self.assertEqual((True, ab.Action.SIG_CANCEL),
+                         dispatcher.get_signal(ACTION_ID, 10))
+        mock_notify.assert_not_called()
+
+    @mock.patch.object(dispatcher, 'signal_action')
+    def test_deliver_signal_remote(self, mock_notify):
+        ab.Action._deliver_signal(ACTION_ID, OWNER_ID, ab.Action.SIG_SUSPEND)
+
+        mock_notify.assert_called_once_with(OWNER_ID, ab.Action.SIG_SUSPEND,
+                                            action_id=ACTION_ID)
+
+    @mock.patch.object(dispatcher, 'signal_action')
+    def test_deliver_signal_not_owned(self, mock_notify):
+        ab.Action._deliver_signal(ACTION_ID, None, ab.Action.SIG_CANCEL)
+
+        mock_notify.assert_not_called()
+
     @mock.patch.object(ao.Action, 'signal')
     @mock.patch.object(dobj.Dependency, 'get_depended')
     def test_signal_cancel(self, mock_dobj, mock_signal):
@@ -689,12 +763,16 @@ class ActionBaseTest(base.SenlinTestCase):
     @mock.patch.object(ao.Action, 'mark_cancelled')
     @mock.patch.object(ao.Action, 'mark_ready')
     @mock.patch.object(ao.Action, 'abandon')
-    @mock.patch.object(dispatcher, 'start_action')
-    @mock.patch.object(eventlet, 'sleep')
-    def test_set_status(self, mock_sleep, mock_start, mock_abandon,
+    @mock.patch.object(ab, 'wallclock')
+    @mock.patch.object(ab.Action, '_retry_delay')
+    @mock.patch.object(eventlet, 'spawn_after')
+    def test_set_status(self, mock_spawn, mock_delay, mock_clock,
+                        mock_abandon,
                         mark_ready, mark_cancel, mark_fail,
                         mark_succeed, mock_event, mock_error,
                         mock_info):
+        mock_clock.return_value = 100.0
+        mock_delay.return_value = 7.5
         action = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, id='FAKE_ID')
         action.entity = mock.Mock()
 
@@ -729,10 +807,11 @@ class ActionBaseTest(base.SenlinTestCase):
         action.set_status(action.RES_RETRY, 'BUSY')
         self.assertEqual(action.READY, action.status)
         self.assertEqual('BUSY', action.status_reason)
-        mock_start.assert_called_once_with(action.id)
-        mock_sleep.assert_called_once_with(10)
+        mock_delay.assert_called_once_with(1)
         mock_abandon.assert_called_once_with(
-            action.context, 'FAKE_ID', {'data': {'retries': 1}})
+            action.context, 'FAKE_ID',
+            {'data': {'retries': 1}, 'not_before': 107.5})
+        mock_spawn.assert_called_once_with(7.5, dispatcher.start_action)
 
         mark_fail.reset_mock()
         action.data = {'retries': 3}
@@ -741,13 +820,50 @@ class ActionBaseTest(base.SenlinTestCase):
         mark_fail.assert_called_once_with(action.context, 'FAKE_ID', mock.ANY,
                                           'BUSY')
 
+    @mock.patch.object(EVENT, 'warning')
+    @mock.patch.object(ao.Action, 'abandon')
+    @mock.patch.object(ab, 'wallclock')
+    @mock.patch.object(eventlet, 'spawn_after')
+    def test_set_status_defer(self, mock_spawn, mock_clock, mock_abandon,
+                              mock_warning):
+        mock_clock.return_value = 100.0
+        action = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, id='FAKE_ID',
+                           data={'retries': 1})
+        action.defer_delay = 2.5
+
+        action.set_status(action.RES_DEFER, 'Rate limited')
+
+        self.assertEqual(action.READY, action.status)
+        # A deferred action does not count as a retry
+        mock_abandon.assert_called_once_with(
+            action.context, 'FAKE_ID',
+            {'data': {'retries': 1}, 'not_before': 102.5})
+        mock_spawn.assert_called_once_with(2.5, dispatcher.start_action)
+        mock_warning.assert_not_called()
+
+    @mock.patch('random.uniform')
+    def test_retry_delay(self, mock_uniform):
+        mock_uniform.side_effect = lambda a, b: b
+        cfg.CONF.set_override('lock_retry_interval', 10)
+        cfg.CONF.set_override('lock_retry_max_interval', 60)
+
+        self.assertEqual(10, ab.Action._retry_delay(1))
+        self.assertEqual(20, ab.Action._retry_delay(2))
+        self.assertEqual(40, ab.Action._retry_delay(3))
+        self.assertEqual(60, ab.Action._retry_delay(4))
+        mock_uniform.assert_called_with(0, 30.0)
+
+        mock_uniform.side_effect = lambda a, b: a
+        self.assertEqual(5, ab.Action._retry_delay(1))
+
     @mock.patch.object(EVENT, 'info')
     @mock.patch.object(EVENT, 'error')
     @mock.patch.object(EVENT, 'warning')
     @mock.patch.object(ao.Action, 'mark_succeeded')
     @mock.patch.object(ao.Action, 'mark_failed')
     @mock.patch.object(ao.Action, 'abandon')
-    def test_set_status_dump_event(self, mock_abandon, mark_fail,
+    @mock.patch.object(eventlet, 'spawn_after')
+    def test_set_status_dump_event(self, mock_spawn, mock_abandon, mark_fail,
                                    mark_succeed, mock_warning, mock_error,
                                    mock_info):
         action = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, id='FAKE_ID')
@@ -771,9 +887,10 @@ class ActionBaseTest(base.SenlinTestCase):
     @mock.patch.object(ao.Action, 'mark_succeeded')
     @mock.patch.object(ao.Action, 'mark_failed')
     @mock.patch.object(ao.Action, 'abandon')
-    def test_set_status_reason_is_none(self, mock_abandon, mark_fail,
-                                       mark_succeed, mock_warning, mock_error,
-                                       mock_info):
+    @mock.patch.object(eventlet, 'spawn_after')
+    def test_set_status_reason_is_none(self, mock_spawn, mock_abandon,
+                                       mark_fail, mark_succeed, mock_warning,
+                                       mock_error, mock_info):
         action = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, id='FAKE_ID')
         action.entity = mock.Mock()
 
@@ -789,6 +906,37 @@ class ActionBaseTest(base.SenlinTestCase):
         mock_warning.assert_called_once_with(action, consts.PHASE_ERROR,
                                              'RETRY')
 
+    @mock.patch.object(EVENT, 'info')
+    @mock.patch.object(ao.Action, 'mark_succeeded')
+    @mock.patch.object(ab.Action, '_wake_dependents')
+    def test_set_status_wake_dependents(self, mock_wake, mark_succeed,
+                                        mock_info):
+        action = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, id='FAKE_ID')
+        mark_succeed.return_value = ['PARENT']
+
+        action.set_status(action.RES_OK)
+
+        mock_wake.assert_called_once_with(['PARENT'])
+
+    @mock.patch.object(ao.Action, 'lock_check')
+    @mock.patch.object(dispatcher, 'wake_action')
+    @mock.patch.object(dispatcher, 'wake_waiter')
+    def test_wake_dependents(self, mock_waiter, mock_wake, mock_check):
+        action = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, id='FAKE_ID')
+        mock_waiter.side_effect = [True, False, False, False]
+        mock_check.side_effect = ['ENGINE', None,
+                                  exception.ResourceNotFound(type='action',
+                                                             id='A4')]
+
+        action._wake_dependents(['A1', 'A2', 'A3', 'A4'])
+
+        mock_waiter.assert_has_calls([mock.call('A1'), mock.call('A2'),
+                                      mock.call('A3'), mock.call('A4')])
+        mock_check.assert_has_calls([mock.call(action.context, 'A2'),
+                                     mock.call(action.context, 'A3'),
+                                     mock.call(action.context, 'A4')])
+        mock_wake.assert_called_once_with('ENGINE', action_id='A2')
+
     @mock.patch.object(ao.Action, 'check_status')
     def test_get_status(self, mock_get):
         mock_get.return_value = 'FAKE_STATUS'
@@ -843,6 +991,38 @@ class ActionBaseTest(base.SenlinTestCase):
         self.assertEqual(sig_cmd, res)
         mock_query.assert_called_once_with(action.context, 'FAKE_ID')
 
+    @mock.patch.object(ao.Action, 'signal_query')
+    def test_check_signal_delivered(self, mock_query):
+        action = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, id='FAKE_ID',
+                           timeout=100)
+        self.patchobject(action, 'is_timeout', return_value=False)
+        self.addCleanup(dispatcher.unregister_signal, 'FAKE_ID')
+        dispatcher.register_signal('FAKE_ID')
+        dispatcher.deliver_signal('FAKE_ID', action.SIG_SUSPEND)
+
+        res = action._check_signal()
+
+        self.assertEqual(action.SIG_SUSPEND, res)
+        mock_query.assert_not_called()
+
+    @mock.patch.object(ao.Action, 'signal_query')
+    def test_check_signal_refreshed(self, mock_query):
+        action = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx, id='FAKE_ID',
+                           timeout=100)
+        self.patchobject(action, 'is_timeout', return_value=False)
+        self.addCleanup(dispatcher.unregister_signal, 'FAKE_ID')
+        dispatcher.register_signal('FAKE_ID')
+        mock_query.return_value = action.SIG_CANCEL
+
+        res = action._check_signal()
+        self.assertEqual(action.SIG_CANCEL, res)
+        mock_query.assert_called_once_with(action.context, 'FAKE_ID')
+
+        # the signal read is kept until it gets stale
+        res = action._check_signal()
+        self.assertEqual(action.SIG_CANCEL, res)
+        self.assertEqual(1, mock_query.call_count)
+
     @mock.patch.object(ao.Action, 'signal_query')
     def test_is_cancelled(self, mock_query):
         action = ab.Action(OBJID, 'OBJECT_ACTION', self.ctx)
@@ -1173,6 +1353,7 @@ class ActionProcTest(base.SenlinTestCase):
                                           project_safe=False)
         mock_event_info.assert_called_once_with(action, 'start', 'ACTION_I')
         mock_status.assert_called_once_with(action.RES_OK, 'BIG SUCCESS')
+        self.assertNotIn(action.id, dispatcher._SIGNALS)
 
     @mock.patch.object(EVENT, 'info')
     @mock.patch.object(ab.Action, 'load')
@@ -1217,3 +1398,4 @@ class ActionProcTest(base.SenlinTestCase):
         mock_status.assert_called_once_with(
             action.RES_CANCEL,
             'CLUSTER_ACTION [%s] cancelled' % ACTION_ID[:8])
+        self.assertNotIn(ACTION_ID, dispatcher._SIGNALS)
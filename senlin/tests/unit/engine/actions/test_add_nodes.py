@@ -13,13 +13,10 @@
 import mock
 
 from senlin.common import consts
-from senlin.engine.actions import base as ab
 from senlin.engine.actions import cluster_action as ca
 from senlin.engine import cluster as cm
-from senlin.engine import dispatcher
 from senlin.engine import node as nm
-from senlin.objects import action as ao
-from senlin.objects import dependency as dobj
+from senlin.objects import cluster as co
 from senlin.objects import node as no
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
@@ -32,19 +29,18 @@ class ClusterAddNodesTest(base.SenlinTestCase):
         super(ClusterAddNodesTest, self).setUp()
         self.ctx = utils.dummy_context()
 
+    @mock.patch.object(co.Cluster, 'reserve_indexes')
     @mock.patch.object(no.Node, 'get')
     @mock.patch.object(no.Node, 'count_by_cluster')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
     @mock.patch.object(nm.Node, 'load')
-    def test_do_add_nodes_single(self, mock_load_node, mock_wait, mock_start,
-                                 mock_update, mock_dep, mock_action,
-                                 mock_count, mock_get, mock_load):
+    def test_do_add_nodes_single(self, mock_load_node, mock_wait, mock_create,
+                                 mock_count, mock_get, mock_reserve,
+                                 mock_load):
         cluster = mock.Mock(id='CLUSTER_ID', min_size=1, max_size=5)
         mock_load.return_value = cluster
+        mock_reserve.return_value = 5
         mock_count.return_value = 2
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx,
                                   id='CLUSTER_ACTION_ID',
@@ -53,7 +49,6 @@ class ClusterAddNodesTest(base.SenlinTestCase):
         db_node = mock.Mock(id='NODE_1', cluster_id='', ACTIVE='ACTIVE',
                             status='ACTIVE')
         mock_get.return_value = db_node
-        mock_action.return_value = 'NODE_ACTION_ID'
         mock_wait.return_value = (action.RES_OK, 'Good to go!')
 
         # do it
@@ -66,15 +61,12 @@ class ClusterAddNodesTest(base.SenlinTestCase):
         mock_load.assert_called_once_with(action.context, 'CLUSTER_ID')
         mock_get.assert_called_once_with(action.context, 'NODE_1')
         mock_count.assert_called_once_with(action.context, 'CLUSTER_ID')
-        mock_action.assert_called_once_with(
-            action.context, 'NODE_1', 'NODE_JOIN',
-            name='node_join_NODE_1', cause='Derived Action',
-            inputs={'cluster_id': 'CLUSTER_ID'})
-        mock_dep.assert_called_once_with(action.context, ['NODE_ACTION_ID'],
-                                         'CLUSTER_ACTION_ID')
-        mock_update.assert_called_once_with(
-            action.context, 'NODE_ACTION_ID', {'status': 'READY'})
-        mock_start.assert_called_once_with()
+        mock_reserve.assert_called_once_with(action.context, 'CLUSTER_ID',
+                                             1)
+        mock_create.assert_called_once_with([
+            ('NODE_1', 'NODE_JOIN',
+             {'name': 'node_join_NODE_1', 'cause': 'Derived Action',
+              'inputs': {'cluster_id': 'CLUSTER_ID', 'index': 5}})])
         mock_wait.assert_called_once_with()
         cluster.eval_status.assert_called_once_with(
             action.context, consts.CLUSTER_ADD_NODES, desired_capacity=3)
@@ -84,20 +76,18 @@ class ClusterAddNodesTest(base.SenlinTestCase):
         mock_load_node.assert_called_once_with(action.context, db_node=db_node)
         cluster.add_node.assert_called_once_with(mock_load_node.return_value)
 
+    @mock.patch.object(co.Cluster, 'reserve_indexes')
     @mock.patch.object(no.Node, 'get')
     @mock.patch.object(no.Node, 'count_by_cluster')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
     @mock.patch.object(nm.Node, 'load')
-    def test_do_add_nodes_multi(self, mock_load_node, mock_wait, mock_start,
-                                mock_update, mock_dep, mock_action,
-                                mock_count, mock_get, mock_load):
+    def test_do_add_nodes_multi(self, mock_load_node, mock_wait, mock_create,
+                                mock_count, mock_get, mock_reserve, mock_load):
 
         cluster = mock.Mock(id='CLUSTER_ID', min_size=1, max_size=5)
         mock_load.return_value = cluster
+        mock_reserve.return_value = 5
         mock_count.return_value = 2
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx,
                                   id='CLUSTER_ACTION_ID',
@@ -112,7 +102,6 @@ class ClusterAddNodesTest(base.SenlinTestCase):
         node_obj_1 = mock.Mock()
         node_obj_2 = mock.Mock()
         mock_load_node.side_effect = [node_obj_1, node_obj_2]
-        mock_action.side_effect = ['NODE_ACTION_1', 'NODE_ACTION_2']
         mock_wait.return_value = (action.RES_OK, 'Good to go!')
 
         # do it
@@ -127,23 +116,15 @@ class ClusterAddNodesTest(base.SenlinTestCase):
             mock.call(action.context, 'NODE_1'),
             mock.call(action.context, 'NODE_2')])
         mock_count.assert_called_once_with(action.context, 'CLUSTER_ID')
-        mock_action.assert_has_calls([
-            mock.call(action.context, 'NODE_1', 'NODE_JOIN',
-                      name='node_join_NODE_1', cause='Derived Action',
-                      inputs={'cluster_id': 'CLUSTER_ID'}),
-            mock.call(action.context, 'NODE_2', 'NODE_JOIN',
-                      name='node_join_NODE_2', cause='Derived Action',
-                      inputs={'cluster_id': 'CLUSTER_ID'})])
-
-        mock_dep.assert_called_once_with(
-            action.context,
-            ['NODE_ACTION_1', 'NODE_ACTION_2'],
-            'CLUSTER_ACTION_ID')
-        mock_update.assert_has_calls([
-            mock.call(action.context, 'NODE_ACTION_1', {'status': 'READY'}),
-            mock.call(action.context, 'NODE_ACTION_2', {'status': 'READY'})
-        ])
-        mock_start.assert_called_once_with()
+        mock_reserve.assert_called_once_with(action.context, 'CLUSTER_ID',
+                                             2)
+        mock_create.assert_called_once_with([
+            ('NODE_1', 'NODE_JOIN',
+             {'name': 'node_join_NODE_1', 'cause': 'Derived Action',
+              'inputs': {'cluster_id': 'CLUSTER_ID', 'index': 5}}),
+            ('NODE_2', 'NODE_JOIN',
+             {'name': 'node_join_NODE_2', 'cause': 'Derived Action',
+              'inputs': {'cluster_id': 'CLUSTER_ID', 'index': 6}})])
         mock_wait.assert_called_once_with()
         cluster.eval_status.assert_called_once_with(
             action.context, consts.CLUSTER_ADD_NODES, desired_capacity=4)
@@ -244,20 +225,18 @@ class ClusterAddNodesTest(base.SenlinTestCase):
         self.assertEqual(2, mock_get.call_count)
         mock_count.assert_called_once_with(action.context, 'CID')
 
+    @mock.patch.object(co.Cluster, 'reserve_indexes')
     @mock.patch.object(no.Node, 'get')
     @mock.patch.object(no.Node, 'count_by_cluster')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
     @mock.patch.object(nm.Node, 'load')
     def test_do_add_nodes_failed_waiting(self, mock_load_node, mock_wait,
-                                         mock_start, mock_update, mock_dep,
-                                         mock_action, mock_count, mock_get,
-                                         mock_load):
+                                         mock_create, mock_count, mock_get,
+                                         mock_reserve, mock_load):
         cluster = mock.Mock(id='CLUSTER_ID', min_size=1, max_size=5)
         mock_load.return_value = cluster
+        mock_reserve.return_value = 5
 
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx,
                                   id='CLUSTER_ACTION_ID', data={},
@@ -265,7 +244,6 @@ class ClusterAddNodesTest(base.SenlinTestCase):
         mock_get.return_value = mock.Mock(id='NODE_1', cluster_id='',
                                           status='ACTIVE', ACTIVE='ACTIVE')
         mock_count.return_value = 3
-        mock_action.return_value = 'NODE_ACTION_ID'
         mock_wait.return_value = (action.RES_TIMEOUT, 'Timeout!')
 
         # do it
@@ -275,15 +253,12 @@ class ClusterAddNodesTest(base.SenlinTestCase):
         mock_load.assert_called_once_with(action.context, 'CLUSTER_ID')
         mock_get.assert_called_once_with(action.context, 'NODE_1')
         mock_count.assert_called_once_with(action.context, 'CLUSTER_ID')
-        mock_action.assert_called_once_with(
-            action.context, 'NODE_1', 'NODE_JOIN',
-            name='node_join_NODE_1', cause='Derived Action',
-            inputs={'cluster_id': 'CLUSTER_ID'})
-        mock_dep.assert_called_once_with(action.context, ['NODE_ACTION_ID'],
-                                         'CLUSTER_ACTION_ID')
-        mock_update.assert_called_once_with(
-            action.context, 'NODE_ACTION_ID', {'status': 'READY'})
-        mock_start.assert_called_once_with()
+        mock_reserve.assert_called_once_with(action.context, 'CLUSTER_ID',
+                                             1)
+        mock_create.assert_called_once_with([
+            ('NODE_1', 'NODE_JOIN',
+             {'name': 'node_join_NODE_1', 'cause': 'Derived Action',
+              'inputs': {'cluster_id': 'CLUSTER_ID', 'index': 5}})])
         mock_wait.assert_called_once_with()
         self.assertEqual(0, cluster.eval_status.call_count)
         self.assertEqual({}, action.outputs)
@@ -13,12 +13,9 @@
 import mock
 
 from senlin.common import consts
-from senlin.engine.actions import base as ab
 from senlin.engine.actions import cluster_action as ca
 from senlin.engine import cluster as cm
-from senlin.engine import dispatcher
 from senlin.objects import action as ao
-from senlin.objects import dependency as dobj
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
 
@@ -30,13 +27,9 @@ class ClusterCheckTest(base.SenlinTestCase):
         super(ClusterCheckTest, self).setUp()
         self.ctx = utils.dummy_context()
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_do_check(self, mock_wait, mock_start, mock_dep, mock_action,
-                      mock_update, mock_load):
+    def test_do_check(self, mock_wait, mock_create, mock_load):
         node1 = mock.Mock(id='NODE_1')
         node2 = mock.Mock(id='NODE_2')
         cluster = mock.Mock(id='FAKE_ID', status='old status',
@@ -44,7 +37,6 @@ class ClusterCheckTest(base.SenlinTestCase):
         cluster.nodes = [node1, node2]
         cluster.do_check.return_value = True
         mock_load.return_value = cluster
-        mock_action.side_effect = ['NODE_ACTION_1', 'NODE_ACTION_2']
 
         action = ca.ClusterAction('FAKE_CLUSTER', 'CLUSTER_CHECK', self.ctx)
         action.id = 'CLUSTER_ACTION_ID'
@@ -60,36 +52,22 @@ class ClusterCheckTest(base.SenlinTestCase):
 
         mock_load.assert_called_once_with(action.context, 'FAKE_CLUSTER')
         cluster.do_check.assert_called_once_with(action.context)
-        mock_action.assert_has_calls([
-            mock.call(action.context, 'NODE_1', 'NODE_CHECK',
-                      name='node_check_NODE_1',
-                      cause=consts.CAUSE_DERIVED,
-                      inputs={}),
-            mock.call(action.context, 'NODE_2', 'NODE_CHECK',
-                      name='node_check_NODE_2',
-                      cause=consts.CAUSE_DERIVED,
-                      inputs={})
+        mock_create.assert_called_once_with([
+            ('NODE_1', 'NODE_CHECK',
+             {'name': 'node_check_NODE_1', 'cause': consts.CAUSE_DERIVED,
+              'inputs': {}}),
+            ('NODE_2', 'NODE_CHECK',
+             {'name': 'node_check_NODE_2', 'cause': consts.CAUSE_DERIVED,
+              'inputs': {}}),
         ])
-        mock_dep.assert_called_once_with(action.context,
-                                         ['NODE_ACTION_1', 'NODE_ACTION_2'],
-                                         'CLUSTER_ACTION_ID')
-        mock_update.assert_has_calls([
-            mock.call(action.context, 'NODE_ACTION_1', {'status': 'READY'}),
-            mock.call(action.context, 'NODE_ACTION_2', {'status': 'READY'}),
-        ])
-        mock_start.assert_called_once_with()
         mock_wait.assert_called_once_with()
         cluster.eval_status.assert_called_once_with(
             action.context, consts.CLUSTER_CHECK)
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ao.Action, 'delete_by_target')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_do_check_need_delete(self, mock_wait, mock_start, mock_dep,
-                                  mock_delete, mock_action, mock_update,
+    def test_do_check_need_delete(self, mock_wait, mock_delete, mock_create,
                                   mock_load):
         node1 = mock.Mock(id='NODE_1')
         node2 = mock.Mock(id='NODE_2')
@@ -98,7 +76,6 @@ class ClusterCheckTest(base.SenlinTestCase):
         cluster.nodes = [node1, node2]
         cluster.do_check.return_value = True
         mock_load.return_value = cluster
-        mock_action.side_effect = ['NODE_ACTION_1', 'NODE_ACTION_2']
         action = ca.ClusterAction('FAKE_CLUSTER', 'CLUSTER_CHECK', self.ctx,
                                   inputs={'delete_check_action': True})
         action.id = 'CLUSTER_ACTION_ID'
@@ -120,24 +97,14 @@ class ClusterCheckTest(base.SenlinTestCase):
             mock.call(action.context, 'NODE_2', action=['NODE_CHECK'],
                       status=['SUCCEEDED', 'FAILED'])
         ])
-        mock_action.assert_has_calls([
-            mock.call(action.context, 'NODE_1', 'NODE_CHECK',
-                      name='node_check_NODE_1',
-                      cause=consts.CAUSE_DERIVED,
-                      inputs={'delete_check_action': True}),
-            mock.call(action.context, 'NODE_2', 'NODE_CHECK',
-                      name='node_check_NODE_2',
-                      cause=consts.CAUSE_DERIVED,
-                      inputs={'delete_check_action': True})
-        ])
-        mock_dep.assert_called_once_with(action.context,
-                                         ['NODE_ACTION_1', 'NODE_ACTION_2'],
-                                         'CLUSTER_ACTION_ID')
-        mock_update.assert_has_calls([
-            mock.call(action.context, 'NODE_ACTION_1', {'status': 'READY'}),
-            mock.call(action.context, 'NODE_ACTION_2', {'status': 'READY'}),
+        mock_create.assert_called_once_with([
+            ('NODE_1', 'NODE_CHECK',
+             {'name': 'node_check_NODE_1', 'cause': consts.CAUSE_DERIVED,
+              'inputs': {'delete_check_action': True}}),
+            ('NODE_2', 'NODE_CHECK',
+             {'name': 'node_check_NODE_2', 'cause': consts.CAUSE_DERIVED,
+              'inputs': {'delete_check_action': True}}),
         ])
-        mock_start.assert_called_once_with()
         mock_wait.assert_called_once_with()
         cluster.eval_status.assert_called_once_with(
             action.context, consts.CLUSTER_CHECK)
@@ -159,20 +126,15 @@ class ClusterCheckTest(base.SenlinTestCase):
         cluster.eval_status.assert_called_once_with(
             action.context, consts.CLUSTER_CHECK)
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_do_check_failed_waiting(self, mock_wait, mock_start, mock_dep,
-                                     mock_action, mock_update, mock_load):
+    def test_do_check_failed_waiting(self, mock_wait, mock_create, mock_load):
         node = mock.Mock(id='NODE_1')
         cluster = mock.Mock(id='CLUSTER_ID', status='old status',
                             status_reason='old reason')
         cluster.do_recover.return_value = True
         cluster.nodes = [node]
         mock_load.return_value = cluster
-        mock_action.return_value = 'NODE_ACTION_ID'
 
         action = ca.ClusterAction('FAKE_CLUSTER', 'CLUSTER_CHECK', self.ctx)
         action.id = 'CLUSTER_ACTION_ID'
@@ -186,17 +148,10 @@ class ClusterCheckTest(base.SenlinTestCase):
 
         mock_load.assert_called_once_with(self.ctx, 'FAKE_CLUSTER')
         cluster.do_check.assert_called_once_with(action.context)
-        mock_action.assert_called_once_with(
-            action.context, 'NODE_1', 'NODE_CHECK',
-            name='node_check_NODE_1',
-            inputs={},
-            cause=consts.CAUSE_DERIVED,
-        )
-        mock_dep.assert_called_once_with(action.context, ['NODE_ACTION_ID'],
-                                         'CLUSTER_ACTION_ID')
-        mock_update.assert_called_once_with(action.context, 'NODE_ACTION_ID',
-                                            {'status': 'READY'})
-        mock_start.assert_called_once_with()
+        mock_create.assert_called_once_with([
+            ('NODE_1', 'NODE_CHECK',
+             {'name': 'node_check_NODE_1', 'cause': consts.CAUSE_DERIVED,
+              'inputs': {}})])
         mock_wait.assert_called_once_with()
         cluster.eval_status.assert_called_once_with(
             action.context, consts.CLUSTER_CHECK)
@@ -206,6 +206,42 @@ class ClusterActionTest(base.SenlinTestCase):
         mock_release.assert_called_once_with(
             'CLUSTER_ID', 'ACTION_ID', senlin_lock.CLUSTER_SCOPE)
 
+    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ab.Action, 'create_bulk')
+    def test_create_children(self, mock_create, mock_start, mock_load):
+        mock_create.return_value = ['NODE_ACTION_1', 'NODE_ACTION_2']
+        action = ca.ClusterAction(CLUSTER_ID, 'CLUSTER_ACTION', self.ctx,
+                                  id=ACTION_ID)
+        specs = [('NODE_1', 'NODE_CHECK', {'id': 'NODE_ACTION_1'}),
+                 ('NODE_2', 'NODE_CHECK', {'id': 'NODE_ACTION_2'})]
+
+        res = action._create_children(specs, nodes=['NODE'])
+
+        self.assertEqual(['NODE_ACTION_1', 'NODE_ACTION_2'], res)
+        mock_create.assert_called_once_with(
+            action.context, specs,
+            [('NODE_ACTION_1', ACTION_ID), ('NODE_ACTION_2', ACTION_ID)],
+            nodes=['NODE'])
+        mock_start.assert_called_once_with()
+
+    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ab.Action, 'create_bulk')
+    def test_create_children_with_dependencies(self, mock_create, mock_start,
+                                               mock_load):
+        action = ca.ClusterAction(CLUSTER_ID, 'CLUSTER_ACTION', self.ctx,
+                                  id=ACTION_ID)
+        specs = [('NODE_1', 'NODE_LEAVE', {}), ('NODE_2', 'NODE_JOIN', {})]
+        deps = [('JOIN', ACTION_ID), ('JOIN', 'LEAVE')]
+
+        action._create_children(specs, dependencies=deps)
+
+        # action IDs are generated for the specs without one
+        self.assertIsNotNone(specs[0][2]['id'])
+        self.assertIsNotNone(specs[1][2]['id'])
+        mock_create.assert_called_once_with(action.context, specs, deps,
+                                            nodes=None)
+        mock_start.assert_called_once_with()
+
     def test_cancel(self, mock_load):
         action = ca.ClusterAction('ID', 'CLUSTER_DELETE', self.ctx)
         res = action.cancel()
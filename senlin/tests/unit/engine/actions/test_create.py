@@ -11,16 +11,13 @@
 # under the License.
 
 import mock
+from oslo_utils import uuidutils
 
 from senlin.common import consts
-from senlin.engine.actions import base as ab
 from senlin.engine.actions import cluster_action as ca
 from senlin.engine import cluster as cm
-from senlin.engine import dispatcher
 from senlin.engine import node as nm
-from senlin.objects import action as ao
 from senlin.objects import cluster as co
-from senlin.objects import dependency as dobj
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
 
@@ -32,22 +29,21 @@ class ClusterCreateTest(base.SenlinTestCase):
         super(ClusterCreateTest, self).setUp()
         self.ctx = utils.dummy_context()
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(co.Cluster, 'get_next_index')
+    @mock.patch.object(uuidutils, 'generate_uuid')
+    @mock.patch.object(co.Cluster, 'reserve_indexes')
     @mock.patch.object(nm, 'Node')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_create_nodes_single(self, mock_wait, mock_start, mock_dep,
-                                 mock_node, mock_index, mock_action,
-                                 mock_update, mock_load):
+    def test_create_nodes_single(self, mock_wait, mock_create, mock_node,
+                                 mock_index, mock_uuid, mock_load):
         # prepare mocks
         cluster = mock.Mock(id='CLUSTER_ID', profile_id='FAKE_PROFILE',
                             user='FAKE_USER', project='FAKE_PROJECT',
                             domain='FAKE_DOMAIN',
-                            config={"node.name.format": "node-$3I"})
+                            config={"node.name.format": "node-$3I"},
+                            rt={'profile': 'PROFILE'})
         mock_index.return_value = 123
+        mock_uuid.return_value = 'NODE_ID'
         node = mock.Mock(id='NODE_ID')
         mock_node.return_value = node
 
@@ -57,37 +53,30 @@ class ClusterCreateTest(base.SenlinTestCase):
         action.id = 'CLUSTER_ACTION_ID'
         mock_wait.return_value = (action.RES_OK, 'All dependents completed')
 
-        # node_action is faked
-        mock_action.return_value = 'NODE_ACTION_ID'
-
         # do it
         res_code, res_msg = action._create_nodes(1)
 
         # assertions
         self.assertEqual(action.RES_OK, res_code)
         self.assertEqual('All dependents completed', res_msg)
-        mock_index.assert_called_once_with(action.context, 'CLUSTER_ID')
+        mock_index.assert_called_once_with(action.context, 'CLUSTER_ID', 1)
         mock_node.assert_called_once_with('node-123',
                                           'FAKE_PROFILE',
                                           'CLUSTER_ID',
-                                          context=action.context,
+                                          id='NODE_ID',
                                           user='FAKE_USER',
                                           project='FAKE_PROJECT',
                                           domain='FAKE_DOMAIN',
                                           index=123, metadata={})
-        node.store.assert_called_once_with(action.context)
-        mock_action.assert_called_once_with(action.context, 'NODE_ID',
-                                            'NODE_CREATE',
-                                            name='node_create_NODE_ID',
-                                            cause='Derived Action')
-        mock_dep.assert_called_once_with(action.context, ['NODE_ACTION_ID'],
-                                         'CLUSTER_ACTION_ID')
-        mock_update.assert_called_once_with(
-            action.context, 'NODE_ACTION_ID',
-            {'status': ab.Action.READY})
-        mock_start.assert_called_once_with()
+        self.assertEqual({'profile': 'PROFILE'}, node.rt)
+        self.assertEqual(0, node.store.call_count)
+        mock_create.assert_called_once_with(
+            [('NODE_ID', 'NODE_CREATE',
+              {'name': 'node_create_NODE_ID', 'cause': 'Derived Action'})],
+            nodes=[node])
         mock_wait.assert_called_once_with()
         self.assertEqual({'nodes_added': ['NODE_ID']}, action.outputs)
+        cluster.add_node.assert_called_once_with(node)
 
     @mock.patch.object(co.Cluster, 'get')
     def test_create_nodes_zero(self, mock_get, mock_load):
@@ -102,16 +91,12 @@ class ClusterCreateTest(base.SenlinTestCase):
         self.assertEqual(action.RES_OK, res_code)
         self.assertEqual('', res_msg)
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(co.Cluster, 'get_next_index')
+    @mock.patch.object(co.Cluster, 'reserve_indexes')
     @mock.patch.object(nm, 'Node')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_create_nodes_multiple(self, mock_wait, mock_start, mock_dep,
-                                   mock_node, mock_index, mock_action,
-                                   mock_update, mock_load):
+    def test_create_nodes_multiple(self, mock_wait, mock_create, mock_node,
+                                   mock_index, mock_load):
         cluster = mock.Mock(id='01234567-123434',
                             config={"node.name.format": "node-$3I"})
         node1 = mock.Mock(id='01234567-abcdef',
@@ -119,7 +104,7 @@ class ClusterCreateTest(base.SenlinTestCase):
         node2 = mock.Mock(id='abcdefab-123456',
                           data={'placement': {'region': 'regionTwo'}})
         mock_node.side_effect = [node1, node2]
-        mock_index.side_effect = [123, 124]
+        mock_index.return_value = 123
 
         mock_load.return_value = cluster
         # cluster action is real
@@ -136,40 +121,35 @@ class ClusterCreateTest(base.SenlinTestCase):
         }
         mock_wait.return_value = (action.RES_OK, 'All dependents completed')
 
-        # node_action is faked
-        mock_action.side_effect = ['NODE_ACTION_1', 'NODE_ACTION_2']
-
         # do it
         res_code, res_msg = action._create_nodes(2)
 
         # assertions
         self.assertEqual(action.RES_OK, res_code)
         self.assertEqual('All dependents completed', res_msg)
-        self.assertEqual(2, mock_index.call_count)
+        mock_index.assert_called_once_with(action.context, '01234567-123434',
+                                           2)
         self.assertEqual(2, mock_node.call_count)
-        node1.store.assert_called_once_with(action.context)
-        node2.store.assert_called_once_with(action.context)
-        self.assertEqual(2, mock_action.call_count)
-        self.assertEqual(1, mock_dep.call_count)
-
-        update_calls = [
-            mock.call(action.context, 'NODE_ACTION_1', {'status': 'READY'}),
-            mock.call(action.context, 'NODE_ACTION_2', {'status': 'READY'})
-        ]
-        mock_update.assert_has_calls(update_calls)
-        mock_start.assert_called_once_with()
+        self.assertEqual(0, node1.store.call_count)
+        self.assertEqual(0, node2.store.call_count)
+        mock_create.assert_called_once_with(
+            [('01234567-abcdef', 'NODE_CREATE',
+              {'name': 'node_create_01234567', 'cause': 'Derived Action'}),
+             ('abcdefab-123456', 'NODE_CREATE',
+              {'name': 'node_create_abcdefab', 'cause': 'Derived Action'})],
+            nodes=[node1, node2])
         mock_wait.assert_called_once_with()
         self.assertEqual({'nodes_added': [node1.id, node2.id]}, action.outputs)
         self.assertEqual({'region': 'regionOne'}, node1.data['placement'])
         self.assertEqual({'region': 'regionTwo'}, node2.data['placement'])
         mock_node_calls = [
             mock.call('node-123', mock.ANY, '01234567-123434',
-                      user=mock.ANY, project=mock.ANY, domain=mock.ANY,
-                      index=123, context=mock.ANY, metadata={},
+                      id=mock.ANY, user=mock.ANY, project=mock.ANY,
+                      domain=mock.ANY, index=123, metadata={},
                       data={'placement': {'region': 'regionOne'}}),
             mock.call('node-124', mock.ANY, '01234567-123434',
-                      user=mock.ANY, project=mock.ANY, domain=mock.ANY,
-                      index=124, context=mock.ANY, metadata={},
+                      id=mock.ANY, user=mock.ANY, project=mock.ANY,
+                      domain=mock.ANY, index=124, metadata={},
                       data={'placement': {'region': 'regionTwo'}})
         ]
 
@@ -177,18 +157,15 @@ class ClusterCreateTest(base.SenlinTestCase):
         cluster.add_node.assert_has_calls([
             mock.call(node1), mock.call(node2)])
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(co.Cluster, 'get')
+    @mock.patch.object(co.Cluster, 'reserve_indexes')
     @mock.patch.object(nm, 'Node')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_create_nodes_multiple_failed_wait(self, mock_wait, mock_start,
-                                               mock_dep, mock_node, mock_get,
-                                               mock_update, mock_load):
+    def test_create_nodes_multiple_failed_wait(self, mock_wait, mock_create,
+                                               mock_node, mock_index,
+                                               mock_load):
         cluster = mock.Mock(id='01234567-123434', config={})
-        db_cluster = mock.Mock(next_index=1)
-        mock_get.return_value = db_cluster
+        mock_index.return_value = 1
         node1 = mock.Mock(id='01234567-abcdef', data={})
         node2 = mock.Mock(id='abcdefab-123456', data={})
         mock_node.side_effect = [node1, node2]
@@ -208,17 +185,14 @@ class ClusterCreateTest(base.SenlinTestCase):
         }
         mock_wait.return_value = (action.RES_ERROR, 'Waiting timed out')
 
-        # node_action is faked
-        n_action_1 = mock.Mock()
-        n_action_2 = mock.Mock()
-        self.patchobject(ab, 'Action', side_effect=[n_action_1, n_action_2])
-
         # do it
         res_code, res_msg = action._create_nodes(2)
 
         # assertions
         self.assertEqual(action.RES_ERROR, res_code)
         self.assertEqual('Failed in creating nodes.', res_msg)
+        self.assertEqual(1, mock_create.call_count)
+        self.assertEqual(0, cluster.add_node.call_count)
 
     def test_do_create_success(self, mock_load):
         cluster = mock.Mock(id='FAKE_CLUSTER', ACTIVE='ACTIVE')
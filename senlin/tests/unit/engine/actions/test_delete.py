@@ -32,13 +32,9 @@ class ClusterDeleteTest(base.SenlinTestCase):
         super(ClusterDeleteTest, self).setUp()
         self.ctx = utils.dummy_context()
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_delete_nodes_single(self, mock_wait, mock_start, mock_dep,
-                                 mock_action, mock_update, mock_load):
+    def test_delete_nodes_single(self, mock_wait, mock_create, mock_load):
         # prepare mocks
         cluster = mock.Mock(id='FAKE_CLUSTER', desired_capacity=100, config={})
 
@@ -48,7 +44,6 @@ class ClusterDeleteTest(base.SenlinTestCase):
         action.id = 'CLUSTER_ACTION_ID'
         action.inputs = {'destroy_after_deletion': False}
         mock_wait.return_value = (action.RES_OK, 'All dependents completed')
-        mock_action.return_value = 'NODE_ACTION_ID'
 
         # do it
         res_code, res_msg = action._delete_nodes(['NODE_ID'])
@@ -56,25 +51,17 @@ class ClusterDeleteTest(base.SenlinTestCase):
         # assertions
         self.assertEqual(action.RES_OK, res_code)
         self.assertEqual('All dependents completed', res_msg)
-        mock_action.assert_called_once_with(
-            action.context, 'NODE_ID', 'NODE_DELETE',
-            name='node_delete_NODE_ID', cause='Derived Action', inputs={})
-        mock_dep.assert_called_once_with(action.context, ['NODE_ACTION_ID'],
-                                         'CLUSTER_ACTION_ID')
-        mock_update.assert_called_once_with(action.context, 'NODE_ACTION_ID',
-                                            {'status': 'READY'})
-        mock_start.assert_called_once_with()
+        mock_create.assert_called_once_with([
+            ('NODE_ID', 'NODE_DELETE',
+             {'name': 'node_delete_NODE_ID', 'cause': 'Derived Action',
+              'inputs': {}})])
         mock_wait.assert_called_once_with()
         self.assertEqual(['NODE_ID'], action.outputs['nodes_removed'])
         cluster.remove_node.assert_called_once_with('NODE_ID')
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_delete_nodes_single_stop_node(self, mock_wait, mock_start,
-                                           mock_dep, mock_action, mock_update,
+    def test_delete_nodes_single_stop_node(self, mock_wait, mock_create,
                                            mock_load):
         # prepare mocks
         cluster = mock.Mock(id='FAKE_CLUSTER', desired_capacity=100,
@@ -86,7 +73,6 @@ class ClusterDeleteTest(base.SenlinTestCase):
         action.id = 'CLUSTER_ACTION_ID'
         action.inputs = {'destroy_after_deletion': False}
         mock_wait.return_value = (action.RES_OK, 'All dependents completed')
-        mock_action.return_value = 'NODE_ACTION_ID'
 
         # do it
         res_code, res_msg = action._delete_nodes(['NODE_ID'])
@@ -94,39 +80,23 @@ class ClusterDeleteTest(base.SenlinTestCase):
         # assertions
         self.assertEqual(action.RES_OK, res_code)
         self.assertEqual('All dependents completed', res_msg)
-        create_actions = [
-            mock.call(action.context, 'NODE_ID', 'NODE_OPERATION',
-                      name='node_delete_NODE_ID',
-                      cause='Derived Action',
-                      inputs={'operation': 'stop',
-                              'update_parent_status': False}),
-            mock.call(action.context, 'NODE_ID', 'NODE_DELETE',
-                      name='node_delete_NODE_ID',
-                      cause='Derived Action', inputs={})
-        ]
-        mock_action.assert_has_calls(create_actions)
-        dep_calls = [
-            mock.call(action.context, ['NODE_ACTION_ID'], 'CLUSTER_ACTION_ID'),
-            mock.call(action.context, ['NODE_ACTION_ID'], 'CLUSTER_ACTION_ID'),
-        ]
-        mock_dep.assert_has_calls(dep_calls)
-        update_calls = [
-            mock.call(action.context, 'NODE_ACTION_ID', {'status': 'READY'}),
-            mock.call(action.context, 'NODE_ACTION_ID', {'status': 'READY'})
-        ]
-        mock_update.assert_has_calls(update_calls)
-        mock_start.assert_has_calls([mock.call(), mock.call()])
+        mock_create.assert_has_calls([
+            mock.call([('NODE_ID', 'NODE_OPERATION',
+                        {'name': 'node_delete_NODE_ID',
+                         'cause': 'Derived Action',
+                         'inputs': {'operation': 'stop',
+                                    'update_parent_status': False}})]),
+            mock.call([('NODE_ID', 'NODE_DELETE',
+                        {'name': 'node_delete_NODE_ID',
+                         'cause': 'Derived Action', 'inputs': {}})]),
+        ])
         mock_wait.assert_has_calls([mock.call(), mock.call()])
         self.assertEqual(['NODE_ID'], action.outputs['nodes_removed'])
         cluster.remove_node.assert_called_once_with('NODE_ID')
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_delete_nodes_multi(self, mock_wait, mock_start, mock_dep,
-                                mock_action, mock_update, mock_load):
+    def test_delete_nodes_multi(self, mock_wait, mock_create, mock_load):
         # prepare mocks
         cluster = mock.Mock(id='CLUSTER_ID', desired_capacity=100, config={})
         mock_load.return_value = cluster
@@ -136,7 +106,6 @@ class ClusterDeleteTest(base.SenlinTestCase):
         action.id = 'CLUSTER_ACTION_ID'
         action.inputs = {'destroy_after_deletion': False}
         mock_wait.return_value = (action.RES_OK, 'All dependents completed')
-        mock_action.side_effect = ['NODE_ACTION_1', 'NODE_ACTION_2']
 
         # do it
         res_code, res_msg = action._delete_nodes(['NODE_1', 'NODE_2'])
@@ -144,14 +113,13 @@ class ClusterDeleteTest(base.SenlinTestCase):
         # assertions
         self.assertEqual(action.RES_OK, res_code)
         self.assertEqual('All dependents completed', res_msg)
-        self.assertEqual(2, mock_action.call_count)
-        update_calls = [
-            mock.call(action.context, 'NODE_ACTION_1', {'status': 'READY'}),
-            mock.call(action.context, 'NODE_ACTION_2', {'status': 'READY'})
-        ]
-        mock_update.assert_has_calls(update_calls)
-        self.assertEqual(1, mock_dep.call_count)
-        mock_start.assert_called_once_with()
+        mock_create.assert_called_once_with([
+            ('NODE_1', 'NODE_DELETE',
+             {'name': 'node_delete_NODE_1', 'cause': 'Derived Action',
+              'inputs': {}}),
+            ('NODE_2', 'NODE_DELETE',
+             {'name': 'node_delete_NODE_2', 'cause': 'Derived Action',
+              'inputs': {}})])
         mock_wait.assert_called_once_with()
         self.assertEqual({'nodes_removed': ['NODE_1', 'NODE_2']},
                          action.outputs)
@@ -172,13 +140,9 @@ class ClusterDeleteTest(base.SenlinTestCase):
         self.assertEqual(action.RES_OK, res_code)
         self.assertEqual('', res_msg)
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_delete_nodes_with_pd(self, mock_wait, mock_start, mock_dep,
-                                  mock_action, mock_update, mock_load):
+    def test_delete_nodes_with_pd(self, mock_wait, mock_create, mock_load):
         # prepare mocks
         cluster = mock.Mock(id='CLUSTER_ID', desired_capacity=100, config={})
         mock_load.return_value = cluster
@@ -192,16 +156,16 @@ class ClusterDeleteTest(base.SenlinTestCase):
             }
         }
         mock_wait.return_value = (action.RES_OK, 'All dependents completed')
-        mock_action.return_value = 'NODE_ACTION_ID'
         # do it
         res_code, res_msg = action._delete_nodes(['NODE_ID'])
 
         # assertions (other assertions are skipped)
         self.assertEqual(action.RES_OK, res_code)
         self.assertEqual('All dependents completed', res_msg)
-        mock_action.assert_called_once_with(
-            action.context, 'NODE_ID', 'NODE_LEAVE',
-            name='node_delete_NODE_ID', cause='Derived Action', inputs={})
+        mock_create.assert_called_once_with([
+            ('NODE_ID', 'NODE_LEAVE',
+             {'name': 'node_delete_NODE_ID', 'cause': 'Derived Action',
+              'inputs': {}})])
 
     @mock.patch.object(ao.Action, 'update')
     @mock.patch.object(ab.Action, 'create')
@@ -777,13 +741,9 @@ class ClusterDeleteTest(base.SenlinTestCase):
 
         self.assertEqual(False, res)
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_remove_nodes_normally(self, mock_wait, mock_start, mock_dep,
-                                   mock_action, mock_update, mock_load):
+    def test_remove_nodes_normally(self, mock_wait, mock_create, mock_load):
         # prepare mocks
         cluster = mock.Mock(id='CLUSTER_ID', desired_capacity=100)
         mock_load.return_value = cluster
@@ -793,7 +753,6 @@ class ClusterDeleteTest(base.SenlinTestCase):
         action.id = 'CLUSTER_ACTION_ID'
         action.inputs = {'destroy_after_deletion': False}
         mock_wait.return_value = (action.RES_OK, 'All dependents completed')
-        mock_action.side_effect = ['NODE_ACTION_1', 'NODE_ACTION_2']
 
         # do it
         res_code, res_msg = action._remove_nodes_normally('NODE_REMOVE',
@@ -802,14 +761,13 @@ class ClusterDeleteTest(base.SenlinTestCase):
         # assertions
         self.assertEqual(action.RES_OK, res_code)
         self.assertEqual('All dependents completed', res_msg)
-        self.assertEqual(2, mock_action.call_count)
-        update_calls = [
-            mock.call(action.context, 'NODE_ACTION_1', {'status': 'READY'}),
-            mock.call(action.context, 'NODE_ACTION_2', {'status': 'READY'})
-        ]
-        mock_update.assert_has_calls(update_calls)
-        self.assertEqual(1, mock_dep.call_count)
-        mock_start.assert_called_once_with()
+        mock_create.assert_called_once_with([
+            ('NODE_1', 'NODE_REMOVE',
+             {'name': 'node_delete_NODE_1', 'cause': 'Derived Action',
+              'inputs': {}}),
+            ('NODE_2', 'NODE_REMOVE',
+             {'name': 'node_delete_NODE_2', 'cause': 'Derived Action',
+              'inputs': {}})])
         mock_wait.assert_called_once_with()
 
     @mock.patch.object(ao.Action, 'update')
@@ -12,6 +12,7 @@
 
 import eventlet
 import mock
+from oslo_config import cfg
 
 from senlin.common import consts
 from senlin.common import scaleutils
@@ -23,6 +24,7 @@ from senlin.engine import node as node_mod
 from senlin.engine import senlin_lock as lock
 from senlin.objects import action as ao
 from senlin.objects import node as node_obj
+from senlin.objects import token_bucket as tbo
 from senlin.policies import base as policy_mod
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
@@ -439,7 +441,22 @@ class NodeActionTest(base.SenlinTestCase):
 
         self.assertEqual(action.RES_OK, res_code)
         self.assertEqual('Node successfully joined cluster.', res_msg)
-        node.do_join.assert_called_once_with(action.context, 'FAKE_ID')
+        node.do_join.assert_called_once_with(action.context, 'FAKE_ID',
+                                             index=None)
+
+    def test_do_join_with_index(self, mock_load):
+        node = mock.Mock(id='NID')
+        mock_load.return_value = node
+        inputs = {"cluster_id": "FAKE_ID", "index": 5}
+        action = node_action.NodeAction(node.id, 'NODE_JOIN', self.ctx,
+                                        inputs=inputs)
+        node.do_join = mock.Mock(return_value=True)
+
+        res_code, res_msg = action.do_join()
+
+        self.assertEqual(action.RES_OK, res_code)
+        node.do_join.assert_called_once_with(action.context, 'FAKE_ID',
+                                             index=5)
 
     def test_do_join_failed_do_join(self, mock_load):
         node = mock.Mock(id='NID')
@@ -454,7 +471,8 @@ class NodeActionTest(base.SenlinTestCase):
 
         self.assertEqual(action.RES_ERROR, res_code)
         self.assertEqual('Node failed in joining cluster.', res_msg)
-        node.do_join.assert_called_once_with(action.context, 'FAKE_ID')
+        node.do_join.assert_called_once_with(action.context, 'FAKE_ID',
+                                             index=None)
 
     def test_do_leave_success(self, mock_load):
         node = mock.Mock(id='NID', cluster_id='CID')
@@ -642,6 +660,75 @@ class NodeActionTest(base.SenlinTestCase):
                                              lock.NODE_SCOPE)
         mock_check.assert_called_once_with('FAKE_CLUSTER', 'BEFORE')
 
+    def test_rate_limit_key(self, mock_load):
+        profile = mock.Mock(type='os.nova.server-1.0', CONTEXT='context',
+                            properties={'context': {'region_name': 'R1'}})
+        node = mock.Mock(id='NID', rt={'profile': profile}, data={})
+        mock_load.return_value = node
+        action = node_action.NodeAction('NID', 'NODE_CREATE', self.ctx)
+
+        self.assertEqual('NODE_CREATE:os.nova.server-1.0:R1',
+                         action._rate_limit_key())
+
+        # region placement takes precedence over the profile context
+        node.data = {'placement': {'region_name': 'R2'}}
+        self.assertEqual('NODE_CREATE:os.nova.server-1.0:R2',
+                         action._rate_limit_key())
+
+    def test_rate_limit_key_no_region(self, mock_load):
+        profile = mock.Mock(type='os.heat.stack-1.0', CONTEXT='context',
+                            properties={'context': {}})
+        node = mock.Mock(id='NID', rt={'profile': profile}, data={})
+        mock_load.return_value = node
+        action = node_action.NodeAction('NID', 'NODE_DELETE', self.ctx)
+
+        self.assertEqual('NODE_DELETE:os.heat.stack-1.0:',
+                         action._rate_limit_key())
+
+    @mock.patch.object(tbo.TokenBucket, 'consume')
+    def test_take_rate_limit_token_disabled(self, mock_consume, mock_load):
+        action = node_action.NodeAction('NID', 'NODE_CREATE', self.ctx)
+
+        self.assertEqual(0, action._take_rate_limit_token())
+
+        mock_consume.assert_not_called()
+        self.assertNotIn('rate_limited', action.data)
+
+    @mock.patch.object(base_action, 'wallclock')
+    @mock.patch.object(tbo.TokenBucket, 'consume')
+    def test_take_rate_limit_token(self, mock_consume, mock_time, mock_load):
+        cfg.CONF.set_override('max_actions_per_batch', 10)
+        cfg.CONF.set_override('batch_interval', 5)
+        mock_time.return_value = 123.4
+        mock_consume.return_value = 1.5
+        action = node_action.NodeAction('NID', 'NODE_CREATE', self.ctx,
+                                        id='ACTION_ID')
+        self.patchobject(action, '_rate_limit_key', return_value='KEY')
+
+        self.assertEqual(1.5, action._take_rate_limit_token())
+        mock_consume.assert_called_once_with(action.context, 'KEY', 2.0, 10,
+                                             123.4)
+        self.assertTrue(action.data['rate_limited'])
+
+        # The token is only taken once
+        self.assertEqual(0, action._take_rate_limit_token())
+        self.assertEqual(1, mock_consume.call_count)
+
+    @mock.patch.object(lock, 'node_lock_acquire')
+    def test_execute_rate_limited(self, mock_acquire, mock_load):
+        node = mock.Mock(id='NID', cluster_id='')
+        mock_load.return_value = node
+        action = node_action.NodeAction('NID', 'NODE_CREATE', self.ctx,
+                                        id='ACTION_ID')
+        self.patchobject(action, '_take_rate_limit_token', return_value=1.5)
+
+        res_code, res_msg = action.execute()
+
+        self.assertEqual(action.RES_DEFER, res_code)
+        self.assertEqual('Rate limited', res_msg)
+        self.assertEqual(1.5, action.defer_delay)
+        mock_acquire.assert_not_called()
+
     @mock.patch.object(lock, 'cluster_lock_acquire')
     @mock.patch.object(lock, 'cluster_lock_release')
     @mock.patch.object(lock, 'node_lock_acquire')
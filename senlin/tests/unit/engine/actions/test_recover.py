@@ -14,13 +14,9 @@ import mock
 
 from senlin.common import consts
 from senlin.common import scaleutils as su
-from senlin.engine.actions import base as ab
 from senlin.engine.actions import cluster_action as ca
 from senlin.engine import cluster as cm
-from senlin.engine import dispatcher
 from senlin.engine import node as nm
-from senlin.objects import action as ao
-from senlin.objects import dependency as dobj
 from senlin.objects import node as no
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
@@ -33,13 +29,9 @@ class ClusterRecoverTest(base.SenlinTestCase):
         super(ClusterRecoverTest, self).setUp()
         self.ctx = utils.dummy_context()
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_do_recover(self, mock_wait, mock_start, mock_dep,
-                        mock_action, mock_update, mock_load):
+    def test_do_recover(self, mock_wait, mock_create, mock_load):
         node1 = mock.Mock(id='NODE_1', cluster_id='FAKE_ID', status='ACTIVE')
         node2 = mock.Mock(id='NODE_2', cluster_id='FAKE_ID', status='ERROR')
 
@@ -53,7 +45,6 @@ class ClusterRecoverTest(base.SenlinTestCase):
         action.id = 'CLUSTER_ACTION_ID'
         action.data = {}
 
-        mock_action.return_value = 'NODE_RECOVER_ID'
         mock_wait.return_value = (action.RES_OK, 'Everything is Okay')
 
         # do it
@@ -64,29 +55,18 @@ class ClusterRecoverTest(base.SenlinTestCase):
         self.assertEqual('Cluster recovery succeeded.', res_msg)
 
         cluster.do_recover.assert_called_once_with(action.context)
-        mock_action.assert_called_once_with(
-            action.context, 'NODE_2', 'NODE_RECOVER',
-            name='node_recover_NODE_2',
-            cause=consts.CAUSE_DERIVED,
-            inputs={'operation': None, 'operation_params': None}
-        )
-        mock_dep.assert_called_once_with(action.context, ['NODE_RECOVER_ID'],
-                                         'CLUSTER_ACTION_ID')
-        mock_update.assert_called_once_with(action.context, 'NODE_RECOVER_ID',
-                                            {'status': 'READY'})
-        mock_start.assert_called_once_with()
+        mock_create.assert_called_once_with([
+            ('NODE_2', 'NODE_RECOVER',
+             {'name': 'node_recover_NODE_2', 'cause': consts.CAUSE_DERIVED,
+              'inputs': {'operation': None, 'operation_params': None}})])
         mock_wait.assert_called_once_with()
         cluster.eval_status.assert_called_once_with(
             action.context, consts.CLUSTER_RECOVER)
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
     @mock.patch.object(ca.ClusterAction, '_check_capacity')
-    def test_do_recover_with_input(self, mock_check, mock_wait, mock_start,
-                                   mock_dep, mock_action, mock_update,
+    def test_do_recover_with_input(self, mock_check, mock_wait, mock_create,
                                    mock_load):
         node1 = mock.Mock(id='NODE_1', cluster_id='FAKE_ID', status='ERROR')
         cluster = mock.Mock(id='FAKE_ID', RECOVERING='RECOVERING',
@@ -103,7 +83,6 @@ class ClusterRecoverTest(base.SenlinTestCase):
             'check_capacity': True
         }
 
-        mock_action.return_value = 'NODE_RECOVER_ID'
         mock_wait.return_value = (action.RES_OK, 'Everything is Okay')
 
         # do it
@@ -114,20 +93,11 @@ class ClusterRecoverTest(base.SenlinTestCase):
         self.assertEqual('Cluster recovery succeeded.', res_msg)
 
         cluster.do_recover.assert_called_once_with(action.context)
-        mock_action.assert_called_once_with(
-            action.context, 'NODE_1', 'NODE_RECOVER',
-            name='node_recover_NODE_1',
-            cause=consts.CAUSE_DERIVED,
-            inputs={
-                'operation': consts.RECOVER_REBOOT,
-                'operation_params': None
-            }
-        )
-        mock_dep.assert_called_once_with(action.context, ['NODE_RECOVER_ID'],
-                                         'CLUSTER_ACTION_ID')
-        mock_update.assert_called_once_with(action.context, 'NODE_RECOVER_ID',
-                                            {'status': 'READY'})
-        mock_start.assert_called_once_with()
+        mock_create.assert_called_once_with([
+            ('NODE_1', 'NODE_RECOVER',
+             {'name': 'node_recover_NODE_1', 'cause': consts.CAUSE_DERIVED,
+              'inputs': {'operation': consts.RECOVER_REBOOT,
+                         'operation_params': None}})])
         mock_wait.assert_called_once_with()
         cluster.eval_status.assert_called_once_with(
             action.context, consts.CLUSTER_RECOVER)
@@ -153,21 +123,16 @@ class ClusterRecoverTest(base.SenlinTestCase):
         cluster.eval_status.assert_called_once_with(
             action.context, consts.CLUSTER_RECOVER)
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
     @mock.patch.object(ca.ClusterAction, '_check_capacity')
     def test_do_recover_failed_waiting(self, mock_check, mock_wait,
-                                       mock_start, mock_dep, mock_action,
-                                       mock_update, mock_load):
+                                       mock_create, mock_load):
         node = mock.Mock(id='NODE_1', cluster_id='CID', status='ERROR')
         cluster = mock.Mock(id='CID', desired_capacity=2)
         cluster.do_recover.return_value = True
         cluster.nodes = [node]
         mock_load.return_value = cluster
-        mock_action.return_value = 'NODE_ACTION_ID'
 
         action = ca.ClusterAction('FAKE_CLUSTER', 'CLUSTER_RECOVER', self.ctx)
         action.id = 'CLUSTER_ACTION_ID'
@@ -186,20 +151,11 @@ class ClusterRecoverTest(base.SenlinTestCase):
 
         mock_load.assert_called_once_with(self.ctx, 'FAKE_CLUSTER')
         cluster.do_recover.assert_called_once_with(action.context)
-        mock_action.assert_called_once_with(
-            action.context, 'NODE_1', 'NODE_RECOVER',
-            name='node_recover_NODE_1',
-            cause=consts.CAUSE_DERIVED,
-            inputs={
-                'operation': consts.RECOVER_RECREATE,
-                'operation_params': None
-            }
-        )
-        mock_dep.assert_called_once_with(action.context, ['NODE_ACTION_ID'],
-                                         'CLUSTER_ACTION_ID')
-        mock_update.assert_called_once_with(action.context, 'NODE_ACTION_ID',
-                                            {'status': 'READY'})
-        mock_start.assert_called_once_with()
+        mock_create.assert_called_once_with([
+            ('NODE_1', 'NODE_RECOVER',
+             {'name': 'node_recover_NODE_1', 'cause': consts.CAUSE_DERIVED,
+              'inputs': {'operation': consts.RECOVER_RECREATE,
+                         'operation_params': None}})])
         mock_wait.assert_called_once_with()
         cluster.eval_status.assert_called_once_with(
             action.context, consts.CLUSTER_RECOVER)
@@ -250,16 +206,12 @@ class ClusterRecoverTest(base.SenlinTestCase):
             action.context, consts.CLUSTER_RECOVER)
         self.assertFalse(mock_desired.called)
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
     @mock.patch.object(ca.ClusterAction, '_check_capacity')
     @mock.patch.object(nm.Node, 'load')
     def test_do_recover_with_check_error(self, mock_node, mock_desired,
-                                         mock_wait, mock_start, mock_dep,
-                                         mock_action, mock_update, mock_load):
+                                         mock_wait, mock_create, mock_load):
         node1 = mock.Mock(id='NODE_1', cluster_id='FAKE_ID', status='ACTIVE')
         node2 = mock.Mock(id='NODE_2', cluster_id='FAKE_ID', status='ACTIVE')
 
@@ -280,7 +232,6 @@ class ClusterRecoverTest(base.SenlinTestCase):
         action.inputs = {'check': True,
                          'check_capacity': True}
 
-        mock_action.return_value = 'NODE_RECOVER_ID'
         mock_wait.return_value = (action.RES_OK, 'Everything is Okay')
 
         def set_status(*args, **kwargs):
@@ -298,13 +249,6 @@ class ClusterRecoverTest(base.SenlinTestCase):
         self.assertEqual('Cluster recovery succeeded.', res_msg)
 
         cluster.do_recover.assert_called_once_with(action.context)
-        mock_action.assert_called_once_with(
-            action.context, 'NODE_2', 'NODE_RECOVER',
-            name='node_recover_NODE_2',
-            cause=consts.CAUSE_DERIVED,
-            inputs={'operation': None,
-                    'operation_params': None}
-        )
         node_calls = [
             mock.call(self.ctx, node_id='NODE_1'),
             mock.call(self.ctx, node_id='NODE_2')
@@ -312,11 +256,10 @@ class ClusterRecoverTest(base.SenlinTestCase):
         mock_node.assert_has_calls(node_calls)
         eng_node1.do_check.assert_called_once_with(self.ctx)
         eng_node2.do_check.assert_called_once_with(self.ctx)
-        mock_dep.assert_called_once_with(action.context, ['NODE_RECOVER_ID'],
-                                         'CLUSTER_ACTION_ID')
-        mock_update.assert_called_once_with(action.context, 'NODE_RECOVER_ID',
-                                            {'status': 'READY'})
-        mock_start.assert_called_once_with()
+        mock_create.assert_called_once_with([
+            ('NODE_2', 'NODE_RECOVER',
+             {'name': 'node_recover_NODE_2', 'cause': consts.CAUSE_DERIVED,
+              'inputs': {'operation': None, 'operation_params': None}})])
         mock_wait.assert_called_once_with()
         cluster.eval_status.assert_called_once_with(
             action.context, consts.CLUSTER_RECOVER)
@@ -338,7 +281,7 @@ class ClusterRecoverTest(base.SenlinTestCase):
         mock_create.assert_called_once_with(1)
 
     @mock.patch.object(su, 'nodes_by_random')
-    @mock.patch.object(no.Node, 'get_all_by_cluster')
+    @mock.patch.object(no.Node, 'columns_by_cluster')
     @mock.patch.object(ca.ClusterAction, '_delete_nodes')
     def test_check_capacity_delete(self, mock_delete, mock_get,
                                    mock_su, mock_load):
@@ -356,6 +299,7 @@ class ClusterRecoverTest(base.SenlinTestCase):
 
         action._check_capacity()
 
-        mock_get.assert_called_once_with(action.context, cluster.id)
+        mock_get.assert_called_once_with(
+            action.context, cluster.id, ['id', 'status', 'created_at'])
         mock_su.assert_called_once_with([node1, node2], 1)
         mock_delete.assert_called_once_with(['NODE_2'])
@@ -11,14 +11,12 @@
 # under the License.
 
 import mock
+from oslo_utils import uuidutils
 
 from senlin.common import consts
-from senlin.engine.actions import base as ab
 from senlin.engine.actions import cluster_action as ca
 from senlin.engine import cluster as cm
-from senlin.engine import dispatcher
-from senlin.objects import action as ao
-from senlin.objects import dependency as dobj
+from senlin.objects import cluster as co
 from senlin.objects import node as no
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
@@ -31,17 +29,16 @@ class ClusterReplaceNodesTest(base.SenlinTestCase):
         super(ClusterReplaceNodesTest, self).setUp()
         self.ctx = utils.dummy_context()
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
+    @mock.patch.object(co.Cluster, 'reserve_indexes')
+    @mock.patch.object(uuidutils, 'generate_uuid')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(no.Node, 'get')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_do_replace_nodes(self, mock_wait, mock_start, mock_dep,
-                              mock_get_node, mock_action, mock_update,
-                              mock_load):
+    def test_do_replace_nodes(self, mock_wait, mock_get_node, mock_create,
+                              mock_uuid, mock_reserve, mock_load):
         cluster = mock.Mock(id='CLUSTER_ID', desired_capacity=10)
         mock_load.return_value = cluster
+        mock_reserve.return_value = 5
 
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
         action.id = 'CLUSTER_ACTION_ID'
@@ -53,7 +50,7 @@ class ClusterReplaceNodesTest(base.SenlinTestCase):
         replace_node = mock.Mock(id='R_NODE_1', cluster_id='',
                                  ACTIVE='ACTIVE', status='ACTIVE')
         mock_get_node.side_effect = [origin_node, replace_node]
-        mock_action.side_effect = ['NODE_LEAVE_1', 'NODE_JOIN_1']
+        mock_uuid.side_effect = ['NODE_LEAVE_1', 'NODE_JOIN_1']
         mock_wait.return_value = (action.RES_OK, 'Free to fly!')
 
         # do the action
@@ -69,32 +66,18 @@ class ClusterReplaceNodesTest(base.SenlinTestCase):
         mock_load.assert_called_once_with(
             action.context,
             'CLUSTER_ID')
-        mock_action.assert_has_calls([
-            mock.call(action.context, 'O_NODE_1', 'NODE_LEAVE',
-                      name='node_leave_O_NODE_1',
-                      cause='Derived Action'),
-            mock.call(action.context, 'R_NODE_1', 'NODE_JOIN',
-                      name='node_join_R_NODE_1',
-                      cause='Derived Action',
-                      inputs={'cluster_id': 'CLUSTER_ID'})])
-
-        mock_dep.assert_has_calls([
-            mock.call(action.context,
-                      ['NODE_JOIN_1'],
-                      'CLUSTER_ACTION_ID'),
-            mock.call(action.context,
-                      ['NODE_JOIN_1'],
-                      'NODE_LEAVE_1')])
-
-        mock_update.assert_has_calls([
-            mock.call(action.context,
-                      'NODE_JOIN_1',
-                      {'status': 'READY'}),
-            mock.call(action.context,
-                      'NODE_LEAVE_1',
-                      {'status': 'READY'})])
-        mock_start.assert_called_once_with()
-
+        mock_reserve.assert_called_once_with(action.context, 'CLUSTER_ID',
+                                             1)
+        mock_create.assert_called_once_with(
+            [('O_NODE_1', 'NODE_LEAVE',
+              {'id': 'NODE_LEAVE_1', 'name': 'node_leave_O_NODE_1',
+               'cause': 'Derived Action'}),
+             ('R_NODE_1', 'NODE_JOIN',
+              {'id': 'NODE_JOIN_1', 'name': 'node_join_R_NODE_1',
+               'cause': 'Derived Action',
+               'inputs': {'cluster_id': 'CLUSTER_ID', 'index': 5}})],
+            dependencies=[('NODE_JOIN_1', 'CLUSTER_ACTION_ID'),
+                          ('NODE_JOIN_1', 'NODE_LEAVE_1')])
         mock_wait.assert_called_once_with()
 
         cluster.remove_node.assert_called_once_with(origin_node)
@@ -234,17 +217,17 @@ class ClusterReplaceNodesTest(base.SenlinTestCase):
         self.assertEqual(action.RES_ERROR, res_code)
         self.assertEqual("Node REPLACE_NODE is not in ACTIVE status.", res_msg)
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
+    @mock.patch.object(co.Cluster, 'reserve_indexes')
+    @mock.patch.object(uuidutils, 'generate_uuid')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(no.Node, 'get')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_do_replace_failed_waiting(self, mock_wait, mock_start, mock_dep,
-                                       mock_get_node, mock_action,
-                                       mock_update, mock_load):
+    def test_do_replace_failed_waiting(self, mock_wait, mock_get_node,
+                                       mock_create, mock_uuid, mock_reserve,
+                                       mock_load):
         cluster = mock.Mock(id='CLUSTER_ID', desired_capacity=10)
         mock_load.return_value = cluster
+        mock_reserve.return_value = 5
 
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
         action.id = 'CLUSTER_ACTION_ID'
@@ -256,37 +239,24 @@ class ClusterReplaceNodesTest(base.SenlinTestCase):
         replace_node = mock.Mock(id='R_NODE_1', cluster_id='',
                                  ACTIVE='ACTIVE', status='ACTIVE')
         mock_get_node.side_effect = [origin_node, replace_node]
-        mock_action.side_effect = ['NODE_LEAVE_1', 'NODE_JOIN_1']
+        mock_uuid.side_effect = ['NODE_LEAVE_1', 'NODE_JOIN_1']
         mock_wait.return_value = (action.RES_TIMEOUT, 'Timeout!')
 
         # do the action
         res_code, res_msg = action.do_replace_nodes()
 
         # assertions
-        mock_action.assert_has_calls([
-            mock.call(action.context, 'O_NODE_1', 'NODE_LEAVE',
-                      name='node_leave_O_NODE_1',
-                      cause='Derived Action'),
-            mock.call(action.context, 'R_NODE_1', 'NODE_JOIN',
-                      name='node_join_R_NODE_1',
-                      cause='Derived Action',
-                      inputs={'cluster_id': 'CLUSTER_ID'})])
-
-        mock_dep.assert_has_calls([
-            mock.call(action.context,
-                      ['NODE_JOIN_1'],
-                      'CLUSTER_ACTION_ID'),
-            mock.call(action.context,
-                      ['NODE_JOIN_1'],
-                      'NODE_LEAVE_1')])
-
-        mock_update.assert_has_calls([
-            mock.call(action.context,
-                      'NODE_JOIN_1',
-                      {'status': 'READY'}),
-            mock.call(action.context,
-                      'NODE_LEAVE_1',
-                      {'status': 'READY'})])
-
+        mock_reserve.assert_called_once_with(action.context, 'CLUSTER_ID',
+                                             1)
+        mock_create.assert_called_once_with(
+            [('O_NODE_1', 'NODE_LEAVE',
+              {'id': 'NODE_LEAVE_1', 'name': 'node_leave_O_NODE_1',
+               'cause': 'Derived Action'}),
+             ('R_NODE_1', 'NODE_JOIN',
+              {'id': 'NODE_JOIN_1', 'name': 'node_join_R_NODE_1',
+               'cause': 'Derived Action',
+               'inputs': {'cluster_id': 'CLUSTER_ID', 'index': 5}})],
+            dependencies=[('NODE_JOIN_1', 'CLUSTER_ACTION_ID'),
+                          ('NODE_JOIN_1', 'NODE_LEAVE_1')])
         self.assertEqual(action.RES_TIMEOUT, res_code)
         self.assertEqual('Timeout!', res_msg)
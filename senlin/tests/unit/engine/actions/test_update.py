@@ -13,12 +13,8 @@
 import mock
 
 from senlin.common import consts
-from senlin.engine.actions import base as ab
 from senlin.engine.actions import cluster_action as ca
 from senlin.engine import cluster as cm
-from senlin.engine import dispatcher
-from senlin.objects import action as ao
-from senlin.objects import dependency as dobj
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
 
@@ -139,13 +135,9 @@ class ClusterUpdateTest(base.SenlinTestCase):
             action.context, consts.CLUSTER_UPDATE, profile_id='FAKE_PROFILE',
             updated_at=mock.ANY)
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_update_nodes_no_policy(self, mock_wait, mock_start, mock_dep,
-                                    mock_action, mock_update, mock_load):
+    def test_update_nodes_no_policy(self, mock_wait, mock_create, mock_load):
         node1 = mock.Mock(id='node_id1')
         node2 = mock.Mock(id='node_id2')
         cluster = mock.Mock(id='FAKE_ID', nodes=[node1, node2],
@@ -156,28 +148,29 @@ class ClusterUpdateTest(base.SenlinTestCase):
         action.inputs = {'new_profile_id': 'FAKE_PROFILE'}
         action.id = 'CLUSTER_ACTION_ID'
         mock_wait.return_value = (action.RES_OK, 'All dependents completed')
-        mock_action.side_effect = ['NODE_ACTION1', 'NODE_ACTION2']
 
         res_code, reason = action._update_nodes('FAKE_PROFILE',
                                                 [node1, node2])
         self.assertEqual(res_code, action.RES_OK)
         self.assertEqual(reason, 'Cluster update completed.')
-        self.assertEqual(2, mock_action.call_count)
-        self.assertEqual(1, mock_dep.call_count)
-        self.assertEqual(2, mock_update.call_count)
-        mock_start.assert_called_once_with()
+        self.assertEqual(1, mock_create.call_count)
+        specs = sorted(mock_create.call_args[0][0])
+        self.assertEqual([
+            ('node_id1', 'NODE_UPDATE',
+             {'name': 'node_update_node_id1', 'cause': 'Derived Action',
+              'inputs': {'new_profile_id': 'FAKE_PROFILE'}}),
+            ('node_id2', 'NODE_UPDATE',
+             {'name': 'node_update_node_id2', 'cause': 'Derived Action',
+              'inputs': {'new_profile_id': 'FAKE_PROFILE'}})], specs)
 
         cluster.eval_status.assert_called_once_with(
             action.context, consts.CLUSTER_UPDATE, profile_id='FAKE_PROFILE',
             updated_at=mock.ANY)
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_update_nodes_batch_policy(self, mock_wait, mock_start, mock_dep,
-                                       mock_action, mock_update, mock_load):
+    def test_update_nodes_batch_policy(self, mock_wait, mock_create,
+                                       mock_load):
         node1 = mock.Mock(id='node_id1')
         node2 = mock.Mock(id='node_id2')
         cluster = mock.Mock(id='FAKE_ID', nodes=[node1, node2],
@@ -195,28 +188,28 @@ class ClusterUpdateTest(base.SenlinTestCase):
             }
         }
         mock_wait.return_value = (action.RES_OK, 'All dependents completed')
-        mock_action.side_effect = ['NODE_ACTION1', 'NODE_ACTION2']
 
         res_code, reason = action._update_nodes('FAKE_PROFILE',
                                                 [node1, node2])
         self.assertEqual(res_code, action.RES_OK)
         self.assertEqual(reason, 'Cluster update completed.')
-        self.assertEqual(2, mock_action.call_count)
-        self.assertEqual(2, mock_dep.call_count)
-        self.assertEqual(2, mock_update.call_count)
-        self.assertEqual(2, mock_start.call_count)
+        mock_create.assert_has_calls([
+            mock.call([('node_id1', 'NODE_UPDATE',
+                        {'name': 'node_update_node_id1',
+                         'cause': 'Derived Action',
+                         'inputs': {'new_profile_id': 'FAKE_PROFILE'}})]),
+            mock.call([('node_id2', 'NODE_UPDATE',
+                        {'name': 'node_update_node_id2',
+                         'cause': 'Derived Action',
+                         'inputs': {'new_profile_id': 'FAKE_PROFILE'}})])])
 
         cluster.eval_status.assert_called_once_with(
             action.context, consts.CLUSTER_UPDATE, profile_id='FAKE_PROFILE',
             updated_at=mock.ANY)
 
-    @mock.patch.object(ao.Action, 'update')
-    @mock.patch.object(ab.Action, 'create')
-    @mock.patch.object(dobj.Dependency, 'create')
-    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_create_children')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
-    def test_update_nodes_fail_wait(self, mock_wait, mock_start, mock_dep,
-                                    mock_action, mock_update, mock_load):
+    def test_update_nodes_fail_wait(self, mock_wait, mock_create, mock_load):
         node1 = mock.Mock(id='node_id1')
         node2 = mock.Mock(id='node_id2')
         cluster = mock.Mock(id='FAKE_ID', nodes=[node1, node2],
@@ -227,15 +220,11 @@ class ClusterUpdateTest(base.SenlinTestCase):
         action.inputs = {'new_profile_id': 'FAKE_PROFILE'}
         action.id = 'CLUSTER_ACTION_ID'
         mock_wait.return_value = (action.RES_ERROR, 'Oops!')
-        mock_action.side_effect = ['NODE_ACTION1', 'NODE_ACTION2']
 
         res_code, reason = action._update_nodes('FAKE_PROFILE',
                                                 [node1, node2])
         self.assertEqual(res_code, action.RES_ERROR)
         self.assertEqual(reason, 'Failed in updating nodes.')
-        self.assertEqual(2, mock_action.call_count)
-        self.assertEqual(1, mock_dep.call_count)
-        self.assertEqual(2, mock_update.call_count)
-        mock_start.assert_called_once_with()
+        self.assertEqual(1, mock_create.call_count)
         cluster.eval_status.assert_called_once_with(
             action.context, consts.CLUSTER_UPDATE)
@@ -33,28 +33,29 @@ class ActionTest(base.SenlinTestCase):
         self.eng = service.EngineService('host-a', 'topic-a')
         self.eng.init_tgm()
 
-    @mock.patch.object(ao.Action, 'get_all')
+    @mock.patch.object(ao.Action, 'get_page')
     def test_action_list(self, mock_get):
         x_1 = mock.Mock()
         x_1.to_dict.return_value = {'k': 'v1'}
         x_2 = mock.Mock()
         x_2.to_dict.return_value = {'k': 'v2'}
-        mock_get.return_value = [x_1, x_2]
+        mock_get.return_value = ([x_1, x_2], None)
 
         req = orao.ActionListRequest()
         result = self.eng.action_list(self.ctx, req.obj_to_primitive())
         expected = [{'k': 'v1'}, {'k': 'v2'}]
         self.assertEqual(expected, result)
 
-        mock_get.assert_called_once_with(self.ctx, project_safe=True)
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         project_safe=True)
 
-    @mock.patch.object(ao.Action, 'get_all')
+    @mock.patch.object(ao.Action, 'get_page')
     def test_action_list_with_params(self, mock_get):
         x_1 = mock.Mock()
         x_1.to_dict.return_value = {'status': 'READY'}
         x_2 = mock.Mock()
         x_2.to_dict.return_value = {'status': 'SUCCESS'}
-        mock_get.return_value = [x_1, x_2]
+        mock_get.return_value = ([x_1, x_2], None)
 
         req = orao.ActionListRequest(status=['READY', 'SUCCEEDED'],
                                      limit=100,
@@ -66,6 +67,7 @@ class ActionTest(base.SenlinTestCase):
 
         filters = {'status': ['READY', 'SUCCEEDED']}
         mock_get.assert_called_once_with(self.ctx,
+                                         replica=True,
                                          filters=filters,
                                          limit=100,
                                          sort='status',
@@ -79,14 +81,15 @@ class ActionTest(base.SenlinTestCase):
                                self.ctx, req.obj_to_primitive())
         self.assertEqual(exc.Forbidden, ex.exc_info[0])
 
-    @mock.patch.object(ao.Action, 'get_all')
+    @mock.patch.object(ao.Action, 'get_page')
     def test_action_list_with_Auth(self, mock_get):
-        mock_get.return_value = []
+        mock_get.return_value = ([], None)
 
         req = orao.ActionListRequest(project_safe=True)
         result = self.eng.action_list(self.ctx, req.obj_to_primitive())
         self.assertEqual([], result)
-        mock_get.assert_called_once_with(self.ctx, project_safe=True)
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         project_safe=True)
 
         self.ctx.is_admin = True
 
@@ -94,13 +97,15 @@ class ActionTest(base.SenlinTestCase):
         req = orao.ActionListRequest(project_safe=True)
         result = self.eng.action_list(self.ctx, req.obj_to_primitive())
         self.assertEqual([], result)
-        mock_get.assert_called_once_with(self.ctx, project_safe=True)
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         project_safe=True)
 
         mock_get.reset_mock()
         req = orao.ActionListRequest(project_safe=False)
         result = self.eng.action_list(self.ctx, req.obj_to_primitive())
         self.assertEqual([], result)
-        mock_get.assert_called_once_with(self.ctx, project_safe=False)
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         project_safe=False)
 
     @mock.patch.object(ab.Action, 'create')
     @mock.patch.object(co.Cluster, 'find')
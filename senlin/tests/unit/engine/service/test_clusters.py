@@ -79,23 +79,24 @@ class ClusterTest(base.SenlinTestCase):
             setattr(req_obj, k, v)
         req_base.obj_from_primitive.return_value = req_obj
 
-    @mock.patch.object(co.Cluster, 'get_all')
+    @mock.patch.object(co.Cluster, 'get_page')
     def test_cluster_list(self, mock_get):
         x_obj_1 = mock.Mock()
         x_obj_1.to_dict.return_value = {'k': 'v1'}
         x_obj_2 = mock.Mock()
         x_obj_2.to_dict.return_value = {'k': 'v2'}
-        mock_get.return_value = [x_obj_1, x_obj_2]
+        mock_get.return_value = ([x_obj_1, x_obj_2], None)
         req = orco.ClusterListRequest(project_safe=True)
 
         result = self.eng.cluster_list(self.ctx, req.obj_to_primitive())
 
         self.assertEqual([{'k': 'v1'}, {'k': 'v2'}], result)
-        mock_get.assert_called_once_with(self.ctx, project_safe=True)
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         project_safe=True)
 
-    @mock.patch.object(co.Cluster, 'get_all')
+    @mock.patch.object(co.Cluster, 'get_page')
     def test_cluster_list_with_params(self, mock_get):
-        mock_get.return_value = []
+        mock_get.return_value = ([], None)
         marker = uuidutils.generate_uuid()
         req = {
             'limit': 10,
@@ -103,18 +104,70 @@ class ClusterTest(base.SenlinTestCase):
             'name': ['test_cluster'],
             'status': ['ACTIVE'],
             'sort': 'name:asc',
-            'project_safe': True
+            'project_safe': True,
+            'with_count': False,
         }
         self._prepare_request(req)
 
         result = self.eng.cluster_list(self.ctx, req)
 
-        self.assertEqual([], result)
+        self.assertEqual({'clusters': [], 'next_marker': None}, result)
         mock_get.assert_called_once_with(
-            self.ctx, limit=10, marker=marker, sort='name:asc',
+            self.ctx, replica=True, limit=10, marker=marker, sort='name:asc',
             filters={'name': ['test_cluster'], 'status': ['ACTIVE']},
             project_safe=True)
 
+    @mock.patch.object(co.Cluster, 'count_all')
+    @mock.patch.object(co.Cluster, 'get_page')
+    def test_cluster_list_with_count(self, mock_get, mock_count):
+        x_obj = mock.Mock()
+        x_obj.to_dict.return_value = {'k': 'v1'}
+        mock_get.return_value = ([x_obj], 'NEXT_MARKER')
+        mock_count.return_value = 5
+        req = orco.ClusterListRequest(limit=1, status=['ACTIVE'],
+                                      with_count=True, project_safe=True)
+
+        result = self.eng.cluster_list(self.ctx, req.obj_to_primitive())
+
+        expected = {
+            'clusters': [{'k': 'v1'}],
+            'next_marker': 'NEXT_MARKER',
+            'total_count': 5,
+        }
+        self.assertEqual(expected, result)
+        mock_count.assert_called_once_with(
+            self.ctx, replica=True, filters={'status': ['ACTIVE']},
+            project_safe=True)
+
+        # the count is cached for the same query
+        result = self.eng.cluster_list(self.ctx, req.obj_to_primitive())
+        self.assertEqual(expected, result)
+        self.assertEqual(1, mock_count.call_count)
+
+    @mock.patch.object(co.Cluster, 'count_all')
+    @mock.patch.object(co.Cluster, 'get_page')
+    def test_cluster_list_without_count(self, mock_get, mock_count):
+        mock_get.return_value = ([], None)
+        req = orco.ClusterListRequest(with_count=False, project_safe=True)
+
+        result = self.eng.cluster_list(self.ctx, req.obj_to_primitive())
+
+        self.assertEqual({'clusters': [], 'next_marker': None}, result)
+        self.assertEqual(0, mock_count.call_count)
+
+    @mock.patch.object(co.Cluster, 'count_all')
+    @mock.patch.object(co.Cluster, 'get_page')
+    def test_cluster_list_count_not_cached(self, mock_get, mock_count):
+        cfg.CONF.set_override('list_count_cache_ttl', 0)
+        mock_get.return_value = ([], None)
+        mock_count.return_value = 0
+        req = orco.ClusterListRequest(with_count=True, project_safe=True)
+
+        self.eng.cluster_list(self.ctx, req.obj_to_primitive())
+        self.eng.cluster_list(self.ctx, req.obj_to_primitive())
+
+        self.assertEqual(2, mock_count.call_count)
+
     @mock.patch.object(service.EngineService, 'check_cluster_quota')
     @mock.patch.object(su, 'check_size_params')
     @mock.patch.object(am.Action, 'create')
@@ -31,30 +31,31 @@ class EventTest(base.SenlinTestCase):
         self.ctx = utils.dummy_context(project='event_test_project')
         self.eng = service.EngineService('host-a', 'topic-a')
 
-    @mock.patch.object(eo.Event, 'get_all')
+    @mock.patch.object(eo.Event, 'get_page')
     def test_event_list(self, mock_load):
         obj_1 = mock.Mock()
         obj_1.as_dict.return_value = {'level': consts.EVENT_LEVELS['DEBUG']}
         obj_2 = mock.Mock()
         obj_2.as_dict.return_value = {'level': consts.EVENT_LEVELS['INFO']}
 
-        mock_load.return_value = [obj_1, obj_2]
+        mock_load.return_value = ([obj_1, obj_2], None)
 
         req = oreo.EventListRequest()
         result = self.eng.event_list(self.ctx, req.obj_to_primitive())
         expected = [{'level': 'DEBUG'}, {'level': 'INFO'}]
 
         self.assertEqual(expected, result)
-        mock_load.assert_called_once_with(self.ctx, project_safe=True)
+        mock_load.assert_called_once_with(self.ctx, replica=True,
+                                          project_safe=True)
 
-    @mock.patch.object(eo.Event, 'get_all')
+    @mock.patch.object(eo.Event, 'get_page')
     def test_event_list_with_params(self, mock_load):
         obj_1 = mock.Mock()
         obj_1.as_dict.return_value = {'level': consts.EVENT_LEVELS['DEBUG']}
         obj_2 = mock.Mock()
         obj_2.as_dict.return_value = {'level': consts.EVENT_LEVELS['INFO']}
 
-        mock_load.return_value = [obj_1, obj_2]
+        mock_load.return_value = ([obj_1, obj_2], None)
 
         marker_uuid = '8216a86c-1bdc-442e-b493-329385d37cbc'
         req = oreo.EventListRequest(level=['DEBUG', 'INFO'],
@@ -68,20 +69,21 @@ class EventTest(base.SenlinTestCase):
 
         filters = {'level': [consts.EVENT_LEVELS['DEBUG'],
                              consts.EVENT_LEVELS['INFO']]}
-        mock_load.assert_called_once_with(self.ctx, filters=filters,
+        mock_load.assert_called_once_with(self.ctx, replica=True,
+                                          filters=filters,
                                           sort=consts.EVENT_TIMESTAMP,
                                           limit=123,
                                           marker=marker_uuid,
                                           project_safe=True)
 
     @mock.patch.object(co.Cluster, 'find')
-    @mock.patch.object(eo.Event, 'get_all')
+    @mock.patch.object(eo.Event, 'get_page')
     def test_event_list_with_cluster_id(self, mock_load, mock_find):
         obj_1 = mock.Mock()
         obj_1.as_dict.return_value = {'level': consts.EVENT_LEVELS['DEBUG']}
         obj_2 = mock.Mock()
         obj_2.as_dict.return_value = {'level': consts.EVENT_LEVELS['INFO']}
-        mock_load.return_value = [obj_1, obj_2]
+        mock_load.return_value = ([obj_1, obj_2], None)
         fake_clusters = [mock.Mock(id='FAKE1'), mock.Mock(id='FAKE2')]
         mock_find.side_effect = fake_clusters
 
@@ -94,7 +96,8 @@ class EventTest(base.SenlinTestCase):
         self.assertEqual(expected, result)
 
         filters = {'cluster_id': ['FAKE1', 'FAKE2']}
-        mock_load.assert_called_once_with(self.ctx, filters=filters,
+        mock_load.assert_called_once_with(self.ctx, replica=True,
+                                          filters=filters,
                                           project_safe=True)
         mock_find.assert_has_calls([
             mock.call(self.ctx, 'CLUSTERA'),
@@ -102,7 +105,7 @@ class EventTest(base.SenlinTestCase):
         ])
 
     @mock.patch.object(co.Cluster, 'find')
-    @mock.patch.object(eo.Event, 'get_all')
+    @mock.patch.object(eo.Event, 'get_page')
     def test_event_list_with_cluster_not_found(self, mock_load, mock_find):
         mock_find.side_effect = [
             mock.Mock(id='FAKE1'),
@@ -120,6 +123,21 @@ class EventTest(base.SenlinTestCase):
             mock.call(self.ctx, 'CLUSTER2')
         ])
 
+    @mock.patch.object(co.Cluster, 'find')
+    @mock.patch.object(eo.Event, 'get_page')
+    def test_event_list_with_cluster_not_found_and_count(self, mock_load,
+                                                         mock_find):
+        mock_find.side_effect = exc.ResourceNotFound(type='cluster',
+                                                     id='CLUSTER2')
+        req = oreo.EventListRequest(cluster_id=['CLUSTER2'],
+                                    with_count=True, project_safe=True)
+
+        result = self.eng.event_list(self.ctx, req.obj_to_primitive())
+
+        self.assertEqual({'events': [], 'next_marker': None,
+                          'total_count': 0}, result)
+        self.assertEqual(0, mock_load.call_count)
+
     def test_event_list_with_bad_params(self):
         req = oreo.EventListRequest(project_safe=False)
         ex = self.assertRaises(rpc.ExpectedException,
@@ -127,14 +145,15 @@ class EventTest(base.SenlinTestCase):
                                self.ctx, req.obj_to_primitive())
         self.assertEqual(exc.Forbidden, ex.exc_info[0])
 
-    @mock.patch.object(eo.Event, 'get_all')
+    @mock.patch.object(eo.Event, 'get_page')
     def test_event_list_with_Auth(self, mock_load):
-        mock_load.return_value = []
+        mock_load.return_value = ([], None)
 
         req = oreo.EventListRequest(project_safe=True)
         result = self.eng.event_list(self.ctx, req.obj_to_primitive())
         self.assertEqual([], result)
-        mock_load.assert_called_once_with(self.ctx, project_safe=True)
+        mock_load.assert_called_once_with(self.ctx, replica=True,
+                                          project_safe=True)
 
         self.ctx.is_admin = True
 
@@ -142,13 +161,15 @@ class EventTest(base.SenlinTestCase):
         req = oreo.EventListRequest(project_safe=True)
         result = self.eng.event_list(self.ctx, req.obj_to_primitive())
         self.assertEqual([], result)
-        mock_load.assert_called_once_with(self.ctx, project_safe=True)
+        mock_load.assert_called_once_with(self.ctx, replica=True,
+                                          project_safe=True)
 
         mock_load.reset_mock()
         req = oreo.EventListRequest(project_safe=False)
         result = self.eng.event_list(self.ctx, req.obj_to_primitive())
         self.assertEqual([], result)
-        mock_load.assert_called_once_with(self.ctx, project_safe=False)
+        mock_load.assert_called_once_with(self.ctx, replica=True,
+                                          project_safe=False)
 
     @mock.patch.object(eo.Event, 'find')
     def test_event_get(self, mock_find):
@@ -160,7 +181,8 @@ class EventTest(base.SenlinTestCase):
         result = self.eng.event_get(self.ctx, req.obj_to_primitive())
 
         self.assertEqual({'level': 'DEBUG'}, result)
-        mock_find.assert_called_once_with(self.ctx, 'EVENT_ID')
+        mock_find.assert_called_once_with(self.ctx, 'EVENT_ID',
+                                          replica=True)
 
     @mock.patch.object(eo.Event, 'find')
     def test_event_get_not_found(self, mock_find):
@@ -171,4 +193,4 @@ class EventTest(base.SenlinTestCase):
                                self.ctx, req.obj_to_primitive())
 
         self.assertEqual(exc.ResourceNotFound, ex.exc_info[0])
-        mock_find.assert_called_once_with(self.ctx, 'BOGUS')
+        mock_find.assert_called_once_with(self.ctx, 'BOGUS', replica=True)
@@ -40,28 +40,29 @@ class NodeTest(base.SenlinTestCase):
         self.ctx = utils.dummy_context(project='node_test_project')
         self.eng = service.EngineService('host-a', 'topic-a')
 
-    @mock.patch.object(no.Node, 'get_all')
+    @mock.patch.object(no.Node, 'get_page')
     def test_node_list(self, mock_get):
         obj_1 = mock.Mock()
         obj_1.to_dict.return_value = {'k': 'v1'}
         obj_2 = mock.Mock()
         obj_2.to_dict.return_value = {'k': 'v2'}
-        mock_get.return_value = [obj_1, obj_2]
+        mock_get.return_value = ([obj_1, obj_2], None)
 
         req = orno.NodeListRequest()
         result = self.eng.node_list(self.ctx, req.obj_to_primitive())
 
         self.assertEqual([{'k': 'v1'}, {'k': 'v2'}], result)
-        mock_get.assert_called_once_with(self.ctx, project_safe=True)
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         project_safe=True)
 
     @mock.patch.object(co.Cluster, 'find')
-    @mock.patch.object(no.Node, 'get_all')
+    @mock.patch.object(no.Node, 'get_page')
     def test_node_list_with_cluster_id(self, mock_get, mock_find):
         obj_1 = mock.Mock()
         obj_1.to_dict.return_value = {'k': 'v1'}
         obj_2 = mock.Mock()
         obj_2.to_dict.return_value = {'k': 'v2'}
-        mock_get.return_value = [obj_1, obj_2]
+        mock_get.return_value = ([obj_1, obj_2], None)
         mock_find.return_value = mock.Mock(id='CLUSTER_ID')
 
         req = orno.NodeListRequest(cluster_id='MY_CLUSTER_NAME',
@@ -70,16 +71,17 @@ class NodeTest(base.SenlinTestCase):
 
         self.assertEqual([{'k': 'v1'}, {'k': 'v2'}], result)
         mock_find.assert_called_once_with(self.ctx, 'MY_CLUSTER_NAME')
-        mock_get.assert_called_once_with(self.ctx, cluster_id='CLUSTER_ID',
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         cluster_id='CLUSTER_ID',
                                          project_safe=True)
 
-    @mock.patch.object(no.Node, 'get_all')
+    @mock.patch.object(no.Node, 'get_page')
     def test_node_list_with_params(self, mock_get):
         obj_1 = mock.Mock()
         obj_1.to_dict.return_value = {'k': 'v1'}
         obj_2 = mock.Mock()
         obj_2.to_dict.return_value = {'k': 'v2'}
-        mock_get.return_value = [obj_1, obj_2]
+        mock_get.return_value = ([obj_1, obj_2], None)
 
         MARKER_UUID = '2fd5b45f-bae4-4cdb-b283-a71e9f9805c7'
         req = orno.NodeListRequest(status=['ACTIVE'], sort='status',
@@ -88,7 +90,8 @@ class NodeTest(base.SenlinTestCase):
         result = self.eng.node_list(self.ctx, req.obj_to_primitive())
 
         self.assertEqual([{'k': 'v1'}, {'k': 'v2'}], result)
-        mock_get.assert_called_once_with(self.ctx, sort='status', limit=123,
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         sort='status', limit=123,
                                          marker=MARKER_UUID, project_safe=True,
                                          filters={'status': ['ACTIVE']})
 
@@ -108,14 +111,15 @@ class NodeTest(base.SenlinTestCase):
                          six.text_type(ex.exc_info[1]))
         mock_find.assert_called_once_with(self.ctx, 'BOGUS')
 
-    @mock.patch.object(no.Node, 'get_all')
+    @mock.patch.object(no.Node, 'get_page')
     def test_node_list_with_project_safe(self, mock_get):
-        mock_get.return_value = []
+        mock_get.return_value = ([], None)
 
         req = orno.NodeListRequest(project_safe=True)
         result = self.eng.node_list(self.ctx, req.obj_to_primitive())
         self.assertEqual([], result)
-        mock_get.assert_called_once_with(self.ctx, project_safe=True)
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         project_safe=True)
         mock_get.reset_mock()
 
         req = orno.NodeListRequest(project_safe=False)
@@ -128,18 +132,20 @@ class NodeTest(base.SenlinTestCase):
         req = orno.NodeListRequest(project_safe=False)
         result = self.eng.node_list(self.ctx, req.obj_to_primitive())
         self.assertEqual([], result)
-        mock_get.assert_called_once_with(self.ctx, project_safe=False)
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         project_safe=False)
         mock_get.reset_mock()
 
-    @mock.patch.object(no.Node, 'get_all')
+    @mock.patch.object(no.Node, 'get_page')
     def test_node_list_empty(self, mock_get):
-        mock_get.return_value = []
+        mock_get.return_value = ([], None)
 
         req = orno.NodeListRequest()
         result = self.eng.node_list(self.ctx, req.obj_to_primitive())
 
         self.assertEqual([], result)
-        mock_get.assert_called_once_with(self.ctx, project_safe=True)
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         project_safe=True)
 
     @mock.patch.object(action_mod.Action, 'create')
     @mock.patch.object(no.Node, 'create')
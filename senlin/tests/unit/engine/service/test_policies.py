@@ -63,7 +63,8 @@ class PolicyTest(base.SenlinTestCase):
 
         result = self.eng.policy_list(self.ctx, req.obj_to_primitive())
         self.assertEqual([{'k': 'v1'}, {'k': 'v2'}], result)
-        mock_get.assert_called_once_with(self.ctx, project_safe=True)
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         project_safe=True)
 
     @mock.patch.object(po.Policy, 'get_all')
     def test_policy_list_with_params(self, mock_get):
@@ -83,7 +84,7 @@ class PolicyTest(base.SenlinTestCase):
 
         self.assertEqual([], result)
         mock_get.assert_called_once_with(
-            self.ctx, limit=10, marker=marker, sort='name:asc',
+            self.ctx, replica=True, limit=10, marker=marker, sort='name:asc',
             filters={'name': ['test-policy'],
                      'type': ['senlin.policy.scaling-1.0']},
             project_safe=True)
@@ -67,7 +67,8 @@ class ProfileTest(base.SenlinTestCase):
         result = self.eng.profile_list(self.ctx, req.obj_to_primitive())
 
         self.assertEqual([{'k': 'v1'}, {'k': 'v2'}], result)
-        mock_get.assert_called_once_with(self.ctx, project_safe=True)
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         project_safe=True)
 
     @mock.patch.object(po.Profile, 'get_all')
     def test_profile_list_with_params(self, mock_get):
@@ -86,7 +87,8 @@ class ProfileTest(base.SenlinTestCase):
         result = self.eng.profile_list(self.ctx, req.obj_to_primitive())
 
         self.assertEqual([], result)
-        mock_get.assert_called_once_with(self.ctx, limit=10, marker=marker,
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         limit=10, marker=marker,
                                          filters={'name': ['foo'],
                                                   'type': ['os.nova.server']},
                                          sort='name:asc',
@@ -44,7 +44,8 @@ class ReceiverTest(base.SenlinTestCase):
 
         self.assertIsInstance(result, list)
         self.assertEqual([{'FOO': 'BAR'}], result)
-        mock_get.assert_called_once_with(self.ctx, project_safe=True)
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         project_safe=True)
 
     @mock.patch.object(ro.Receiver, 'get_all')
     def test_receiver_list_with_params(self, mock_get):
@@ -62,7 +63,8 @@ class ReceiverTest(base.SenlinTestCase):
 
         self.assertIsInstance(result, list)
         self.assertEqual([{'FOO': 'BAR'}], result)
-        mock_get.assert_called_once_with(self.ctx, limit=1, marker=marker,
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         limit=1, marker=marker,
                                          sort='name',
                                          filters={'type': ['webhook'],
                                                   'action': ['CLUSTER_RESIZE'],
@@ -84,13 +86,15 @@ class ReceiverTest(base.SenlinTestCase):
 
         result = self.eng.receiver_list(self.ctx, req.obj_to_primitive())
         self.assertEqual([], result)
-        mock_get.assert_called_once_with(self.ctx, project_safe=False)
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         project_safe=False)
         mock_get.reset_mock()
 
         req = orro.ReceiverListRequest(project_safe=True)
         result = self.eng.receiver_list(self.ctx, req.obj_to_primitive())
         self.assertEqual([], result)
-        mock_get.assert_called_once_with(self.ctx, project_safe=True)
+        mock_get.assert_called_once_with(self.ctx, replica=True,
+                                         project_safe=True)
         mock_get.reset_mock()
 
     @mock.patch.object(co.Cluster, 'find')
@@ -31,6 +31,11 @@ from senlin.tests.unit.common import utils
 PROFILE_ID = 'aa5f86b8-e52b-4f2b-828a-4c14c770938d'
 CLUSTER_ID = '60efdaa1-06c2-4fcf-ae44-17a2d85ff3ea'
 POLICY_ID = '2c5139a6-24ba-4a6f-bd53-a268f61536de'
+NODE_IDS = [
+    'b4cdb7bc-5d2c-4da4-a6d5-bd6e1d9f1d4b',
+    '4d1f2bba-9b8c-4b8c-8a57-0e0e1b7bd2f1',
+    'e1a6b1cf-59a8-4f88-b38b-7f8f3c8c5b38',
+]
 
 
 class TestCluster(base.SenlinTestCase):
@@ -121,6 +126,136 @@ class TestCluster(base.SenlinTestCase):
                                              project_safe=False)
         mock_nodes.assert_called_once_with(self.context, CLUSTER_ID)
 
+    @mock.patch.object(cpo.ClusterPolicy, 'get_all')
+    @mock.patch.object(pcb.Policy, 'load')
+    @mock.patch.object(pfb.Profile, 'load')
+    @mock.patch.object(no.Node, 'get_all_by_cluster')
+    def test_load_runtime_data_cached(self, mock_nodes, mock_profile,
+                                      mock_policy, mock_pb):
+        x_binding = mock.Mock(policy_id=POLICY_ID)
+        mock_pb.return_value = [x_binding]
+        x_policy = mock.Mock()
+        mock_policy.return_value = x_policy
+        x_node = mock.Mock()
+        mock_nodes.return_value = [x_node]
+
+        cluster1 = cm.Cluster('test-cluster', 0, PROFILE_ID, id=CLUSTER_ID,
+                              node_generation=3, policy_generation=5)
+        cluster1._load_runtime_data(self.context)
+        cluster2 = cm.Cluster('test-cluster', 0, PROFILE_ID, id=CLUSTER_ID,
+                              node_generation=3, policy_generation=5)
+        cluster2._load_runtime_data(self.context)
+
+        self.assertEqual([x_node.obj_clone.return_value],
+                         cluster2.rt['nodes'])
+        self.assertEqual(1, len(cluster2.rt['policies']))
+        # Each cluster gets its own lists
+        self.assertIsNot(cluster1.rt['nodes'], cluster2.rt['nodes'])
+        self.assertIsNot(cluster1.rt['policies'], cluster2.rt['policies'])
+        mock_nodes.assert_called_once_with(self.context, CLUSTER_ID)
+        mock_pb.assert_called_once_with(self.context, CLUSTER_ID)
+        mock_policy.assert_called_once_with(self.context, POLICY_ID,
+                                            project_safe=False)
+        self.assertEqual(2, mock_profile.call_count)
+
+    @mock.patch.object(cpo.ClusterPolicy, 'get_all')
+    @mock.patch.object(pfb.Profile, 'load')
+    @mock.patch.object(no.Node, 'get_all_by_cluster')
+    def test_load_runtime_data_cached_copies(self, mock_nodes, mock_profile,
+                                             mock_pb):
+        mock_pb.return_value = []
+        mock_nodes.return_value = [
+            no.Node(id=NODE_IDS[0], generation=0, data={'key': 'value'})]
+
+        cluster1 = cm.Cluster('test-cluster', 0, PROFILE_ID, id=CLUSTER_ID,
+                              node_generation=3, policy_generation=5)
+        cluster1._load_runtime_data(self.context)
+        cluster1.rt['nodes'][0].data['key'] = 'changed'
+        cluster2 = cm.Cluster('test-cluster', 0, PROFILE_ID, id=CLUSTER_ID,
+                              node_generation=3, policy_generation=5)
+        cluster2._load_runtime_data(self.context)
+
+        # Changes made by one cluster are not seen by the other
+        self.assertEqual({'key': 'value'}, cluster2.rt['nodes'][0].data)
+        self.assertIsNot(cluster1.rt['nodes'][0], cluster2.rt['nodes'][0])
+        mock_nodes.assert_called_once_with(self.context, CLUSTER_ID)
+
+    @mock.patch.object(cpo.ClusterPolicy, 'get_all')
+    @mock.patch.object(pfb.Profile, 'load')
+    @mock.patch.object(no.Node, 'columns_by_cluster')
+    @mock.patch.object(no.Node, 'get_all_by_cluster')
+    def test_load_runtime_data_generation_changed(self, mock_nodes,
+                                                  mock_columns,
+                                                  mock_profile, mock_pb):
+        mock_pb.return_value = []
+        node1 = no.Node(id=NODE_IDS[0], generation=0)
+        node2 = no.Node(id=NODE_IDS[1], generation=0)
+        node2_new = no.Node(id=NODE_IDS[1], generation=1)
+        node3 = no.Node(id=NODE_IDS[2], generation=0)
+        mock_nodes.side_effect = [[node1, node2], [node2_new, node3]]
+        mock_columns.return_value = [
+            mock.Mock(id=NODE_IDS[0], generation=0),
+            mock.Mock(id=NODE_IDS[1], generation=1),
+            mock.Mock(id=NODE_IDS[2], generation=0),
+        ]
+
+        cluster = cm.Cluster('test-cluster', 0, PROFILE_ID, id=CLUSTER_ID,
+                             node_generation=3, policy_generation=5)
+        cluster._load_runtime_data(self.context)
+        self.assertEqual([NODE_IDS[0], NODE_IDS[1]],
+                         [n.id for n in cluster.rt['nodes']])
+
+        cluster.node_generation = 4
+        cluster._load_runtime_data(self.context)
+
+        # Only the changed nodes are loaded again
+        self.assertEqual(NODE_IDS, [n.id for n in cluster.rt['nodes']])
+        self.assertEqual([0, 1, 0],
+                         [n.generation for n in cluster.rt['nodes']])
+        mock_columns.assert_called_once_with(self.context, CLUSTER_ID,
+                                             ['id', 'generation'])
+        self.assertEqual(2, mock_nodes.call_count)
+        self.assertEqual([NODE_IDS[1], NODE_IDS[2]],
+                         sorted(mock_nodes.call_args[1]['filters']['id']))
+        mock_pb.assert_called_once_with(self.context, CLUSTER_ID)
+
+    @mock.patch.object(cpo.ClusterPolicy, 'get_all')
+    @mock.patch.object(pfb.Profile, 'load')
+    @mock.patch.object(no.Node, 'columns_by_cluster')
+    @mock.patch.object(no.Node, 'get_all_by_cluster')
+    def test_load_runtime_data_node_removed(self, mock_nodes, mock_columns,
+                                            mock_profile, mock_pb):
+        mock_pb.return_value = []
+        node1 = no.Node(id=NODE_IDS[0], generation=0)
+        node2 = no.Node(id=NODE_IDS[1], generation=0)
+        mock_nodes.return_value = [node1, node2]
+        mock_columns.return_value = [mock.Mock(id=NODE_IDS[1], generation=0)]
+
+        cluster = cm.Cluster('test-cluster', 0, PROFILE_ID, id=CLUSTER_ID,
+                             node_generation=3, policy_generation=5)
+        cluster._load_runtime_data(self.context)
+        cluster.node_generation = 4
+        cluster._load_runtime_data(self.context)
+
+        self.assertEqual([NODE_IDS[1]], [n.id for n in cluster.rt['nodes']])
+        # No node is loaded again
+        mock_nodes.assert_called_once_with(self.context, CLUSTER_ID)
+
+    @mock.patch.object(cpo.ClusterPolicy, 'get_all')
+    @mock.patch.object(pfb.Profile, 'load')
+    @mock.patch.object(no.Node, 'get_all_by_cluster')
+    def test_load_runtime_data_generation_unknown(self, mock_nodes,
+                                                  mock_profile, mock_pb):
+        mock_pb.return_value = []
+        mock_nodes.return_value = []
+
+        cluster = cm.Cluster('test-cluster', 0, PROFILE_ID, id=CLUSTER_ID)
+        cluster._load_runtime_data(self.context)
+        cluster._load_runtime_data(self.context)
+
+        self.assertEqual(2, mock_nodes.call_count)
+        self.assertEqual(2, mock_pb.call_count)
+
     def test_load_runtime_data_id_is_none(self):
         cluster = cm.Cluster('test-cluster', 0, PROFILE_ID)
 
@@ -230,7 +365,7 @@ class TestCluster(base.SenlinTestCase):
 
         self.assertEqual(mock_init.return_value, result)
         mock_get.assert_called_once_with(self.context, CLUSTER_ID,
-                                         project_safe=True)
+                                         project_safe=True, load_nodes=False)
         mock_init.assert_called_once_with(self.context, x_obj)
 
     @mock.patch.object(co.Cluster, 'get')
@@ -242,7 +377,7 @@ class TestCluster(base.SenlinTestCase):
         self.assertEqual("The cluster '%s' could not be found." % CLUSTER_ID,
                          six.text_type(ex))
         mock_get.assert_called_once_with(self.context, CLUSTER_ID,
-                                         project_safe=True)
+                                         project_safe=True, load_nodes=False)
 
     @mock.patch.object(cm.Cluster, '_from_object')
     @mock.patch.object(co.Cluster, 'get_all')
@@ -897,20 +1032,15 @@ class TestCluster(base.SenlinTestCase):
         mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_below_min_size(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_below_min_size(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 5, PROFILE_ID,
                              min_size=2, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ERROR')
-        node3 = mock.Mock(status='WARNING')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 1, 'ERROR': 1, 'WARNING': 1}
 
         cluster.eval_status(self.context, 'TEST')
-        rt = cluster.rt
-        self.assertEqual(3, len(rt['nodes']))
-        self.assertIsInstance(rt['nodes'], list)
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'status': consts.CS_ERROR,
@@ -918,18 +1048,15 @@ class TestCluster(base.SenlinTestCase):
                               'min_size (2).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_below_desired_capacity(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_below_desired_capacity(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 5, PROFILE_ID,
                              min_size=1, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ERROR')
-        node3 = mock.Mock(status='WARNING')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 1, 'ERROR': 1, 'WARNING': 1}
 
         cluster.eval_status(self.context, 'TEST')
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'status': consts.CS_WARNING,
@@ -937,18 +1064,15 @@ class TestCluster(base.SenlinTestCase):
                               'desired_capacity (5).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_equal_desired_capacity(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_equal_desired_capacity(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 3, PROFILE_ID,
                              min_size=1, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ACTIVE')
-        node3 = mock.Mock(status='ACTIVE')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 3}
 
         cluster.eval_status(self.context, 'TEST')
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'status': consts.CS_ACTIVE,
@@ -956,18 +1080,15 @@ class TestCluster(base.SenlinTestCase):
                               'desired_capacity (3).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_above_desired_capacity(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_above_desired_capacity(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 2, PROFILE_ID,
                              min_size=1, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ACTIVE')
-        node3 = mock.Mock(status='ACTIVE')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 3}
 
         cluster.eval_status(self.context, 'TEST')
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'status': consts.CS_ACTIVE,
@@ -975,18 +1096,15 @@ class TestCluster(base.SenlinTestCase):
                               'desired_capacity (2).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_above_max_size(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_above_max_size(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 2, PROFILE_ID,
                              max_size=2, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ACTIVE')
-        node3 = mock.Mock(status='ACTIVE')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 3}
 
         cluster.eval_status(self.context, 'TEST')
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'status': consts.CS_WARNING,
@@ -994,17 +1112,14 @@ class TestCluster(base.SenlinTestCase):
                               'max_size (2).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_with_new_desired(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_with_new_desired(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 5, PROFILE_ID, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ERROR')
-        node3 = mock.Mock(status='WARNING')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 1, 'ERROR': 1, 'WARNING': 1}
 
         cluster.eval_status(self.context, 'TEST', desired_capacity=2)
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'desired_capacity': 2,
@@ -1013,17 +1128,14 @@ class TestCluster(base.SenlinTestCase):
                               'desired_capacity (2).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status__new_desired_is_zero(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status__new_desired_is_zero(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 5, PROFILE_ID, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ERROR')
-        node3 = mock.Mock(status='WARNING')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 1, 'ERROR': 1, 'WARNING': 1}
 
         cluster.eval_status(self.context, 'TEST', desired_capacity=0)
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'desired_capacity': 0,
@@ -1032,18 +1144,15 @@ class TestCluster(base.SenlinTestCase):
                               'desired_capacity (0).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_with_new_min(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_with_new_min(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 5, PROFILE_ID,
                              id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ERROR')
-        node3 = mock.Mock(status='WARNING')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 1, 'ERROR': 1, 'WARNING': 1}
 
         cluster.eval_status(self.context, 'TEST', min_size=2)
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'min_size': 2,
@@ -1052,18 +1161,15 @@ class TestCluster(base.SenlinTestCase):
                               'min_size (2).'})
 
     @mock.patch.object(co.Cluster, 'update')
-    @mock.patch.object(node_mod.Node, 'load_all')
-    def test_eval_status_with_new_max(self, mock_load, mock_update):
+    @mock.patch.object(no.Node, 'count_by_status')
+    def test_eval_status_with_new_max(self, mock_count, mock_update):
         cluster = cm.Cluster('test-cluster', 2, PROFILE_ID,
                              max_size=5, id=CLUSTER_ID)
-        node1 = mock.Mock(status='ACTIVE')
-        node2 = mock.Mock(status='ACTIVE')
-        node3 = mock.Mock(status='ACTIVE')
-        mock_load.return_value = [node1, node2, node3]
+        mock_count.return_value = {'ACTIVE': 3}
 
         cluster.eval_status(self.context, 'TEST', max_size=6)
 
-        mock_load.assert_called_once_with(self.context, cluster_id=CLUSTER_ID)
+        mock_count.assert_called_once_with(self.context, CLUSTER_ID)
         mock_update.assert_called_once_with(
             self.context, CLUSTER_ID,
             {'max_size': 6,
@@ -17,6 +17,7 @@ import oslo_messaging
 
 from senlin.common import consts
 from senlin.common import messaging
+from senlin.common import utils as common_utils
 from senlin.engine import dispatcher
 from senlin.engine import scheduler
 from senlin.engine import service
@@ -49,6 +50,7 @@ class TestDispatcher(base.SenlinTestCase):
         mock_server.return_value = mock.Mock()
         mock_target.return_value = mock.Mock()
 
+        self.addCleanup(dispatcher._COALESCER.register_engine, None, None)
         disp = dispatcher.Dispatcher(self.svc, 'TOPIC', '1', self.thm)
         disp.start()
 
@@ -59,6 +61,8 @@ class TestDispatcher(base.SenlinTestCase):
 
         the_server = mock_server.return_value
         the_server.start.assert_called_once_with()
+        self.assertEqual('1234', dispatcher._COALESCER.engine_id)
+        self.assertEqual(self.thm, dispatcher._COALESCER.TG)
 
     def test_listening(self):
         disp = dispatcher.Dispatcher(self.svc, 'TOPIC', '1', self.thm)
@@ -74,28 +78,60 @@ class TestDispatcher(base.SenlinTestCase):
         mock_start.reset_mock()
 
         disp.start_action(self.context)
-        mock_start.assert_called_once_with('1234', None)
+        mock_start.assert_called_once_with('1234')
 
-    @mock.patch.object(scheduler.ThreadGroupManager, 'cancel_action')
-    def test_cancel_action(self, mock_cancel):
+    @mock.patch.object(scheduler.ThreadGroupManager, 'start_action')
+    def test_start_action_while_scheduling(self, mock_start):
+        disp = dispatcher.Dispatcher(self.svc, 'TOPIC', '1', self.thm)
+
+        def scheduling(engine_id):
+            # wake-ups during the first pass are folded into a single rescan
+            if mock_start.call_count == 1:
+                disp.start_action(self.context)
+                disp.start_action(self.context)
+
+        mock_start.side_effect = scheduling
+
+        disp.start_action(self.context)
+
+        self.assertEqual(2, mock_start.call_count)
+        self.assertFalse(disp._scheduling)
+        self.assertFalse(disp._rescan)
+
+    @mock.patch.object(dispatcher, 'deliver_signal')
+    def test_cancel_action(self, mock_deliver):
         disp = dispatcher.Dispatcher(self.svc, 'TOPIC', '1', self.thm)
         disp.cancel_action(self.context, action_id='FOO')
 
-        mock_cancel.assert_called_once_with('FOO')
+        mock_deliver.assert_called_once_with('FOO', consts.ACTION_SIG_CANCEL)
 
-    @mock.patch.object(scheduler.ThreadGroupManager, 'suspend_action')
-    def test_suspend_action(self, mock_suspend):
+    @mock.patch.object(dispatcher, 'deliver_signal')
+    def test_suspend_action(self, mock_deliver):
         disp = dispatcher.Dispatcher(self.svc, 'TOPIC', '1', self.thm)
         disp.suspend_action(self.context, action_id='FOO')
 
-        mock_suspend.assert_called_once_with('FOO')
+        mock_deliver.assert_called_once_with('FOO', consts.ACTION_SIG_SUSPEND)
 
-    @mock.patch.object(scheduler.ThreadGroupManager, 'resume_action')
-    def test_resume_action(self, mock_resume):
+    @mock.patch.object(dispatcher, 'deliver_signal')
+    def test_resume_action(self, mock_deliver):
         disp = dispatcher.Dispatcher(self.svc, 'TOPIC', '1', self.thm)
         disp.resume_action(self.context, action_id='FOO')
 
-        mock_resume.assert_called_once_with('FOO')
+        mock_deliver.assert_called_once_with('FOO', consts.ACTION_SIG_RESUME)
+
+    @mock.patch.object(dispatcher, 'wake_waiter')
+    def test_wake_action(self, mock_wake):
+        disp = dispatcher.Dispatcher(self.svc, 'TOPIC', '1', self.thm)
+        disp.wake_action(self.context, action_id='FOO')
+
+        mock_wake.assert_called_once_with('FOO')
+
+    @mock.patch.object(common_utils, 'invalidate_cached_object')
+    def test_invalidate_cache(self, mock_invalidate):
+        disp = dispatcher.Dispatcher(self.svc, 'TOPIC', '1', self.thm)
+        disp.invalidate_cache(self.context, name='profile', obj_id='FOO')
+
+        mock_invalidate.assert_called_once_with('profile', 'FOO')
 
     @mock.patch.object(scheduler.ThreadGroupManager, 'stop')
     def test_stop(self, mock_stop):
@@ -161,3 +197,188 @@ class TestDispatcher(base.SenlinTestCase):
 
         mock_notify.assert_called_once_with(dispatcher.START_ACTION,
                                             'FAKE_ENGINE')
+
+    @mock.patch.object(dispatcher._COALESCER, 'start_action')
+    @mock.patch.object(dispatcher, 'notify')
+    def test_start_action_function_coalesced(self, mock_notify,
+                                             mock_coalesce):
+        dispatcher.start_action()
+
+        mock_coalesce.assert_called_once_with()
+        mock_notify.assert_not_called()
+
+    @mock.patch.object(dispatcher, 'notify')
+    def test_wake_action_function(self, mock_notify):
+        dispatcher.wake_action('FAKE_ENGINE', action_id='FOO')
+
+        mock_notify.assert_called_once_with(dispatcher.WAKE_ACTION,
+                                            'FAKE_ENGINE', action_id='FOO')
+
+    @mock.patch.object(dispatcher, 'notify')
+    def test_signal_action_function(self, mock_notify):
+        dispatcher.signal_action('FAKE_ENGINE', consts.ACTION_SIG_SUSPEND,
+                                 action_id='FOO')
+
+        mock_notify.assert_called_once_with(dispatcher.SUSPEND_ACTION,
+                                            'FAKE_ENGINE', action_id='FOO')
+
+    @mock.patch.object(dispatcher, 'notify')
+    @mock.patch.object(common_utils, 'invalidate_cached_object')
+    def test_invalidate_cache_function(self, mock_invalidate, mock_notify):
+        dispatcher.invalidate_cache('profile', 'FOO')
+
+        mock_invalidate.assert_called_once_with('profile', 'FOO')
+        mock_notify.assert_called_once_with(dispatcher.INVALIDATE_CACHE,
+                                            None, name='profile',
+                                            obj_id='FOO')
+
+
+class TestNotificationCoalescer(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestNotificationCoalescer, self).setUp()
+        self.coalescer = dispatcher.NotificationCoalescer()
+        self.thm = mock.Mock()
+        self.thm.group.threads = []
+
+    @mock.patch('eventlet.spawn_after')
+    @mock.patch.object(dispatcher, 'notify')
+    def test_start_action_coalesced(self, mock_notify, mock_spawn):
+        cfg.CONF.set_override('notification_coalesce_interval', 0.5)
+
+        self.assertTrue(self.coalescer.start_action())
+        self.assertTrue(self.coalescer.start_action())
+
+        mock_spawn.assert_called_once_with(0.5, self.coalescer._flush,
+                                           mock.ANY)
+        mock_notify.assert_not_called()
+        self.assertTrue(self.coalescer.pending)
+
+    @mock.patch('eventlet.spawn_after')
+    @mock.patch.object(dispatcher, 'notify')
+    def test_start_action_not_coalesced(self, mock_notify, mock_spawn):
+        cfg.CONF.set_override('notification_coalesce_interval', 0)
+
+        self.coalescer.start_action()
+        self.coalescer.start_action()
+
+        self.assertEqual(2, mock_notify.call_count)
+        mock_notify.assert_called_with(dispatcher.START_ACTION, None)
+        mock_spawn.assert_not_called()
+
+    @mock.patch.object(dispatcher, 'notify')
+    def test_flush(self, mock_notify):
+        self.coalescer.pending = True
+        ctx = mock.Mock()
+
+        self.coalescer._flush(ctx)
+
+        self.assertFalse(self.coalescer.pending)
+        ctx.update_store.assert_called_once_with()
+        mock_notify.assert_called_once_with(dispatcher.START_ACTION, None)
+
+    @mock.patch.object(dispatcher, 'notify')
+    def test_flush_failed(self, mock_notify):
+        mock_notify.side_effect = Exception('Boom!')
+        self.coalescer.pending = True
+
+        self.coalescer._flush(None)
+
+        self.assertFalse(self.coalescer.pending)
+
+    def test_select_engine_lightly_loaded(self):
+        cfg.CONF.set_override('scheduler_thread_pool_size', 10)
+        self.thm.group.threads = [mock.Mock()] * 4
+        self.coalescer.register_engine('ENGINE', self.thm)
+
+        self.assertEqual('ENGINE', self.coalescer._select_engine())
+
+    def test_select_engine_busy(self):
+        cfg.CONF.set_override('scheduler_thread_pool_size', 10)
+        self.thm.group.threads = [mock.Mock()] * 5
+        self.coalescer.register_engine('ENGINE', self.thm)
+
+        self.assertIsNone(self.coalescer._select_engine())
+
+    def test_select_engine_no_local_engine(self):
+        self.assertIsNone(self.coalescer._select_engine())
+
+
+class TestWaiter(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestWaiter, self).setUp()
+        self.addCleanup(dispatcher._WAITERS.clear)
+
+    def test_wake_waiter_not_waiting(self):
+        self.assertFalse(dispatcher.wake_waiter('FOO'))
+
+    def test_register_unregister(self):
+        dispatcher.register_waiter('FOO')
+        self.assertIn('FOO', dispatcher._WAITERS)
+
+        dispatcher.unregister_waiter('FOO')
+        self.assertNotIn('FOO', dispatcher._WAITERS)
+        # unregister is idempotent
+        dispatcher.unregister_waiter('FOO')
+
+    def test_wait_for_wakeup_woken(self):
+        dispatcher.register_waiter('FOO')
+
+        self.assertTrue(dispatcher.wake_waiter('FOO'))
+        # a second wake-up before the wait is harmless
+        self.assertTrue(dispatcher.wake_waiter('FOO'))
+
+        self.assertTrue(dispatcher.wait_for_wakeup('FOO', 10))
+        # the waiter is re-armed after being woken up
+        self.assertFalse(dispatcher._WAITERS['FOO'].ready())
+
+    def test_wait_for_wakeup_timeout(self):
+        dispatcher.register_waiter('FOO')
+
+        self.assertFalse(dispatcher.wait_for_wakeup('FOO', 0.01))
+
+    @mock.patch('eventlet.sleep')
+    def test_wait_for_wakeup_not_registered(self, mock_sleep):
+        self.assertFalse(dispatcher.wait_for_wakeup('FOO', 5))
+
+        mock_sleep.assert_called_once_with(5)
+
+
+class TestSignal(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestSignal, self).setUp()
+        self.addCleanup(dispatcher._SIGNALS.clear)
+
+    def test_register_unregister(self):
+        dispatcher.register_signal('FOO')
+        self.assertIn('FOO', dispatcher._SIGNALS)
+        # the signal is unknown until read or delivered
+        self.assertEqual((False, None), dispatcher.get_signal('FOO', 10))
+
+        dispatcher.unregister_signal('FOO')
+        self.assertNotIn('FOO', dispatcher._SIGNALS)
+        # unregister is idempotent
+        dispatcher.unregister_signal('FOO')
+
+    def test_deliver_signal(self):
+        dispatcher.register_signal('FOO')
+
+        self.assertTrue(dispatcher.deliver_signal('FOO', 'CANCEL'))
+        self.assertEqual((True, 'CANCEL'), dispatcher.get_signal('FOO', 10))
+
+    def test_deliver_signal_not_running(self):
+        self.assertFalse(dispatcher.deliver_signal('FOO', 'CANCEL'))
+        self.assertNotIn('FOO', dispatcher._SIGNALS)
+
+    @mock.patch('time.time')
+    def test_get_signal_stale(self, mock_time):
+        mock_time.return_value = 100
+        dispatcher.register_signal('FOO')
+        dispatcher.deliver_signal('FOO', 'SUSPEND')
+
+        mock_time.return_value = 110
+        self.assertEqual((True, 'SUSPEND'), dispatcher.get_signal('FOO', 10))
+        mock_time.return_value = 111
+        self.assertEqual((False, None), dispatcher.get_signal('FOO', 10))
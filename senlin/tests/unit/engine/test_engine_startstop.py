@@ -21,7 +21,10 @@ from oslo_utils import uuidutils
 from senlin.common import consts
 from senlin.common import context
 from senlin.common import messaging as rpc_messaging
+from senlin.engine import event as EVENT
 from senlin.engine import service
+from senlin.objects import event as event_obj
+from senlin.objects import node as node_obj
 from senlin.objects import service as service_obj
 from senlin.tests.unit.common import base
 
@@ -82,9 +85,10 @@ class EngineBasicTest(base.SenlinTestCase):
         self.assertEqual(self.fake_rpc_server, self.eng._rpc_server)
         self.fake_rpc_server.start.assert_called_once_with()
 
+    @mock.patch.object(EVENT, 'flush')
     @mock.patch.object(service_obj.Service, 'delete')
-    def test_engine_stop(self, mock_delete, mock_msg_cls, mock_hm_cls,
-                         mock_disp_cls):
+    def test_engine_stop(self, mock_delete, mock_flush, mock_msg_cls,
+                         mock_hm_cls, mock_disp_cls):
         mock_disp = mock_disp_cls.return_value
         mock_hm = mock_hm_cls.return_value
         self.eng.start()
@@ -98,6 +102,7 @@ class EngineBasicTest(base.SenlinTestCase):
         mock_hm.stop.assert_called_once_with()
 
         mock_delete.assert_called_once_with(self.fake_id)
+        mock_flush.assert_called_once_with()
 
     def test_engine_stop_with_exception(self, mock_msg_cls, mock_hm_cls,
                                         mock_disp_cls):
@@ -209,3 +214,62 @@ class EngineStatusTest(base.SenlinTestCase):
         eventlet.sleep(6)
         self.assertGreater(mock_get_all.call_count, 1)
         self.eng.stop()
+
+    @mock.patch('senlin.engine.dispatcher.Dispatcher')
+    @mock.patch('senlin.engine.health_manager.HealthManager')
+    @mock.patch('oslo_messaging.Target')
+    @mock.patch.object(event_obj.Event, 'purge')
+    def test_engine_event_retention(self, mock_purge, mock_msg_cls,
+                                    mock_hm_cls, mock_disp_cls):
+        cfg.CONF.set_override('event_retention_interval', 1)
+
+        # start engine and verify that events are being purged
+        self.eng.start()
+        eventlet.sleep(2)
+        self.assertGreater(mock_purge.call_count, 0)
+        self.eng.stop()
+
+    @mock.patch.object(event_obj.Event, 'purge_excess')
+    @mock.patch.object(event_obj.Event, 'purge')
+    def test_event_retention(self, mock_purge, mock_excess):
+        self.eng.event_retention()
+
+        mock_purge.assert_called_once_with(None, 'days', 30)
+        self.assertFalse(mock_excess.called)
+
+    @mock.patch.object(event_obj.Event, 'purge_excess')
+    @mock.patch.object(event_obj.Event, 'purge')
+    def test_event_retention_max_events(self, mock_purge, mock_excess):
+        cfg.CONF.set_override('event_retention_age', 0)
+        cfg.CONF.set_override('max_events_per_cluster', 100)
+
+        self.eng.event_retention()
+
+        self.assertFalse(mock_purge.called)
+        mock_excess.assert_called_once_with(100)
+
+    @mock.patch.object(event_obj.Event, 'purge')
+    def test_event_retention_with_exception(self, mock_purge):
+        mock_purge.side_effect = Exception('blah')
+
+        # no exception is raised
+        self.eng.event_retention()
+
+        mock_purge.assert_called_once_with(None, 'days', 30)
+
+    @mock.patch.object(node_obj.Node, 'count_reconcile')
+    def test_node_count_reconcile(self, mock_reconcile):
+        mock_reconcile.return_value = ['CLUSTER_A']
+
+        self.eng.node_count_reconcile()
+
+        mock_reconcile.assert_called_once_with(mock.ANY)
+
+    @mock.patch.object(node_obj.Node, 'count_reconcile')
+    def test_node_count_reconcile_with_exception(self, mock_reconcile):
+        mock_reconcile.side_effect = Exception('blah')
+
+        # no exception is raised
+        self.eng.node_count_reconcile()
+
+        mock_reconcile.assert_called_once_with(mock.ANY)
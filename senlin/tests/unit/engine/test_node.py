@@ -450,13 +450,26 @@ class TestNode(base.SenlinTestCase):
 
         self.assertTrue(res)
         mock_migrate.assert_called_once_with(self.context, node.id,
-                                             cluster_id, mock.ANY)
+                                             cluster_id, mock.ANY, index=None)
         mock_join_cluster.assert_called_once_with(self.context, node,
                                                   cluster_id)
         self.assertEqual(cluster_id, node.cluster_id)
         self.assertEqual(mock_migrate.return_value.index, node.index)
         self.assertIsNotNone(node.updated_at)
 
+    @mock.patch.object(pb.Profile, 'join_cluster')
+    @mock.patch.object(node_obj.Node, 'migrate')
+    def test_node_join_with_index(self, mock_migrate, mock_join_cluster):
+        node = nodem.Node('node1', PROFILE_ID, CLUSTER_ID, self.context)
+        mock_join_cluster.return_value = True
+        cluster_id = 'fb8bca7a-a82b-4442-a40f-92d3e3cfb0b9'
+
+        res = node.do_join(self.context, cluster_id, index=5)
+
+        self.assertTrue(res)
+        mock_migrate.assert_called_once_with(self.context, node.id,
+                                             cluster_id, mock.ANY, index=5)
+
     @mock.patch.object(pb.Profile, 'join_cluster')
     def test_node_join_fail_profile_call(self, mock_join):
         node = nodem.Node('node1', PROFILE_ID, None, self.context)
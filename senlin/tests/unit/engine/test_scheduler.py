@@ -10,16 +10,20 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
+
 import eventlet
 import mock
 from oslo_config import cfg
 from oslo_context import context as oslo_context
 from oslo_service import threadgroup
+from oslo_utils import timeutils
 
 from senlin.db import api as db_api
 from senlin.engine.actions import base as actionm
 from senlin.engine import scheduler
 from senlin.tests.unit.common import base
+from senlin.tests.unit.common import utils
 
 
 class DummyThread(object):
@@ -128,55 +132,166 @@ class SchedulerTest(base.SenlinTestCase):
 
     @mock.patch.object(scheduler, 'sleep')
     @mock.patch.object(db_api, 'action_acquire_first_ready')
-    def test_start_action_batch_control(self, mock_acquire_action, mock_sleep):
-        mock_action1 = mock.Mock()
-        mock_action1.id = 'ID1'
-        mock_action1.action = 'NODE_CREATE'
-        mock_action2 = mock.Mock()
-        mock_action2.id = 'ID2'
-        mock_action2.action = 'CLUSTER_CREATE'
-        mock_action3 = mock.Mock()
-        mock_action3.id = 'ID3'
-        mock_action3.action = 'NODE_DELETE'
-        mock_acquire_action.side_effect = [mock_action1, mock_action2,
-                                           mock_action3, None]
+    def test_start_action_batch_control(self, mock_acquire_action,
+                                        mock_sleep):
+        action_types = ['NODE_CREATE', 'CLUSTER_CREATE', 'NODE_DELETE']
+        actions = []
+        for index in range(10):
+            mock_action = mock.Mock()
+            mock_action.id = 'ID%d' % (index + 1)
+            mock_action.action = action_types[index % 3]
+            actions.append(mock_action)
+
+        # Add a None at the end to end the process.
+        actions.insert(len(actions), None)
+
+        mock_acquire_action.side_effect = actions
         mock_group = mock.Mock()
         self.mock_tg.return_value = mock_group
         cfg.CONF.set_override('max_actions_per_batch', 1)
         cfg.CONF.set_override('batch_interval', 2)
 
         tgm = scheduler.ThreadGroupManager()
-        tgm.start_action('4567')
+        tgm.start_action(worker_id='4567')
 
-        mock_sleep.assert_called_once_with(2)
-        self.assertEqual(mock_group.add_thread.call_count, 3)
+        # node actions are rate limited when executed, not when claimed
+        mock_sleep.assert_not_called()
+        self.assertEqual(mock_group.add_thread.call_count, 10)
 
-    @mock.patch.object(scheduler, 'sleep')
     @mock.patch.object(db_api, 'action_acquire_first_ready')
-    def test_start_action_multiple_batches(self, mock_acquire_action,
-                                           mock_sleep):
-        action_types = ['NODE_CREATE', 'NODE_DELETE']
+    @mock.patch.object(db_api, 'action_acquire_ready_batch')
+    def test_start_action_claim_batch(self, mock_acquire_batch,
+                                      mock_acquire_1st):
         actions = []
-        for index in range(10):
+        for index in range(3):
             mock_action = mock.Mock()
             mock_action.id = 'ID%d' % (index + 1)
-            mock_action.action = action_types[index % 2]
+            mock_action.action = 'NODE_CREATE'
             actions.append(mock_action)
-
-        # Add a None at the end to end the process.
-        actions.insert(len(actions), None)
-
-        mock_acquire_action.side_effect = actions
+        mock_acquire_batch.side_effect = [actions[:2], actions[2:], []]
         mock_group = mock.Mock()
         self.mock_tg.return_value = mock_group
-        cfg.CONF.set_override('max_actions_per_batch', 3)
-        cfg.CONF.set_override('batch_interval', 5)
+        cfg.CONF.set_override('max_actions_per_claim', 2)
 
         tgm = scheduler.ThreadGroupManager()
-        tgm.start_action(worker_id='4567')
+        tgm.start_action('4567')
 
-        self.assertEqual(mock_sleep.call_count, 3)
-        self.assertEqual(mock_group.add_thread.call_count, 10)
+        self.assertEqual(3, mock_acquire_batch.call_count)
+        mock_acquire_batch.assert_called_with(tgm.db_session, '4567',
+                                              mock.ANY, 2)
+        mock_acquire_1st.assert_not_called()
+        mock_group.add_thread.assert_has_calls([
+            mock.call(tgm._start_with_trace, oslo_context.get_current(),
+                      None, actionm.ActionProc, tgm.db_session, 'ID1'),
+            mock.call(tgm._start_with_trace, oslo_context.get_current(),
+                      None, actionm.ActionProc, tgm.db_session, 'ID2'),
+            mock.call(tgm._start_with_trace, oslo_context.get_current(),
+                      None, actionm.ActionProc, tgm.db_session, 'ID3'),
+        ])
+
+    @mock.patch.object(db_api, 'action_acquire')
+    @mock.patch.object(db_api, 'action_get_all_ready')
+    @mock.patch.object(db_api, 'action_count_ready_by_class')
+    def test_acquire_by_priority(self, mock_count, mock_ready, mock_acquire):
+        mock_count.return_value = {'recovery': 1, 'rpc': 1, 'derived': 1}
+        mock_ready.side_effect = [
+            [mock.Mock(id='ID3', action='NODE_RECOVER', cause='RPC Request',
+                       project='P2')],
+            [mock.Mock(id='ID2', action='CLUSTER_SCALE_OUT',
+                       cause='RPC Request', project='P2')],
+            [mock.Mock(id='ID1', action='NODE_CREATE',
+                       cause='Derived Action', project='P1')],
+        ]
+        action = mock.Mock(id='ID2')
+        # the first candidate was claimed by another engine
+        mock_acquire.side_effect = [None, action]
+        cfg.CONF.set_override('scheduling_window', 50)
+
+        tgm = scheduler.ThreadGroupManager()
+        res = tgm._acquire_ready_actions('4567')
+
+        self.assertEqual([action], res)
+        mock_count.assert_called_once_with(tgm.db_session,
+                                           timestamp=mock.ANY)
+        mock_ready.assert_has_calls([
+            mock.call(tgm.db_session, timestamp=mock.ANY, limit=50,
+                      action_class='recovery'),
+            mock.call(tgm.db_session, timestamp=mock.ANY, limit=49,
+                      action_class='rpc'),
+            mock.call(tgm.db_session, timestamp=mock.ANY, limit=48,
+                      action_class='derived'),
+        ])
+        mock_acquire.assert_has_calls([
+            mock.call(tgm.db_session, 'ID3', '4567', mock.ANY),
+            mock.call(tgm.db_session, 'ID2', '4567', mock.ANY),
+        ])
+        self.assertEqual({'recovery': 1, 'rpc': 1, 'derived': 1},
+                         tgm.queue_depth)
+
+    @mock.patch.object(db_api, 'action_acquire_batch')
+    @mock.patch.object(db_api, 'action_get_all_ready')
+    @mock.patch.object(db_api, 'action_count_ready_by_class')
+    def test_acquire_by_priority_batch(self, mock_count, mock_ready,
+                                       mock_acquire):
+        mock_count.return_value = {'recovery': 0, 'rpc': 0, 'derived': 4}
+        ready = [
+            mock.Mock(id='ID%d' % i, action='NODE_CREATE',
+                      cause='Derived Action', project=project)
+            for i, project in enumerate(['P1', 'P1', 'P1', 'P2'])
+        ]
+        mock_ready.return_value = ready
+        mock_acquire.return_value = ['ACTION']
+        cfg.CONF.set_override('scheduling_window', 50)
+        cfg.CONF.set_override('max_actions_per_claim', 2)
+
+        tgm = scheduler.ThreadGroupManager()
+        res = tgm._acquire_ready_actions('4567')
+
+        self.assertEqual(['ACTION'], res)
+        # empty classes are not queried
+        mock_ready.assert_called_once_with(tgm.db_session,
+                                           timestamp=mock.ANY, limit=50,
+                                           action_class='derived')
+        # projects take turns
+        mock_acquire.assert_called_once_with(tgm.db_session, ['ID0', 'ID3'],
+                                             '4567', mock.ANY)
+
+    @mock.patch.object(db_api, 'action_acquire')
+    @mock.patch.object(db_api, 'action_get_all_ready')
+    def test_acquire_by_priority_none_ready(self, mock_ready, mock_acquire):
+        cfg.CONF.set_override('scheduling_window', 50)
+
+        tgm = scheduler.ThreadGroupManager()
+        res = tgm._acquire_ready_actions('4567')
+
+        self.assertEqual([], res)
+        mock_ready.assert_not_called()
+        mock_acquire.assert_not_called()
+        self.assertEqual({'recovery': 0, 'rpc': 0, 'derived': 0},
+                         tgm.queue_depth)
+
+    def test_acquire_by_priority_window_full(self):
+        ctx = utils.dummy_context()
+        now = timeutils.utcnow(True)
+        for i in range(5):
+            db_api.action_create(ctx, {
+                'name': 'DERIVED%d' % i, 'action': 'NODE_CREATE',
+                'cause': 'Derived Action', 'status': 'READY',
+                'target': 'NODE_ID', 'project': ctx.project_id,
+                'created_at': now - datetime.timedelta(seconds=10 - i)})
+        db_api.action_create(ctx, {
+            'name': 'RECOVERY', 'action': 'NODE_RECOVER',
+            'cause': 'RPC Request', 'status': 'READY', 'target': 'NODE_ID',
+            'project': ctx.project_id, 'created_at': now})
+        cfg.CONF.set_override('scheduling_window', 3)
+
+        tgm = scheduler.ThreadGroupManager()
+        res = tgm._acquire_ready_actions('4567')
+
+        # the window full of older derived actions does not hide it
+        self.assertEqual(['RECOVERY'], [a.name for a in res])
+        self.assertEqual({'recovery': 1, 'rpc': 0, 'derived': 5},
+                         tgm.queue_depth)
 
     @mock.patch.object(db_api, 'action_acquire_first_ready')
     @mock.patch.object(db_api, 'action_acquire')
@@ -245,6 +360,16 @@ class SchedulerTest(base.SenlinTestCase):
         self.assertEqual(2, len(self.fake_tg.threads))
         self.assertEqual(f, self.fake_tg.threads[1])
 
+    def test_add_timer_initial_delay(self):
+        mock_group = mock.Mock()
+        self.mock_tg.return_value = mock_group
+        f = mock.Mock()
+
+        tgm = scheduler.ThreadGroupManager()
+        tgm.add_timer(10, f, 'ARG', initial_delay=5, key='VALUE')
+
+        mock_group.add_timer.assert_called_with(10, f, 5, 'ARG', key='VALUE')
+
     def test_stop_timer(self):
         mock_group = mock.Mock()
         self.mock_tg.return_value = mock_group
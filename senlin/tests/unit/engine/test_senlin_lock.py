@@ -11,11 +11,15 @@
 # under the License.
 
 import mock
+from oslo_config import cfg
+from oslo_db import exception
 
 from senlin.common import utils as common_utils
+from senlin.engine import dispatcher
 from senlin.engine import senlin_lock as lockm
 from senlin.objects import action as ao
 from senlin.objects import cluster_lock as clo
+from senlin.objects import lock_waiter as lwo
 from senlin.objects import node_lock as nlo
 from senlin.objects import service as svco
 from senlin.tests.unit.common import base
@@ -58,7 +62,7 @@ class SenlinLockTest(base.SenlinTestCase):
         self.assertTrue(res)
         mock_acquire.assert_called_with("CLUSTER_A", "ACTION_XYZ",
                                         lockm.CLUSTER_SCOPE)
-        self.assertEqual(3, mock_acquire.call_count)
+        self.assertEqual(1, mock_acquire.call_count)
         mock_steal.assert_called_once_with('CLUSTER_A', 'ACTION_XYZ')
         mock_gc.assert_called_once_with(mock.ANY)
 
@@ -73,7 +77,7 @@ class SenlinLockTest(base.SenlinTestCase):
         self.assertFalse(res)
         mock_acquire.assert_called_with('CLUSTER_A', 'ACTION_XYZ',
                                         lockm.CLUSTER_SCOPE)
-        self.assertEqual(3, mock_acquire.call_count)
+        self.assertEqual(1, mock_acquire.call_count)
 
     @mock.patch.object(clo.ClusterLock, "acquire")
     @mock.patch.object(clo.ClusterLock, "steal")
@@ -87,7 +91,7 @@ class SenlinLockTest(base.SenlinTestCase):
         self.assertTrue(res)
         mock_acquire.assert_called_with('CLUSTER_A', 'ACTION_XY',
                                         lockm.CLUSTER_SCOPE)
-        self.assertEqual(3, mock_acquire.call_count)
+        self.assertEqual(1, mock_acquire.call_count)
         mock_steal.assert_called_once_with('CLUSTER_A', 'ACTION_XY')
 
     @mock.patch.object(common_utils, 'is_engine_dead')
@@ -105,15 +109,58 @@ class SenlinLockTest(base.SenlinTestCase):
         self.assertFalse(res)
         mock_acquire.assert_called_with('CLUSTER_A', 'ACTION_XY',
                                         lockm.CLUSTER_SCOPE)
-        self.assertEqual(3, mock_acquire.call_count)
+        self.assertEqual(1, mock_acquire.call_count)
         mock_steal.assert_called_once_with('CLUSTER_A', 'ACTION_XY')
 
+    @mock.patch.object(clo.ClusterLock, "acquire")
+    def test_cluster_lock_acquire_duplicate_entry(self, mock_acquire):
+        mock_acquire.side_effect = [exception.DBDuplicateEntry,
+                                    ['ACTION_XYZ']]
+
+        res = lockm.cluster_lock_acquire(self.ctx, 'CLUSTER_A', 'ACTION_XYZ')
+
+        self.assertTrue(res)
+        self.assertEqual(2, mock_acquire.call_count)
+
+    @mock.patch.object(lockm, '_wait_in_line')
+    @mock.patch.object(common_utils, 'is_engine_dead')
+    @mock.patch.object(clo.ClusterLock, "acquire")
+    def test_cluster_lock_acquire_wait(self, mock_acquire, mock_dead,
+                                       mock_wait):
+        mock_dead.return_value = False
+        mock_acquire.side_effect = [[], ['ACTION_XYZ']]
+        mock_wait.side_effect = lambda r, a, e, acquire: acquire()
+
+        res = lockm.cluster_lock_acquire(self.ctx, 'CLUSTER_A', 'ACTION_XYZ',
+                                         'ENGINE', lockm.NODE_SCOPE)
+
+        self.assertTrue(res)
+        mock_wait.assert_called_once_with('CLUSTER_A', 'ACTION_XYZ',
+                                          'ENGINE', mock.ANY)
+        mock_acquire.assert_called_with('CLUSTER_A', 'ACTION_XYZ',
+                                        lockm.NODE_SCOPE)
+        self.assertEqual(2, mock_acquire.call_count)
+        # no owner to check when the lock is free but others are in line
+        self.assertFalse(mock_dead.called)
+
+    @mock.patch.object(lockm, '_wake_next')
     @mock.patch.object(clo.ClusterLock, "release")
-    def test_cluster_lock_release(self, mock_release):
+    def test_cluster_lock_release(self, mock_release, mock_wake):
         actual = lockm.cluster_lock_release('C', 'A', 'S')
 
         self.assertEqual(mock_release.return_value, actual)
         mock_release.assert_called_once_with('C', 'A', 'S')
+        mock_wake.assert_called_once_with('C')
+
+    @mock.patch.object(lockm, '_wake_next')
+    @mock.patch.object(clo.ClusterLock, "release")
+    def test_cluster_lock_release_failed(self, mock_release, mock_wake):
+        mock_release.return_value = False
+
+        actual = lockm.cluster_lock_release('C', 'A', 'S')
+
+        self.assertFalse(actual)
+        self.assertFalse(mock_wake.called)
 
     @mock.patch.object(nlo.NodeLock, "acquire")
     def test_node_lock_acquire_already_owner(self, mock_acquire):
@@ -183,8 +230,126 @@ class SenlinLockTest(base.SenlinTestCase):
         mock_acquire.assert_called_once_with('NODE_A', 'ACTION_XY')
         mock_steal.assert_called_once_with('NODE_A', 'ACTION_XY')
 
+    @mock.patch.object(lockm, '_wait_in_line')
+    @mock.patch.object(common_utils, 'is_engine_dead')
+    @mock.patch.object(nlo.NodeLock, "acquire")
+    def test_node_lock_acquire_wait(self, mock_acquire, mock_dead,
+                                    mock_wait):
+        mock_dead.return_value = False
+        mock_acquire.side_effect = ['ACTION_ABC', 'ACTION_XYZ']
+        mock_wait.side_effect = lambda r, a, e, acquire: acquire()
+
+        res = lockm.node_lock_acquire(self.ctx, 'NODE_A', 'ACTION_XYZ',
+                                      'ENGINE')
+
+        self.assertTrue(res)
+        mock_wait.assert_called_once_with('NODE_A', 'ACTION_XYZ', 'ENGINE',
+                                          mock.ANY)
+        self.assertEqual(2, mock_acquire.call_count)
+
+    @mock.patch.object(lockm, '_wake_next')
     @mock.patch.object(nlo.NodeLock, "release")
-    def test_node_lock_release(self, mock_release):
+    def test_node_lock_release(self, mock_release, mock_wake):
         actual = lockm.node_lock_release('C', 'A')
         self.assertEqual(mock_release.return_value, actual)
         mock_release.assert_called_once_with('C', 'A')
+        mock_wake.assert_called_once_with('C')
+
+
+class LockWaiterTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(LockWaiterTest, self).setUp()
+        lockm._STATS.clear()
+        self.patchobject(dispatcher, 'register_waiter')
+        self.patchobject(dispatcher, 'unregister_waiter')
+        self.mock_wake = self.patchobject(lockm, '_wake_next')
+        self.mock_add = self.patchobject(lwo.LockWaiter, 'add')
+        self.mock_remove = self.patchobject(lwo.LockWaiter, 'remove')
+
+    @mock.patch.object(dispatcher, 'wait_for_wakeup')
+    def test_wait_in_line(self, mock_wait):
+        acquire = mock.Mock(side_effect=[False, False, True])
+
+        res = lockm._wait_in_line('RES', 'ACTION', 'ENGINE', acquire)
+
+        self.assertTrue(res)
+        self.assertEqual(3, acquire.call_count)
+        self.assertEqual(2, mock_wait.call_count)
+        mock_wait.assert_called_with('ACTION', 10)
+        dispatcher.register_waiter.assert_called_once_with('ACTION')
+        dispatcher.unregister_waiter.assert_called_once_with('ACTION')
+        self.mock_add.assert_called_once_with('RES', 'ACTION', 'ENGINE',
+                                              mock.ANY)
+        self.mock_remove.assert_called_once_with('RES', 'ACTION')
+        self.mock_wake.assert_called_once_with('RES')
+        stats = lockm.get_stats()
+        self.assertEqual(1, stats['waits'])
+        self.assertEqual(0, stats['timeouts'])
+
+    @mock.patch.object(dispatcher, 'wait_for_wakeup')
+    @mock.patch('time.time')
+    def test_wait_in_line_timeout(self, mock_time, mock_wait):
+        cfg.CONF.set_override('lock_wait_timeout', 15)
+        mock_time.side_effect = [100, 100, 110, 120, 120]
+        acquire = mock.Mock(return_value=False)
+
+        res = lockm._wait_in_line('RES', 'ACTION', 'ENGINE', acquire)
+
+        self.assertFalse(res)
+        self.assertEqual(3, acquire.call_count)
+        mock_wait.assert_has_calls([mock.call('ACTION', 10),
+                                    mock.call('ACTION', 5)])
+        self.mock_remove.assert_called_once_with('RES', 'ACTION')
+        self.mock_wake.assert_called_once_with('RES')
+        self.assertEqual({'waits': 1, 'timeouts': 1, 'wait_time': 20,
+                          'steals': 0}, lockm.get_stats())
+
+    def test_wait_in_line_disabled(self):
+        acquire = mock.Mock()
+
+        self.assertFalse(lockm._wait_in_line('RES', 'ACTION', None, acquire))
+        cfg.CONF.set_override('lock_wait_timeout', 0)
+        self.assertFalse(lockm._wait_in_line('RES', 'ACTION', 'ENGINE',
+                                             acquire))
+
+        self.assertFalse(acquire.called)
+        self.assertFalse(self.mock_add.called)
+
+
+class WakeNextTest(base.SenlinTestCase):
+
+    @mock.patch.object(dispatcher, 'wake_action')
+    @mock.patch.object(dispatcher, 'wake_waiter')
+    @mock.patch.object(lwo.LockWaiter, 'get_first')
+    def test_wake_next_local(self, mock_first, mock_local, mock_remote):
+        mock_first.return_value = mock.Mock(action_id='ACTION',
+                                            engine_id='ENGINE')
+        mock_local.return_value = True
+
+        lockm._wake_next('RES')
+
+        mock_first.assert_called_once_with('RES')
+        mock_local.assert_called_once_with('ACTION')
+        self.assertFalse(mock_remote.called)
+
+    @mock.patch.object(dispatcher, 'wake_action')
+    @mock.patch.object(dispatcher, 'wake_waiter')
+    @mock.patch.object(lwo.LockWaiter, 'get_first')
+    def test_wake_next_remote(self, mock_first, mock_local, mock_remote):
+        mock_first.return_value = mock.Mock(action_id='ACTION',
+                                            engine_id='ENGINE')
+        mock_local.return_value = False
+
+        lockm._wake_next('RES')
+
+        mock_remote.assert_called_once_with('ENGINE', action_id='ACTION')
+
+    @mock.patch.object(dispatcher, 'wake_waiter')
+    @mock.patch.object(lwo.LockWaiter, 'get_first')
+    def test_wake_next_no_waiter(self, mock_first, mock_local):
+        mock_first.return_value = None
+
+        lockm._wake_next('RES')
+
+        self.assertFalse(mock_local.called)
@@ -71,3 +71,6 @@ class TestEventBackend(testtools.TestCase):
         self.assertRaises(NotImplementedError,
                           base.EventBackend.dump,
                           '1', '2')
+
+    def test_flush(self):
+        self.assertIsNone(base.EventBackend.flush())
@@ -11,6 +11,7 @@
 # under the License.
 
 import mock
+from oslo_config import cfg
 import testtools
 
 from senlin.common import consts
@@ -29,8 +30,8 @@ class TestDatabase(testtools.TestCase):
         self.context = utils.dummy_context()
 
     @mock.patch.object(base.EventBackend, '_check_entity')
-    @mock.patch.object(eo.Event, 'create')
-    def test_dump(self, mock_create, mock_check):
+    @mock.patch.object(DB.EventWriter, 'write')
+    def test_dump(self, mock_write, mock_check):
         mock_check.return_value = 'CLUSTER'
         entity = mock.Mock(id='CLUSTER_ID')
         entity.name = 'cluster1'
@@ -41,7 +42,7 @@ class TestDatabase(testtools.TestCase):
 
         self.assertIsNone(res)
         mock_check.assert_called_once_with(entity)
-        mock_create.assert_called_once_with(
+        mock_write.assert_called_once_with(
             self.context,
             {
                 'level': 'LEVEL',
@@ -59,8 +60,8 @@ class TestDatabase(testtools.TestCase):
             })
 
     @mock.patch.object(base.EventBackend, '_check_entity')
-    @mock.patch.object(eo.Event, 'create')
-    def test_dump_with_extra_but_no_status_(self, mock_create, mock_check):
+    @mock.patch.object(DB.EventWriter, 'write')
+    def test_dump_with_extra_but_no_status_(self, mock_write, mock_check):
         mock_check.return_value = 'NODE'
         entity = mock.Mock(id='NODE_ID', status='S1', status_reason='R1',
                            cluster_id='CLUSTER_ID')
@@ -74,7 +75,7 @@ class TestDatabase(testtools.TestCase):
 
         self.assertIsNone(res)
         mock_check.assert_called_once_with(entity)
-        mock_create.assert_called_once_with(
+        mock_write.assert_called_once_with(
             self.context,
             {
                 'level': 'LEVEL',
@@ -92,8 +93,8 @@ class TestDatabase(testtools.TestCase):
             })
 
     @mock.patch.object(base.EventBackend, '_check_entity')
-    @mock.patch.object(eo.Event, 'create')
-    def test_dump_operation_action(self, mock_create, mock_check):
+    @mock.patch.object(DB.EventWriter, 'write')
+    def test_dump_operation_action(self, mock_write, mock_check):
         mock_check.return_value = 'CLUSTER'
         entity = mock.Mock(id='CLUSTER_ID')
         entity.name = 'cluster1'
@@ -104,7 +105,7 @@ class TestDatabase(testtools.TestCase):
 
         self.assertIsNone(res)
         mock_check.assert_called_once_with(entity)
-        mock_create.assert_called_once_with(
+        mock_write.assert_called_once_with(
             self.context,
             {
                 'level': 'LEVEL',
@@ -120,3 +121,100 @@ class TestDatabase(testtools.TestCase):
                 'status_reason': 'REASON',
                 'meta_data': {}
             })
+
+    @mock.patch.object(DB.EventWriter, 'flush')
+    def test_flush(self, mock_flush):
+        res = DB.DBEvent.flush()
+
+        self.assertIsNone(res)
+        mock_flush.assert_called_once_with()
+
+
+@mock.patch.object(DB.eventlet, 'spawn_after')
+class TestEventWriter(testtools.TestCase):
+
+    def setUp(self):
+        super(TestEventWriter, self).setUp()
+        self.context = utils.dummy_context()
+        self.writer = DB.EventWriter()
+        self.addCleanup(cfg.CONF.reset)
+
+    @mock.patch.object(eo.Event, 'create')
+    def test_write_at_once(self, mock_create, mock_spawn):
+        cfg.CONF.set_override('flush_interval', 0, group='dispatchers')
+
+        res = self.writer.write(self.context, {'oid': 'OBJ1'})
+
+        self.assertTrue(res)
+        mock_create.assert_called_once_with(self.context, {'oid': 'OBJ1'})
+        self.assertEqual(0, len(self.writer.queue))
+        self.assertFalse(mock_spawn.called)
+
+    def test_write_queued(self, mock_spawn):
+        res = self.writer.write(self.context, {'oid': 'OBJ1'})
+        self.assertTrue(res)
+        res = self.writer.write(self.context, {'oid': 'OBJ2'})
+        self.assertTrue(res)
+
+        self.assertEqual([(self.context, {'oid': 'OBJ1'}),
+                          (self.context, {'oid': 'OBJ2'})],
+                         list(self.writer.queue))
+        # The flush is scheduled once
+        mock_spawn.assert_called_once_with(1.0, self.writer.flush)
+
+    def test_write_batch_full(self, mock_spawn):
+        cfg.CONF.set_override('batch_size', 2, group='dispatchers')
+        timer = mock.Mock()
+        mock_spawn.return_value = timer
+
+        self.writer.write(self.context, {'oid': 'OBJ1'})
+        self.writer.write(self.context, {'oid': 'OBJ2'})
+
+        timer.cancel.assert_called_once_with()
+        self.assertEqual([mock.call(1.0, self.writer.flush),
+                          mock.call(0, self.writer.flush)],
+                         mock_spawn.call_args_list)
+
+    def test_write_queue_full(self, mock_spawn):
+        cfg.CONF.set_override('max_queue_size', 1, group='dispatchers')
+
+        res = self.writer.write(self.context, {'oid': 'OBJ1'})
+        self.assertTrue(res)
+        res = self.writer.write(self.context, {'oid': 'OBJ2'})
+        self.assertFalse(res)
+
+        self.assertEqual([(self.context, {'oid': 'OBJ1'})],
+                         list(self.writer.queue))
+        self.assertEqual({'queued': 1, 'written': 0, 'dropped': 1},
+                         self.writer.get_stats())
+
+    @mock.patch.object(eo.Event, 'create_bulk')
+    def test_flush(self, mock_create, mock_spawn):
+        cfg.CONF.set_override('batch_size', 2, group='dispatchers')
+        cfg.CONF.set_override('max_queue_size', 10, group='dispatchers')
+        for i in range(5):
+            self.writer.write(self.context, {'oid': 'OBJ%s' % i})
+
+        self.writer.flush()
+
+        # Batches are written in queue order
+        mock_create.assert_has_calls([
+            mock.call(self.context, [{'oid': 'OBJ0'}, {'oid': 'OBJ1'}]),
+            mock.call(self.context, [{'oid': 'OBJ2'}, {'oid': 'OBJ3'}]),
+            mock.call(self.context, [{'oid': 'OBJ4'}]),
+        ])
+        self.assertEqual({'queued': 0, 'written': 5, 'dropped': 0},
+                         self.writer.get_stats())
+
+    @mock.patch.object(eo.Event, 'create_bulk')
+    def test_flush_failed(self, mock_create, mock_spawn):
+        mock_create.side_effect = [Exception('boom'), None]
+        cfg.CONF.set_override('batch_size', 2, group='dispatchers')
+        for i in range(3):
+            self.writer.write(self.context, {'oid': 'OBJ%s' % i})
+
+        self.writer.flush()
+
+        self.assertEqual(2, mock_create.call_count)
+        self.assertEqual({'queued': 0, 'written': 1, 'dropped': 2},
+                         self.writer.get_stats())
@@ -17,6 +17,7 @@ from oslo_utils import timeutils
 from oslo_utils import uuidutils
 import testtools
 
+from senlin.common import consts
 from senlin.engine.actions import base as action_base
 from senlin.engine import cluster
 from senlin.engine import node
@@ -33,9 +34,13 @@ class TestMessageEvent(testtools.TestCase):
     def setUp(self):
         super(TestMessageEvent, self).setUp()
         self.ctx = utils.dummy_context()
+        patcher = mock.patch.object(MSG, '_EMITTER', MSG.EventEmitter())
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
+    @mock.patch.object(MSG.eventlet, 'spawn')
     @mock.patch.object(nobj.NotificationBase, '_emit')
-    def test_notify_cluster_action(self, mock_emit):
+    def test_notify_cluster_action(self, mock_emit, mock_spawn):
         cluster_id = uuidutils.generate_uuid()
         profile_id = uuidutils.generate_uuid()
         cluster_init = timeutils.utcnow(True)
@@ -124,14 +129,20 @@ class TestMessageEvent(testtools.TestCase):
             self.ctx, logging.INFO, c1, action, phase='start')
 
         self.assertIsNone(res)
+        # The notification is queued and sent by a worker
+        mock_spawn.assert_called_once_with(MSG._EMITTER._run)
+        self.assertFalse(mock_emit.called)
+
+        MSG.MessageEvent.flush()
 
         mock_emit.assert_called_once_with(
             self.ctx, 'cluster.create.start', publisher_id, mock.ANY)
         payload = mock_emit.call_args[0][3]
         self.assertEqual(expected_payload, payload)
 
+    @mock.patch.object(MSG.eventlet, 'spawn')
     @mock.patch.object(nobj.NotificationBase, '_emit')
-    def test_notify_node_action(self, mock_emit):
+    def test_notify_node_action(self, mock_emit, mock_spawn):
         node_id = uuidutils.generate_uuid()
         profile_id = uuidutils.generate_uuid()
         node_init = timeutils.utcnow(True)
@@ -217,6 +228,11 @@ class TestMessageEvent(testtools.TestCase):
             self.ctx, logging.INFO, n1, action, phase='start')
 
         self.assertIsNone(res)
+        # The notification is queued and sent by a worker
+        mock_spawn.assert_called_once_with(MSG._EMITTER._run)
+        self.assertFalse(mock_emit.called)
+
+        MSG.MessageEvent.flush()
 
         mock_emit.assert_called_once_with(
             self.ctx, 'node.create.start', publisher_id, mock.ANY)
@@ -264,3 +280,171 @@ class TestMessageEvent(testtools.TestCase):
         mock_check.assert_called_once_with(entity)
         mock_notify.assert_called_once_with(self.ctx, logging.INFO, entity,
                                             action)
+
+    @mock.patch.object(MSG.random, 'random')
+    @mock.patch.object(MSG.MessageEvent, '_notify_node_action')
+    @mock.patch.object(base.EventBackend, '_check_entity')
+    def test_dump_derived_node_action_sampled(self, mock_check, mock_notify,
+                                              mock_random):
+        self.addCleanup(cfg.CONF.reset)
+        cfg.CONF.set_override('sample_rates', {'info': '0.1'},
+                              group='dispatchers')
+        mock_check.return_value = 'NODE'
+        mock_random.side_effect = [0.5, 0.05]
+        entity = mock.Mock()
+        action = mock.Mock(context=self.ctx, entity=entity,
+                           cause=consts.CAUSE_DERIVED)
+
+        MSG.MessageEvent.dump(logging.INFO, action)
+        self.assertFalse(mock_notify.called)
+
+        MSG.MessageEvent.dump(logging.INFO, action)
+        mock_notify.assert_called_once_with(self.ctx, logging.INFO, entity,
+                                            action)
+
+    @mock.patch.object(MSG.random, 'random')
+    @mock.patch.object(MSG.MessageEvent, '_notify_node_action')
+    @mock.patch.object(base.EventBackend, '_check_entity')
+    def test_dump_node_action_not_sampled(self, mock_check, mock_notify,
+                                          mock_random):
+        self.addCleanup(cfg.CONF.reset)
+        cfg.CONF.set_override('sample_rates', {'info': '0'},
+                              group='dispatchers')
+        mock_check.return_value = 'NODE'
+        entity = mock.Mock()
+
+        # Actions not derived
+        action = mock.Mock(context=self.ctx, entity=entity,
+                           cause=consts.CAUSE_RPC)
+        MSG.MessageEvent.dump(logging.INFO, action)
+        # Priorities without sample rates
+        action = mock.Mock(context=self.ctx, entity=entity,
+                           cause=consts.CAUSE_DERIVED)
+        MSG.MessageEvent.dump(logging.ERROR, action)
+
+        self.assertEqual(2, mock_notify.call_count)
+        self.assertFalse(mock_random.called)
+
+    @mock.patch.object(MSG, 'LOG')
+    def test_get_sample_rates(self, mock_log):
+        self.addCleanup(cfg.CONF.reset)
+        cfg.CONF.set_override('sample_rates',
+                              {'INFO': '0.1', 'debug': 'x', 'warning': '2'},
+                              group='dispatchers')
+
+        res = MSG.MessageEvent._get_sample_rates()
+
+        self.assertEqual({'info': 0.1}, res)
+        self.assertEqual(2, mock_log.error.call_count)
+
+        # The rates are only parsed once
+        mock_log.reset_mock()
+        res = MSG.MessageEvent._get_sample_rates()
+        self.assertEqual({'info': 0.1}, res)
+        self.assertFalse(mock_log.error.called)
+
+    @mock.patch.object(MSG.random, 'random')
+    @mock.patch.object(MSG.MessageEvent, '_notify_node_action')
+    @mock.patch.object(base.EventBackend, '_check_entity')
+    def test_dump_node_action_invalid_sample_rate(self, mock_check,
+                                                  mock_notify, mock_random):
+        self.addCleanup(cfg.CONF.reset)
+        cfg.CONF.set_override('sample_rates', {'info': 'x'},
+                              group='dispatchers')
+        mock_check.return_value = 'NODE'
+        entity = mock.Mock()
+        action = mock.Mock(context=self.ctx, entity=entity,
+                           cause=consts.CAUSE_DERIVED)
+
+        MSG.MessageEvent.dump(logging.INFO, action)
+
+        mock_notify.assert_called_once_with(self.ctx, logging.INFO, entity,
+                                            action)
+        self.assertFalse(mock_random.called)
+
+    @mock.patch.object(MSG.EventEmitter, 'flush')
+    def test_flush(self, mock_flush):
+        res = MSG.MessageEvent.flush()
+
+        self.assertIsNone(res)
+        mock_flush.assert_called_once_with()
+
+
+@mock.patch.object(MSG.eventlet, 'spawn')
+class TestEventEmitter(testtools.TestCase):
+
+    def setUp(self):
+        super(TestEventEmitter, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.emitter = MSG.EventEmitter()
+        self.addCleanup(cfg.CONF.reset)
+
+    def test_emit_at_once(self, mock_spawn):
+        cfg.CONF.set_override('flush_interval', 0, group='dispatchers')
+        notification = mock.Mock()
+
+        res = self.emitter.emit(self.ctx, notification)
+
+        self.assertTrue(res)
+        notification.emit.assert_called_once_with(self.ctx)
+        self.assertFalse(mock_spawn.called)
+
+    def test_emit_queued(self, mock_spawn):
+        n1 = mock.Mock()
+        n2 = mock.Mock()
+
+        self.assertTrue(self.emitter.emit(self.ctx, n1))
+        self.assertTrue(self.emitter.emit(self.ctx, n2))
+
+        self.assertFalse(n1.emit.called)
+        self.assertFalse(n2.emit.called)
+        # One worker is started
+        mock_spawn.assert_called_once_with(self.emitter._run)
+        self.assertEqual({'queued': 2, 'emitted': 0, 'dropped': 0},
+                         self.emitter.get_stats())
+
+    def test_emit_queue_full(self, mock_spawn):
+        cfg.CONF.set_override('max_queue_size', 1, group='dispatchers')
+
+        res = self.emitter.emit(self.ctx, mock.Mock())
+        self.assertTrue(res)
+        res = self.emitter.emit(self.ctx, mock.Mock())
+        self.assertFalse(res)
+
+        self.assertEqual({'queued': 1, 'emitted': 0, 'dropped': 1},
+                         self.emitter.get_stats())
+
+    @mock.patch.object(MSG.eventlet, 'sleep')
+    def test_run(self, mock_sleep, mock_spawn):
+        cfg.CONF.set_override('batch_size', 2, group='dispatchers')
+        calls = []
+        notifications = []
+        for i in range(3):
+            n = mock.Mock()
+            n.emit.side_effect = lambda ctx, i=i: calls.append(i)
+            notifications.append(n)
+            self.emitter.emit(self.ctx, n)
+
+        self.emitter._run()
+
+        # Notifications are sent in order, yielding after each batch
+        self.assertEqual([0, 1, 2], calls)
+        self.assertEqual([mock.call(0), mock.call(0)],
+                         mock_sleep.call_args_list)
+        self.assertIsNone(self.emitter._worker)
+        self.assertEqual({'queued': 0, 'emitted': 3, 'dropped': 0},
+                         self.emitter.get_stats())
+
+    def test_flush(self, mock_spawn):
+        n1 = mock.Mock()
+        n2 = mock.Mock()
+        n2.emit.side_effect = Exception('boom')
+        self.emitter.emit(self.ctx, n1)
+        self.emitter.emit(self.ctx, n2)
+
+        self.emitter.flush()
+
+        n1.emit.assert_called_once_with(self.ctx)
+        n2.emit.assert_called_once_with(self.ctx)
+        self.assertEqual({'queued': 0, 'emitted': 1, 'dropped': 1},
+                         self.emitter.get_stats())
@@ -241,6 +241,11 @@ class TestClusterList(test_base.SenlinTestCase):
         self.assertEqual('name:asc', sot.sort)
         self.assertFalse(sot.project_safe)
 
+    def test_cluster_list_request_with_count(self):
+        sot = clusters.ClusterListRequest(with_count='true', **self.params)
+        self.assertTrue(sot.with_count)
+        self.assertTrue(sot.project_safe)
+
 
 class TestClusterGet(test_base.SenlinTestCase):
 
@@ -30,73 +30,27 @@ class TestCluster(base.SenlinTestCase):
         super(TestCluster, self).setUp()
         self.ctx = utils.dummy_context()
 
-    @mock.patch.object(co.Cluster, 'get')
-    def test_find_by_uuid(self, mock_get):
+    @mock.patch.object(co.Cluster, 'get_by_identity')
+    def test_find(self, mock_get):
         x_cluster = mock.Mock()
         mock_get.return_value = x_cluster
         aid = uuidutils.generate_uuid()
 
-        result = co.Cluster.find(self.ctx, aid)
-
-        self.assertEqual(x_cluster, result)
-        mock_get.assert_called_once_with(self.ctx, aid, project_safe=True)
-
-    @mock.patch.object(co.Cluster, 'get_by_name')
-    @mock.patch.object(co.Cluster, 'get')
-    def test_find_by_uuid_as_name(self, mock_get, mock_get_name):
-        x_cluster = mock.Mock()
-        mock_get_name.return_value = x_cluster
-        mock_get.return_value = None
-
-        aid = uuidutils.generate_uuid()
-        result = co.Cluster.find(self.ctx, aid, False)
+        result = co.Cluster.find(self.ctx, aid, project_safe=False)
 
         self.assertEqual(x_cluster, result)
         mock_get.assert_called_once_with(self.ctx, aid, project_safe=False)
-        mock_get_name.assert_called_once_with(self.ctx, aid,
-                                              project_safe=False)
-
-    @mock.patch.object(co.Cluster, 'get_by_name')
-    def test_find_by_name(self, mock_get_name):
-        x_cluster = mock.Mock()
-        mock_get_name.return_value = x_cluster
-        aid = 'this-is-not-uuid'
-
-        result = co.Cluster.find(self.ctx, aid)
 
-        self.assertEqual(x_cluster, result)
-        mock_get_name.assert_called_once_with(self.ctx, aid, project_safe=True)
-
-    @mock.patch.object(co.Cluster, 'get_by_short_id')
-    @mock.patch.object(co.Cluster, 'get_by_name')
-    def test_find_by_shortid(self, mock_get_name, mock_get_shortid):
-        x_cluster = mock.Mock()
-        mock_get_shortid.return_value = x_cluster
-        mock_get_name.return_value = None
-        aid = 'abcd-1234-abcd'
-
-        result = co.Cluster.find(self.ctx, aid, False)
-
-        self.assertEqual(x_cluster, result)
-        mock_get_name.assert_called_once_with(self.ctx, aid,
-                                              project_safe=False)
-        mock_get_shortid.assert_called_once_with(self.ctx, aid,
-                                                 project_safe=False)
-
-    @mock.patch.object(co.Cluster, 'get_by_short_id')
-    @mock.patch.object(co.Cluster, 'get_by_name')
-    def test_find_not_found(self, mock_get_name, mock_get_short_id):
-        mock_get_name.return_value = None
-        mock_get_short_id.return_value = None
-
-        self.assertRaises(exc.ResourceNotFound,
-                          co.Cluster.find,
-                          self.ctx, 'bogus')
+    @mock.patch.object(co.Cluster, 'get_by_identity')
+    def test_find_not_found(self, mock_get):
+        mock_get.return_value = None
 
-        mock_get_name.assert_called_once_with(self.ctx, 'bogus',
-                                              project_safe=True)
-        mock_get_short_id.assert_called_once_with(self.ctx, 'bogus',
-                                                  project_safe=True)
+        ex = self.assertRaises(exc.ResourceNotFound,
+                               co.Cluster.find,
+                               self.ctx, 'BOGUS')
+        self.assertEqual("The cluster 'BOGUS' could not be found.",
+                         six.text_type(ex))
+        mock_get.assert_called_once_with(self.ctx, 'BOGUS', project_safe=True)
 
     def test_to_dict(self):
         PROFILE_ID = '96f4df4b-889e-4184-ba8d-b5ca122f95bb'
@@ -28,70 +28,27 @@ class TestNode(base.SenlinTestCase):
         super(TestNode, self).setUp()
         self.ctx = utils.dummy_context()
 
-    @mock.patch.object(no.Node, 'get')
-    def test_find_by_uuid(self, mock_get):
+    @mock.patch.object(no.Node, 'get_by_identity')
+    def test_find(self, mock_get):
         x_node = mock.Mock()
         mock_get.return_value = x_node
         aid = uuidutils.generate_uuid()
 
-        result = no.Node.find(self.ctx, aid)
-
-        self.assertEqual(x_node, result)
-        mock_get.assert_called_once_with(self.ctx, aid, project_safe=True)
-
-    @mock.patch.object(no.Node, 'get_by_name')
-    @mock.patch.object(no.Node, 'get')
-    def test_find_by_uuid_as_name(self, mock_get, mock_name):
-        mock_get.return_value = None
-        x_node = mock.Mock()
-        mock_name.return_value = x_node
-        aid = uuidutils.generate_uuid()
-
-        result = no.Node.find(self.ctx, aid, False)
+        result = no.Node.find(self.ctx, aid, project_safe=False)
 
         self.assertEqual(x_node, result)
         mock_get.assert_called_once_with(self.ctx, aid, project_safe=False)
-        mock_name.assert_called_once_with(self.ctx, aid, project_safe=False)
-
-    @mock.patch.object(no.Node, 'get_by_name')
-    def test_find_by_name(self, mock_name):
-        x_node = mock.Mock()
-        mock_name.return_value = x_node
-        aid = 'not-a-uuid'
 
-        result = no.Node.find(self.ctx, aid)
-
-        self.assertEqual(x_node, result)
-        mock_name.assert_called_once_with(self.ctx, aid, project_safe=True)
-
-    @mock.patch.object(no.Node, 'get_by_short_id')
-    @mock.patch.object(no.Node, 'get_by_name')
-    def test_find_by_short_id(self, mock_name, mock_shortid):
-        mock_name.return_value = None
-        x_node = mock.Mock()
-        mock_shortid.return_value = x_node
-        aid = 'abcdef'
-
-        result = no.Node.find(self.ctx, aid, False)
-
-        self.assertEqual(x_node, result)
-        mock_name.assert_called_once_with(self.ctx, aid, project_safe=False)
-        mock_shortid.assert_called_once_with(self.ctx, aid, project_safe=False)
-
-    @mock.patch.object(no.Node, 'get_by_name')
-    @mock.patch.object(no.Node, 'get_by_short_id')
-    def test_find_not_found(self, mock_shortid, mock_name):
-        mock_name.return_value = None
-        mock_shortid.return_value = None
+    @mock.patch.object(no.Node, 'get_by_identity')
+    def test_find_not_found(self, mock_get):
+        mock_get.return_value = None
 
         ex = self.assertRaises(exc.ResourceNotFound,
                                no.Node.find,
                                self.ctx, 'BOGUS')
         self.assertEqual("The node 'BOGUS' could not be found.",
                          six.text_type(ex))
-        mock_name.assert_called_once_with(self.ctx, 'BOGUS', project_safe=True)
-        mock_shortid.assert_called_once_with(self.ctx, 'BOGUS',
-                                             project_safe=True)
+        mock_get.assert_called_once_with(self.ctx, 'BOGUS', project_safe=True)
 
     def test_to_dict(self):
         PROFILE_ID = uuidutils.generate_uuid()
@@ -12,6 +12,7 @@
 
 import mock
 from oslo_utils import uuidutils
+import six
 import testtools
 
 from senlin.common import exception as exc
@@ -24,68 +25,24 @@ class ReceiverTest(testtools.TestCase):
         super(ReceiverTest, self).setUp()
         self.ctx = mock.Mock()
 
-    @mock.patch.object(ro.Receiver, 'get')
-    def test_find_by_uuid(self, mock_get):
-        fake_obj = mock.Mock()
-        mock_get.return_value = fake_obj
-        fake_id = uuidutils.generate_uuid()
+    @mock.patch.object(ro.Receiver, 'get_by_identity')
+    def test_find(self, mock_get):
+        x_receiver = mock.Mock()
+        mock_get.return_value = x_receiver
+        aid = uuidutils.generate_uuid()
 
-        res = ro.Receiver.find(self.ctx, fake_id)
+        result = ro.Receiver.find(self.ctx, aid, project_safe=False)
 
-        self.assertEqual(fake_obj, res)
-        mock_get.assert_called_once_with(self.ctx, fake_id)
+        self.assertEqual(x_receiver, result)
+        mock_get.assert_called_once_with(self.ctx, aid, project_safe=False)
 
-    @mock.patch.object(ro.Receiver, 'get_by_name')
-    @mock.patch.object(ro.Receiver, 'get')
-    def test_find_by_uuid_as_name(self, mock_get, mock_get_name):
+    @mock.patch.object(ro.Receiver, 'get_by_identity')
+    def test_find_not_found(self, mock_get):
         mock_get.return_value = None
-        fake_obj = mock.Mock()
-        mock_get_name.return_value = fake_obj
-        fake_id = uuidutils.generate_uuid()
 
-        res = ro.Receiver.find(self.ctx, fake_id, project_safe=False)
-
-        self.assertEqual(fake_obj, res)
-        mock_get.assert_called_once_with(self.ctx, fake_id, project_safe=False)
-        mock_get_name.assert_called_once_with(self.ctx, fake_id,
-                                              project_safe=False)
-
-    @mock.patch.object(ro.Receiver, 'get_by_name')
-    def test_find_by_name(self, mock_get_name):
-        fake_obj = mock.Mock()
-        mock_get_name.return_value = fake_obj
-        fake_id = 'not-a-uuid'
-
-        res = ro.Receiver.find(self.ctx, fake_id)
-
-        self.assertEqual(fake_obj, res)
-        mock_get_name.assert_called_once_with(self.ctx, fake_id)
-
-    @mock.patch.object(ro.Receiver, 'get_by_short_id')
-    @mock.patch.object(ro.Receiver, 'get_by_name')
-    def test_find_by_short_id(self, mock_get_name, mock_get_shortid):
-        mock_get_name.return_value = None
-        fake_obj = mock.Mock()
-        mock_get_shortid.return_value = fake_obj
-        fake_id = '12345678'
-
-        res = ro.Receiver.find(self.ctx, fake_id, project_safe=False)
-
-        self.assertEqual(fake_obj, res)
-        mock_get_name.assert_called_once_with(self.ctx, fake_id,
-                                              project_safe=False)
-        mock_get_shortid.assert_called_once_with(self.ctx, fake_id,
-                                                 project_safe=False)
-
-    @mock.patch.object(ro.Receiver, 'get_by_short_id')
-    @mock.patch.object(ro.Receiver, 'get_by_name')
-    def test_find_not_found(self, mock_get_name, mock_get_shortid):
-        mock_get_shortid.return_value = None
-        mock_get_name.return_value = None
-        fake_id = '12345678'  # not a uuid
-
-        self.assertRaises(exc.ResourceNotFound,
-                          ro.Receiver.find,
-                          self.ctx, fake_id)
-
-        mock_get_name.assert_called_once_with(self.ctx, fake_id)
+        ex = self.assertRaises(exc.ResourceNotFound,
+                               ro.Receiver.find,
+                               self.ctx, 'BOGUS')
+        self.assertEqual("The receiver 'BOGUS' could not be found.",
+                         six.text_type(ex))
+        mock_get.assert_called_once_with(self.ctx, 'BOGUS')
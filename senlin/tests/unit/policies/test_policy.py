@@ -20,6 +20,7 @@ from senlin.common import context as senlin_ctx
 from senlin.common import exception
 from senlin.common import schema
 from senlin.common import utils as common_utils
+from senlin.engine import dispatcher
 from senlin.engine import environment
 from senlin.engine import parser
 from senlin.objects import credential as co
@@ -223,6 +224,46 @@ class TestPolicyBase(base.SenlinTestCase):
         self.assertEqual("The policy 'None' could not be found.",
                          six.text_type(ex))
 
+    def test_load_cached(self):
+        policy = utils.create_policy(self.ctx, UUID1)
+        res1 = pb.Policy.load(self.ctx, policy.id)
+
+        with mock.patch.object(po.Policy, 'get') as mock_get:
+            res2 = pb.Policy.load(self.ctx, policy.id)
+        self.assertEqual(0, mock_get.call_count)
+
+        self.assertEqual(policy.id, res2.id)
+        self.assertEqual(policy.spec, res2.spec)
+        self.assertIsInstance(res2, DummyPolicy)
+        # Each caller gets a policy of its own
+        self.assertIsNot(res1, res2)
+        res1._novaclient = mock.Mock()
+        self.assertIsNone(res2._novaclient)
+        self.assertEqual({'hits': 1, 'misses': 1, 'size': 1},
+                         pb._CACHE.stats())
+
+    def test_load_cached_updated(self):
+        policy = utils.create_policy(self.ctx, UUID1)
+        pb.Policy.load(self.ctx, policy.id)
+
+        # A policy updated without a broadcast is not served from cache
+        po.Policy.update(self.ctx, policy.id,
+                         {'name': 'new-name',
+                          'updated_at': timeutils.utcnow(True)})
+        res = pb.Policy.load(self.ctx, policy.id)
+
+        self.assertEqual('new-name', res.name)
+        self.assertEqual(2, pb._CACHE.misses)
+
+    def test_load_cached_diff_project(self):
+        policy = utils.create_policy(self.ctx, UUID1)
+        pb.Policy.load(self.ctx, policy.id)
+
+        new_ctx = utils.dummy_context(project='a-different-project')
+        self.assertRaises(exception.ResourceNotFound,
+                          pb.Policy.load,
+                          new_ctx, policy.id, None)
+
     def test_delete(self):
         policy = utils.create_policy(self.ctx, UUID1)
         policy_id = policy.id
@@ -237,6 +278,18 @@ class TestPolicyBase(base.SenlinTestCase):
         result = pb.Policy.delete(self.ctx, 'bogus')
         self.assertIsNone(result)
 
+    def test_delete_cached(self):
+        policy = utils.create_policy(self.ctx, UUID1)
+        pb.Policy.load(self.ctx, policy.id)
+
+        with mock.patch.object(dispatcher, 'notify') as mock_notify:
+            pb.Policy.delete(self.ctx, policy.id)
+
+        self.assertEqual(0, pb._CACHE.stats()['size'])
+        mock_notify.assert_called_once_with(
+            dispatcher.INVALIDATE_CACHE, None, name='policy',
+            obj_id=policy.id)
+
     def test_store_for_create(self):
         policy = self._create_policy('test-policy')
         self.assertIsNone(policy.id)
@@ -281,6 +334,16 @@ class TestPolicyBase(base.SenlinTestCase):
         self.assertIsNotNone(policy.created_at)
         self.assertIsNotNone(policy.updated_at)
 
+    @mock.patch.object(dispatcher, 'invalidate_cache')
+    def test_store_for_update_invalidate_cache(self, mock_invalidate):
+        policy = self._create_policy('test-policy')
+        policy_id = policy.store(self.ctx)
+        self.assertEqual(0, mock_invalidate.call_count)
+
+        policy.store(self.ctx)
+
+        mock_invalidate.assert_called_once_with('policy', policy_id)
+
     def test_to_dict(self):
         policy = self._create_policy('test-policy')
         policy_id = policy.store(self.ctx)
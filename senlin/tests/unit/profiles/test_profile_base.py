@@ -14,6 +14,7 @@ import copy
 
 import mock
 from oslo_context import context as oslo_ctx
+from oslo_utils import timeutils
 import six
 
 from senlin.common import consts
@@ -21,6 +22,7 @@ from senlin.common import context as senlin_ctx
 from senlin.common import exception
 from senlin.common import schema
 from senlin.common import utils as common_utils
+from senlin.engine import dispatcher
 from senlin.engine import environment
 from senlin.engine import parser
 from senlin.objects import credential as co
@@ -275,13 +277,64 @@ class TestProfileBase(base.SenlinTestCase):
         self.assertEqual(profile.id, res.id)
 
     @mock.patch.object(po.Profile, 'get')
-    def test_load_not_found(self, mock_get):
-        mock_get.return_value = None
+    @mock.patch.object(po.Profile, 'get_version')
+    def test_load_not_found(self, mock_version, mock_get):
+        mock_version.return_value = None
         self.assertRaises(exception.ResourceNotFound,
                           pb.Profile.load,
                           self.ctx, profile_id='FAKE_ID')
-        mock_get.assert_called_once_with(self.ctx, 'FAKE_ID',
-                                         project_safe=True)
+        mock_version.assert_called_once_with(self.ctx, 'FAKE_ID',
+                                             project_safe=True)
+        self.assertEqual(0, mock_get.call_count)
+
+    @mock.patch.object(senlin_ctx, 'get_service_credentials')
+    def test_load_cached(self, mock_creds):
+        mock_creds.return_value = {}
+        obj = self._create_profile('test-profile-dd')
+        profile_id = obj.store(self.ctx)
+
+        res1 = pb.Profile.load(self.ctx, profile_id=profile_id)
+        with mock.patch.object(po.Profile, 'get') as mock_get:
+            res2 = pb.Profile.load(self.ctx, profile_id=profile_id)
+        self.assertEqual(0, mock_get.call_count)
+
+        self.assertEqual(profile_id, res2.id)
+        self.assertEqual(res1.spec, res2.spec)
+        self.assertIsInstance(res2, DummyProfile)
+        # Each caller gets a profile of its own
+        self.assertIsNot(res1, res2)
+        res1._computeclient = mock.Mock()
+        self.assertIsNone(res2._computeclient)
+        self.assertEqual({'hits': 1, 'misses': 1, 'size': 1},
+                         pb._CACHE.stats())
+
+    @mock.patch.object(senlin_ctx, 'get_service_credentials')
+    def test_load_cached_updated(self, mock_creds):
+        mock_creds.return_value = {}
+        obj = self._create_profile('test-profile-ee')
+        profile_id = obj.store(self.ctx)
+        pb.Profile.load(self.ctx, profile_id=profile_id)
+
+        # A profile updated without a broadcast is not served from cache
+        po.Profile.update(self.ctx, profile_id,
+                          {'name': 'new-name',
+                           'updated_at': timeutils.utcnow(True)})
+        res = pb.Profile.load(self.ctx, profile_id=profile_id)
+
+        self.assertEqual('new-name', res.name)
+        self.assertEqual(2, pb._CACHE.misses)
+
+    @mock.patch.object(senlin_ctx, 'get_service_credentials')
+    def test_load_cached_diff_project(self, mock_creds):
+        mock_creds.return_value = {}
+        obj = self._create_profile('test-profile-ff')
+        profile_id = obj.store(self.ctx)
+        pb.Profile.load(self.ctx, profile_id=profile_id)
+
+        new_ctx = utils.dummy_context(project='a-different-project')
+        self.assertRaises(exception.ResourceNotFound,
+                          pb.Profile.load,
+                          new_ctx, profile_id=profile_id)
 
     @mock.patch.object(senlin_ctx, 'get_service_credentials')
     def test_create(self, mock_creds):
@@ -323,6 +376,13 @@ class TestProfileBase(base.SenlinTestCase):
         self.assertIsNone(res)
         mock_delete.assert_called_once_with(self.ctx, 'FAKE_ID')
 
+    @mock.patch.object(dispatcher, 'invalidate_cache')
+    @mock.patch.object(po.Profile, 'delete')
+    def test_delete_invalidate_cache(self, mock_delete, mock_invalidate):
+        pb.Profile.delete(self.ctx, 'FAKE_ID')
+
+        mock_invalidate.assert_called_once_with('profile', 'FAKE_ID')
+
     @mock.patch.object(po.Profile, 'delete')
     def test_delete_busy(self, mock_delete):
         err = exception.EResourceBusy(type='profile', id='FAKE_ID')
@@ -393,6 +453,19 @@ class TestProfileBase(base.SenlinTestCase):
         self.assertIsNotNone(profile.updated_at)
         self.assertEqual('FAKE_ID', profile_id)
 
+    @mock.patch.object(senlin_ctx, 'get_service_credentials')
+    @mock.patch.object(dispatcher, 'invalidate_cache')
+    @mock.patch.object(po.Profile, 'update')
+    def test_store_for_update_invalidate_cache(self, mock_update,
+                                               mock_invalidate, mock_creds):
+        mock_creds.return_value = {}
+        profile = self._create_profile('test-profile')
+        profile.id = 'FAKE_ID'
+
+        profile.store(self.ctx)
+
+        mock_invalidate.assert_called_once_with('profile', 'FAKE_ID')
+
     @mock.patch.object(pb.Profile, 'load')
     def test_create_object(self, mock_load):
         profile = mock.Mock()
@@ -126,3 +126,30 @@ class TestUtilFunctions(testtools.TestCase):
         mock_context_serializer.assert_called_once_with(x_serializer)
         mock_rpc_client.assert_called_once_with(
             messaging.TRANSPORT, x_target, serializer=x_context_serializer)
+
+    @mock.patch("senlin.common.messaging.NOTIFIER")
+    def test_get_notifier(self, mock_notifier):
+        self.addCleanup(messaging.PREPARED_NOTIFIERS.clear)
+        mock_prepare = mock_notifier.prepare
+
+        res1 = messaging.get_notifier('senlin-engine:host1')
+        res2 = messaging.get_notifier('senlin-engine:host1')
+
+        # The notifier is prepared once and reused
+        self.assertEqual(mock_prepare.return_value, res1)
+        self.assertEqual(res1, res2)
+        mock_prepare.assert_called_once_with(
+            publisher_id='senlin-engine:host1')
+
+    def test_get_notifier_new_base(self):
+        self.addCleanup(messaging.PREPARED_NOTIFIERS.clear)
+        notifier1 = mock.Mock()
+        notifier2 = mock.Mock()
+
+        with mock.patch.object(messaging, 'NOTIFIER', notifier1):
+            res1 = messaging.get_notifier('senlin-engine:host1')
+        with mock.patch.object(messaging, 'NOTIFIER', notifier2):
+            res2 = messaging.get_notifier('senlin-engine:host1')
+
+        self.assertEqual(notifier1.prepare.return_value, res1)
+        self.assertEqual(notifier2.prepare.return_value, res2)
@@ -0,0 +1,75 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from senlin.common import consts
+from senlin.common import scheduleutils as su
+from senlin.tests.unit.common import base
+
+
+def _action(name, action, cause=consts.CAUSE_DERIVED, project='P1'):
+    return mock.Mock(id=name, action=action, cause=cause, project=project)
+
+
+class ScheduleUtilsTest(base.SenlinTestCase):
+
+    def test_action_class(self):
+        self.assertEqual(
+            su.CLASS_RECOVERY,
+            su.action_class(_action('A', consts.NODE_RECOVER)))
+        self.assertEqual(
+            su.CLASS_RECOVERY,
+            su.action_class(_action('A', consts.CLUSTER_RECOVER,
+                                    cause=consts.CAUSE_RPC)))
+        self.assertEqual(
+            su.CLASS_RPC,
+            su.action_class(_action('A', consts.CLUSTER_SCALE_OUT,
+                                    cause=consts.CAUSE_RPC)))
+        self.assertEqual(
+            su.CLASS_DERIVED,
+            su.action_class(_action('A', consts.NODE_CREATE)))
+        self.assertEqual(
+            su.CLASS_DERIVED,
+            su.action_class(_action('A', consts.NODE_DELETE,
+                                    cause=consts.CAUSE_DERIVED_LCH)))
+
+    def test_fair_order(self):
+        actions = [
+            _action('D1', consts.NODE_CREATE, project='P1'),
+            _action('D2', consts.NODE_CREATE, project='P1'),
+            _action('D3', consts.NODE_CREATE, project='P1'),
+            _action('R1', consts.CLUSTER_CHECK, cause=consts.CAUSE_RPC,
+                    project='P2'),
+            _action('D4', consts.NODE_UPDATE, project='P2'),
+            _action('H1', consts.NODE_RECOVER, project='P3'),
+            _action('D5', consts.NODE_CREATE, project='P3'),
+        ]
+
+        res = su.fair_order(actions)
+
+        self.assertEqual(['H1', 'R1', 'D1', 'D4', 'D5', 'D2', 'D3'],
+                         [a.id for a in res])
+
+    def test_fair_order_empty(self):
+        self.assertEqual([], su.fair_order([]))
+
+    def test_queue_depth(self):
+        actions = [
+            _action('D1', consts.NODE_CREATE),
+            _action('D2', consts.NODE_CREATE),
+            _action('H1', consts.NODE_RECOVER),
+        ]
+
+        res = su.queue_depth(actions)
+
+        self.assertEqual({'recovery': 1, 'rpc': 0, 'derived': 2}, res)
@@ -295,3 +295,71 @@ class EngineDeathTest(base.SenlinTestCase):
 
         self.assertFalse(res)
         mock_svc.assert_called_once_with(self.ctx, 'fake_engine_id')
+
+
+class ObjectCacheTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(ObjectCacheTest, self).setUp()
+        self.cache = utils.ObjectCache('test')
+        self.addCleanup(utils._OBJECT_CACHES.pop, 'test', None)
+
+    def test_get_put(self):
+        self.assertIsNone(self.cache.get('ID1', 'V1'))
+        self.cache.put('ID1', 'V1', 'OBJ1')
+
+        self.assertEqual('OBJ1', self.cache.get('ID1', 'V1'))
+        self.assertEqual({'hits': 1, 'misses': 1, 'size': 1},
+                         self.cache.stats())
+
+    def test_get_other_version(self):
+        self.cache.put('ID1', 'V1', 'OBJ1')
+
+        self.assertIsNone(self.cache.get('ID1', 'V2'))
+        self.assertEqual({'hits': 0, 'misses': 1, 'size': 0},
+                         self.cache.stats())
+
+    def test_peek(self):
+        self.assertIsNone(self.cache.peek('ID1'))
+        self.cache.put('ID1', 'V1', 'OBJ1')
+
+        self.assertEqual('OBJ1', self.cache.peek('ID1'))
+        self.assertEqual({'hits': 0, 'misses': 0, 'size': 1},
+                         self.cache.stats())
+
+    def test_put_evict_least_recently_used(self):
+        cfg.CONF.set_override('object_cache_size', 2)
+        self.cache.put('ID1', 'V1', 'OBJ1')
+        self.cache.put('ID2', 'V1', 'OBJ2')
+        self.cache.get('ID1', 'V1')
+
+        self.cache.put('ID3', 'V1', 'OBJ3')
+
+        self.assertIsNone(self.cache.get('ID2', 'V1'))
+        self.assertEqual('OBJ1', self.cache.get('ID1', 'V1'))
+        self.assertEqual('OBJ3', self.cache.get('ID3', 'V1'))
+
+    def test_put_disabled(self):
+        cfg.CONF.set_override('object_cache_size', 0)
+        self.cache.put('ID1', 'V1', 'OBJ1')
+
+        self.assertIsNone(self.cache.get('ID1', 'V1'))
+
+    def test_invalidate(self):
+        self.cache.put('ID1', 'V1', 'OBJ1')
+
+        utils.invalidate_cached_object('test', 'ID1')
+        # Unknown caches and objects are ignored
+        utils.invalidate_cached_object('test', 'ID2')
+        utils.invalidate_cached_object('bogus', 'ID1')
+
+        self.assertIsNone(self.cache.get('ID1', 'V1'))
+
+    def test_clear_object_caches(self):
+        self.cache.put('ID1', 'V1', 'OBJ1')
+        self.cache.get('ID1', 'V1')
+
+        utils.clear_object_caches()
+
+        self.assertEqual({'hits': 0, 'misses': 0, 'size': 0},
+                         utils.object_cache_stats()['test'])